@@ -0,0 +1,68 @@
+"""compliance summary rollup cache
+
+Revision ID: 0055_compliance_summary_rollups
+Revises: 0054_wo_service_release_note_link
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0055_compliance_summary_rollups"
+down_revision: str | Sequence[str] | None = "0054_wo_service_release_note_link"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+COMPLIANCE_SCHEMA = "compliance"
+TABLE = f"{COMPLIANCE_SCHEMA}.summary_rollups"
+POLICY = f"tenant_isolation_{TABLE.replace('.', '_')}"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "summary_rollups",
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+        ),
+        sa.Column("bucket_type", sa.String(length=20), nullable=False),
+        sa.Column("framework_key", sa.String(length=80), nullable=False, server_default=""),
+        sa.Column("domain_code", sa.String(length=80), nullable=False, server_default=""),
+        sa.Column("label", sa.String(length=255), nullable=False, server_default=""),
+        sa.Column("profile_key", sa.String(length=120), nullable=True),
+        sa.Column("numerator", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("denominator", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.CheckConstraint(
+            "bucket_type in ('overall','domain','framework','framework_domain')",
+            name="ck_compliance_summary_rollups_bucket_type",
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "bucket_type", "framework_key", "domain_code"),
+        schema=COMPLIANCE_SCHEMA,
+    )
+
+    op.execute(f"ALTER TABLE {TABLE} ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {POLICY}
+        ON {TABLE}
+        USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP POLICY IF EXISTS {POLICY} ON {TABLE}")
+    op.execute(f"ALTER TABLE {TABLE} DISABLE ROW LEVEL SECURITY")
+    op.drop_table("summary_rollups", schema=COMPLIANCE_SCHEMA)
@@ -0,0 +1,50 @@
+"""Denormalized question_count on assessment_test_versions; per-user attempt index.
+
+Lets the test-taker "available assessments" feed read question counts and the
+caller's attempt state in one aggregated query.
+
+Revision ID: 0056_test_version_question_count
+Revises: 0055_compliance_summary_rollups
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0056_test_version_question_count"
+down_revision: str | Sequence[str] | None = "0055_compliance_summary_rollups"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assessment_test_versions",
+        sa.Column("question_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE assessment_test_versions v
+        SET question_count = sub.cnt
+        FROM (
+            SELECT test_version_id, COUNT(*) AS cnt
+            FROM assessment_test_version_questions
+            GROUP BY test_version_id
+        ) sub
+        WHERE v.id = sub.test_version_id
+        """
+    )
+    op.create_index(
+        "ix_assessment_attempts_user_delivery",
+        "assessment_attempts",
+        ["user_id", "delivery_id", "attempt_number"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assessment_attempts_user_delivery", table_name="assessment_attempts")
+    op.drop_column("assessment_test_versions", "question_count")
@@ -0,0 +1,86 @@
+"""MinHash signatures and LSH band buckets for near-duplicate question detection.
+
+Revision ID: 0057_question_minhash_signatures
+Revises: 0056_test_version_question_count
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0057_question_minhash_signatures"
+down_revision: str | Sequence[str] | None = "0056_test_version_question_count"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("assessment_question_signatures", "assessment_question_lsh_bands")
+
+
+def _tenant_column() -> sa.Column:
+    return sa.Column(
+        "tenant_id",
+        postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("tenants.id", ondelete="CASCADE"),
+        nullable=False,
+        server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+    )
+
+
+def _question_fk() -> sa.ForeignKeyConstraint:
+    return sa.ForeignKeyConstraint(
+        ["tenant_id", "question_id"],
+        ["assessment_questions.tenant_id", "assessment_questions.id"],
+        ondelete="CASCADE",
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "assessment_question_signatures",
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        _tenant_column(),
+        sa.Column("minhash", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        _question_fk(),
+    )
+    op.create_index(
+        "ix_assessment_question_signatures_tenant_id", "assessment_question_signatures", ["tenant_id"]
+    )
+    op.create_table(
+        "assessment_question_lsh_bands",
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("band", sa.SmallInteger(), primary_key=True),
+        _tenant_column(),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        _question_fk(),
+    )
+    op.create_index(
+        "ix_assessment_question_lsh_bands_bucket",
+        "assessment_question_lsh_bands",
+        ["tenant_id", "band", "bucket"],
+    )
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+        op.execute(
+            f"""
+            CREATE POLICY {table}_tenant_isolation
+            ON {table}
+            USING (tenant_id = current_setting('app.tenant_id')::uuid)
+            """
+        )
+    # Signatures are backfilled lazily by question_dedup_service.ensure_signatures.
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS {table}_tenant_isolation ON {table}")
+    op.drop_index("ix_assessment_question_lsh_bands_bucket", table_name="assessment_question_lsh_bands")
+    op.drop_table("assessment_question_lsh_bands")
+    op.drop_index("ix_assessment_question_signatures_tenant_id", table_name="assessment_question_signatures")
+    op.drop_table("assessment_question_signatures")
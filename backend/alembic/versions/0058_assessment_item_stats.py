@@ -0,0 +1,112 @@
+"""Running item-analysis statistics per assessment test version.
+
+Revision ID: 0058_assessment_item_stats
+Revises: 0057_question_minhash_signatures
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0058_assessment_item_stats"
+down_revision: str | Sequence[str] | None = "0057_question_minhash_signatures"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("assessment_version_stats", "assessment_item_stats")
+
+
+def _tenant_column() -> sa.Column:
+    return sa.Column(
+        "tenant_id",
+        postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("tenants.id", ondelete="CASCADE"),
+        nullable=False,
+        server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+    )
+
+
+def _version_fk() -> sa.ForeignKeyConstraint:
+    return sa.ForeignKeyConstraint(
+        ["tenant_id", "test_version_id"],
+        ["assessment_test_versions.tenant_id", "assessment_test_versions.id"],
+        ondelete="CASCADE",
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "assessment_version_stats",
+        sa.Column("test_version_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        _tenant_column(),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("score_sq_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        _version_fk(),
+    )
+    op.create_index("ix_assessment_version_stats_tenant_id", "assessment_version_stats", ["tenant_id"])
+    op.create_table(
+        "assessment_item_stats",
+        sa.Column(
+            "test_version_question_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("assessment_test_version_questions.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        _tenant_column(),
+        sa.Column("test_version_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("response_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("omitted_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("correct_score_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("option_counts", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        _version_fk(),
+    )
+    op.create_index("ix_assessment_item_stats_version", "assessment_item_stats", ["test_version_id"])
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+        op.execute(
+            f"""
+            CREATE POLICY {table}_tenant_isolation
+            ON {table}
+            USING (tenant_id = current_setting('app.tenant_id')::uuid)
+            """
+        )
+
+    # Adds two {key: count} maps; lets submit-time upserts merge distractor counts atomically.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION assessment_merge_counts(a jsonb, b jsonb)
+        RETURNS jsonb LANGUAGE sql IMMUTABLE AS $$
+            SELECT COALESCE(jsonb_object_agg(k, total), '{}'::jsonb)
+            FROM (
+                SELECT k, SUM(v::bigint) AS total
+                FROM (
+                    SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+                    UNION ALL
+                    SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+                ) AS s(k, v)
+                GROUP BY k
+            ) AS merged
+        $$
+        """
+    )
+    # Statistics are rebuilt lazily from existing attempts by item_analysis_service.
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS assessment_merge_counts(jsonb, jsonb)")
+    for table in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS {table}_tenant_isolation ON {table}")
+    op.drop_index("ix_assessment_item_stats_version", table_name="assessment_item_stats")
+    op.drop_table("assessment_item_stats")
+    op.drop_index("ix_assessment_version_stats_tenant_id", table_name="assessment_version_stats")
+    op.drop_table("assessment_version_stats")
@@ -0,0 +1,54 @@
+"""Per-membership achievement progress (streaks, runs, per-test stars).
+
+Revision ID: 0059_user_achievement_progress
+Revises: 0058_assessment_item_stats
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0059_user_achievement_progress"
+down_revision: str | Sequence[str] | None = "0058_assessment_item_stats"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_achievement_progress",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("current_week_streak", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_active_week", sa.String(8), nullable=True),
+        sa.Column("perfect_run", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("five_star_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("low_star_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("test_stars", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "user_id"),
+    )
+
+    op.execute("ALTER TABLE user_achievement_progress ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        """
+        CREATE POLICY tenant_isolation_user_achievement_progress
+        ON user_achievement_progress
+        USING      (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+    # Rows are seeded lazily from attempt history by star_service on a member's next submission.
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_user_achievement_progress ON user_achievement_progress")
+    op.execute("ALTER TABLE user_achievement_progress DISABLE ROW LEVEL SECURITY")
+    op.drop_table("user_achievement_progress")
@@ -0,0 +1,88 @@
+"""Leaderboard rollups of stars per member per week/month/quarter/all-time.
+
+Revision ID: 0060_assessment_leaderboard
+Revises: 0059_user_achievement_progress
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0060_assessment_leaderboard"
+down_revision: str | Sequence[str] | None = "0059_user_achievement_progress"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "assessment_leaderboard_entries"
+
+# Period keys must match leaderboard_service.period_key (UTC, ISO weeks).
+PERIOD_KEYS = {
+    "week": "to_char(a.submitted_at AT TIME ZONE 'UTC', 'IYYY-\"W\"IW')",
+    "month": "to_char(a.submitted_at AT TIME ZONE 'UTC', 'YYYY-MM')",
+    "quarter": "to_char(a.submitted_at AT TIME ZONE 'UTC', 'YYYY-\"Q\"Q')",
+    "all": "'all'",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        TABLE,
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("period_type", sa.String(10), nullable=False),
+        sa.Column("period_key", sa.String(10), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("stars", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("tests", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.CheckConstraint(
+            "period_type in ('week', 'month', 'quarter', 'all')",
+            name="assessment_leaderboard_period_type_values",
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "period_type", "period_key", "user_id"),
+    )
+    op.execute(
+        f"""
+        CREATE INDEX ix_assessment_leaderboard_rank
+        ON {TABLE} (tenant_id, period_type, period_key, stars DESC, user_id DESC)
+        """
+    )
+
+    for period_type, key_expr in PERIOD_KEYS.items():
+        # Postgres rejects a string constant in GROUP BY, so the all-time bucket omits it.
+        group_key = "" if period_type == "all" else f"{key_expr}, "
+        op.execute(
+            f"""
+            INSERT INTO {TABLE} (tenant_id, period_type, period_key, user_id, stars, tests)
+            SELECT a.tenant_id, '{period_type}', {key_expr}, a.user_id,
+                   SUM(a.stars_earned), COUNT(*)
+            FROM assessment_attempts a
+            WHERE a.status = 'scored'
+              AND a.stars_earned IS NOT NULL
+              AND a.submitted_at IS NOT NULL
+            GROUP BY a.tenant_id, {group_key}a.user_id
+            """
+        )
+
+    op.execute(f"ALTER TABLE {TABLE} ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY tenant_isolation_{TABLE}
+        ON {TABLE}
+        USING      (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP POLICY IF EXISTS tenant_isolation_{TABLE} ON {TABLE}")
+    op.execute(f"ALTER TABLE {TABLE} DISABLE ROW LEVEL SECURITY")
+    op.drop_index("ix_assessment_leaderboard_rank", table_name=TABLE)
+    op.drop_table(TABLE)
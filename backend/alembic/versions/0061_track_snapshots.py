@@ -0,0 +1,96 @@
+"""Content-addressed track snapshots shared by assignments.
+
+Revision ID: 0061_track_snapshots
+Revises: 0060_assessment_leaderboard
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0061_track_snapshots"
+down_revision: str | Sequence[str] | None = "0060_assessment_leaderboard"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Existing rows are keyed by the digest of their jsonb text; new rows use the canonical-JSON
+# digest computed by assignment_service, so at most one extra copy per version can appear.
+_LEGACY_HASH = "encode(sha256(convert_to(snapshot::text, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "track_snapshots",
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+        ),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("track_version_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("snapshot", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "content_hash"),
+    )
+
+    op.execute("ALTER TABLE track_snapshots ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        """
+        CREATE POLICY tenant_isolation_track_snapshots
+        ON track_snapshots
+        USING      (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+    op.add_column("onboarding_assignments", sa.Column("snapshot_hash", sa.String(64), nullable=True))
+    op.execute(
+        f"""
+        INSERT INTO track_snapshots (tenant_id, content_hash, track_version_id, snapshot)
+        SELECT DISTINCT ON (tenant_id, {_LEGACY_HASH})
+               tenant_id, {_LEGACY_HASH}, track_version_id, snapshot
+        FROM onboarding_assignments
+        ORDER BY tenant_id, {_LEGACY_HASH}, created_at
+        """
+    )
+    op.execute(f"UPDATE onboarding_assignments SET snapshot_hash = {_LEGACY_HASH}")
+    op.alter_column("onboarding_assignments", "snapshot_hash", nullable=False)
+    op.create_foreign_key(
+        "fk_onboarding_assignments_tenant_snapshot",
+        "onboarding_assignments",
+        "track_snapshots",
+        ["tenant_id", "snapshot_hash"],
+        ["tenant_id", "content_hash"],
+        ondelete="RESTRICT",
+    )
+    op.create_index("ix_onboarding_assignments_snapshot_hash", "onboarding_assignments", ["snapshot_hash"])
+    op.drop_column("onboarding_assignments", "snapshot")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "onboarding_assignments",
+        sa.Column("snapshot", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+    )
+    op.execute(
+        """
+        UPDATE onboarding_assignments AS a
+        SET snapshot = s.snapshot
+        FROM track_snapshots AS s
+        WHERE s.tenant_id = a.tenant_id AND s.content_hash = a.snapshot_hash
+        """
+    )
+    op.drop_index("ix_onboarding_assignments_snapshot_hash", table_name="onboarding_assignments")
+    op.drop_constraint("fk_onboarding_assignments_tenant_snapshot", "onboarding_assignments", type_="foreignkey")
+    op.drop_column("onboarding_assignments", "snapshot_hash")
+
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_track_snapshots ON track_snapshots")
+    op.execute("ALTER TABLE track_snapshots DISABLE ROW LEVEL SECURITY")
+    op.drop_table("track_snapshots")
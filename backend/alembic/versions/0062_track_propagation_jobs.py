@@ -0,0 +1,83 @@
+"""Background jobs propagating a published track version to assignments.
+
+Revision ID: 0062_track_propagation_jobs
+Revises: 0061_track_snapshots
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0062_track_propagation_jobs"
+down_revision: str | Sequence[str] | None = "0061_track_snapshots"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "track_propagation_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+        ),
+        sa.Column("template_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("track_version_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_assignment_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("error_summary", sa.Text(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("updated_by", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["tenant_id", "track_version_id"],
+            ["track_versions.tenant_id", "track_versions.id"],
+            ondelete="CASCADE",
+        ),
+        sa.CheckConstraint(
+            "status in ('queued', 'running', 'completed', 'failed', 'canceled')",
+            name="track_propagation_job_status_values",
+        ),
+    )
+    op.create_index("ix_track_propagation_jobs_tenant_id", "track_propagation_jobs", ["tenant_id"])
+    op.create_index("ix_track_propagation_jobs_status", "track_propagation_jobs", ["status"])
+    op.create_index(
+        "ix_track_propagation_jobs_template_created",
+        "track_propagation_jobs",
+        ["template_id", "created_at"],
+    )
+
+    op.execute("ALTER TABLE track_propagation_jobs ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        """
+        CREATE POLICY tenant_isolation_track_propagation_jobs
+        ON track_propagation_jobs
+        USING      (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_track_propagation_jobs ON track_propagation_jobs")
+    op.execute("ALTER TABLE track_propagation_jobs DISABLE ROW LEVEL SECURITY")
+    op.drop_index("ix_track_propagation_jobs_template_created", table_name="track_propagation_jobs")
+    op.drop_index("ix_track_propagation_jobs_status", table_name="track_propagation_jobs")
+    op.drop_index("ix_track_propagation_jobs_tenant_id", table_name="track_propagation_jobs")
+    op.drop_table("track_propagation_jobs")
@@ -0,0 +1,32 @@
+"""Index for the integration registry overview's most recently changed instances.
+
+Revision ID: 0063_ir_instance_recent_index
+Revises: 0062_track_propagation_jobs
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0063_ir_instance_recent_index"
+down_revision: str | Sequence[str] | None = "0062_track_propagation_jobs"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+IR_SCHEMA = "integration_registry"
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS ix_ir_instance_tenant_updated
+        ON {IR_SCHEMA}.ir_instance (tenant_id, updated_at DESC)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {IR_SCHEMA}.ix_ir_instance_tenant_updated")
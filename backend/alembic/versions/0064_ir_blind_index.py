@@ -0,0 +1,43 @@
+"""Blind-index search tokens for encrypted integration registry endpoint and route-hop fields.
+
+Revision ID: 0064_ir_blind_index
+Revises: 0063_ir_instance_recent_index
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0064_ir_blind_index"
+down_revision: str | Sequence[str] | None = "0063_ir_instance_recent_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+IR_SCHEMA = "integration_registry"
+
+# Tokens are keyed by the tenant's passphrase-derived key, so existing rows stay NULL here
+# and are indexed by the application the next time the tenant key is unlocked.
+
+
+def upgrade() -> None:
+    for table in ("ir_endpoint", "ir_route_hop"):
+        op.add_column(
+            table,
+            sa.Column("search_tokens", postgresql.ARRAY(sa.String(16)), nullable=True),
+            schema=IR_SCHEMA,
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_search_tokens ON {IR_SCHEMA}.{table} "
+            "USING gin (search_tokens)"
+        )
+
+
+def downgrade() -> None:
+    for table in ("ir_route_hop", "ir_endpoint"):
+        op.execute(f"DROP INDEX IF EXISTS {IR_SCHEMA}.ix_{table}_search_tokens")
+        op.drop_column(table, "search_tokens", schema=IR_SCHEMA)
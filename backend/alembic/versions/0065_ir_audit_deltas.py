@@ -0,0 +1,124 @@
+"""Delta-encoded integration registry audit log with a per-entity version head.
+
+Revision ID: 0065_ir_audit_deltas
+Revises: 0064_ir_blind_index
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.utils.json_patch import apply_patch
+
+revision: str = "0065_ir_audit_deltas"
+down_revision: str | Sequence[str] | None = "0064_ir_blind_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+IR_SCHEMA = "integration_registry"
+
+
+def upgrade() -> None:
+    # Existing rows are full snapshots, i.e. keyframes.
+    op.add_column(
+        "ir_audit_log",
+        sa.Column("is_keyframe", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        schema=IR_SCHEMA,
+    )
+    op.add_column(
+        "ir_audit_log",
+        sa.Column("patch_json", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        schema=IR_SCHEMA,
+    )
+    op.create_index(
+        "ix_ir_audit_log_entity_version",
+        "ir_audit_log",
+        ["tenant_id", "entity_type", "entity_id", "version"],
+        schema=IR_SCHEMA,
+    )
+
+    op.create_table(
+        "ir_audit_head",
+        sa.Column(
+            "tenant_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+        ),
+        sa.Column("entity_type", sa.String(length=80), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("keyframe_version", sa.Integer(), nullable=False),
+        sa.Column(
+            "snapshot_json",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.PrimaryKeyConstraint("tenant_id", "entity_type", "entity_id"),
+        schema=IR_SCHEMA,
+    )
+    op.execute(
+        f"""
+        INSERT INTO {IR_SCHEMA}.ir_audit_head
+            (tenant_id, entity_type, entity_id, version, keyframe_version, snapshot_json)
+        SELECT DISTINCT ON (tenant_id, entity_type, entity_id)
+               tenant_id, entity_type, entity_id, version, version, snapshot_json
+        FROM {IR_SCHEMA}.ir_audit_log
+        ORDER BY tenant_id, entity_type, entity_id, version DESC, changed_at DESC
+        """
+    )
+
+    table = f"{IR_SCHEMA}.ir_audit_head"
+    policy = f"tenant_isolation_{table.replace('.', '_')}"
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {policy}
+        ON {table}
+        USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+        """
+    )
+
+
+def downgrade() -> None:
+    table = f"{IR_SCHEMA}.ir_audit_head"
+    policy = f"tenant_isolation_{table.replace('.', '_')}"
+    op.execute(f"DROP POLICY IF EXISTS {policy} ON {table}")
+    op.execute(f"ALTER TABLE {table} DISABLE ROW LEVEL SECURITY")
+    op.drop_table("ir_audit_head", schema=IR_SCHEMA)
+
+    # Materialize every delta back into a full snapshot before dropping the patches.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            f"""
+            SELECT id, tenant_id, entity_type, entity_id, is_keyframe, snapshot_json, patch_json
+            FROM {IR_SCHEMA}.ir_audit_log
+            ORDER BY tenant_id, entity_type, entity_id, version
+            """
+        )
+    ).mappings().all()
+    state = None
+    entity = None
+    update = sa.text(
+        f"UPDATE {IR_SCHEMA}.ir_audit_log SET snapshot_json = CAST(:snapshot AS jsonb) WHERE id = :id"
+    )
+    for row in rows:
+        key = (row["tenant_id"], row["entity_type"], row["entity_id"])
+        if row["is_keyframe"] or key != entity:
+            entity, state = key, row["snapshot_json"]
+            continue
+        state = apply_patch(state, row["patch_json"] or [])
+        bind.execute(update, {"snapshot": json.dumps(state), "id": row["id"]})
+
+    op.drop_index("ix_ir_audit_log_entity_version", table_name="ir_audit_log", schema=IR_SCHEMA)
+    op.drop_column("ir_audit_log", "patch_json", schema=IR_SCHEMA)
+    op.drop_column("ir_audit_log", "is_keyframe", schema=IR_SCHEMA)
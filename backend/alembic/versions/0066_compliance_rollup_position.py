@@ -0,0 +1,35 @@
+"""Keep the compute order of compliance summary rollups.
+
+Revision ID: 0066_compliance_rollup_position
+Revises: 0065_ir_audit_deltas
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0066_compliance_rollup_position"
+down_revision: str | Sequence[str] | None = "0065_ir_audit_deltas"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COMPLIANCE_SCHEMA = "compliance"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "summary_rollups",
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+        schema=COMPLIANCE_SCHEMA,
+    )
+    # Existing rows have no order; drop them so the next write or read rebuilds them.
+    op.execute(f"DELETE FROM {COMPLIANCE_SCHEMA}.summary_rollups")
+
+
+def downgrade() -> None:
+    op.drop_column("summary_rollups", "position", schema=COMPLIANCE_SCHEMA)
@@ -0,0 +1,51 @@
+"""Align question signature RLS policies with the schema; index questions by update time.
+
+Revision ID: 0067_question_signature_policies
+Revises: 0066_compliance_rollup_position
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0067_question_signature_policies"
+down_revision: str | Sequence[str] | None = "0066_compliance_rollup_position"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("assessment_question_signatures", "assessment_question_lsh_bands")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS {table}_tenant_isolation ON {table}")
+        op.execute(
+            f"""
+            CREATE POLICY tenant_isolation_{table}
+            ON {table}
+            USING (tenant_id = current_setting('app.tenant_id', true)::uuid)
+            WITH CHECK (tenant_id = current_setting('app.tenant_id', true)::uuid)
+            """
+        )
+    # Incremental signature backfill scans questions updated since its last pass.
+    op.create_index(
+        "ix_assessment_questions_tenant_updated_at",
+        "assessment_questions",
+        ["tenant_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assessment_questions_tenant_updated_at", table_name="assessment_questions")
+    for table in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS tenant_isolation_{table} ON {table}")
+        op.execute(
+            f"""
+            CREATE POLICY {table}_tenant_isolation
+            ON {table}
+            USING (tenant_id = current_setting('app.tenant_id')::uuid)
+            """
+        )
@@ -1,4 +1,5 @@
 from collections.abc import Callable
+from typing import Any
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
@@ -7,13 +8,67 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.security import TokenDecodeError, decode_access_token
-from app.db.session import get_db
+from app.db.session import get_db, route_reads_to_replica
 from app.models.rbac import User, UserRole
+from app.services import principal_service
+from app.services.principal_service import Principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/v1/auth/login')
 
 
+class CurrentUser:
+    """The authenticated user as seen by endpoints.
+
+    ``id``, ``is_active``, ``password_change_required`` and the role names come from the
+    cached principal; any other ``User`` attribute loads the row on first use.
+    """
+
+    __slots__ = ('principal', '_db', '_user')
+
+    def __init__(self, principal: Principal, db: Session, user: User | None = None) -> None:
+        object.__setattr__(self, 'principal', principal)
+        object.__setattr__(self, '_db', db)
+        object.__setattr__(self, '_user', user)
+
+    @property
+    def id(self) -> UUID:
+        return self.principal.user_id
+
+    @property
+    def is_active(self) -> bool:
+        return self._user.is_active if self._user is not None else self.principal.is_active
+
+    @property
+    def password_change_required(self) -> bool:
+        if self._user is not None:
+            return self._user.password_change_required
+        return self.principal.password_change_required
+
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            user = _load_user(self._db, self.principal.user_id)
+            if user is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User not found')
+            object.__setattr__(self, '_user', user)
+        return self._user
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.user, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.user, name, value)
+
+
+def _load_user(db: Session, user_id: UUID) -> User | None:
+    return db.scalar(
+        select(User)
+        .where(User.id == user_id)
+        .options(joinedload(User.user_roles).joinedload(UserRole.role))
+    )
+
+
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
     try:
         payload = decode_access_token(token)
@@ -24,16 +79,17 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
     except (TokenDecodeError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid access token') from exc
 
-    user = db.scalar(
-        select(User)
-        .where(User.id == user_id)
-        .options(joinedload(User.user_roles).joinedload(UserRole.role))
-    )
+    # Tokens minted before ``iat`` was added are keyed by their expiry instead.
+    issued_at = int(payload.get('iat') or payload.get('exp') or 0)
+    principal, epoch = principal_service.get_principal(user_id, issued_at)
+    if principal is not None:
+        return CurrentUser(principal, db)
 
+    user = _load_user(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User not found')
 
-    return user
+    return CurrentUser(principal_service.remember(user, issued_at, epoch), db, user)
 
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -42,6 +98,18 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
+def use_read_replica(
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+) -> None:
+    """
+    Route-level dependency for read-only endpoints: the rest of the request reads from the replica.
+
+    The user is resolved first so identity (and the principal cache) never sees replica lag.
+    """
+    route_reads_to_replica(db)
+
+
 def require_password_change_completed(
     request: Request,
     current_user: User = Depends(get_current_active_user),
@@ -63,6 +131,8 @@ def require_password_change_completed(
 
 
 def get_user_role_names(current_user: User) -> set[str]:
+    if isinstance(current_user, CurrentUser):
+        return set(current_user.principal.role_names)
     return {user_role.role.name for user_role in current_user.user_roles}
 
 
@@ -1,18 +1,20 @@
+from collections.abc import Iterator
+import csv
 from datetime import datetime, timedelta, timezone
+import io
+import itertools
 import json
-import re
-import threading
-import time
+from typing import Literal
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, Form, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, or_, select
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session, joinedload
 
-from app.api.deps import get_current_active_user
-from app.db.session import get_db
+from app.api.deps import get_current_active_user, use_read_replica
+from app.db.session import SessionLocal, get_db, set_tenant_id
 from app.models.rbac import User
 from app.multitenancy.deps import TenantContext, require_tenant_membership
 from app.multitenancy.permissions import permissions_for_roles, require_access
@@ -37,6 +39,7 @@ from app.schemas.assessment import (
     AssessmentDeliveryListResponse,
     AssessmentDeliveryOut,
     AssessmentDeliveryUpdate,
+    AssessmentItemAnalysisOut,
     AssessmentQuestionCreate,
     AssessmentQuestionListResponse,
     AssessmentQuestionOut,
@@ -71,123 +74,34 @@ from app.models.assessment import (
     AssessmentAttempt,
     AssessmentClassificationJob,
     AssessmentDelivery,
+    AssessmentTest,
     AssessmentTestVersion,
 )
 from app.models.assessment import AssessmentClassificationJobItem
-from app.services import assessment_classification_service, assessment_service, audit_service, usage_service
-from app.services.openai_responses_service import call_openai_responses_json
-from app.services.pdf_extract_service import chunk_pages, extract_pdf_pages_text
+from app.services import (
+    assessment_classification_service,
+    assessment_service,
+    audit_service,
+    import_job_store,
+    item_analysis_service,
+    job_signals,
+    leaderboard_service,
+    question_dedup_service,
+    question_import_service,
+    usage_service,
+)
+from app.services.pdf_extract_service import iter_page_chunks, iter_pdf_pages_text
+from app.services.question_import_service import (
+    ImportSpec,
+    QuestionCollector,
+    iter_chunk_results,
+    split_text_chunks,
+)
 
 
 router = APIRouter(prefix='/assessments', tags=['assessments'])
 
 
-# ---------------------------------------------------------------------------
-# Job store for text-import background jobs.
-# Uses Redis when available (cross-process safe); falls back to an in-process
-# dict protected by a lock (works fine for single-worker deployments).
-# ---------------------------------------------------------------------------
-_JOB_TTL = 600  # seconds
-_JOB_KEY_PREFIX = 'import_job:'
-
-# In-memory fallback
-_mem_jobs: dict[str, dict] = {}
-_mem_jobs_lock = threading.Lock()
-
-
-def _job_key(job_id: str) -> str:
-    return f'{_JOB_KEY_PREFIX}{job_id}'
-
-
-def _write_job(job_id: str, data: dict) -> None:
-    from app.core.redis_client import redis_client
-    if redis_client is not None:
-        redis_client.set(_job_key(job_id), json.dumps(data), ex=_JOB_TTL)
-    else:
-        with _mem_jobs_lock:
-            _mem_jobs[job_id] = {**data, '_ts': time.monotonic()}
-        _prune_mem_jobs()
-
-
-def _read_job(job_id: str) -> dict | None:
-    from app.core.redis_client import redis_client
-    if redis_client is not None:
-        raw = redis_client.get(_job_key(job_id))
-        return json.loads(raw) if raw else None
-    with _mem_jobs_lock:
-        return _mem_jobs.get(job_id)
-
-
-def _update_job(job_id: str, **fields: object) -> None:
-    """Patch specific fields on an existing job (read-modify-write)."""
-    data = _read_job(job_id)
-    if data is None:
-        return
-    data.update(fields)
-    _write_job(job_id, data)
-
-
-def _prune_mem_jobs() -> None:
-    now = time.monotonic()
-    with _mem_jobs_lock:
-        stale = [jid for jid, j in _mem_jobs.items() if j.get('status') != 'running' and now - j.get('_ts', now) > _JOB_TTL]
-        for jid in stale:
-            del _mem_jobs[jid]
-
-IMPORT_SYSTEM_PROMPT = """You extract high-quality multiple-choice assessment questions from technical text.
-Return compact JSON only (no prose).
-
-Constraints:
-- question_type must be "mcq_single" or "mcq_multi"
-- Provide 4 options for each question when possible (min 2).
-- For mcq_single: exactly 1 correct option.
-- For mcq_multi: 2-3 correct options.
-- Keep prompts unambiguous and answerable from the provided text.
-- Avoid trick questions; focus on key concepts, definitions, procedures, and requirements.
-"""
-
-IMPORT_JSON_SCHEMA: dict = {
-    "type": "object",
-    "additionalProperties": False,
-    "required": ["questions"],
-    "properties": {
-        "questions": {
-            "type": "array",
-            "minItems": 1,
-            "maxItems": 50,
-            "items": {
-                "type": "object",
-                "additionalProperties": False,
-                "required": ["prompt", "question_type", "difficulty", "tags", "status", "explanation", "options"],
-                "properties": {
-                    "prompt": {"type": "string", "minLength": 8},
-                    "question_type": {"type": "string", "enum": ["mcq_single", "mcq_multi"]},
-                    "difficulty": {"type": ["string", "null"]},
-                    "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 20},
-                    "status": {"type": "string", "enum": ["draft"]},
-                    "explanation": {"type": ["string", "null"]},
-                    "options": {
-                        "type": "array",
-                        "minItems": 2,
-                        "maxItems": 6,
-                        "items": {
-                            "type": "object",
-                            "additionalProperties": False,
-                            "required": ["option_text", "is_correct", "order_index"],
-                            "properties": {
-                                "option_text": {"type": "string", "minLength": 1},
-                                "is_correct": {"type": "boolean"},
-                                "order_index": {"type": "integer", "minimum": 0, "maximum": 10},
-                            },
-                        },
-                    },
-                },
-            },
-        }
-    },
-}
-
-
 def _normalize_tags(raw: str) -> list[str]:
     tags = []
     for part in (raw or "").split(","):
@@ -212,53 +126,16 @@ def _split_csv(value: str | None) -> list[str] | None:
     return items or None
 
 
-def _validate_mcq(question: dict) -> tuple[dict | None, str | None]:
-    qtype = question.get("question_type")
-    options = question.get("options") or []
-    if qtype not in ("mcq_single", "mcq_multi"):
-        return None, "invalid question_type"
-    if not isinstance(options, list) or len(options) < 2:
-        return None, "not enough options"
-
-    # Ensure order_index contiguous
-    normalized_opts = []
-    for idx, opt in enumerate(options):
-        if not isinstance(opt, dict):
-            continue
-        text = str(opt.get("option_text") or "").strip()
-        if not text:
-            continue
-        normalized_opts.append(
-            {
-                "option_text": text,
-                "is_correct": bool(opt.get("is_correct", False)),
-                "order_index": idx,
-            }
-        )
-    if len(normalized_opts) < 2:
-        return None, "not enough valid option_text"
-
-    correct_count = sum(1 for o in normalized_opts if o["is_correct"])
-    if qtype == "mcq_single" and correct_count != 1:
-        # try to coerce: keep the first correct, else mark first as correct
-        if correct_count > 1:
-            first = True
-            for o in normalized_opts:
-                if o["is_correct"] and first:
-                    first = False
-                elif o["is_correct"]:
-                    o["is_correct"] = False
-        else:  # 0
-            normalized_opts[0]["is_correct"] = True
-    if qtype == "mcq_multi" and correct_count < 2:
-        # coerce by adding the second option as correct
-        if len(normalized_opts) >= 2:
-            normalized_opts[0]["is_correct"] = True
-            normalized_opts[1]["is_correct"] = True
-
-    question["options"] = normalized_opts
-    question["status"] = "draft"
-    return question, None
+def _peek_min_chars(chunks: Iterator[str], min_chars: int) -> tuple[list[str], int]:
+    """Pull chunks until at least ``min_chars`` of text are buffered (or the source runs dry)."""
+    head: list[str] = []
+    total = 0
+    for chunk in chunks:
+        head.append(chunk)
+        total += len(chunk)
+        if total >= min_chars:
+            break
+    return head, total
 
 
 @router.post('/questions/import-pdf', response_model=AssessmentPdfImportResponse, status_code=status.HTTP_201_CREATED)
@@ -289,105 +166,53 @@ def import_questions_from_pdf(
     if len(pdf_bytes) > 25 * 1024 * 1024:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="PDF too large (max 25MB).")
 
-    pages = extract_pdf_pages_text(pdf_bytes, max_pages=max_pages)
-    total_chars = sum(len(p) for p in pages if p)
+    # Pages are extracted lazily: generation starts on the first chunks while later pages are
+    # still unparsed, and extraction stops once enough questions have been collected.
+    chunks = iter_page_chunks(iter_pdf_pages_text(pdf_bytes, max_pages=max_pages), max_chars=18_000)
+    head, total_chars = _peek_min_chars(chunks, 500)
     if total_chars < 500:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Could not extract enough text from this PDF (it may be scanned). OCR is not enabled yet.",
         )
 
-    chunks = chunk_pages(pages, max_chars=18_000)
-    if not chunks:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No extractable text found.")
-
     base_tags = _normalize_tags(tags)
     source_tag = f"source:{(file.filename or 'pdf').strip()}"
     merged_tags = [*base_tags, "pdf_import", source_tag]
     # de-dupe merged tags
     merged_tags = _normalize_tags(",".join(merged_tags))
 
-    # Build enriched system prompt
-    pdf_system_prompt = IMPORT_SYSTEM_PROMPT
-    if material_context:
-        pdf_system_prompt += f'\n\nMaterial context: {material_context}'
-    if extra_instructions:
-        pdf_system_prompt += f'\n\nAdditional instructions:\n{extra_instructions}'
-
-    warnings: list[str] = []
-    questions: list[dict] = []
-    remaining = question_count
-
-    for chunk in chunks:
-        if not auto_question_count and remaining <= 0:
-            break
-        per_chunk = min(remaining, 20) if not auto_question_count else 20
-        if auto_question_count:
-            count_instruction = f"Generate the most appropriate number of questions (max {per_chunk})"
-        else:
-            count_instruction = f"Generate exactly {per_chunk} questions"
-        prompt = (
-            f"{count_instruction} as JSON.\n"
-            f"Difficulty: {difficulty or 'mixed'}\n"
-            f"Tags to include on every question: {merged_tags}\n\n"
-            f"Content:\n{chunk}"
-        )
-        payload = call_openai_responses_json(
-            instructions=pdf_system_prompt,
-            input_text=prompt,
-            schema_name="assessment_questions_import",
-            schema=IMPORT_JSON_SCHEMA,
-            temperature=0.3,
-            timeout_ms=60_000,
-        )
-        items = payload.get("questions")
-        if not isinstance(items, list):
-            warnings.append("OpenAI returned unexpected payload shape for one chunk.")
-            continue
-
-        for q in items:
-            if not isinstance(q, dict):
-                continue
-            q["tags"] = merged_tags
-            if difficulty and not q.get("difficulty"):
-                q["difficulty"] = difficulty
-            q, err = _validate_mcq(q)
-            if err:
-                warnings.append(f"Skipped invalid question: {err}")
-                continue
-            questions.append(q)
-
-        if not auto_question_count:
-            remaining = question_count - len(questions)
-
-    # de-dupe by prompt
-    seen_prompts = set()
-    deduped: list[dict] = []
-    pdf_dedup_limit = len(questions) if auto_question_count else question_count
-    for q in questions:
-        prompt = str(q.get("prompt") or "").strip()
-        key = re.sub(r"\s+", " ", prompt).lower()
-        if not prompt or key in seen_prompts:
-            continue
-        seen_prompts.add(key)
-        deduped.append(q)
-        if len(deduped) >= pdf_dedup_limit:
-            break
-
-    if not deduped:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No valid questions generated.")
+    spec = ImportSpec(
+        question_count=question_count,
+        merged_tags=merged_tags,
+        difficulty=difficulty,
+        extra_instructions=extra_instructions,
+        material_context=material_context,
+        auto_question_count=auto_question_count,
+        per_chunk_max=20,
+        timeout_ms=60_000,
+    )
 
     # Resolve optional category path → UUID (creating hierarchy if needed).
     pdf_category_id: UUID | None = None
     if category_path and category_path.strip():
         pdf_category_id = assessment_service.find_or_create_category_path(db, category_path.strip())
 
+    warnings: list[str] = []
     created_ids = []
-    for q in deduped:
-        if pdf_category_id is not None:
-            q['category_id'] = pdf_category_id
-        created = assessment_service.create_question(db, payload=q, actor_user_id=current_user.id)
-        created_ids.append(created.id)
+    collector = QuestionCollector(spec)
+    for result in iter_chunk_results(spec, itertools.chain(head, chunks), collector):
+        if result.error is not None:
+            raise result.error
+        warnings.extend(result.warnings)
+        for q in collector.accept(result.questions):
+            if pdf_category_id is not None:
+                q['category_id'] = pdf_category_id
+            created = assessment_service.create_question(db, payload=q, actor_user_id=current_user.id)
+            created_ids.append(created.id)
+
+    if not created_ids:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No valid questions generated.")
 
     audit_service.log_action(
         db,
@@ -420,181 +245,6 @@ def import_questions_from_pdf(
     )
 
 
-def _split_text_chunks(text: str, chunk_size: int = 8_000) -> list[str]:
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    chunks: list[str] = []
-    buf: list[str] = []
-    buf_size = 0
-    for para in paragraphs:
-        if buf_size + len(para) > chunk_size and buf:
-            chunks.append('\n\n'.join(buf))
-            buf = []
-            buf_size = 0
-        buf.append(para)
-        buf_size += len(para) + 2
-    if buf:
-        chunks.append('\n\n'.join(buf))
-    return chunks
-
-
-def _run_text_import_job(
-    job_id: str,
-    text_chunks: list[str],
-    question_count: int,
-    merged_tags: list[str],
-    difficulty: str | None,
-    tenant_id: str,
-    user_id: UUID,
-    tenant_db_id: UUID,
-    category_id: UUID | None = None,
-    extra_instructions: str | None = None,
-    material_context: str | None = None,
-    auto_question_count: bool = False,
-) -> None:
-    """Background thread: calls OpenAI per chunk, saves questions, updates Redis job state."""
-    from app.db.session import SessionLocal, set_tenant_id  # local import to avoid circular refs
-
-    # Build enriched system prompt
-    system_prompt = IMPORT_SYSTEM_PROMPT
-    if material_context:
-        system_prompt += f'\n\nMaterial context: {material_context}'
-    if extra_instructions:
-        system_prompt += f'\n\nAdditional instructions:\n{extra_instructions}'
-
-    questions: list[dict] = []
-    remaining = question_count
-    warnings: list[str] = []
-
-    def _is_cancelled() -> bool:
-        job = _read_job(job_id)
-        return bool(job and job.get('cancel_requested'))
-
-    try:
-        for i, chunk in enumerate(text_chunks):
-            if not auto_question_count and remaining <= 0:
-                break
-            if _is_cancelled():
-                _update_job(job_id, status='cancelled', phase='Cancelled by user.')
-                return
-            _update_job(job_id, phase=f'Generating questions… (chunk {i + 1} of {len(text_chunks)})')
-            per_chunk = min(remaining, 25) if not auto_question_count else 25
-            if auto_question_count:
-                count_instruction = f'Generate the most appropriate number of questions (max {per_chunk})'
-            else:
-                count_instruction = f'Generate exactly {per_chunk} questions'
-            prompt = (
-                f'{count_instruction} as JSON.\n'
-                f'Difficulty: {difficulty or "mixed"}\n'
-                f'Tags to include on every question: {merged_tags}\n\n'
-                f'Content:\n{chunk}'
-            )
-            try:
-                payload = call_openai_responses_json(
-                    instructions=system_prompt,
-                    input_text=prompt,
-                    schema_name='assessment_questions_import',
-                    schema=IMPORT_JSON_SCHEMA,
-                    temperature=0.3,
-                    timeout_ms=120_000,
-                )
-            except Exception as exc:
-                warnings.append(f'Chunk {i + 1} skipped (AI timeout or error): {exc}')
-                _update_job(job_id, done_chunks=i + 1, warnings=warnings)
-                continue
-
-            items = payload.get('questions')
-            if not isinstance(items, list):
-                warnings.append(f'Chunk {i + 1}: OpenAI returned unexpected payload shape.')
-                _update_job(job_id, done_chunks=i + 1, warnings=warnings)
-                continue
-
-            for q in items:
-                if not isinstance(q, dict):
-                    continue
-                q['tags'] = merged_tags
-                if difficulty and not q.get('difficulty'):
-                    q['difficulty'] = difficulty
-                q, err = _validate_mcq(q)
-                if err:
-                    warnings.append(f'Skipped invalid question: {err}')
-                    continue
-                questions.append(q)
-
-            if not auto_question_count:
-                remaining = question_count - len(questions)
-            _update_job(job_id, done_chunks=i + 1, questions_created=len(questions), warnings=warnings)
-            if _is_cancelled():
-                _update_job(job_id, status='cancelled', phase='Cancelled by user.')
-                return
-
-        # de-dupe by prompt
-        seen_prompts: set[str] = set()
-        deduped: list[dict] = []
-        dedup_limit = len(questions) if auto_question_count else question_count
-        for q in questions:
-            p = re.sub(r'\s+', ' ', str(q.get('prompt') or '').strip()).lower()
-            if not p or p in seen_prompts:
-                continue
-            seen_prompts.add(p)
-            deduped.append(q)
-            if len(deduped) >= dedup_limit:
-                break
-
-        if not deduped:
-            _update_job(job_id, status='error', error='No valid questions were generated from the provided text.')
-            return
-
-        _update_job(job_id, phase='Saving to question bank…')
-        created_ids: list[str] = []
-
-        db = SessionLocal()
-        try:
-            set_tenant_id(db, tenant_id)
-            for q in deduped:
-                if category_id is not None:
-                    q['category_id'] = category_id
-                created = assessment_service.create_question(db, payload=q, actor_user_id=user_id)
-                created_ids.append(str(created.id))
-
-            audit_service.log_action(
-                db,
-                actor_user_id=user_id,
-                action='assessment_questions_import_text',
-                entity_type='assessment_question',
-                details={
-                    'imported_count': len(created_ids),
-                    'question_count_requested': question_count,
-                    'tags': merged_tags,
-                    'difficulty': difficulty,
-                },
-            )
-            usage_service.record_event(
-                db,
-                tenant_id=tenant_db_id,
-                event_key='ai.text_import',
-                quantity=float(len(created_ids)),
-                actor_user_id=user_id,
-                meta={'question_count_requested': question_count},
-            )
-            db.commit()
-        finally:
-            db.close()
-
-        _update_job(
-            job_id,
-            status='done',
-            phase='Done',
-            done_chunks=len(text_chunks),
-            questions_created=len(created_ids),
-            imported_count=len(created_ids),
-            question_ids=created_ids,
-            warnings=warnings,
-        )
-
-    except Exception as exc:  # noqa: BLE001
-        _update_job(job_id, status='error', error=str(exc))
-
-
 @router.post('/questions/import-text', response_model=AssessmentTextImportJobStart, status_code=status.HTTP_202_ACCEPTED)
 def import_questions_from_text(
     body: AssessmentTextImportIn,
@@ -606,12 +256,11 @@ def import_questions_from_text(
     if len(raw_text) < 50:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='Text is too short to generate questions from.')
 
-    question_count = body.question_count
     difficulty = (body.difficulty or '').strip() or None
     base_tags = _normalize_tags(body.tags)
     merged_tags = _normalize_tags(','.join([*base_tags, 'text_import']))
 
-    text_chunks = _split_text_chunks(raw_text)
+    text_chunks = split_text_chunks(raw_text)
     if not text_chunks:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='No usable text found.')
 
@@ -628,7 +277,7 @@ def import_questions_from_text(
             _cat_db.close()
 
     job_id = str(uuid4())
-    _write_job(job_id, {
+    import_job_store.create_job(job_id, {
         'job_id': job_id,
         'status': 'running',
         'total_chunks': len(text_chunks),
@@ -639,21 +288,24 @@ def import_questions_from_text(
         'warnings': [],
         'error': None,
         'imported_count': None,
-        'question_ids': None,
+        'question_ids': [],
     })
 
-    t = threading.Thread(
-        target=_run_text_import_job,
-        args=(job_id, text_chunks, question_count, merged_tags, difficulty, str(ctx.tenant.id), current_user.id, ctx.tenant.id),
-        kwargs={
-            'category_id': category_id,
-            'extra_instructions': body.extra_instructions,
-            'material_context': body.material_context,
-            'auto_question_count': body.auto_question_count,
-        },
-        daemon=True,
+    question_import_service.dispatch_text_import(
+        job_id,
+        text_chunks=text_chunks,
+        spec=ImportSpec(
+            question_count=body.question_count,
+            merged_tags=merged_tags,
+            difficulty=difficulty,
+            extra_instructions=body.extra_instructions,
+            material_context=body.material_context,
+            auto_question_count=body.auto_question_count,
+        ),
+        tenant_id=ctx.tenant.id,
+        user_id=current_user.id,
+        category_id=category_id,
     )
-    t.start()
 
     return AssessmentTextImportJobStart(job_id=job_id, status='running', total_chunks=len(text_chunks))
 
@@ -664,12 +316,13 @@ def get_text_import_job(
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access('assessments', 'assessments:write')),
 ) -> AssessmentTextImportJobStatus:
-    job = _read_job(job_id)
+    job = import_job_store.read_job(job_id)
     if job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Import job not found.')
     total = job.get('total_chunks', 1)
     done = job.get('done_chunks', 0)
     percent = 100 if job.get('status') == 'done' else (0 if total == 0 else int(done * 100 / total))
+    question_ids = job.get('question_ids') or []
     return AssessmentTextImportJobStatus(
         job_id=job['job_id'],
         status=job['status'],
@@ -682,7 +335,7 @@ def get_text_import_job(
         warnings=job.get('warnings', []),
         error=job.get('error'),
         imported_count=job.get('imported_count'),
-        question_ids=job.get('question_ids'),
+        question_ids=question_ids if job.get('imported_count') is not None else None,
     )
 
 
@@ -692,12 +345,12 @@ def cancel_text_import_job(
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access('assessments', 'assessments:write')),
 ) -> None:
-    job = _read_job(job_id)
-    if job is None:
+    job_status = import_job_store.read_job_field(job_id, 'status')
+    if job_status is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Import job not found.')
-    if job.get('status') not in ('running',):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f'Job is already {job["status"]}.')
-    _update_job(job_id, cancel_requested=True, phase='Cancellation requested…')
+    if job_status not in ('running',):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f'Job is already {job_status}.')
+    import_job_store.update_job(job_id, cancel_requested=True, phase='Cancellation requested…')
     return None
 
 
@@ -910,7 +563,6 @@ def question_stats(
 @router.post('/questions/classify', response_model=AssessmentClassificationJobOut, status_code=status.HTTP_202_ACCEPTED)
 def start_classification_job(
     payload: AssessmentClassificationJobCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     ctx: TenantContext = Depends(require_tenant_membership),
@@ -932,19 +584,34 @@ def start_classification_job(
         .order_by(AssessmentClassificationJob.created_at.desc())
     )
     if existing:
-        # If the worker appears dead (no heartbeat for 2 min), expire it so a fresh run can start.
-        # Otherwise return the live job so the UI can attach and poll.
+        # If the worker appears dead (no heartbeat for 2 min, or still unclaimed 2 min after
+        # queueing), expire it so a fresh run can start. Otherwise return the live job so the
+        # UI can attach and poll.
         heartbeat_cutoff = datetime.now(timezone.utc) - timedelta(minutes=2)
-        worker_is_dead = (
-            existing.last_heartbeat_at is None
-            or existing.last_heartbeat_at < heartbeat_cutoff
+        last_seen = existing.last_heartbeat_at or existing.created_at
+        if last_seen is not None and last_seen >= heartbeat_cutoff:
+            return AssessmentClassificationJobOut.model_validate(existing)
+        # Conditional on what we read, so a worker that claimed or beat in the meantime wins.
+        expired = db.execute(
+            update(AssessmentClassificationJob)
+            .where(
+                AssessmentClassificationJob.id == existing.id,
+                AssessmentClassificationJob.status == existing.status,
+                or_(
+                    AssessmentClassificationJob.last_heartbeat_at.is_(None),
+                    AssessmentClassificationJob.last_heartbeat_at < heartbeat_cutoff,
+                ),
+            )
+            .values(
+                status='failed',
+                error_summary='Expired stale job (worker unresponsive for 2+ minutes). Re-running.',
+                updated_by=current_user.id,
+            )
+            .execution_options(synchronize_session=False)
         )
-        if worker_is_dead:
-            existing.status = 'failed'
-            existing.error_summary = 'Expired stale job (worker unresponsive for 2+ minutes). Re-running.'
-            existing.updated_by = current_user.id
-            db.commit()
-        else:
+        db.commit()
+        if expired.rowcount == 0:
+            db.refresh(existing)
             return AssessmentClassificationJobOut.model_validate(existing)
 
     job = AssessmentClassificationJob(
@@ -973,8 +640,7 @@ def start_classification_job(
     db.commit()
     db.refresh(job)
 
-    background_tasks.add_task(
-        assessment_classification_service.run_classification_job,
+    assessment_classification_service.dispatch_classification_job(
         job_id=job.id,
         tenant_id=ctx.tenant.id,
         actor_user_id=current_user.id,
@@ -1062,6 +728,29 @@ def cancel_classification_job(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Classification job not found')
     if job.status not in ('queued', 'running', 'paused'):
         return {'status': 'noop'}
+    if job.status == 'queued':
+        # No worker has claimed it yet; canceling the row makes the claim fail.
+        canceled = db.execute(
+            update(AssessmentClassificationJob)
+            .where(
+                AssessmentClassificationJob.id == job.id,
+                AssessmentClassificationJob.status == 'queued',
+            )
+            .values(
+                status='canceled',
+                cancel_requested=True,
+                error_summary='Cancelled by user before the job started.',
+                completed_at=datetime.now(timezone.utc),
+                updated_by=current_user.id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if canceled.rowcount:
+            return {'status': 'ok'}
+        db.refresh(job)
+        if job.status not in ('running', 'paused'):
+            return {'status': 'noop'}
     # If the worker is stale (no heartbeat in 30s), force-cancel immediately —
     # the background task is dead and won't pick up cancel_requested on its own.
     heartbeat_cutoff = datetime.now(timezone.utc) - timedelta(seconds=30)
@@ -1077,6 +766,8 @@ def cancel_classification_job(
         job.cancel_requested = True
     job.updated_by = current_user.id
     db.commit()
+    if not worker_is_dead:
+        job_signals.publish(job.id, job_signals.CANCEL)
     return {'status': 'ok'}
 
 
@@ -1097,6 +788,7 @@ def pause_classification_job(
     job.pause_requested = True
     job.updated_by = current_user.id
     db.commit()
+    job_signals.publish(job.id, job_signals.PAUSE)
     return {'status': 'ok'}
 
 
@@ -1117,6 +809,7 @@ def resume_classification_job(
     job.pause_requested = False
     job.updated_by = current_user.id
     db.commit()
+    job_signals.publish(job.id, job_signals.RESUME)
     return {'status': 'ok'}
 
 
@@ -1219,56 +912,27 @@ def bulk_update_questions(
 @router.post('/questions/deduplicate', response_model=AssessmentDeduplicateResult)
 def deduplicate_questions(
     dry_run: bool = True,
+    threshold: float = Query(0.8, ge=0.5, le=1.0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     __: object = Depends(require_access('assessments', 'assessments:write')),
 ) -> AssessmentDeduplicateResult:
-    """Find questions with identical prompts (after normalisation) and archive the extras.
+    """Find questions with near-identical prompts and archive the extras.
 
+    Similarity is the MinHash estimate of the Jaccard index of the prompts' character
+    shingles; each group is a kept copy plus the questions at or above ``threshold`` to it.
     Keeps the 'best' copy per group: prefers questions with both category and difficulty
-    set; among equals keeps the oldest (created_at ASC). Operates only on non-archived questions.
+    set; among equals keeps the oldest. Operates only on non-archived questions. A dry run
+    writes nothing, not even backfilled signatures.
     """
     from app.models.assessment import AssessmentQuestion as AQ
 
-    # Load all non-archived questions — just the columns we need for grouping.
-    rows = db.execute(
-        select(AQ.id, AQ.prompt, AQ.category_id, AQ.difficulty, AQ.created_at)
-        .where(AQ.status != 'archived')
-        .order_by(AQ.created_at.asc())
-    ).all()
-
-    # Group by normalised prompt
-    groups: dict[str, list] = {}
-    for row in rows:
-        key = re.sub(r'\s+', ' ', (row.prompt or '').strip().lower())
-        if not key:
-            continue
-        groups.setdefault(key, []).append(row)
-
-    duplicate_groups = 0
-    ids_to_archive: list = []
-
-    for norm_prompt, candidates in groups.items():
-        if len(candidates) < 2:
-            continue
-        duplicate_groups += 1
-
-        # Sort: fully classified first, then by age (oldest first → keep oldest)
-        def _score(r) -> tuple:
-            has_cat = r.category_id is not None
-            has_diff = r.difficulty is not None
-            return (0 if (has_cat and has_diff) else 1 if (has_cat or has_diff) else 2, r.created_at)
-
-        sorted_candidates = sorted(candidates, key=_score)
-        # Keep the first (best / oldest), archive the rest
-        ids_to_archive.extend(c.id for c in sorted_candidates[1:])
-
+    groups = question_dedup_service.find_duplicate_groups(db, threshold=threshold)
+    duplicate_groups = len(groups)
+    ids_to_archive = [qid for group in groups for qid in group.duplicate_ids]
     archived_count = len(ids_to_archive)
 
     if not dry_run and ids_to_archive:
-        db.execute(
-            select(AQ).where(AQ.id.in_(ids_to_archive))  # warm identity map
-        )
         db.query(AQ).filter(AQ.id.in_(ids_to_archive)).update(
             {'status': 'archived', 'updated_by': current_user.id},
             synchronize_session='fetch',
@@ -1278,8 +942,15 @@ def deduplicate_questions(
             actor_user_id=current_user.id,
             action='assessment_questions_deduplicate',
             entity_type='assessment_question',
-            details={'archived_count': archived_count, 'duplicate_groups': duplicate_groups},
+            details={
+                'archived_count': archived_count,
+                'duplicate_groups': duplicate_groups,
+                'threshold': threshold,
+            },
         )
+    if dry_run:
+        db.rollback()
+    else:
         db.commit()
 
     return AssessmentDeduplicateResult(
@@ -1626,6 +1297,18 @@ def publish_test_version(
     return AssessmentTestVersionOut.model_validate(version)
 
 
+@router.get('/test-versions/{version_id}/item-analysis', response_model=AssessmentItemAnalysisOut)
+def get_item_analysis(
+    version_id: UUID,
+    db: Session = Depends(get_db),
+    __: object = Depends(require_access('assessments', 'assessments:write')),
+) -> AssessmentItemAnalysisOut:
+    """Per-question difficulty (p-value), item-rest discrimination, distractor rates and KR-20."""
+    assessment_service.get_test_version(db, version_id)
+    analysis = item_analysis_service.get_item_analysis(db, test_version_id=version_id)
+    return AssessmentItemAnalysisOut(**analysis)
+
+
 @router.get('/available')
 def list_available_assessments(
     db: Session = Depends(get_db),
@@ -1640,57 +1323,103 @@ def list_available_assessments(
         AssessmentDelivery.participant_user_id == current_user.id,
         AssessmentDelivery.audience_type == 'campaign',
     )
-    base = (
-        select(AssessmentDelivery)
+
+    # Only the caller's attempts are read: one aggregate row and one latest row per delivery,
+    # regardless of how many other participants a campaign has.
+    my_attempts = (
+        AssessmentAttempt.tenant_id == ctx.tenant.id,
+        AssessmentAttempt.user_id == current_user.id,
+    )
+    stats = (
+        select(
+            AssessmentAttempt.delivery_id.label('delivery_id'),
+            func.count().label('attempts_used'),
+            func.count().filter(AssessmentAttempt.passed.is_(True)).label('passed_count'),
+            func.count().filter(AssessmentAttempt.status.in_(('submitted', 'scored'))).label('completed_count'),
+            func.count().filter(AssessmentAttempt.status == 'in_progress').label('in_progress_count'),
+        )
+        .where(*my_attempts)
+        .group_by(AssessmentAttempt.delivery_id)
+        .subquery('stats')
+    )
+    latest = (
+        select(
+            AssessmentAttempt.delivery_id.label('delivery_id'),
+            AssessmentAttempt.id.label('attempt_id'),
+            AssessmentAttempt.status.label('status'),
+            AssessmentAttempt.score_percent.label('score_percent'),
+        )
+        .where(*my_attempts)
+        .distinct(AssessmentAttempt.delivery_id)
+        .order_by(AssessmentAttempt.delivery_id, AssessmentAttempt.attempt_number.desc())
+        .subquery('latest')
+    )
+    query = (
+        select(
+            AssessmentDelivery.id,
+            AssessmentDelivery.title,
+            AssessmentDelivery.audience_type,
+            AssessmentDelivery.starts_at,
+            AssessmentDelivery.ends_at,
+            AssessmentDelivery.due_date,
+            AssessmentDelivery.duration_minutes,
+            AssessmentDelivery.attempts_allowed,
+            AssessmentTestVersion.id.label('version_id'),
+            AssessmentTestVersion.question_count,
+            AssessmentTestVersion.passing_score,
+            AssessmentTest.title.label('test_title'),
+            AssessmentTest.description.label('test_description'),
+            func.coalesce(stats.c.attempts_used, 0).label('attempts_used'),
+            func.coalesce(stats.c.passed_count, 0).label('passed_count'),
+            func.coalesce(stats.c.completed_count, 0).label('completed_count'),
+            func.coalesce(stats.c.in_progress_count, 0).label('in_progress_count'),
+            latest.c.attempt_id.label('latest_attempt_id'),
+            latest.c.status.label('latest_status'),
+            latest.c.score_percent.label('latest_score_percent'),
+        )
+        .outerjoin(AssessmentTestVersion, AssessmentTestVersion.id == AssessmentDelivery.test_version_id)
+        .outerjoin(AssessmentTest, AssessmentTest.id == AssessmentTestVersion.test_id)
+        .outerjoin(stats, stats.c.delivery_id == AssessmentDelivery.id)
+        .outerjoin(latest, latest.c.delivery_id == AssessmentDelivery.id)
         .where(
             AssessmentDelivery.tenant_id == ctx.tenant.id,  # tenant isolation
             visible,
             window_open,
             window_close,
         )
-        .options(joinedload(AssessmentDelivery.test_version), joinedload(AssessmentDelivery.attempts))
         .order_by(AssessmentDelivery.created_at.desc())
     )
-    deliveries = db.scalars(base).unique().all()
 
     items = []
-    for d in deliveries:
-        user_attempts = [a for a in d.attempts if a.user_id == current_user.id]
-        latest = max(user_attempts, key=lambda a: a.attempt_number, default=None)
-        completed = any(a.status in ('submitted', 'scored') for a in user_attempts)
-        in_progress = any(a.status == 'in_progress' for a in user_attempts)
-        passed = any(getattr(a, 'passed', False) for a in user_attempts)
+    for row in db.execute(query):
+        passed = row.passed_count > 0
         attempt_status = 'not_started'
         if passed:
             attempt_status = 'passed'
-        elif completed:
+        elif row.completed_count > 0:
             attempt_status = 'completed'
-        elif in_progress:
+        elif row.in_progress_count > 0:
             attempt_status = 'in_progress'
 
-        test = None
-        if d.test_version and d.test_version.test_id:
-            from app.models.assessment import AssessmentTest
-            test = db.scalar(select(AssessmentTest).where(AssessmentTest.id == d.test_version.test_id))
-
+        has_test = row.test_title is not None
         items.append({
-            'delivery_id': str(d.id),
-            'title': d.title,
-            'description': test.description if test else None,
-            'test_title': test.title if test else d.title,
-            'audience_type': d.audience_type,
-            'starts_at': d.starts_at.isoformat() if d.starts_at else None,
-            'ends_at': d.ends_at.isoformat() if d.ends_at else None,
-            'due_date': d.due_date.isoformat() if d.due_date else None,
-            'duration_minutes': d.duration_minutes,
-            'attempts_allowed': d.attempts_allowed,
-            'attempts_used': len(user_attempts),
+            'delivery_id': str(row.id),
+            'title': row.title,
+            'description': row.test_description if has_test else None,
+            'test_title': row.test_title if has_test else row.title,
+            'audience_type': row.audience_type,
+            'starts_at': row.starts_at.isoformat() if row.starts_at else None,
+            'ends_at': row.ends_at.isoformat() if row.ends_at else None,
+            'due_date': row.due_date.isoformat() if row.due_date else None,
+            'duration_minutes': row.duration_minutes,
+            'attempts_allowed': row.attempts_allowed,
+            'attempts_used': row.attempts_used,
             'attempt_status': attempt_status,
-            'latest_score_percent': latest.score_percent if latest and latest.score_percent is not None else None,
+            'latest_score_percent': row.latest_score_percent,
             'passed': passed,
-            'question_count': len(d.test_version.questions) if d.test_version else 0,
-            'passing_score': d.test_version.passing_score if d.test_version else None,
-            'in_progress_attempt_id': latest.id if latest and latest.status == 'in_progress' else None,
+            'question_count': row.question_count if row.version_id else 0,
+            'passing_score': row.passing_score if row.version_id else None,
+            'in_progress_attempt_id': row.latest_attempt_id if row.latest_status == 'in_progress' else None,
         })
 
     return {'items': items}
@@ -1899,8 +1628,7 @@ def start_attempt(
     __: object = Depends(require_access('assessments', 'assessments:take')),
 ) -> AssessmentAttemptStartOut:
     attempt = assessment_service.start_attempt(db, delivery_id=delivery_id, user_id=current_user.id)
-    # Load the delivery and version while the RLS tenant context is still active
-    # (set_config 'app.tenant_id' is transaction-local — it clears after commit).
+    # Load the delivery and version inside the same transaction as the attempt insert.
     delivery = assessment_service.get_delivery(db, delivery_id)
     version = assessment_service.get_test_version(db, delivery.test_version_id)
     questions = assessment_service._build_attempt_questions(version, attempt.question_order)
@@ -2032,67 +1760,131 @@ def list_my_results(
     )
 
 
-@router.get('/results', response_model=AssessmentResultListResponse)
+_RESULT_EXPORT_FIELDS = (
+    'id',
+    'delivery_id',
+    'user_id',
+    'user_name',
+    'user_email',
+    'test_title',
+    'attempt_number',
+    'status',
+    'started_at',
+    'submitted_at',
+    'score',
+    'max_score',
+    'score_percent',
+    'passed',
+    'stars_earned',
+)
+
+
+def _results_scope(
+    *,
+    user_id: UUID | None,
+    current_user: User,
+    ctx: TenantContext,
+) -> tuple[UUID | None, bool]:
+    """Managers may look at anyone's results; everyone else only at their own."""
+    perms = permissions_for_roles(ctx.roles)
+    is_manager = 'assessments:write' in perms or 'assignments:review' in perms
+    return (user_id if is_manager else current_user.id), is_manager
+
+
+@router.get('/results', response_model=AssessmentResultListResponse, dependencies=[Depends(use_read_replica)])
 def list_results(
     delivery_id: UUID | None = Query(default=None),
     user_id: UUID | None = Query(default=None),
     test_id: UUID | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     ctx: TenantContext = Depends(require_tenant_membership),
     __: object = Depends(require_access('assessments', 'assessments:take')),
 ) -> AssessmentResultListResponse:
-    perms = permissions_for_roles(ctx.roles)
-    effective_user_id = user_id
-    is_manager = 'assessments:write' in perms or 'assignments:review' in perms
-    if not is_manager:
-        effective_user_id = current_user.id
-
-    attempts = assessment_service.list_attempts(
-        db, delivery_id=delivery_id, user_id=effective_user_id, test_id=test_id
-    )
-    scores = [attempt.score_percent for attempt in attempts if attempt.score_percent is not None]
-    average_score = (sum(scores) / len(scores)) if scores else None
-
-    # ── Enrich with user name/email and test title (manager view only) ────────
-    user_map: dict[UUID, User] = {}
-    delivery_title_map: dict[UUID, str] = {}
-    if is_manager and attempts:
-        unique_user_ids = list({a.user_id for a in attempts})
-        users = db.scalars(select(User).where(User.id.in_(unique_user_ids))).all()
-        user_map = {u.id: u for u in users}
-
-        unique_delivery_ids = list({a.delivery_id for a in attempts})
-        deliveries = db.scalars(
-            select(AssessmentDelivery)
-            .options(
-                joinedload(AssessmentDelivery.test_version).joinedload(AssessmentTestVersion.test)
-            )
-            .where(AssessmentDelivery.id.in_(unique_delivery_ids))
-        ).all()
-        for d in deliveries:
-            if d.test_version and d.test_version.test:
-                delivery_title_map[d.id] = d.test_version.test.title
-
-    def _to_out(a: AssessmentAttempt) -> AssessmentAttemptOut:
-        out = AssessmentAttemptOut.model_validate(a)
-        if is_manager:
-            u = user_map.get(a.user_id)
-            out.user_name = u.full_name if u else None
-            out.user_email = u.email if u else None
-            out.test_title = delivery_title_map.get(a.delivery_id)
-        return out
-
-    summary = AssessmentResultSummary(
-        delivery_id=delivery_id,
-        test_id=test_id,
-        user_id=effective_user_id,
-        attempt_count=len(attempts),
-        average_score_percent=average_score,
-    )
+    effective_user_id, is_manager = _results_scope(user_id=user_id, current_user=current_user, ctx=ctx)
+    filters = {'delivery_id': delivery_id, 'user_id': effective_user_id, 'test_id': test_id}
+
+    rows, next_cursor = assessment_service.list_results_page(db, cursor=cursor, limit=limit, **filters)
+    items = []
+    for row in rows:
+        data = row._asdict()
+        if not is_manager:
+            data.update(user_name=None, user_email=None, test_title=None)
+        items.append(AssessmentAttemptOut(**data))
+
+    # Summary covers the whole filtered set, not just this page.
+    stats = assessment_service.results_summary(db, **filters)
     return AssessmentResultListResponse(
-        items=[_to_out(a) for a in attempts],
-        summary=summary,
+        items=items,
+        summary=AssessmentResultSummary(
+            delivery_id=delivery_id,
+            test_id=test_id,
+            user_id=effective_user_id,
+            **stats,
+        ),
+        next_cursor=next_cursor,
+    )
+
+
+@router.get('/results/export')
+def export_results(
+    delivery_id: UUID | None = Query(default=None),
+    user_id: UUID | None = Query(default=None),
+    test_id: UUID | None = Query(default=None),
+    export_format: Literal['csv', 'ndjson'] = Query(default='csv', alias='format'),
+    current_user: User = Depends(get_current_active_user),
+    ctx: TenantContext = Depends(require_tenant_membership),
+    __: object = Depends(require_access('assessments', 'assessments:take')),
+) -> StreamingResponse:
+    """Stream every matching result as CSV or NDJSON without buffering the full set."""
+    effective_user_id, is_manager = _results_scope(user_id=user_id, current_user=current_user, ctx=ctx)
+    fields = _RESULT_EXPORT_FIELDS if is_manager else tuple(
+        f for f in _RESULT_EXPORT_FIELDS if f not in ('user_name', 'user_email')
+    )
+    tenant_id = str(ctx.tenant.id)
+
+    def _rows():
+        # The export outlives the request-scoped session, so it reads through its own.
+        db = SessionLocal()
+        try:
+            set_tenant_id(db, tenant_id)
+            yield from assessment_service.iter_results(
+                db, delivery_id=delivery_id, user_id=effective_user_id, test_id=test_id
+            )
+        finally:
+            db.close()
+
+    if export_format == 'ndjson':
+        def _ndjson():
+            for row in _rows():
+                data = row._asdict()
+                yield json.dumps({f: data[f] for f in fields}, default=str) + '\n'
+
+        return StreamingResponse(
+            _ndjson(),
+            media_type='application/x-ndjson',
+            headers={'Content-Disposition': 'attachment; filename="assessment-results.ndjson"'},
+        )
+
+    def _csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for row in _rows():
+            data = row._asdict()
+            writer.writerow(['' if data[f] is None else data[f] for f in fields])
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        _csv(),
+        media_type='text/csv',
+        headers={'Content-Disposition': 'attachment; filename="assessment-results.csv"'},
     )
 
 
@@ -2228,10 +2020,31 @@ def list_achievements(
     return {'items': profile['achievements']}
 
 
+@router.get('/leaderboard')
+def get_leaderboard(
+    period: Literal['week', 'month', 'quarter', 'all'] = Query(default='week'),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    ctx: TenantContext = Depends(require_tenant_membership),
+    __: object = Depends(require_access('assessments', 'assessments:take')),
+) -> dict:
+    """Top members by stars for the current week/month/quarter (or all time), plus the caller's rank."""
+    return {
+        'period': period,
+        'period_key': leaderboard_service.period_key(period),
+        'items': leaderboard_service.top(db, tenant_id=ctx.tenant.id, period_type=period, limit=limit),
+        'me': leaderboard_service.rank_of(
+            db, tenant_id=ctx.tenant.id, user_id=current_user.id, period_type=period
+        ),
+    }
+
+
 @router.get('/performance')
 def get_team_performance(
     period_start: str | None = Query(default=None),
     period_end: str | None = Query(default=None),
+    period: Literal['week', 'month', 'quarter'] | None = Query(default=None),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_active_user),
     ctx: TenantContext = Depends(require_tenant_membership),
@@ -2254,5 +2067,6 @@ def get_team_performance(
         tenant_id=ctx.tenant.id,
         period_start=_parse(period_start),
         period_end=_parse(period_end),
+        period_type=period,
     )
     return {'items': members}
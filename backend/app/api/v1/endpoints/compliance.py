@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import and_, delete, func, select, update
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, use_read_replica
 from app.db.session import get_db
 from app.models.compliance import (
     ComplianceControlStatus,
@@ -122,8 +122,19 @@ from app.services.compliance_tenant_library_service import (
     load_tenant_library_payload_from_request,
     validate_tenant_library_payload,
 )
-from app.services.compliance_summary_service import STATUS_SCORES, compute_framework_summary, compute_summary
-from app.services.compliance_gap_service import list_gaps, order_gaps
+from app.services.compliance_summary_service import (
+    STATUS_SCORES,
+    apply_status_change,
+    load_framework_summary,
+    load_summary,
+    refresh_rollups,
+)
+from app.services.compliance_gap_service import (
+    invalidate_framework_map,
+    list_gaps,
+    load_gap_columns,
+    rank_gaps,
+)
 from app.services.compliance_snapshot_service import create_snapshot, get_trends, latest_snapshot
 from app.services.compliance_client_coverage_service import compute_client_coverage
 from app.services.compliance_practice_service import run_practice_match
@@ -153,6 +164,11 @@ def _active_profile_key(db: Session, tenant_id: UUID) -> str | None:
     )
 
 
+def _refresh_library_caches(db: Session, *, tenant_id: UUID) -> None:
+    refresh_rollups(db, tenant_id=tenant_id)
+    invalidate_framework_map(db, tenant_id)
+
+
 def _generate_work_order_id() -> str:
     year = datetime.utcnow().year
     suffix = uuid.uuid4().hex[:6].upper()
@@ -407,6 +423,7 @@ def import_library(
             version_label=payload.version_label,
             imported_by_user_id=current_user.id,
         )
+        _refresh_library_caches(db, tenant_id=ctx.tenant.id)
         db.commit()
     except TenantLibraryError as exc:
         db.rollback()
@@ -981,6 +998,8 @@ def apply_profile_semantic_match(
         entity_id=None,
         details={"results": counts, "unmatched_practices": unmatched},
     )
+    db.flush()
+    refresh_rollups(db, tenant_id=ctx.tenant.id)
     try:
         create_snapshot(
             db,
@@ -1042,6 +1061,7 @@ def create_library_framework(
         existing.references = req.references
         existing.is_active = True
 
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     log_action(db, user.id, "compliance.library.framework.create", {"framework_key": req.framework_key})
     return ComplianceFrameworkOut.model_validate(existing)
@@ -1064,6 +1084,7 @@ def update_library_framework(
     for k, v in data.items():
         setattr(fw, k, v)
 
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     log_action(db, user.id, "compliance.library.framework.update", {"framework_key": framework_key})
     return ComplianceFrameworkOut.model_validate(fw)
@@ -1090,6 +1111,7 @@ def delete_library_framework(
         )
         .values(is_active=False)
     )
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     log_action(db, user.id, "compliance.library.framework.delete", {"framework_key": framework_key})
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1135,6 +1157,7 @@ def add_framework_requirement(
         )
         db.add(ref)
 
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     log_action(
         db,
@@ -1181,6 +1204,7 @@ def update_framework_requirement(
             is_active=True,
         )
         db.add(replacement)
+        _refresh_library_caches(db, tenant_id=ctx.tenant.id)
         db.commit()
         log_action(
             db,
@@ -1233,6 +1257,7 @@ def delete_framework_requirement(
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     db.delete(item)
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     log_action(
         db,
@@ -1265,6 +1290,7 @@ def rollback_library(
             version_label=batch.version_label,
             imported_by_user_id=current_user.id,
         )
+        _refresh_library_caches(db, tenant_id=ctx.tenant.id)
         db.commit()
     except TenantLibraryError as exc:
         db.rollback()
@@ -1375,6 +1401,7 @@ def enable_profile(
             )
         )
 
+    _refresh_library_caches(db, tenant_id=ctx.tenant.id)
     db.commit()
     db.refresh(profile)
     return ComplianceProfileOut(
@@ -1594,6 +1621,7 @@ def update_status(
     )
 
     previous_status = status_row.status_enum if status_row else None
+    previous_score = status_row.score if status_row else None
     if status_row:
         status_row.status_enum = payload.status_enum
         status_row.score = score
@@ -1622,6 +1650,14 @@ def update_status(
         entity_id=None,
         details={"control_key": control.control_key, "from": previous_status, "to": payload.status_enum},
     )
+    db.flush()
+    apply_status_change(
+        db,
+        tenant_id=ctx.tenant.id,
+        control_key=control.control_key,
+        previous=(previous_status, previous_score),
+        current=(status_row.status_enum, status_row.score),
+    )
     try:
         create_snapshot(
             db,
@@ -1705,7 +1741,7 @@ def get_summary(
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access("compliance", "compliance:read")),
 ) -> ComplianceSummaryResponse:
-    summary = compute_summary(db, tenant_id=ctx.tenant.id)
+    summary = load_summary(db, tenant_id=ctx.tenant.id)
     return ComplianceSummaryResponse(**summary)
 
 
@@ -1717,27 +1753,24 @@ def get_framework_summary(
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access("compliance", "compliance:read")),
 ) -> ComplianceFrameworkSummaryResponse:
-    summary = compute_framework_summary(db, tenant_id=ctx.tenant.id, framework_key=framework_key)
+    summary = load_framework_summary(db, tenant_id=ctx.tenant.id, framework_key=framework_key)
     if not summary:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Framework not found")
     return ComplianceFrameworkSummaryResponse(**summary)
 
 
-@router.get("/dashboard", response_model=ComplianceDashboardResponse)
+@router.get("/dashboard", response_model=ComplianceDashboardResponse, dependencies=[Depends(use_read_replica)])
 def get_dashboard(
     ctx: TenantContext = Depends(require_tenant_membership),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access("compliance", "compliance:read")),
 ) -> ComplianceDashboardResponse:
-    summary = compute_summary(db, tenant_id=ctx.tenant.id)
+    summary = load_summary(db, tenant_id=ctx.tenant.id)
     last_snapshot = latest_snapshot(db, tenant_id=ctx.tenant.id)
-    gaps = list_gaps(db, tenant_id=ctx.tenant.id, threshold=0.75)
-    ordered_gaps = order_gaps(gaps)
-    gaps_by_severity: dict[str, int] = {}
-    for gap in gaps:
-        key = gap.criticality or "Unknown"
-        gaps_by_severity[key] = gaps_by_severity.get(key, 0) + 1
+    gap_columns = load_gap_columns(db, tenant_id=ctx.tenant.id)
+    gaps_by_severity = gap_columns.severity_counts(0.75)
+    top_gaps = rank_gaps(gap_columns, threshold=0.75, limit=5)
 
     open_work_items = db.scalar(
         select(func.count(ComplianceWorkItemLink.id)).where(
@@ -1752,14 +1785,14 @@ def get_dashboard(
         gaps_by_severity=gaps_by_severity,
         open_work_items=int(open_work_items),
         last_snapshot_at=last_snapshot.computed_at if last_snapshot else None,
-        top_gaps=[ComplianceGapItem.model_validate(item) for item in ordered_gaps[:5]],
+        top_gaps=[ComplianceGapItem.model_validate(item) for item in top_gaps],
     )
 
 
-@router.get("/trends", response_model=ComplianceTrendResponse)
+@router.get("/trends", response_model=ComplianceTrendResponse, dependencies=[Depends(use_read_replica)])
 def get_trend_data(
     scope: str = Query(default="overall"),
-    window: int = Query(default=90, ge=7, le=365),
+    window: int = Query(default=90, ge=7, le=1825),
     framework_key: str | None = Query(default=None),
     client_set_version_id: UUID | None = Query(default=None),
     ctx: TenantContext = Depends(require_tenant_membership),
@@ -1841,13 +1874,14 @@ def get_gaps(
 @router.post("/gaps/plan", response_model=ComplianceGapPlanResponse)
 def get_gap_plan(
     threshold: float = Query(default=0.75, ge=0, le=1),
+    limit: int | None = Query(default=None, ge=1, le=1000),
     ctx: TenantContext = Depends(require_tenant_membership),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_active_user),
     __: object = Depends(require_access("compliance", "compliance:read")),
 ) -> ComplianceGapPlanResponse:
-    gaps = list_gaps(db, tenant_id=ctx.tenant.id, threshold=threshold)
-    ordered = order_gaps(gaps)
+    columns = load_gap_columns(db, tenant_id=ctx.tenant.id)
+    ordered = rank_gaps(columns, threshold=threshold, limit=limit)
     return ComplianceGapPlanResponse(items=[ComplianceGapItem.model_validate(item) for item in ordered])
 
 
@@ -1890,6 +1924,14 @@ def update_remediation(
             last_reviewed_at=datetime.utcnow(),
         )
         db.add(status_row)
+        db.flush()
+        apply_status_change(
+            db,
+            tenant_id=ctx.tenant.id,
+            control_key=control.control_key,
+            previous=(None, None),
+            current=(status_row.status_enum, status_row.score),
+        )
 
     status_row.target_score = payload.target_score
     status_row.priority = payload.priority
@@ -2323,6 +2365,8 @@ def apply_practice_mapping(
         entity_id=item.id,
         details={"result_ids": [str(r.id) for r in results]},
     )
+    db.flush()
+    refresh_rollups(db, tenant_id=ctx.tenant.id)
     try:
         create_snapshot(
             db,
@@ -2936,6 +2980,8 @@ def apply_client_mapping(
         entity_id=version_id,
         details={"result_ids": [str(rid) for rid in payload.result_ids]},
     )
+    db.flush()
+    refresh_rollups(db, tenant_id=ctx.tenant.id)
     try:
         create_snapshot(
             db,
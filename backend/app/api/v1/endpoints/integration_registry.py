@@ -253,8 +253,7 @@ def list_instances(
     )
     key = svc.get_tenant_key(ctx.tenant.id)
     items: list[IrInstanceListRead] = [
-        IrInstanceListRead(**svc.build_instance_list_item_data(inst, key))
-        for inst in rows
+        IrInstanceListRead(**item) for item in svc.build_instance_list_items_data(rows, key)
     ]
 
     return IrInstanceListResponse(
@@ -360,6 +359,19 @@ def get_instance_history(
     return [IrAuditLogRead.model_validate(log) for log in logs]
 
 
+@router.get("/instances/{instance_id}/history/{version}", response_model=IrAuditLogRead)
+def get_instance_version(
+    instance_id: uuid.UUID,
+    version: int,
+    db: Session = Depends(get_db),
+    ctx: TenantContext = Depends(_require_read()),
+) -> IrAuditLogRead:
+    log = svc.get_instance_version(db, instance_id=instance_id, tenant_id=ctx.tenant.id, version=version)
+    if not log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+    return IrAuditLogRead.model_validate(log)
+
+
 # ---------------------------------------------------------------------------
 # Endpoints (sub-resource of Instance)
 # ---------------------------------------------------------------------------
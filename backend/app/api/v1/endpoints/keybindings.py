@@ -49,6 +49,5 @@ def update_keybindings(
     prefs = dict(current_user.preferences_json or {})
     prefs['keybindings'] = payload.model_dump()
     current_user.preferences_json = prefs
-    db.add(current_user)
     db.commit()
     return _normalize_payload(prefs.get('keybindings'))
@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, use_read_replica
 from app.db.session import get_db
 from app.models.release_mgmt import ReleasePlan
 from app.models.rbac import User
@@ -66,7 +66,7 @@ def list_release_templates(
     ]
 
 
-@router.get("", response_model=ReleaseCenterListResponse)
+@router.get("", response_model=ReleaseCenterListResponse, dependencies=[Depends(use_read_replica)])
 def list_release_center(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, use_read_replica
 from app.db.session import get_db
 from app.models.rbac import User
 from app.multitenancy.deps import TenantContext, require_tenant_membership
@@ -13,7 +13,7 @@ from app.services import report_service
 router = APIRouter(prefix='/reports', tags=['reports'])
 
 
-@router.get('/admin-dashboard', response_model=AdminDashboardReport)
+@router.get('/admin-dashboard', response_model=AdminDashboardReport, dependencies=[Depends(use_read_replica)])
 def admin_dashboard(
     db: Session = Depends(get_db),
     _: User = Depends(get_current_active_user),
@@ -26,7 +26,9 @@ def admin_dashboard(
     return AdminDashboardReport(**report_service.admin_dashboard(db))
 
 
-@router.get('/employee-dashboard', response_model=EmployeeDashboardReport)
+@router.get(
+    '/employee-dashboard', response_model=EmployeeDashboardReport, dependencies=[Depends(use_read_replica)]
+)
 def employee_dashboard(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -35,7 +37,7 @@ def employee_dashboard(
     return EmployeeDashboardReport(**report_service.employee_dashboard(db, employee_id=current_user.id))
 
 
-@router.get('/mentor-dashboard', response_model=MentorDashboardReport)
+@router.get('/mentor-dashboard', response_model=MentorDashboardReport, dependencies=[Depends(use_read_replica)])
 def mentor_dashboard(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -11,7 +11,7 @@ from app.models.assignment import OnboardingAssignment
 from app.models.rbac import User
 from app.multitenancy.permissions import require_access
 from app.schemas.common import PaginationMeta
-from app.models.track import TrackVersion
+from app.models.track import TrackPropagationJob, TrackVersion
 from app.schemas.track import (
     DuplicateTrackResponse,
     PublishTrackResponse,
@@ -19,11 +19,12 @@ from app.schemas.track import (
     TrackCascadeDeleteRequest,
     TrackCascadeDeleteResponse,
     TrackListResponse,
+    TrackPropagationJobOut,
     TrackTemplateCreate,
     TrackTemplateOut,
     TrackTemplateUpdate,
 )
-from app.services import audit_service, track_service
+from app.services import audit_service, track_propagation_service, track_service
 
 
 router = APIRouter(prefix='/tracks', tags=['tracks'])
@@ -359,6 +360,7 @@ def delete_track_version(
 def publish_track(
     template_id: UUID,
     version_id: UUID,
+    apply_to_assignments: bool = Query(default=False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     __: object = Depends(require_access('tracks', 'tracks:write')),
@@ -370,19 +372,97 @@ def publish_track(
         actor_user_id=current_user.id,
     )
 
+    job = None
+    needs_dispatch = False
+    if apply_to_assignments:
+        job, needs_dispatch = track_propagation_service.start_propagation_job(
+            db,
+            template_id=template_id,
+            version_id=published.id,
+            actor_user_id=current_user.id,
+        )
+
     audit_service.log_action(
         db,
         actor_user_id=current_user.id,
         action='track_publish',
         entity_type='track_version',
         entity_id=published.id,
-        details={'template_id': template_id, 'version_id': version_id},
+        details={
+            'template_id': template_id,
+            'version_id': version_id,
+            'apply_to_assignments': apply_to_assignments,
+        },
     )
     db.commit()
 
+    if job is not None and needs_dispatch:
+        db.refresh(job)
+        track_propagation_service.dispatch_propagation_job(job_id=job.id, tenant_id=job.tenant_id)
+
     return PublishTrackResponse(
         template_id=template_id,
         version_id=published.id,
         status=published.status,
         published_at=published.published_at,
+        propagation_job_id=job.id if job is not None else None,
     )
+
+
+@router.get('/{template_id}/propagation-jobs/latest', response_model=TrackPropagationJobOut)
+def latest_propagation_job(
+    template_id: UUID,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    __: object = Depends(require_access('tracks', 'tracks:read')),
+) -> TrackPropagationJobOut:
+    job = db.scalar(
+        select(TrackPropagationJob)
+        .where(TrackPropagationJob.template_id == template_id)
+        .order_by(TrackPropagationJob.created_at.desc())
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No propagation jobs found')
+    return TrackPropagationJobOut.model_validate(job)
+
+
+@router.get('/{template_id}/propagation-jobs/{job_id}', response_model=TrackPropagationJobOut)
+def get_propagation_job(
+    template_id: UUID,
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    __: object = Depends(require_access('tracks', 'tracks:read')),
+) -> TrackPropagationJobOut:
+    job = db.scalar(
+        select(TrackPropagationJob).where(
+            TrackPropagationJob.id == job_id,
+            TrackPropagationJob.template_id == template_id,
+        )
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Propagation job not found')
+    return TrackPropagationJobOut.model_validate(job)
+
+
+@router.post('/{template_id}/propagation-jobs/{job_id}/cancel', response_model=TrackPropagationJobOut)
+def cancel_propagation_job(
+    template_id: UUID,
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    __: object = Depends(require_access('tracks', 'tracks:write')),
+) -> TrackPropagationJobOut:
+    job = db.scalar(
+        select(TrackPropagationJob).where(
+            TrackPropagationJob.id == job_id,
+            TrackPropagationJob.template_id == template_id,
+        )
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Propagation job not found')
+    if job.status in track_propagation_service.ACTIVE_STATUSES:
+        # A running worker stops before its next chunk; chunks already committed stay applied.
+        track_propagation_service.cancel_job(db, job=job, actor_user_id=current_user.id)
+        db.commit()
+    return TrackPropagationJobOut.model_validate(job)
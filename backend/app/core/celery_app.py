@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    'onboarding',
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=[
+        'app.modules.billing.tasks',
+        'app.tasks.assessments',
+        'app.tasks.compliance',
+        'app.tasks.tracks',
+    ],
+)
+
+# Billing keeps the queue it always had as the default, so a worker started without -Q (the
+# old `celery -A app.modules.billing.celery_app worker -B`) still drains the billing outbox.
+# Newer modules are routed explicitly; a worker must add them with -Q billing,default,imports.
+celery_app.conf.update(
+    task_default_queue='billing',
+    task_routes={
+        'app.tasks.assessments.*': {'queue': 'imports'},
+        'app.tasks.compliance.*': {'queue': 'default'},
+        'app.tasks.tracks.*': {'queue': 'default'},
+    },
+    broker_connection_retry_on_startup=True,
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+celery_app.conf.beat_schedule = {
+    'billing-outbox-dispatch': {
+        'task': 'app.modules.billing.tasks.process_billing_outbox',
+        'schedule': settings.BILLING_OUTBOX_INTERVAL_SECONDS,
+    },
+    'compliance-snapshot-scheduler': {
+        'task': 'app.tasks.compliance.run_compliance_snapshots',
+        'schedule': settings.COMPLIANCE_SNAPSHOT_INTERVAL_SECONDS,
+    },
+}
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    # Optional streaming replica for endpoints declared read-only (reports, dashboards).
+    DATABASE_REPLICA_URL: str | None = None
     JWT_SECRET_KEY: str
     JWT_REFRESH_SECRET_KEY: str
     APP_ENV: str = 'development'
@@ -65,6 +67,29 @@ class Settings(BaseSettings):
     # Generate: python -c "import secrets; print(secrets.token_hex(32))"
     CREDENTIALS_ENCRYPTION_KEY: str | None = None
 
+    # Integration registry: unlocked tenant keys auto-lock after this long; scrypt runs in a
+    # process pool of this size.
+    IR_KEY_TTL_SECONDS: int = 8 * 60 * 60
+    IR_KDF_POOL_SIZE: int = 2
+
+    # Connection pools and statement timeouts (ms, 0 = server default) per engine. Read-only
+    # requests fall back to the primary while the replica lags more than the allowed seconds.
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 0
+    DATABASE_REPLICA_POOL_SIZE: int = 5
+    DATABASE_REPLICA_MAX_OVERFLOW: int = 10
+    DATABASE_REPLICA_STATEMENT_TIMEOUT_MS: int = 30_000
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+
+    # Per-request SQL/timing instrumentation (Server-Timing header, /metrics). A request that runs
+    # one statement fingerprint at least SQL_N_PLUS_ONE_THRESHOLD times is logged (0 = off).
+    # When METRICS_TOKEN is set, /metrics requires it as a bearer token; without one, /metrics
+    # is only served when APP_ENV is development or test.
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 0
+    METRICS_TOKEN: str | None = None
+
     BASE_DOMAINS: str = 'app.com'
     RESERVED_SUBDOMAINS: str = 'admin,billing,docs,status,api'
     DEFAULT_TENANT_SLUG: str | None = None
@@ -81,6 +106,16 @@ class Settings(BaseSettings):
     CELERY_RESULT_BACKEND: str = 'redis://localhost:6379/0'
     BILLING_OUTBOX_INTERVAL_SECONDS: int = 15
     BILLING_OUTBOX_BATCH_SIZE: int = 100
+    COMPLIANCE_SNAPSHOT_INTERVAL_SECONDS: int = 6 * 60 * 60
+    ASSESSMENT_IMPORT_CONCURRENCY: int = 4
+    ASSESSMENT_CLASSIFY_CONCURRENCY: int = 3
+
+    # Password hashing runs in a process pool of this size (0 = in the request thread);
+    # up to PASSWORD_HASH_MAX_PENDING further calls wait, others get 503 at once.
+    # Every waiting call holds a threadpool thread, so keep the sum well below 40.
+    PASSWORD_HASH_POOL_SIZE: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 6
+    PASSWORD_BCRYPT_ROUNDS: int = 12
 
     @field_validator('DATABASE_URL')
     @classmethod
@@ -89,6 +124,15 @@ class Settings(BaseSettings):
             raise ValueError('DATABASE_URL must point to PostgreSQL and start with postgresql')
         return value
 
+    @field_validator('DATABASE_REPLICA_URL')
+    @classmethod
+    def validate_database_replica_url(cls, value: str | None) -> str | None:
+        if not value:
+            return None
+        if not value.startswith('postgresql'):
+            raise ValueError('DATABASE_REPLICA_URL must point to PostgreSQL')
+        return value
+
     @field_validator('JWT_SECRET_KEY', 'JWT_REFRESH_SECRET_KEY')
     @classmethod
     def validate_jwt_secret_strength(cls, value: str) -> str:
@@ -20,6 +20,8 @@ silently storing or returning plaintext.
 from __future__ import annotations
 
 import base64
+import hashlib
+import hmac
 import os
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -46,6 +48,11 @@ def _get_key() -> bytes:
     return key
 
 
+def derive_subkey(label: bytes) -> bytes:
+    """A 32-byte key for a separate purpose, derived from the credentials key and *label*."""
+    return hmac.new(_get_key(), label, hashlib.sha256).digest()
+
+
 def encrypt_secret(plaintext: str) -> str:
     """Encrypt *plaintext* and return an opaque ``enc:v1:<base64>`` token."""
     if not plaintext:
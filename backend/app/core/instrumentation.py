@@ -0,0 +1,241 @@
+"""Per-request SQL and timing instrumentation.
+
+Engine cursor events time every statement and attribute it to the current request
+(a ContextVar set by ``instrument_request``; sync endpoints and dependencies run in
+the threadpool with a copy of that context). Each response gets a ``Server-Timing``
+header with DB time, query count, Python time and the slowest statement's
+fingerprint. Per-route totals are kept in-process and rendered in the Prometheus text
+format by ``render_metrics`` (each worker reports its own counters).
+
+Statements are fingerprinted after replacing literals and bind parameters, so the
+same query with different values shares a fingerprint. With
+``SQL_N_PLUS_ONE_THRESHOLD`` > 0, a request that runs one fingerprint at least that
+many times is logged as a probable N+1.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+
+from fastapi import Request, Response
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+from app.core.security import password_pool_stats
+from app.db.session import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAM = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SAMPLE_LENGTH = 200
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """(short hash, normalized SQL) for a statement, ignoring literal and parameter values."""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _BIND_PARAM.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _VALUE_LIST.sub('(?+)', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip().lower()
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=6).hexdigest()
+    return digest, normalized
+
+
+@dataclass
+class RequestStats:
+    started_at: float
+    query_count: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_fingerprint: str | None = None
+    fingerprint_counts: dict[str, int] = field(default_factory=dict)
+    samples: dict[str, str] = field(default_factory=dict)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar('request_stats', default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._instrumentation_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started_at = getattr(context, '_instrumentation_started_at', None)
+    if stats is None or started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    digest, normalized = fingerprint(statement)
+    stats.query_count += 1
+    stats.db_seconds += elapsed
+    stats.fingerprint_counts[digest] = stats.fingerprint_counts.get(digest, 0) + 1
+    if digest not in stats.samples:
+        stats.samples[digest] = normalized[:_SAMPLE_LENGTH]
+    if elapsed > stats.slowest_seconds:
+        stats.slowest_seconds = elapsed
+        stats.slowest_fingerprint = digest
+
+
+@dataclass
+class _RouteTotals:
+    requests: int = 0
+    seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    queries: int = 0
+    db_seconds: float = 0.0
+    n_plus_one: int = 0
+
+
+_metrics_lock = threading.Lock()
+_route_totals: dict[tuple[str, str], _RouteTotals] = {}
+_status_counts: dict[tuple[str, str, str], int] = {}
+
+
+def _repeated_statements(stats: RequestStats, threshold: int) -> dict[str, int]:
+    if threshold <= 0:
+        return {}
+    return {digest: n for digest, n in stats.fingerprint_counts.items() if n >= threshold}
+
+
+def _record_request(
+    method: str, route: str, status: int, seconds: float, stats: RequestStats, n_plus_one: bool
+) -> None:
+    with _metrics_lock:
+        totals = _route_totals.setdefault((method, route), _RouteTotals())
+        totals.requests += 1
+        totals.seconds += seconds
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                totals.buckets[i] += 1
+        totals.queries += stats.query_count
+        totals.db_seconds += stats.db_seconds
+        totals.n_plus_one += int(n_plus_one)
+        key = (method, route, str(status))
+        _status_counts[key] = _status_counts.get(key, 0) + 1
+
+
+def _server_timing(stats: RequestStats, total_seconds: float) -> str:
+    db_ms = stats.db_seconds * 1000
+    parts = [
+        f'db;dur={db_ms:.1f};desc="{stats.query_count} queries"',
+        f'app;dur={max(total_seconds * 1000 - db_ms, 0.0):.1f}',
+        f'total;dur={total_seconds * 1000:.1f}',
+    ]
+    if stats.slowest_fingerprint:
+        slowest_ms = stats.slowest_seconds * 1000
+        parts.append(f'db-slowest;dur={slowest_ms:.1f};desc="{stats.slowest_fingerprint}"')
+    return ', '.join(parts)
+
+
+async def instrument_request(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """HTTP middleware: collect SQL stats, add Server-Timing and update the /metrics totals."""
+    stats = RequestStats(started_at=time.perf_counter())
+    token = _current.set(stats)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        _current.reset(token)
+        elapsed = time.perf_counter() - stats.started_at
+        route = getattr(request.scope.get('route'), 'path', None) or 'unmatched'
+        repeated = _repeated_statements(stats, settings.SQL_N_PLUS_ONE_THRESHOLD)
+        for digest, count in repeated.items():
+            logger.warning(
+                'Probable N+1 in %s %s: statement %s ran %d times: %s',
+                request.method,
+                route,
+                digest,
+                count,
+                stats.samples.get(digest, ''),
+            )
+        _record_request(request.method, route, status, elapsed, stats, bool(repeated))
+    response.headers['Server-Timing'] = _server_timing(stats, elapsed)
+    return response
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of this worker's request, SQL, pool and hashing metrics."""
+    with _metrics_lock:
+        totals = {
+            key: replace(value, buckets=list(value.buckets)) for key, value in _route_totals.items()
+        }
+        status_counts = dict(_status_counts)
+
+    lines = [
+        '# HELP http_requests_total Requests handled, by route and status.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (method, route, status), count in sorted(status_counts.items()):
+        labels = f'method="{method}",route="{_label(route)}",status="{status}"'
+        lines.append(f'http_requests_total{{{labels}}} {count}')
+
+    lines += [
+        '# HELP http_request_duration_seconds Request latency, by route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (method, route), value in sorted(totals.items()):
+        labels = f'method="{method}",route="{_label(route)}"'
+        for bound, count in zip(DURATION_BUCKETS, value.buckets, strict=True):
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {value.requests}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {value.seconds:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {value.requests}')
+
+    per_route = (
+        ('db_queries_total', 'SQL statements executed while handling requests.', 'queries'),
+        ('db_query_duration_seconds_total', 'Time spent in SQL handling requests.', 'db_seconds'),
+        ('db_n_plus_one_requests_total', 'Requests with a probable N+1 statement.', 'n_plus_one'),
+    )
+    for name, help_text, attr in per_route:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (method, route), value in sorted(totals.items()):
+            labels = f'method="{method}",route="{_label(route)}"'
+            lines.append(f'{name}{{{labels}}} {round(getattr(value, attr), 6)}')
+
+    lines += [
+        '# HELP db_pool_connections_checked_out Connections currently checked out of the pool.',
+        '# TYPE db_pool_connections_checked_out gauge',
+    ]
+    for name, bound in (('primary', engine), ('replica', replica_engine)):
+        if bound is not None:
+            checked_out = bound.pool.checkedout()
+            lines.append(f'db_pool_connections_checked_out{{engine="{name}"}} {checked_out}')
+
+    pool = password_pool_stats()
+    for key in ('workers', 'in_flight', 'queued'):
+        lines += [f'# TYPE password_hash_pool_{key} gauge', f'password_hash_pool_{key} {pool[key]}']
+    for key in ('completed_total', 'rejected_total'):
+        lines += [
+            f'# TYPE password_hash_pool_{key} counter',
+            f'password_hash_pool_{key} {pool[key]}',
+        ]
+    return '\n'.join(lines) + '\n'
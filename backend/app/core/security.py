@@ -1,34 +1,149 @@
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import UTC, datetime, timedelta
 from hashlib import sha256
-from typing import Any
+from typing import Any, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
 
 # Use bcrypt_sha256 for new hashes so long passwords are handled safely.
 # Keep plain bcrypt for backward compatibility with existing seeded hashes.
-pwd_context = CryptContext(schemes=['bcrypt_sha256', 'bcrypt'], deprecated='auto')
+# Hashes below the configured cost (or in plain bcrypt) are flagged for rehash on login.
+pwd_context = CryptContext(
+    schemes=['bcrypt_sha256', 'bcrypt'],
+    deprecated='auto',
+    bcrypt_sha256__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt_sha256__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
 class TokenDecodeError(Exception):
     pass
 
 
-def hash_password(password: str) -> str:
+class PasswordHashBusyError(Exception):
+    """The password hashing pool is saturated; the caller should retry later."""
+
+
+# ── Password hashing pool ─────────────────────────────────────────────────────
+# bcrypt runs in a dedicated, size-capped process pool instead of on the request
+# thread. The caller's threadpool thread still waits for the result, so at most
+# PASSWORD_HASH_POOL_SIZE + PASSWORD_HASH_MAX_PENDING calls may hold a slot and
+# any further call fails at once with PasswordHashBusyError instead of queueing.
+# Keep that sum well below AnyIO's default of 40 threadpool tokens so a login
+# storm cannot starve the rest of the sync endpoints.
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(
+    max(1, settings.PASSWORD_HASH_POOL_SIZE) + settings.PASSWORD_HASH_MAX_PENDING
+)
+_stats_lock = threading.Lock()
+_stats = {'in_flight': 0, 'completed': 0, 'rejected': 0}
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if settings.PASSWORD_HASH_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_POOL_SIZE,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def shutdown_password_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def password_pool_stats() -> dict[str, int]:
+    with _stats_lock:
+        in_flight = _stats['in_flight']
+        return {
+            'workers': max(0, settings.PASSWORD_HASH_POOL_SIZE),
+            'in_flight': in_flight,
+            'queued': max(0, in_flight - max(0, settings.PASSWORD_HASH_POOL_SIZE)),
+            'completed_total': _stats['completed'],
+            'rejected_total': _stats['rejected'],
+        }
+
+
+def _run_in_pool(fn: Callable[..., T], *args: Any) -> T:
+    global _pool
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats['rejected'] += 1
+        raise PasswordHashBusyError('Password hashing is at capacity')
+    with _stats_lock:
+        _stats['in_flight'] += 1
+    try:
+        pool = _get_pool()
+        if pool is None:
+            result = fn(*args)
+        else:
+            try:
+                result = pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                logger.warning('Password hashing pool broke; hashing in-process')
+                with _pool_lock:
+                    _pool = None
+                result = fn(*args)
+        with _stats_lock:
+            _stats['completed'] += 1
+        return result
+    finally:
+        with _stats_lock:
+            _stats['in_flight'] -= 1
+        _slots.release()
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(password: str, hashed_password: str) -> bool:
+def _verify(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return _run_in_pool(_hash, password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return _run_in_pool(_verify, password, hashed_password)
+
+
+def verify_and_update_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify; on success also return a fresh hash if the stored one uses outdated parameters."""
+    return _run_in_pool(_verify_and_update, password, hashed_password)
+
+
 def _create_token(payload: dict[str, Any], secret: str, expires_delta: timedelta) -> str:
     data = payload.copy()
-    expire = datetime.now(UTC) + expires_delta
-    data.update({'exp': expire})
+    now = datetime.now(UTC)
+    data.update({'iat': now, 'exp': now + expires_delta})
     return jwt.encode(data, secret, algorithm=settings.JWT_ALGORITHM)
 
 
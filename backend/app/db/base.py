@@ -4,14 +4,18 @@ from app.models.assessment import (
     AssessmentAttempt,
     AssessmentAttemptAnswer,
     AssessmentDelivery,
+    AssessmentItemStats,
     AssessmentCategory,
     AssessmentClassificationJob,
     AssessmentClassificationJobItem,
     AssessmentQuestion,
+    AssessmentQuestionLshBand,
     AssessmentQuestionOption,
+    AssessmentQuestionSignature,
     AssessmentTest,
     AssessmentTestVersion,
     AssessmentTestVersionQuestion,
+    AssessmentVersionStats,
 )
 from app.models.audit import AuditLog
 from app.models.comment import Comment
@@ -29,6 +33,7 @@ from app.models.compliance import (
     CompliancePracticeMatchRun,
     ComplianceSeedImportBatch,
     ComplianceSnapshot,
+    ComplianceSummaryRollup,
     ComplianceClientGroup,
     ComplianceClientMatchResult,
     ComplianceClientMatchRun,
@@ -46,6 +51,7 @@ from app.models.compliance import (
     ComplianceWorkItemLink,
 )
 from app.models.integration_registry import (
+    IrAuditHead,
     IrAuditLog,
     IrDictionary,
     IrDictionaryItem,
@@ -90,7 +96,15 @@ from app.modules.billing.models import (
     UsageEvent,
 )
 from app.models.token import PasswordSetToken, RefreshToken
-from app.models.track import TaskResource, TrackPhase, TrackTask, TrackTemplate, TrackVersion
+from app.models.track import (
+    TaskResource,
+    TrackPhase,
+    TrackPropagationJob,
+    TrackSnapshot,
+    TrackTask,
+    TrackTemplate,
+    TrackVersion,
+)
 
 
 __all__ = [
@@ -100,14 +114,18 @@ __all__ = [
     'AssessmentAttempt',
     'AssessmentAttemptAnswer',
     'AssessmentDelivery',
+    'AssessmentItemStats',
     'AssessmentCategory',
     'AssessmentClassificationJob',
     'AssessmentClassificationJobItem',
     'AssessmentQuestion',
+    'AssessmentQuestionLshBand',
     'AssessmentQuestionOption',
+    'AssessmentQuestionSignature',
     'AssessmentTest',
     'AssessmentTestVersion',
     'AssessmentTestVersionQuestion',
+    'AssessmentVersionStats',
     'Base',
     'Comment',
     'ComplianceControl',
@@ -123,6 +141,7 @@ __all__ = [
     'CompliancePracticeMatchRun',
     'ComplianceSeedImportBatch',
     'ComplianceSnapshot',
+    'ComplianceSummaryRollup',
     'ComplianceClientGroup',
     'ComplianceClientMatchResult',
     'ComplianceClientMatchRun',
@@ -138,6 +157,7 @@ __all__ = [
     'ComplianceTenantLibraryProfileControl',
     'ComplianceTenantProfile',
     'ComplianceWorkItemLink',
+    'IrAuditHead',
     'IrAuditLog',
     'IrDictionary',
     'IrDictionaryItem',
@@ -169,6 +189,8 @@ __all__ = [
     'TaskResource',
     'TaskSubmission',
     'TrackPhase',
+    'TrackPropagationJob',
+    'TrackSnapshot',
     'TrackTask',
     'TrackTemplate',
     'TrackVersion',
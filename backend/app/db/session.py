@@ -1,16 +1,175 @@
+import logging
+import threading
+import time
 from collections.abc import Generator
+from typing import Any
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Connection, Engine, TextClause, create_engine, event, text
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry, Pool
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.config import settings
 
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(
+    url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int,
+    read_only: bool = False,
+) -> Engine:
+    options = []
+    if statement_timeout_ms:
+        options.append(f'-c statement_timeout={statement_timeout_ms}')
+    if read_only:
+        options.append('-c default_transaction_read_only=on')
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={'options': ' '.join(options)} if options else {},
+    )
+
+
+engine = _create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    statement_timeout_ms=settings.DATABASE_STATEMENT_TIMEOUT_MS,
+)
+replica_engine: Engine | None = (
+    _create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+        max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        statement_timeout_ms=settings.DATABASE_REPLICA_STATEMENT_TIMEOUT_MS,
+        read_only=True,
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+_USE_REPLICA_KEY = 'use_replica'
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to ``replica_bind`` once ``route_reads_to_replica`` was called.
+
+    Flushes and DML always go to the primary, and so does everything after the first write,
+    so a request reads its own writes.
+    """
+
+    def __init__(self, *args: Any, replica_bind: Engine | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        if self.info.get(_USE_REPLICA_KEY) and self.replica_bind is not None:
+            if self._flushing or not _is_read(clause):
+                self.info[_USE_REPLICA_KEY] = False
+            else:
+                return self.replica_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def _is_read(clause: Any) -> bool:
+    if isinstance(clause, UpdateBase):
+        return False
+    if getattr(clause, '_for_update_arg', None) is not None:
+        # Row locks only exist on the primary, and a read-only replica rejects them.
+        return False
+    if isinstance(clause, TextClause):
+        # Raw SQL may write; only plain selects are safe to send to the replica.
+        return clause.text.lstrip().lower().startswith('select')
+    return True
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    bind=engine,
+    replica_bind=replica_engine,
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
+)
+
+# A replica counts as caught up when it has replayed everything it received, or its last
+# replayed transaction is recent enough. On a server that isn't in recovery the lag is 0.
+_REPLICA_LAG_SQL = text(
+    """
+    select case
+      when not pg_is_in_recovery() then 0
+      when pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() then 0
+      else coalesce(extract(epoch from now() - pg_last_xact_replay_timestamp()), 0)
+    end
+    """
+)
+REPLICA_CHECK_INTERVAL_SECONDS = 1.0
+_replica_lock = threading.Lock()
+# engine -> (lag in seconds, or None when unreachable; monotonic time of the check)
+_replica_lags: dict[Engine, tuple[float | None, float]] = {}
+
+
+def replica_lag_seconds(replica: Engine) -> float | None:
+    """The replica's replay lag, or None when it can't be reached (checked once a second)."""
+    now = time.monotonic()
+    with _replica_lock:
+        cached = _replica_lags.get(replica)
+    if cached is not None and now - cached[1] < REPLICA_CHECK_INTERVAL_SECONDS:
+        return cached[0]
+
+    lag: float | None
+    try:
+        with replica.connect() as conn:
+            lag = float(conn.execute(_REPLICA_LAG_SQL).scalar() or 0)
+    except Exception as exc:  # noqa: BLE001 - the primary still serves reads
+        logger.warning('Replica unavailable, reading from the primary: %s', exc)
+        lag = None
+    with _replica_lock:
+        _replica_lags[replica] = (lag, now)
+    return lag
+
+
+def replica_is_fresh(replica: Engine, max_lag_seconds: float | None = None) -> bool:
+    if max_lag_seconds is None:
+        max_lag_seconds = settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+    lag = replica_lag_seconds(replica)
+    return lag is not None and lag <= max_lag_seconds
+
+
+def route_reads_to_replica(db: Session) -> bool:
+    """Send the session's further reads to its replica when one is configured and caught up."""
+    replica = getattr(db, 'replica_bind', None)
+    if replica is None or not replica_is_fresh(replica):
+        return False
+    db.info[_USE_REPLICA_KEY] = True
+    return True
+
 
 _DEFAULT_TENANT_ID: str | None = None
 
+# Tenant binding: ``set_tenant_id`` records the tenant on the Session (``session.info``), and
+# every transaction the Session begins applies it to its connection as a session-level setting.
+# Each connection remembers the tenant it currently carries (``connection.info``), so the
+# set_config round trip only happens when it last served a different tenant. The binding
+# survives commits while the connection is checked out, so long-running jobs don't need to
+# re-apply it; on checkin it is RESET, so direct ``engine.connect()`` users never inherit it.
+_SESSION_TENANT_KEY = 'tenant_id'
+_CONNECTION_TENANT_KEY = 'bound_tenant_id'
+_CONNECTION_PENDING_KEY = 'bound_tenant_pending'
+_SESSION_CONNECTIONS_KEY = 'tenant_connections'
+_UNKNOWN = object()
+# Recorded after a rollback undid a set_config: the connection holds whatever was committed
+# before, so the next bind re-applies the tenant and checkin resets it.
+_UNKNOWN_BINDING = object()
+
 
 def _resolve_default_tenant_id(db: Session) -> str | None:
     """
@@ -54,8 +213,7 @@ def _resolve_default_tenant_id(db: Session) -> str | None:
 
 def _ensure_session_tenant_id(db: Session) -> None:
     global _DEFAULT_TENANT_ID  # noqa: PLW0603
-    existing = db.execute(text("select current_setting('app.tenant_id', true)")).scalar()
-    if existing:
+    if db.info.get(_SESSION_TENANT_KEY):
         return
 
     if not _DEFAULT_TENANT_ID:
@@ -74,7 +232,77 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _bind_tenant(connection: Connection, tenant_id: str | None) -> None:
+    if connection.info.get(_CONNECTION_TENANT_KEY, _UNKNOWN) == tenant_id:
+        return
+    # Session-level (third argument false): the value outlives this transaction. An empty
+    # string clears it, since current_setting() then yields '' just like an unset value.
+    connection.execute(
+        text("select set_config('app.tenant_id', :tenant_id, false)"),
+        {"tenant_id": tenant_id or ''},
+    )
+    connection.info[_CONNECTION_TENANT_KEY] = tenant_id
+    connection.info[_CONNECTION_PENDING_KEY] = True
+
+
 def set_tenant_id(db: Session, tenant_id: str) -> None:
-    # Use set_config() because SET LOCAL doesn't accept bind parameters in PostgreSQL.
-    # The third argument (true) makes it transaction-local (like SET LOCAL).
-    db.execute(text("select set_config('app.tenant_id', :tenant_id, true)"), {"tenant_id": str(tenant_id)})
+    tenant_id = str(tenant_id)
+    db.info[_SESSION_TENANT_KEY] = tenant_id
+    # Applied right away to the connections of an open transaction (primary and replica);
+    # otherwise the next begin binds it.
+    for connection in db.info.get(_SESSION_CONNECTIONS_KEY, ()):
+        _bind_tenant(connection, tenant_id)
+
+
+@event.listens_for(Session, 'after_begin')
+def _bind_session_tenant(
+    session: Session, _transaction: SessionTransaction, connection: Connection
+) -> None:
+    # Sessions without a tenant still clear whatever a previous user left on the connection.
+    _bind_tenant(connection, session.info.get(_SESSION_TENANT_KEY))
+    session.info.setdefault(_SESSION_CONNECTIONS_KEY, []).append(connection)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _release_session_connections(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_SESSION_CONNECTIONS_KEY, None)
+
+
+@event.listens_for(Engine, 'commit')
+def _keep_bound_tenant(connection: Connection) -> None:
+    connection.info.pop(_CONNECTION_PENDING_KEY, None)
+
+
+@event.listens_for(Engine, 'rollback')
+@event.listens_for(Engine, 'rollback_savepoint')
+def _forget_bound_tenant(connection: Connection, *_args) -> None:
+    # A set_config issued inside the rolled-back (sub)transaction is undone with it and the
+    # connection falls back to an earlier value we no longer know, possibly another tenant's.
+    # Without a pending set_config the recorded binding is still accurate.
+    if connection.info.pop(_CONNECTION_PENDING_KEY, None):
+        connection.info[_CONNECTION_TENANT_KEY] = _UNKNOWN_BINDING
+
+
+@event.listens_for(Pool, 'checkin')
+def _reset_bound_tenant(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+    tenant_id = connection_record.info.pop(_CONNECTION_TENANT_KEY, None)
+    connection_record.info.pop(_CONNECTION_PENDING_KEY, None)
+    # Skipped only when nothing was bound or the last binding cleared it; an unknown binding
+    # (_UNKNOWN_BINDING) is truthy and gets reset.
+    if not tenant_id or dbapi_connection is None:
+        return
+    # The pool has already rolled back, so this runs on an idle connection; autocommit makes
+    # the RESET a single round trip instead of begin/reset/commit.
+    autocommit = dbapi_connection.autocommit
+    try:
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('RESET app.tenant_id')
+        finally:
+            cursor.close()
+        dbapi_connection.autocommit = autocommit
+    except Exception as exc:  # noqa: BLE001 - never hand out a connection still bound to a tenant
+        logger.warning('Could not reset the tenant on a pooled connection: %s', exc)
+        connection_record.invalidate(exc)
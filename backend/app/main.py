@@ -1,7 +1,9 @@
 from contextlib import asynccontextmanager
+import hmac
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # Ensure application-level loggers (not just uvicorn.*) emit INFO messages.
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
@@ -9,6 +11,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.core.instrumentation import instrument_request, render_metrics
+from app.core.security import PasswordHashBusyError, shutdown_password_pool
 from app.db.session import SessionLocal
 from app.services.bootstrap_service import ensure_reference_data
 
@@ -29,6 +33,7 @@ async def lifespan(_: FastAPI):
         db.close()
 
     yield
+    shutdown_password_pool()
 
 
 app = FastAPI(
@@ -49,9 +54,38 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.middleware('http')(instrument_request)
+
 app.include_router(api_router, prefix='/api/v1')
 
 
+@app.exception_handler(PasswordHashBusyError)
+async def password_hash_busy_handler(_: Request, exc: PasswordHashBusyError) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={'detail': 'Authentication is busy. Try again shortly.'},
+        headers={'Retry-After': '2'},
+    )
+
+
 @app.get('/')
 def root() -> dict[str, str]:
     return {'service': 'internal-onboarding-api', 'status': 'running'}
+
+
+# Without METRICS_TOKEN, /metrics is only served in these environments.
+_OPEN_METRICS_ENVS = ('development', 'test')
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get('authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), settings.METRICS_TOKEN.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid metrics token'
+            )
+    elif settings.APP_ENV not in _OPEN_METRICS_ENVS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Not Found')
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4')
@@ -3,6 +3,7 @@ from datetime import date, datetime
 from typing import Any
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Date,
@@ -12,13 +13,14 @@ from sqlalchemy import (
     ForeignKeyConstraint,
     Index,
     Integer,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     func,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -82,6 +84,7 @@ class AssessmentQuestion(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Ba
             ['assessment_categories.tenant_id', 'assessment_categories.id'],
             ondelete='SET NULL',
         ),
+        Index('ix_assessment_questions_tenant_updated_at', 'tenant_id', 'updated_at'),
     )
 
     tenant_id: Mapped[uuid.UUID] = mapped_column(
@@ -133,6 +136,55 @@ class AssessmentQuestionOption(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMix
     question: Mapped['AssessmentQuestion'] = relationship(back_populates='options')
 
 
+class AssessmentQuestionSignature(Base):
+    """MinHash signature of a question prompt (see question_dedup_service)."""
+
+    __tablename__ = 'assessment_question_signatures'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tenant_id', 'question_id'],
+            ['assessment_questions.tenant_id', 'assessment_questions.id'],
+            ondelete='CASCADE',
+        ),
+    )
+
+    question_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    minhash: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AssessmentQuestionLshBand(Base):
+    """LSH band buckets of a question's MinHash signature, for near-duplicate candidate lookup."""
+
+    __tablename__ = 'assessment_question_lsh_bands'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tenant_id', 'question_id'],
+            ['assessment_questions.tenant_id', 'assessment_questions.id'],
+            ondelete='CASCADE',
+        ),
+    )
+
+    question_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        nullable=False,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    bucket: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
 class AssessmentClassificationJob(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Base):
     __tablename__ = 'assessment_classification_jobs'
     __table_args__ = (
@@ -269,6 +321,8 @@ class AssessmentTestVersion(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin,
     shuffle_questions: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     attempts_allowed: Mapped[int | None] = mapped_column(Integer, nullable=True)
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Denormalized len(questions); maintained by assessment_service when the question set changes.
+    question_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
 
     test: Mapped['AssessmentTest'] = relationship(back_populates='versions')
     questions: Mapped[list['AssessmentTestVersionQuestion']] = relationship(
@@ -439,11 +493,81 @@ class AssessmentAttemptAnswer(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixi
     attempt: Mapped['AssessmentAttempt'] = relationship(back_populates='answers')
 
 
+class AssessmentVersionStats(Base):
+    """Running score moments of a test version's scored attempts (see item_analysis_service)."""
+
+    __tablename__ = 'assessment_version_stats'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tenant_id', 'test_version_id'],
+            ['assessment_test_versions.tenant_id', 'assessment_test_versions.id'],
+            ondelete='CASCADE',
+        ),
+    )
+
+    test_version_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Moments of the number-correct score X over scored attempts: sum(X), sum(X^2).
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    score_sq_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AssessmentItemStats(Base):
+    """Running response counts of one test-version question (see item_analysis_service)."""
+
+    __tablename__ = 'assessment_item_stats'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tenant_id', 'test_version_id'],
+            ['assessment_test_versions.tenant_id', 'assessment_test_versions.id'],
+            ondelete='CASCADE',
+        ),
+    )
+
+    test_version_question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('assessment_test_version_questions.id', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        nullable=False,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    test_version_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    response_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    correct_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    omitted_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # sum(X) over the attempts that answered this item correctly; drives point-biserial.
+    correct_score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    option_counts: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
 Index('ix_assessment_questions_status', AssessmentQuestion.status)
 Index('ix_assessment_questions_difficulty', AssessmentQuestion.difficulty)
 Index('ix_assessment_questions_type', AssessmentQuestion.question_type)
 Index('ix_assessment_questions_category_id', AssessmentQuestion.category_id)
 Index('ix_assessment_question_options_question_id', AssessmentQuestionOption.question_id)
+Index(
+    'ix_assessment_question_lsh_bands_bucket',
+    AssessmentQuestionLshBand.tenant_id,
+    AssessmentQuestionLshBand.band,
+    AssessmentQuestionLshBand.bucket,
+)
 Index('ix_assessment_classification_jobs_status', AssessmentClassificationJob.status)
 Index('ix_assessment_classify_job_items_job', AssessmentClassificationJobItem.job_id)
 Index('ix_assessment_classify_job_items_tenant', AssessmentClassificationJobItem.tenant_id)
@@ -451,10 +575,17 @@ Index('ix_assessment_classify_job_items_question', AssessmentClassificationJobIt
 Index('ix_assessment_tests_status', AssessmentTest.status)
 Index('ix_assessment_tests_category', AssessmentTest.category)
 Index('ix_assessment_test_versions_test_id', AssessmentTestVersion.test_id)
+Index('ix_assessment_item_stats_version', AssessmentItemStats.test_version_id)
 Index('ix_assessment_deliveries_participant_user', AssessmentDelivery.participant_user_id)
 Index('ix_assessment_deliveries_source_assignment', AssessmentDelivery.source_assignment_id)
 Index('ix_assessment_attempts_delivery_id', AssessmentAttempt.delivery_id)
 Index('ix_assessment_attempts_user_id', AssessmentAttempt.user_id)
+Index(
+    'ix_assessment_attempts_user_delivery',
+    AssessmentAttempt.user_id,
+    AssessmentAttempt.delivery_id,
+    AssessmentAttempt.attempt_number,
+)
 
 
 class AiImportTemplate(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Base):
@@ -520,3 +651,64 @@ class UserAchievement(UUIDPrimaryKeyMixin, Base):
     )
 
     achievement: Mapped['AchievementCatalog'] = relationship(back_populates='user_achievements')
+
+
+class AssessmentLeaderboardEntry(Base):
+    """Stars and completed tests per member per leaderboard period (see leaderboard_service)."""
+    __tablename__ = 'assessment_leaderboard_entries'
+    __table_args__ = (
+        CheckConstraint(
+            "period_type in ('week', 'month', 'quarter', 'all')",
+            name='assessment_leaderboard_period_type_values',
+        ),
+    )
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True
+    )
+    period_type: Mapped[str] = mapped_column(String(10), primary_key=True)
+    period_key: Mapped[str] = mapped_column(String(10), primary_key=True)  # e.g. 2026-W42, 2026-10, 2026-Q4, all
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    stars: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+Index(
+    'ix_assessment_leaderboard_rank',
+    AssessmentLeaderboardEntry.tenant_id,
+    AssessmentLeaderboardEntry.period_type,
+    AssessmentLeaderboardEntry.period_key,
+    AssessmentLeaderboardEntry.stars.desc(),
+    AssessmentLeaderboardEntry.user_id.desc(),
+)
+
+
+class UserAchievementProgress(Base):
+    """Running per-membership state behind streak, run and improvement achievements.
+
+    Maintained incrementally by star_service on each scored attempt so unlock checks
+    never rescan attempt history.
+    """
+    __tablename__ = 'user_achievement_progress'
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    current_week_streak: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_active_week: Mapped[str | None] = mapped_column(String(8), nullable=True)  # ISO 'YYYY-WW'
+    perfect_run: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    five_star_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    low_star_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # {test_id: {"last": stars, "best": stars}}
+    test_stars: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -25,6 +25,7 @@ from app.models.mixins import AuditUserMixin, TimestampMixin, UUIDPrimaryKeyMixi
 
 if TYPE_CHECKING:
     from app.models.comment import Comment
+    from app.models.track import TrackSnapshot
 
 
 class OnboardingAssignment(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Base):
@@ -45,6 +46,11 @@ class OnboardingAssignment(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin,
             ['track_versions.tenant_id', 'track_versions.id'],
             ondelete='RESTRICT',
         ),
+        ForeignKeyConstraint(
+            ['tenant_id', 'snapshot_hash'],
+            ['track_snapshots.tenant_id', 'track_snapshots.content_hash'],
+            ondelete='RESTRICT',
+        ),
     )
 
     tenant_id: Mapped[uuid.UUID] = mapped_column(
@@ -67,18 +73,25 @@ class OnboardingAssignment(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin,
     target_date: Mapped[date] = mapped_column(Date, nullable=False)
     status: Mapped[str] = mapped_column(String(30), nullable=False, default='not_started', index=True)
     progress_percent: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
-    snapshot_json: Mapped[dict[str, Any]] = mapped_column('snapshot', JSONB, nullable=False, default=dict)
+    snapshot_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     metadata_json: Mapped[dict[str, Any]] = mapped_column('metadata', JSONB, nullable=False, default=dict)
 
     phases: Mapped[list['AssignmentPhase']] = relationship(
         back_populates='assignment', cascade='all, delete-orphan', order_by='AssignmentPhase.order_index'
     )
     tasks: Mapped[list['AssignmentTask']] = relationship(
-        back_populates='assignment', cascade='all, delete-orphan', order_by='AssignmentTask.order_index'
+        back_populates='assignment',
+        cascade='all, delete-orphan',
+        order_by='[AssignmentTask.order_index, AssignmentTask.id]',
     )
     comments: Mapped[list['Comment']] = relationship(
         back_populates='assignment', cascade='all, delete-orphan', order_by='Comment.created_at'
     )
+    snapshot: Mapped['TrackSnapshot'] = relationship(lazy='selectin', viewonly=True)
+
+    @property
+    def snapshot_json(self) -> dict[str, Any]:
+        return self.snapshot.snapshot if self.snapshot is not None else {}
 
     @property
     def purpose(self) -> str | None:
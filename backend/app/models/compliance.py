@@ -5,7 +5,17 @@ from datetime import datetime
 from typing import Any
 
 import sqlalchemy as sa
-from sqlalchemy import Boolean, CheckConstraint, DateTime, ForeignKey, Index, String, Text, UniqueConstraint
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -409,6 +419,37 @@ class ComplianceSnapshot(UUIDPrimaryKeyMixin, Base):
     computed_by_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
 
 
+class ComplianceSummaryRollup(Base):
+    """Precomputed numerator/denominator buckets behind the compliance summary endpoints."""
+
+    __tablename__ = 'summary_rollups'
+    __table_args__ = (
+        CheckConstraint(
+            "bucket_type in ('overall','domain','framework','framework_domain')",
+            name='ck_compliance_summary_rollups_bucket_type',
+        ),
+        {'schema': COMPLIANCE_SCHEMA},
+    )
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        primary_key=True,
+        server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+    )
+    bucket_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    framework_key: Mapped[str] = mapped_column(String(80), primary_key=True, default='')
+    domain_code: Mapped[str] = mapped_column(String(80), primary_key=True, default='')
+    label: Mapped[str] = mapped_column(String(255), nullable=False, default='')
+    profile_key: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    numerator: Mapped[float] = mapped_column(nullable=False, default=0.0)
+    denominator: Mapped[float] = mapped_column(nullable=False, default=0.0)
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=sa.text('now()')
+    )
+
+
 class ComplianceWorkItemLink(UUIDPrimaryKeyMixin, Base):
     __tablename__ = 'work_item_links'
     __table_args__ = (
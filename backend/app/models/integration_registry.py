@@ -12,7 +12,7 @@ from typing import Any
 
 import sqlalchemy as sa
 from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, LargeBinary, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -212,6 +212,8 @@ class IrEndpoint(UUIDPrimaryKeyMixin, Base):
     is_public: Mapped[bool] = mapped_column(Boolean(), nullable=False, server_default=sa.text("false"))
     is_primary: Mapped[bool] = mapped_column(Boolean(), nullable=False, server_default=sa.text("false"))
     sort_order: Mapped[int] = mapped_column(Integer(), nullable=False, server_default=sa.text("0"))
+    # Blind-index tokens of fqdn/ip/base_path (app.utils.blind_index); NULL until indexed.
+    search_tokens: Mapped[list[str] | None] = mapped_column(ARRAY(String(16)), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -248,6 +250,8 @@ class IrRouteHop(UUIDPrimaryKeyMixin, Base):
     label: Mapped[str | None] = mapped_column(String(200), nullable=True)
     proxy_chain: Mapped[str | None] = mapped_column(String(500), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text(), nullable=True)
+    # Blind-index tokens of label/proxy_chain (app.utils.blind_index); NULL until indexed.
+    search_tokens: Mapped[list[str] | None] = mapped_column(ARRAY(String(16)), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -256,7 +260,11 @@ class IrRouteHop(UUIDPrimaryKeyMixin, Base):
 
 
 class IrAuditLog(UUIDPrimaryKeyMixin, Base):
-    """Immutable snapshot audit record written on every create/update/delete."""
+    """Immutable audit record written on every create/update/delete.
+
+    Keyframes carry the full ``snapshot_json``; other versions carry a JSON Patch
+    (``patch_json``) against the previous version and an empty snapshot.
+    """
 
     __tablename__ = "ir_audit_log"
     __table_args__ = {"schema": IR_SCHEMA}
@@ -281,6 +289,32 @@ class IrAuditLog(UUIDPrimaryKeyMixin, Base):
         nullable=False,
         server_default=sa.text("'{}'::jsonb"),
     )
+    is_keyframe: Mapped[bool] = mapped_column(Boolean(), nullable=False, server_default=sa.text("true"))
+    patch_json: Mapped[list[dict[str, Any]] | None] = mapped_column(
+        JSONB(astext_type=sa.Text()), nullable=True
+    )
+
+
+class IrAuditHead(Base):
+    """Latest audit version and full snapshot per entity; the base for the next delta."""
+
+    __tablename__ = "ir_audit_head"
+    __table_args__ = {"schema": IR_SCHEMA}
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        server_default=sa.text("current_setting('app.tenant_id')::uuid"),
+    )
+    entity_type: Mapped[str] = mapped_column(String(80), primary_key=True)
+    entity_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer(), nullable=False)
+    keyframe_version: Mapped[int] = mapped_column(Integer(), nullable=False)
+    snapshot_json: Mapped[dict[str, Any]] = mapped_column(
+        JSONB(astext_type=sa.Text()),
+        nullable=False,
+        server_default=sa.text("'{}'::jsonb"),
+    )
 
 
 class IrUserGridPrefs(UUIDPrimaryKeyMixin, Base):
@@ -13,6 +13,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    func,
     text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
@@ -186,7 +187,62 @@ class TaskResource(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Base):
     task: Mapped['TrackTask'] = relationship(back_populates='resources')
 
 
+class TrackSnapshot(Base):
+    """Serialized track version, stored once per content hash and shared by its assignments."""
+
+    __tablename__ = 'track_snapshots'
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        primary_key=True,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    track_version_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    snapshot: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+
+class TrackPropagationJob(UUIDPrimaryKeyMixin, TimestampMixin, AuditUserMixin, Base):
+    """Background move of a template's assignments onto a newly published version."""
+
+    __tablename__ = 'track_propagation_jobs'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['tenant_id', 'track_version_id'],
+            ['track_versions.tenant_id', 'track_versions.id'],
+            ondelete='CASCADE',
+        ),
+        CheckConstraint(
+            "status in ('queued', 'running', 'completed', 'failed', 'canceled')",
+            name='track_propagation_job_status_values',
+        ),
+    )
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey('tenants.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        server_default=text("current_setting('app.tenant_id')::uuid"),
+    )
+    template_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    track_version_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default='queued', index=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_assignment_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    error_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 Index('ix_track_versions_template_id', TrackVersion.template_id)
 Index('ix_track_phases_track_version_id', TrackPhase.track_version_id)
 Index('ix_track_tasks_track_phase_id', TrackTask.track_phase_id)
 Index('ix_task_resources_task_id', TaskResource.task_id)
+Index('ix_track_propagation_jobs_template_created', TrackPropagationJob.template_id, TrackPropagationJob.created_at)
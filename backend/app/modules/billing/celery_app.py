@@ -1,25 +1,8 @@
 from __future__ import annotations
 
-from celery import Celery
+# The Celery app is shared by every background module; kept importable here for
+# existing `celery -A app.modules.billing.celery_app` deployments. Without -Q such a worker
+# only consumes the billing queue; see app.core.celery_app for the other queues.
+from app.core.celery_app import celery_app
 
-from app.core.config import settings
-
-celery_app = Celery(
-    'billing',
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND,
-)
-
-celery_app.conf.update(
-    task_default_queue='billing',
-    broker_connection_retry_on_startup=True,
-    task_acks_late=True,
-    worker_prefetch_multiplier=1,
-)
-
-celery_app.conf.beat_schedule = {
-    'billing-outbox-dispatch': {
-        'task': 'app.modules.billing.tasks.process_billing_outbox',
-        'schedule': settings.BILLING_OUTBOX_INTERVAL_SECONDS,
-    }
-}
+__all__ = ['celery_app']
@@ -544,11 +544,46 @@ class AssessmentResultSummary(BaseModel):
     user_id: UUID | None
     attempt_count: int
     average_score_percent: float | None
+    scored_count: int = 0
+    pass_rate: float | None = None  # share of scored attempts that passed
+    score_percentiles: dict[str, float | None] = Field(default_factory=dict)  # p25/p50/p75/p90
 
 
 class AssessmentResultListResponse(BaseModel):
     items: list[AssessmentAttemptOut]
     summary: AssessmentResultSummary
+    next_cursor: str | None = None
+
+
+class AssessmentItemDistractorOut(BaseModel):
+    key: str | None
+    text: str | None
+    is_correct: bool
+    selection_rate: float
+
+
+class AssessmentItemAnalysisItemOut(BaseModel):
+    test_version_question_id: UUID
+    question_id: UUID | None
+    order_index: int
+    prompt: str
+    response_count: int
+    p_value: float | None
+    point_biserial: float | None
+    omitted_rate: float | None
+    distractors: list[AssessmentItemDistractorOut]
+    flags: list[str]
+
+
+class AssessmentItemAnalysisOut(BaseModel):
+    test_version_id: UUID
+    attempt_count: int
+    question_count: int
+    mean_score: float | None
+    score_std: float | None
+    kr20: float | None
+    items: list[AssessmentItemAnalysisItemOut]
+    statistics_pending: bool = False
 
 
 # ---------------------------------------------------------------------------
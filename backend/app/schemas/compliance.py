@@ -184,6 +184,7 @@ class ComplianceGapItem(BaseSchema):
     remediation_notes: str | None = None
     remediation_owner_user_id: UUID | None = None
     framework_keys: list[str] = Field(default_factory=list)
+    priority_score: float = 0.0
 
 
 class ComplianceGapPlanResponse(BaseSchema):
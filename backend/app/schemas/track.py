@@ -154,6 +154,22 @@ class PublishTrackResponse(BaseModel):
     version_id: UUID
     status: str
     published_at: datetime
+    propagation_job_id: UUID | None = None
+
+
+class TrackPropagationJobOut(BaseSchema):
+    id: UUID
+    template_id: UUID
+    track_version_id: UUID
+    status: str
+    total: int
+    processed: int
+    error_summary: str | None = None
+    cancel_requested: bool
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    last_heartbeat_at: datetime | None = None
+    created_at: datetime
 
 
 class TrackCascadeDeletePreviewAssignment(BaseSchema):
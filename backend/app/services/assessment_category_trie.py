@@ -0,0 +1,224 @@
+"""In-memory trie of a tenant's assessment category hierarchy, keyed by slug path.
+
+Paths like ``School/History/8th Grade`` resolve segment by segment in memory;
+missing nodes for a whole set of paths are created with one multi-row INSERT
+per depth level instead of one SELECT (and possibly INSERT) per segment.
+
+Category rows are cached per tenant and revalidated with a single
+``count(*), max(updated_at)`` probe, so renames, deletes, merges and inserts
+made by any process invalidate the cached copy.
+"""
+from __future__ import annotations
+
+import threading
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.assessment import AssessmentCategory
+
+CategoryRow = tuple[uuid.UUID, str, str, uuid.UUID | None]  # id, name, slug, parent_id
+
+_NAME_MAX = 100
+
+_cache_lock = threading.Lock()
+_cache: dict[str, tuple[tuple[int, datetime | None], tuple[CategoryRow, ...]]] = {}
+
+
+@dataclass
+class CategoryNode:
+    id: uuid.UUID | None
+    name: str
+    slug: str
+    children: dict[str, CategoryNode] = field(default_factory=dict)
+
+
+class CategoryTrie:
+    def __init__(self, rows: Iterable[CategoryRow]) -> None:
+        self.root = CategoryNode(id=None, name='', slug='')
+        rows = list(rows)
+        self._by_id = {row_id: CategoryNode(id=row_id, name=name, slug=slug) for row_id, name, slug, _ in rows}
+        for row_id, _, slug, parent_id in rows:
+            parent = self.root if parent_id is None else self._by_id.get(parent_id)
+            if parent is not None:
+                parent.children.setdefault(slug, self._by_id[row_id])
+
+    @staticmethod
+    def split(path: str) -> list[tuple[str, str]]:
+        """``'A / B'`` → ``[(slug, name), ...]`` using the same slug rules as category CRUD."""
+        from app.services.assessment_service import _slugify  # local import to avoid circular refs
+
+        parts = [p.strip() for p in path.split('/') if p.strip()]
+        return [(_slugify(p), p[:_NAME_MAX]) for p in parts]
+
+    def _walk(self, parts: list[tuple[str, str]]) -> CategoryNode | None:
+        node = self.root
+        for slug, _ in parts:
+            node = node.children.get(slug)
+            if node is None:
+                return None
+        return node
+
+    def resolve(self, path: str) -> uuid.UUID | None:
+        parts = self.split(path)
+        node = self._walk(parts) if parts else None
+        return node.id if node else None
+
+    def paths(self) -> list[str]:
+        """Every node's full name path, e.g. ``["School", "School/History", ...]``."""
+        out: list[str] = []
+        stack = [(child, child.name) for child in self.root.children.values()]
+        while stack:
+            node, prefix = stack.pop()
+            out.append(prefix)
+            stack.extend((child, f'{prefix}/{child.name}') for child in node.children.values())
+        return sorted(set(out))
+
+    def ensure_paths(self, db: Session, paths: Iterable[str]) -> tuple[dict[str, uuid.UUID], int]:
+        """Resolve ``paths`` to leaf ids, creating missing nodes level by level.
+
+        Returns ``(path → leaf id, number of categories created)``. Empty paths are omitted.
+        """
+        wanted = {path: parts for path in set(paths) if (parts := self.split(path))}
+        created = 0
+        depth_limit = max((len(parts) for parts in wanted.values()), default=0)
+        for depth in range(depth_limit):
+            missing: dict[tuple[uuid.UUID | None, str], str] = {}
+            for parts in wanted.values():
+                if len(parts) <= depth:
+                    continue
+                parent = self._walk(parts[:depth])
+                slug, name = parts[depth]
+                if parent is not None and slug not in parent.children:
+                    missing.setdefault((parent.id, slug), name)
+            if missing:
+                created += self._insert_level(db, missing)
+        resolved: dict[str, uuid.UUID] = {}
+        for path, parts in wanted.items():
+            node = self._walk(parts) or self._select_path(db, parts)
+            if node is not None and node.id is not None:
+                resolved[path] = node.id
+        return resolved, created
+
+    def _select_path(self, db: Session, parts: list[tuple[str, str]]) -> CategoryNode | None:
+        """Slow path: look up the segments the trie is missing one at a time."""
+        from app.services.assessment_service import _tenant_id_expr  # local import to avoid circular refs
+
+        node = self.root
+        for slug, _ in parts:
+            child = node.children.get(slug)
+            if child is None:
+                parent_filter = (
+                    AssessmentCategory.parent_id.is_(None)
+                    if node.id is None
+                    else AssessmentCategory.parent_id == node.id
+                )
+                row = db.execute(
+                    select(
+                        AssessmentCategory.id,
+                        AssessmentCategory.name,
+                        AssessmentCategory.slug,
+                        AssessmentCategory.parent_id,
+                    ).where(
+                        AssessmentCategory.tenant_id == _tenant_id_expr(),
+                        AssessmentCategory.slug == slug,
+                        parent_filter,
+                    )
+                ).first()
+                if row is None:
+                    return None
+                self._attach(row.id, row.name, row.slug, row.parent_id)
+                child = node.children.get(slug)
+                if child is None:
+                    return None
+            node = child
+        return node
+
+    def _attach(self, row_id: uuid.UUID, name: str, slug: str, parent_id: uuid.UUID | None) -> None:
+        parent = self.root if parent_id is None else self._by_id.get(parent_id)
+        if parent is not None:
+            node = parent.children.setdefault(slug, CategoryNode(id=row_id, name=name, slug=slug))
+            self._by_id[node.id] = node
+
+    def _insert_level(self, db: Session, missing: dict[tuple[uuid.UUID | None, str], str]) -> int:
+        values = [
+            {'id': uuid.uuid4(), 'parent_id': parent_id, 'slug': slug, 'name': name}
+            for (parent_id, slug), name in missing.items()
+        ]
+        inserted = db.execute(
+            insert(AssessmentCategory)
+            .values(values)
+            .on_conflict_do_nothing()
+            .returning(
+                AssessmentCategory.id,
+                AssessmentCategory.name,
+                AssessmentCategory.slug,
+                AssessmentCategory.parent_id,
+            )
+        ).all()
+        for row in inserted:
+            self._attach(row.id, row.name, row.slug, row.parent_id)
+
+        # Rows skipped by ON CONFLICT were created concurrently; pick them up in one query.
+        inserted_keys = {(row.parent_id, row.slug) for row in inserted}
+        lost = [key for key in missing if key not in inserted_keys]
+        if lost:
+            from app.services.assessment_service import _tenant_id_expr  # local import to avoid circular refs
+
+            root_slugs = [slug for parent_id, slug in lost if parent_id is None]
+            child_pairs = [(parent_id, slug) for parent_id, slug in lost if parent_id is not None]
+            conditions = []
+            if root_slugs:
+                conditions.append(and_(AssessmentCategory.parent_id.is_(None), AssessmentCategory.slug.in_(root_slugs)))
+            if child_pairs:
+                conditions.append(tuple_(AssessmentCategory.parent_id, AssessmentCategory.slug).in_(child_pairs))
+            rows = db.execute(
+                select(
+                    AssessmentCategory.id,
+                    AssessmentCategory.name,
+                    AssessmentCategory.slug,
+                    AssessmentCategory.parent_id,
+                ).where(AssessmentCategory.tenant_id == _tenant_id_expr(), or_(*conditions))
+            ).all()
+            for row in rows:
+                self._attach(row.id, row.name, row.slug, row.parent_id)
+        return len(inserted)
+
+
+def load_category_trie(db: Session) -> CategoryTrie:
+    """Trie for the session's current tenant, served from the per-tenant cache when still valid."""
+    from app.services.assessment_service import _tenant_id_expr  # local import to avoid circular refs
+
+    tenant_key, count, last_updated = db.execute(
+        select(
+            func.current_setting('app.tenant_id'),
+            func.count(AssessmentCategory.id),
+            func.max(AssessmentCategory.updated_at),
+        ).where(AssessmentCategory.tenant_id == _tenant_id_expr())
+    ).one()
+    stamp = (int(count or 0), last_updated)
+
+    with _cache_lock:
+        cached = _cache.get(tenant_key)
+    if cached and cached[0] == stamp:
+        return CategoryTrie(cached[1])
+
+    rows = tuple(
+        (row.id, row.name, row.slug, row.parent_id)
+        for row in db.execute(
+            select(
+                AssessmentCategory.id,
+                AssessmentCategory.name,
+                AssessmentCategory.slug,
+                AssessmentCategory.parent_id,
+            ).where(AssessmentCategory.tenant_id == _tenant_id_expr())
+        )
+    )
+    with _cache_lock:
+        _cache[tenant_key] = (stamp, rows)
+    return CategoryTrie(rows)
@@ -1,28 +1,37 @@
 from __future__ import annotations
 
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from datetime import datetime, timezone
 from uuid import UUID as PyUUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import String, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal, set_tenant_id
 from app.models.assessment import (
-    AssessmentCategory,
     AssessmentClassificationJob,
     AssessmentClassificationJobItem,
     AssessmentQuestion,
 )
 from app.services.openai_responses_service import call_openai_responses_json
-from app.services import usage_service
-from app.services.assessment_service import build_question_query, find_or_create_category_path
+from app.services import job_signals, usage_service
+from app.services.assessment_category_trie import CategoryTrie, load_category_trie
+from app.services.assessment_service import build_question_query
 
 
+# While paused the worker blocks on the signal channel and refreshes its heartbeat at this interval
+# (well under the 2-minute stale-worker cutoff used by the start endpoint).
+PAUSE_HEARTBEAT_SECONDS = 20.0
+
 CLASSIFICATION_SCHEMA: dict[str, Any] = {
     "type": "object",
     "additionalProperties": False,
@@ -59,33 +68,6 @@ def _truncate(text: str, limit: int = 400) -> str:
     return cleaned[: limit - 3] + "..."
 
 
-def _build_category_paths(categories: list[AssessmentCategory]) -> list[str]:
-    """Build full slash-separated paths for every category in the tenant.
-
-    E.g. ["School", "School/History", "School/History/8th Grade", ...]
-
-    This gives the AI the complete picture of the existing hierarchy so it can
-    reuse the most specific matching path rather than inventing new names.
-    """
-    id_to_cat = {str(c.id): c for c in categories}
-
-    def _path(cat: AssessmentCategory) -> str:
-        parts: list[str] = []
-        current: AssessmentCategory | None = cat
-        visited: set[str] = set()
-        while current is not None:
-            cid = str(current.id)
-            if cid in visited:
-                break
-            visited.add(cid)
-            parts.append(current.name)
-            parent_id = str(current.parent_id) if current.parent_id else None
-            current = id_to_cat.get(parent_id) if parent_id else None  # type: ignore[arg-type]
-        return "/".join(reversed(parts))
-
-    return sorted({_path(c) for c in categories})
-
-
 def _build_prompt(questions: list[AssessmentQuestion], category_paths: list[str]) -> str:
     """Build the AI classification prompt.
 
@@ -132,6 +114,156 @@ def _build_prompt(questions: list[AssessmentQuestion], category_paths: list[str]
     return "\n".join(lines)
 
 
+def _classify_batch(prompt: str) -> dict[str, Any]:
+    return call_openai_responses_json(
+        instructions="Return JSON only. Keep category short and consistent.",
+        input_text=prompt,
+        schema_name="assessment_questions_classification",
+        schema=CLASSIFICATION_SCHEMA,
+        temperature=0.2,
+        timeout_ms=60_000,
+    )
+
+
+def _apply_batch_results(
+    db: Session,
+    *,
+    job_id: UUID,
+    tenant_id: UUID,
+    actor_user_id: UUID,
+    batch: list[AssessmentQuestion],
+    payload: dict[str, Any],
+    mode: str,
+    dry_run: bool,
+    category_trie: CategoryTrie,
+    report: dict[str, Any],
+) -> int:
+    """Write one batch's classifications with a single UPDATE ... FROM (VALUES ...) and one item upsert.
+
+    Returns the number of categories created for the batch.
+    """
+    results = {
+        str(item.get("id")): item
+        for item in (payload.get("questions") or [])
+        if isinstance(item, dict)
+    }
+
+    classified: list[tuple[AssessmentQuestion, str, str]] = []
+    for question in batch:
+        result = results.get(str(question.id))
+        if not result:
+            report["skipped"] += 1
+            continue
+        category_name = str(result.get("category") or "").strip()
+        difficulty = str(result.get("difficulty") or "").strip().lower()
+        if difficulty not in ("easy", "medium", "hard") or not category_name:
+            report["skipped"] += 1
+            continue
+        classified.append((question, category_name[:300], difficulty))
+    if not classified:
+        return 0
+
+    category_ids: dict[str, UUID] = {}
+    created_count = 0
+    if not dry_run:
+        category_ids, created_count = category_trie.ensure_paths(db, [name for _, name, _ in classified])
+        report["created_categories"] += created_count
+
+        # unclassified_only keeps whichever of category/difficulty is already set.
+        v = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("category_id", PG_UUID(as_uuid=True)),
+            column("difficulty", String),
+            name="v",
+        ).data([(question.id, category_ids.get(name), difficulty) for question, name, difficulty in classified])
+        if mode == "unclassified_only":
+            new_category = func.coalesce(AssessmentQuestion.category_id, v.c.category_id)
+            new_difficulty = func.coalesce(AssessmentQuestion.difficulty, v.c.difficulty)
+        else:
+            new_category = v.c.category_id
+            new_difficulty = v.c.difficulty
+        db.execute(
+            update(AssessmentQuestion)
+            .where(AssessmentQuestion.id == v.c.id, AssessmentQuestion.tenant_id == tenant_id)
+            .values(category_id=new_category, difficulty=new_difficulty, updated_by=actor_user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Record per-question diffs for review/rollback: full path as the name, leaf slug as the slug.
+    now = datetime.now(timezone.utc)
+    item_rows = [
+        {
+            "id": uuid4(),
+            "job_id": job_id,
+            "question_id": question.id,
+            "old_category_id": question.category_id,
+            "old_difficulty": question.difficulty,
+            "new_category_name": name[:100],
+            "new_category_slug": _slugify(name.split("/")[-1])[:120],
+            "new_category_id": category_ids.get(name),
+            "new_difficulty": difficulty,
+            "applied": not dry_run,
+            "applied_at": now if not dry_run else None,
+            "created_by": actor_user_id,
+            "updated_by": actor_user_id,
+        }
+        for question, name, difficulty in classified
+    ]
+    stmt = insert(AssessmentClassificationJobItem).values(item_rows)
+    item_table = AssessmentClassificationJobItem.__table__
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["job_id", "question_id"],
+            set_={
+                "new_category_name": stmt.excluded.new_category_name,
+                "new_category_slug": stmt.excluded.new_category_slug,
+                "new_category_id": stmt.excluded.new_category_id,
+                "new_difficulty": stmt.excluded.new_difficulty,
+                "applied": or_(item_table.c.applied, stmt.excluded.applied),
+                "applied_at": func.coalesce(stmt.excluded.applied_at, item_table.c.applied_at),
+                "updated_by": stmt.excluded.updated_by,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+    for _, name, difficulty in classified:
+        slug = _slugify(name.split("/")[-1])[:120]
+        report["updated"] += 1
+        report["category_counts"][slug] = report["category_counts"].get(slug, 0) + 1
+        report["difficulty_counts"][difficulty] = report["difficulty_counts"].get(difficulty, 0) + 1
+    return created_count
+
+
+def dispatch_classification_job(
+    *,
+    job_id: UUID,
+    tenant_id: UUID,
+    actor_user_id: UUID,
+    mode: str,
+    dry_run: bool,
+    batch_size: int,
+) -> None:
+    """Queue the job on the Celery worker; without Redis fall back to an in-process thread."""
+    from app.core.redis_client import redis_client
+
+    kwargs = {
+        "job_id": job_id,
+        "tenant_id": tenant_id,
+        "actor_user_id": actor_user_id,
+        "mode": mode,
+        "dry_run": bool(dry_run),
+        "batch_size": int(batch_size),
+    }
+    if redis_client is None:
+        threading.Thread(target=run_classification_job, kwargs=kwargs, daemon=True).start()
+        return
+
+    from app.tasks.assessments import run_classification
+
+    run_classification.delay(**{k: str(v) if isinstance(v, UUID) else v for k, v in kwargs.items()})
+
+
 def run_classification_job(
     *,
     job_id: UUID,
@@ -140,31 +272,61 @@ def run_classification_job(
     mode: str,
     dry_run: bool,
     batch_size: int,
+    concurrency: int | None = None,
 ) -> None:
+    """Classify the job's questions with up to ``concurrency`` LLM batches in flight.
+
+    The next keyset page is fetched and submitted while earlier calls are outstanding;
+    completed batches are applied strictly in page order. Cancel/pause arrive over
+    Redis pub/sub (job_signals); without Redis the job row flags are read once per batch.
+    """
     db = SessionLocal()
+    listener = job_signals.JobSignalListener(job_id)
+    workers = max(1, concurrency or settings.ASSESSMENT_CLASSIFY_CONCURRENCY)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="classify")
     try:
-        def _set_ctx() -> None:
-            # Tenant context is transaction-local (set_config(..., true)).
-            # After each commit() we must re-apply it, otherwise RLS hides rows and updates become no-ops.
-            set_tenant_id(db, str(tenant_id))
+        def _update_job(**fields: Any) -> None:
+            db.execute(
+                update(AssessmentClassificationJob)
+                .where(AssessmentClassificationJob.id == job_id)
+                .values(last_heartbeat_at=datetime.now(timezone.utc), updated_by=actor_user_id, **fields)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
 
-        _set_ctx()
-        job = db.scalar(select(AssessmentClassificationJob).where(AssessmentClassificationJob.id == job_id))
-        if not job:
+        # The tenant binding sticks to the session across commits (see db.session).
+        set_tenant_id(db, str(tenant_id))
+        # Claim the job atomically: a duplicate delivery, or a job canceled or expired
+        # before any worker picked it up, leaves nothing to claim and the worker exits.
+        now = datetime.now(timezone.utc)
+        claimed = db.execute(
+            update(AssessmentClassificationJob)
+            .where(
+                AssessmentClassificationJob.id == job_id,
+                AssessmentClassificationJob.status == "queued",
+                AssessmentClassificationJob.cancel_requested.is_(False),
+            )
+            .values(
+                status="running",
+                error_summary=None,
+                report_json={},
+                started_at=now,
+                completed_at=None,
+                last_heartbeat_at=now,
+                mode=mode,
+                dry_run=bool(dry_run),
+                batch_size=int(batch_size),
+                updated_by=actor_user_id,
+            )
+            .returning(AssessmentClassificationJob.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        if claimed is None:
             return
-
-        job.status = "running"
-        job.error_summary = None
-        job.report_json = {}
-        job.started_at = datetime.now(timezone.utc)
-        job.completed_at = None
-        job.last_heartbeat_at = datetime.now(timezone.utc)
-        job.cancel_requested = False
-        job.mode = mode
-        job.dry_run = bool(dry_run)
-        job.batch_size = int(batch_size)
-        job.updated_by = actor_user_id
-        db.flush()
+        job = db.scalar(select(AssessmentClassificationJob).where(AssessmentClassificationJob.id == job_id))
+        # Read after subscribing so a pause sent before the worker started is not lost.
+        paused = bool(job.pause_requested)
 
         scope = dict(job.scope_json or {})
         scope_kind = str(scope.get("scope") or "all_matching")
@@ -210,10 +372,10 @@ def run_classification_job(
         job.total = int(total or 0)
         job.processed = 0
         db.commit()
-        _set_ctx()
 
-        categories = db.scalars(select(AssessmentCategory).order_by(AssessmentCategory.name.asc())).all()
-        category_paths = _build_category_paths(list(categories))
+        # One trie per job: paths resolve in memory and missing nodes are created once per batch.
+        category_trie = load_category_trie(db)
+        category_paths = category_trie.paths()
 
         report: dict[str, Any] = {
             "updated": 0,
@@ -222,203 +384,131 @@ def run_classification_job(
             "category_counts": {},
             "difficulty_counts": {},
         }
-
+        processed = 0
+
+        def _read_signal() -> str | None:
+            if listener.available:
+                return listener.poll()
+            flags = db.execute(
+                select(AssessmentClassificationJob.cancel_requested, AssessmentClassificationJob.pause_requested)
+                .where(AssessmentClassificationJob.id == job_id)
+            ).one_or_none()
+            db.commit()
+            if flags is None or flags.cancel_requested:
+                return job_signals.CANCEL
+            if flags.pause_requested:
+                return job_signals.PAUSE
+            return job_signals.RESUME if paused else None
+
+        def _wait_while_paused() -> str:
+            _update_job(status="paused")
+            last_beat = time.monotonic()
+            while True:
+                if listener.available:
+                    signal = listener.wait(PAUSE_HEARTBEAT_SECONDS)
+                else:
+                    time.sleep(1.5)
+                    signal = _read_signal()
+                if signal == job_signals.CANCEL:
+                    return signal
+                if signal == job_signals.RESUME:
+                    _update_job(status="running")
+                    return signal
+                # Keep the heartbeat fresh so the job is not expired as a dead worker.
+                if time.monotonic() - last_beat >= PAUSE_HEARTBEAT_SECONDS:
+                    _update_job()
+                    last_beat = time.monotonic()
+
+        pending: deque[tuple[list[AssessmentQuestion], Future]] = deque()
         last_id: UUID | None = None
+        exhausted = False
         while True:
-            _set_ctx()
-            job = db.scalar(select(AssessmentClassificationJob).where(AssessmentClassificationJob.id == job_id))
-            if not job:
-                return
-            if job.cancel_requested:
-                job.status = "canceled"
-                job.completed_at = datetime.now(timezone.utc)
-                job.last_heartbeat_at = datetime.now(timezone.utc)
-                job.updated_by = actor_user_id
-                db.commit()
+            signal = _read_signal()
+            if signal == job_signals.CANCEL:
+                _update_job(status="canceled", completed_at=datetime.now(timezone.utc))
                 return
-            if job.pause_requested:
-                if job.status != "paused":
-                    job.status = "paused"
-                    job.last_heartbeat_at = datetime.now(timezone.utc)
-                    job.updated_by = actor_user_id
-                    db.commit()
-                # Sleep briefly and check again (keeps job alive across UI navigation).
-                time.sleep(1.5)
-                continue
-            if job.status == "paused":
-                job.status = "running"
-                job.last_heartbeat_at = datetime.now(timezone.utc)
-                job.updated_by = actor_user_id
-                db.commit()
-
-            query = base_query.order_by(AssessmentQuestion.id).limit(batch_size)
-            if last_id:
-                query = query.where(AssessmentQuestion.id > last_id)
-            batch = db.scalars(query).all()
-            if not batch:
-                break
-
-            last_id = batch[-1].id
-            prompt = _build_prompt(batch, category_paths)
-            try:
-                payload = call_openai_responses_json(
-                    instructions="Return JSON only. Keep category short and consistent.",
-                    input_text=prompt,
-                    schema_name="assessment_questions_classification",
-                    schema=CLASSIFICATION_SCHEMA,
-                    temperature=0.2,
-                    timeout_ms=60_000,
-                )
-            except Exception as batch_exc:  # noqa: BLE001
-                # Log and skip this batch rather than aborting the whole job
-                report.setdefault("batch_errors", []).append(str(batch_exc)[:200])
-                job.processed += len(batch)
-                job.report_json = report
-                job.last_heartbeat_at = datetime.now(timezone.utc)
-                job.updated_by = actor_user_id
-                db.commit()
-                _set_ctx()
-                continue
-
-            results = {
-                str(item.get("id")): item
-                for item in (payload.get("questions") or [])
-                if isinstance(item, dict)
-            }
-
-            for question in batch:
-                result = results.get(str(question.id))
-                if not result:
-                    report["skipped"] += 1
-                    continue
-
-                old_category_id = question.category_id
-                old_difficulty = question.difficulty
-
-                category_name = str(result.get("category") or "").strip()
-                difficulty = str(result.get("difficulty") or "").strip().lower()
-                if difficulty not in ("easy", "medium", "hard"):
-                    report["skipped"] += 1
-                    continue
-
-                if mode == "unclassified_only":
-                    needs_category = question.category_id is None
-                    needs_difficulty = question.difficulty is None
+            if signal == job_signals.PAUSE:
+                paused = True
+            elif signal == job_signals.RESUME:
+                paused = False
+
+            # Keep up to `workers` batches in flight; the next page is read while calls are outstanding.
+            while not paused and not exhausted and len(pending) < workers:
+                query = base_query.order_by(AssessmentQuestion.id).limit(batch_size)
+                if last_id:
+                    query = query.where(AssessmentQuestion.id > last_id)
+                batch = list(db.scalars(query).all())
+                if not batch:
+                    exhausted = True
+                    break
+                last_id = batch[-1].id
+                pending.append((batch, pool.submit(_classify_batch, _build_prompt(batch, category_paths))))
+
+            if pending:
+                batch, future = pending.popleft()
+                try:
+                    payload = future.result()
+                except Exception as batch_exc:  # noqa: BLE001
+                    # Log and skip this batch rather than aborting the whole job
+                    report.setdefault("batch_errors", []).append(str(batch_exc)[:200])
                 else:
-                    needs_category = True
-                    needs_difficulty = True
-
-                if not category_name:
-                    report["skipped"] += 1
-                    continue
-
-                clean_name = (category_name or "").strip()[:300] or "General"
-                slug = _slugify(clean_name.split("/")[-1])[:120]  # slug of the leaf segment
-                category = None
-                created = False
-                if not dry_run:
-                    # find_or_create_category_path handles 'A', 'A/B', 'A/B/C' — reuses
-                    # existing nodes at every level and only creates what is missing.
-                    prev_count = db.scalar(
-                        select(func.count()).select_from(
-                            select(AssessmentCategory.id).subquery()
-                        )
-                    ) or 0
-                    cat_id = find_or_create_category_path(db, clean_name)
-                    db.flush()
-                    category = db.scalar(select(AssessmentCategory).where(AssessmentCategory.id == cat_id))
-                    new_count = db.scalar(
-                        select(func.count()).select_from(
-                            select(AssessmentCategory.id).subquery()
-                        )
-                    ) or 0
-                    created = new_count > prev_count
-                    if created:
-                        report["created_categories"] += 1
-                        # Refresh paths so subsequent batches see the new hierarchy.
-                        all_cats = db.scalars(select(AssessmentCategory).order_by(AssessmentCategory.name.asc())).all()
-                        category_paths = _build_category_paths(list(all_cats))
-
-                if not dry_run:
-                    if needs_category:
-                        question.category_id = category.id if category else None
-                    if needs_difficulty:
-                        question.difficulty = difficulty
-                    question.updated_by = actor_user_id
-
-                # Record per-question diff for review/rollback.
-                item = db.scalar(
-                    select(AssessmentClassificationJobItem).where(
-                        AssessmentClassificationJobItem.job_id == job_id,
-                        AssessmentClassificationJobItem.question_id == question.id,
-                    )
-                )
-                # For the job log, record the full path as the name and the leaf slug.
-                if not item:
-                    item = AssessmentClassificationJobItem(
+                    created = _apply_batch_results(
+                        db,
                         job_id=job_id,
-                        question_id=question.id,
-                        old_category_id=old_category_id,
-                        old_difficulty=old_difficulty,
-                        new_category_name=clean_name,   # full path for readability
-                        new_category_slug=slug,          # leaf slug
-                        new_category_id=category.id if category else None,
-                        new_difficulty=difficulty,
-                        applied=not dry_run,
-                        applied_at=datetime.now(timezone.utc) if not dry_run else None,
-                        created_by=actor_user_id,
-                        updated_by=actor_user_id,
+                        tenant_id=tenant_id,
+                        actor_user_id=actor_user_id,
+                        batch=batch,
+                        payload=payload,
+                        mode=mode,
+                        dry_run=dry_run,
+                        category_trie=category_trie,
+                        report=report,
                     )
-                    db.add(item)
-                else:
-                    item.new_category_name = clean_name
-                    item.new_category_slug = slug
-                    item.new_category_id = category.id if category else None
-                    item.new_difficulty = difficulty
-                    if not dry_run:
-                        item.applied = True
-                        item.applied_at = datetime.now(timezone.utc)
-                    item.updated_by = actor_user_id
-
-                report["updated"] += 1
-                report["category_counts"][slug] = report["category_counts"].get(slug, 0) + 1
-                report["difficulty_counts"][difficulty] = report["difficulty_counts"].get(difficulty, 0) + 1
-
-            job.processed += len(batch)
-            job.report_json = report
-            job.last_heartbeat_at = datetime.now(timezone.utc)
-            job.updated_by = actor_user_id
-            db.commit()
+                    if created:
+                        # Batches submitted from now on see the new hierarchy.
+                        category_paths = category_trie.paths()
+                processed += len(batch)
+                _update_job(processed=processed, report_json=dict(report))
+                continue
+
+            if paused:
+                if _wait_while_paused() == job_signals.CANCEL:
+                    _update_job(status="canceled", completed_at=datetime.now(timezone.utc))
+                    return
+                paused = False
+                continue
+            break
 
-        _set_ctx()
-        job.status = "completed"
-        job.report_json = report
-        job.completed_at = datetime.now(timezone.utc)
-        job.last_heartbeat_at = datetime.now(timezone.utc)
-        job.updated_by = actor_user_id
         usage_service.record_event(
             db,
             tenant_id=tenant_id,
             event_key='ai.classify_questions',
-            quantity=float(job.processed),
+            quantity=float(processed),
             actor_user_id=actor_user_id,
             meta={'mode': mode, 'dry_run': dry_run},
         )
-        db.commit()
+        _update_job(status="completed", report_json=dict(report), completed_at=datetime.now(timezone.utc))
     except Exception as exc:
         try:
             db.rollback()  # reset any broken transaction before writing error status
-            _set_ctx()
-            job = db.scalar(select(AssessmentClassificationJob).where(AssessmentClassificationJob.id == job_id))
-            if job:
-                job.status = "failed"
-                job.error_summary = str(exc)[:500]
-                job.updated_by = actor_user_id
-                db.commit()
+            set_tenant_id(db, str(tenant_id))
+            # Only a job this worker is still running; never overwrite a cancel or an expiry.
+            db.execute(
+                update(AssessmentClassificationJob)
+                .where(
+                    AssessmentClassificationJob.id == job_id,
+                    AssessmentClassificationJob.status.in_(("running", "paused")),
+                )
+                .values(status="failed", error_summary=str(exc)[:500], updated_by=actor_user_id)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
         except Exception:  # noqa: BLE001
             pass  # best-effort — don't mask the original exception
         raise
     finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        listener.close()
         db.close()
 
 
@@ -431,11 +521,19 @@ def apply_job_items(db: Session, *, job_id: UUID, actor_user_id: UUID, tenant_id
     if not items:
         return 0
 
+    # Ensure every previewed category path exists (one INSERT per depth level for the whole job).
+    category_ids, _ = load_category_trie(db).ensure_paths(
+        db, [item.new_category_name for item in items if item.new_category_name]
+    )
+
     applied = 0
     for item in items:
-        # Ensure category exists (explicit tenant_id to avoid FK violations)
-        category, _ = _get_or_create_category(db, item.new_category_name, actor_user_id, tenant_id)
-        item.new_category_id = category.id
+        category_id = category_ids.get(item.new_category_name or "")
+        if category_id is None:
+            item.error_summary = "Category path is empty"
+            item.updated_by = actor_user_id
+            continue
+        item.new_category_id = category_id
         q = db.scalar(select(AssessmentQuestion).where(AssessmentQuestion.id == item.question_id))
         if not q:
             item.error_summary = "Question not found"
@@ -448,7 +546,7 @@ def apply_job_items(db: Session, *, job_id: UUID, actor_user_id: UUID, tenant_id
             item.updated_by = actor_user_id
             continue
 
-        q.category_id = category.id
+        q.category_id = category_id
         q.difficulty = item.new_difficulty
         q.updated_by = actor_user_id
         item.applied = True
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import base64
+import json
 import logging
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -11,8 +13,8 @@ from uuid import UUID
 logger = logging.getLogger("uvicorn.error")
 
 from fastapi import HTTPException, status
-from sqlalchemy import cast, delete as sql_delete, func, or_, select, text, update
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import and_, case, cast, delete as sql_delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, array as pg_array
 from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.config import settings
@@ -30,7 +32,7 @@ from app.models.assessment import (
 )
 from app.models.rbac import User
 from app.models.tenant import Tenant
-from app.services import email_service
+from app.services import email_service, item_analysis_service, question_dedup_service
 
 
 def build_question_query(
@@ -410,35 +412,21 @@ def find_or_create_category_path(db: Session, path: str) -> UUID:
     Each level is separated by '/'.  Each level is matched by slug AND parent_id so
     that identically-named categories at different depths are treated as separate nodes.
     Missing levels are created automatically.  Returns the leaf category's UUID.
+    Resolution goes through the tenant's cached category trie (see assessment_category_trie).
     """
-    parts = [p.strip() for p in path.split('/') if p.strip()]
-    if not parts:
+    from app.services.assessment_category_trie import load_category_trie  # local import to avoid circular refs
+
+    if not any(p.strip() for p in path.split('/')):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Empty category path')
 
-    parent_id: UUID | None = None
-    leaf_id: UUID | None = None
-    for part in parts:
-        slug = _slugify(part)
-        # Match slug AND parent_id so "8th Grade" under "History" is distinct from
-        # "8th Grade" directly under "School".
-        existing = db.scalar(
-            select(AssessmentCategory).where(
-                AssessmentCategory.tenant_id == _tenant_id_expr(),
-                AssessmentCategory.slug == slug,
-                AssessmentCategory.parent_id == parent_id,
-            )
+    resolved, _ = load_category_trie(db).ensure_paths(db, [path])
+    category_id = resolved.get(path)
+    if category_id is None:
+        # A segment was created and removed again by another transaction while we resolved it.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail='Category path changed concurrently; retry'
         )
-        if existing:
-            leaf_id = existing.id
-            parent_id = existing.id
-        else:
-            cat = AssessmentCategory(name=part, slug=slug, parent_id=parent_id)
-            db.add(cat)
-            db.flush()
-            leaf_id = cat.id
-            parent_id = cat.id
-
-    return leaf_id  # type: ignore[return-value]
+    return category_id
 
 
 def create_category(db: Session, name: str, slug: str, parent_id: UUID | None) -> AssessmentCategory:
@@ -640,11 +628,13 @@ def create_question(db: Session, *, payload: dict, actor_user_id: UUID) -> Asses
         )
 
     db.flush()
+    question_dedup_service.index_questions(db, [(question.id, question.prompt)])
     return get_question(db, question.id)
 
 
 def update_question(db: Session, *, question_id: UUID, payload: dict, actor_user_id: UUID) -> AssessmentQuestion:
     question = get_question(db, question_id)
+    prompt_changed = payload.get('prompt') is not None and payload['prompt'] != question.prompt
     for field in ['prompt', 'question_type', 'difficulty', 'tags', 'status', 'explanation']:
         if field in payload and payload[field] is not None:
             setattr(question, field, payload[field])
@@ -673,6 +663,8 @@ def update_question(db: Session, *, question_id: UUID, payload: dict, actor_user
             )
 
     db.flush()
+    if prompt_changed:
+        question_dedup_service.index_questions(db, [(question.id, question.prompt)])
     return get_question(db, question.id)
 
 
@@ -753,6 +745,7 @@ def create_test_version(db: Session, *, test_id: UUID, actor_user_id: UUID) -> A
         time_limit_minutes=latest.time_limit_minutes if latest else None,
         shuffle_questions=latest.shuffle_questions if latest else False,
         attempts_allowed=latest.attempts_allowed if latest else None,
+        question_count=len(latest.questions) if latest else 0,
         created_by=actor_user_id,
         updated_by=actor_user_id,
     )
@@ -986,6 +979,7 @@ def update_test_version(
                     updated_by=actor_user_id,
                 )
             )
+        version.question_count = len(version.questions)
         db.flush()
 
     return get_test_version(db, version.id) if load_questions else version
@@ -1005,6 +999,7 @@ def publish_test_version(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='Cannot publish a version with no questions')
     version.status = 'published'
     version.published_at = datetime.now(UTC)
+    version.question_count = len(version.questions)
     version.updated_by = actor_user_id
     test = db.scalar(select(AssessmentTest).where(AssessmentTest.id == version.test_id))
     if test:
@@ -1285,6 +1280,7 @@ def submit_attempt(
 
     # Per-section accumulators: {section_name: {earned, total, correct, total_questions}}
     section_acc: dict[str, dict[str, float]] = {}
+    item_responses: list[item_analysis_service.ItemResponse] = []
 
     for idx, item in enumerate(ordered_questions):
         total_points += item.points
@@ -1299,6 +1295,9 @@ def submit_attempt(
         if is_correct:
             earned_points += item.points
             correct_count += 1
+        item_responses.append(
+            item_analysis_service.ItemResponse(item.id, is_correct, answer.selected_option_keys if answer else [])
+        )
 
         section = item.section or 'General'
         if section not in section_acc:
@@ -1346,10 +1345,15 @@ def submit_attempt(
     _membership = None
     if _tenant_id:
         _membership = star_service.award_stars(
-            db, user_id=attempt.user_id, tenant_id=_tenant_id, stars=stars
+            db,
+            user_id=attempt.user_id,
+            tenant_id=_tenant_id,
+            stars=stars,
+            at=attempt.submitted_at,
         )
 
     db.flush()
+    item_analysis_service.record_attempt(db, test_version_id=version.id, responses=item_responses)
 
     # ── Check achievements ────────────────────────────────────────────────────
     new_achievements: list = []
@@ -1361,6 +1365,7 @@ def submit_attempt(
             attempt=attempt,
             total_stars=_membership.total_stars,
             tests_completed=_membership.tests_completed,
+            test_id=version.test_id,
         )
 
     db.flush()
@@ -1410,6 +1415,161 @@ def list_attempts(
     return db.scalars(base.order_by(AssessmentAttempt.submitted_at.desc().nulls_last())).all()
 
 
+RESULT_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+_RESULT_COLUMNS = (
+    AssessmentAttempt.id,
+    AssessmentAttempt.delivery_id,
+    AssessmentAttempt.user_id,
+    AssessmentAttempt.attempt_number,
+    AssessmentAttempt.status,
+    AssessmentAttempt.started_at,
+    AssessmentAttempt.submitted_at,
+    AssessmentAttempt.expires_at,
+    AssessmentAttempt.score,
+    AssessmentAttempt.max_score,
+    AssessmentAttempt.score_percent,
+    AssessmentAttempt.passed,
+    AssessmentAttempt.stars_earned,
+    AssessmentAttempt.section_scores,
+    AssessmentAttempt.created_at,
+    AssessmentAttempt.updated_at,
+    User.full_name.label('user_name'),
+    User.email.label('user_email'),
+    AssessmentTest.title.label('test_title'),
+)
+
+
+def _results_base(stmt, *, delivery_id: UUID | None, user_id: UUID | None, test_id: UUID | None):
+    stmt = stmt.join(AssessmentDelivery, AssessmentAttempt.delivery_id == AssessmentDelivery.id)
+    if delivery_id:
+        stmt = stmt.where(AssessmentAttempt.delivery_id == delivery_id)
+    if user_id:
+        stmt = stmt.where(AssessmentAttempt.user_id == user_id)
+    if test_id:
+        stmt = stmt.join(
+            AssessmentTestVersion, AssessmentDelivery.test_version_id == AssessmentTestVersion.id
+        ).where(AssessmentTestVersion.test_id == test_id)
+    return stmt
+
+
+def _results_rows_query(*, delivery_id: UUID | None, user_id: UUID | None, test_id: UUID | None):
+    stmt = _results_base(
+        select(*_RESULT_COLUMNS).select_from(AssessmentAttempt),
+        delivery_id=delivery_id,
+        user_id=user_id,
+        test_id=test_id,
+    )
+    if not test_id:
+        stmt = stmt.outerjoin(
+            AssessmentTestVersion, AssessmentDelivery.test_version_id == AssessmentTestVersion.id
+        )
+    return (
+        stmt.outerjoin(AssessmentTest, AssessmentTestVersion.test_id == AssessmentTest.id)
+        .outerjoin(User, User.id == AssessmentAttempt.user_id)
+        .order_by(AssessmentAttempt.submitted_at.desc().nulls_last(), AssessmentAttempt.id.desc())
+    )
+
+
+def encode_results_cursor(submitted_at: datetime | None, attempt_id: UUID) -> str:
+    raw = json.dumps([submitted_at.isoformat() if submitted_at else None, str(attempt_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_results_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        submitted_raw, attempt_raw = json.loads(raw)
+        submitted_at = datetime.fromisoformat(submitted_raw) if submitted_raw else None
+        return submitted_at, UUID(attempt_raw)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor') from exc
+
+
+def list_results_page(
+    db: Session,
+    *,
+    delivery_id: UUID | None,
+    user_id: UUID | None,
+    test_id: UUID | None,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[Any], str | None]:
+    """One keyset page of result rows (attempt columns + user name/email + test title).
+
+    Ordered by ``submitted_at DESC NULLS LAST, id DESC``; returns ``(rows, next_cursor)``.
+    """
+    stmt = _results_rows_query(delivery_id=delivery_id, user_id=user_id, test_id=test_id)
+    if cursor:
+        after_submitted, after_id = _decode_results_cursor(cursor)
+        if after_submitted is None:
+            stmt = stmt.where(AssessmentAttempt.submitted_at.is_(None), AssessmentAttempt.id < after_id)
+        else:
+            stmt = stmt.where(
+                or_(
+                    AssessmentAttempt.submitted_at < after_submitted,
+                    and_(AssessmentAttempt.submitted_at == after_submitted, AssessmentAttempt.id < after_id),
+                    AssessmentAttempt.submitted_at.is_(None),
+                )
+            )
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_results_cursor(rows[-1].submitted_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def iter_results(
+    db: Session,
+    *,
+    delivery_id: UUID | None,
+    user_id: UUID | None,
+    test_id: UUID | None,
+    batch_size: int = 1000,
+):
+    """Stream every matching result row with a server-side cursor (for exports)."""
+    stmt = _results_rows_query(delivery_id=delivery_id, user_id=user_id, test_id=test_id)
+    yield from db.execute(stmt.execution_options(yield_per=batch_size))
+
+
+def results_summary(
+    db: Session,
+    *,
+    delivery_id: UUID | None,
+    user_id: UUID | None,
+    test_id: UUID | None,
+) -> dict[str, Any]:
+    """Count, average, pass rate and score percentiles over all matching attempts, in one query."""
+    scored = AssessmentAttempt.status == 'scored'
+    stmt = _results_base(
+        select(
+            func.count().label('attempt_count'),
+            func.count().filter(scored).label('scored_count'),
+            func.avg(AssessmentAttempt.score_percent).label('average_score_percent'),
+            func.avg(case((AssessmentAttempt.passed, 1.0), else_=0.0)).filter(scored).label('pass_rate'),
+            func.percentile_cont(pg_array(list(RESULT_PERCENTILES)))
+            .within_group(AssessmentAttempt.score_percent)
+            .label('percentiles'),
+        ).select_from(AssessmentAttempt),
+        delivery_id=delivery_id,
+        user_id=user_id,
+        test_id=test_id,
+    )
+    row = db.execute(stmt).one()
+    percentiles = list(row.percentiles or [None] * len(RESULT_PERCENTILES))
+    return {
+        'attempt_count': int(row.attempt_count or 0),
+        'scored_count': int(row.scored_count or 0),
+        'average_score_percent': float(row.average_score_percent) if row.average_score_percent is not None else None,
+        'pass_rate': float(row.pass_rate) if row.pass_rate is not None else None,
+        'score_percentiles': {
+            f'p{int(q * 100)}': (float(v) if v is not None else None)
+            for q, v in zip(RESULT_PERCENTILES, percentiles, strict=False)
+        },
+    }
+
+
 def get_attempt_review(
     db: Session,
     *,
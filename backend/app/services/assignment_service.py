@@ -1,21 +1,51 @@
+from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import (
+    Boolean,
+    Float,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    and_,
+    case,
+    cast,
+    column,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql.expression import ColumnClause, Values
 
 from app.models.assignment import AssignmentPhase, AssignmentTask, OnboardingAssignment, QuizAttempt
 from app.models.assessment import AssessmentDelivery
 from app.services import assessment_service
 from app.schemas.assignment import AssignmentOut
-from app.models.track import TrackPhase, TrackTask, TrackVersion
+from app.models.track import TrackSnapshot, TrackVersion
+from app.utils.json_stream import sha256_json
 
 
 COMPLETED_TASK_STATUSES = {'completed'}
 IN_PROGRESS_TASK_STATUSES = {'in_progress', 'pending_review', 'revision_requested'}
 PRESERVE_TASK_STATUSES = {'completed', 'pending_review', 'revision_requested'}
+NEXT_TASK_STATUSES = {'not_started', 'in_progress', 'revision_requested', 'overdue'}
 ARCHIVE_METADATA_KEY = 'archived_from_republish'
+PROPAGATION_CHUNK_SIZE = 500
 
 
 def _serialize_snapshot(track_version: TrackVersion) -> dict:
@@ -65,6 +95,18 @@ def _serialize_snapshot(track_version: TrackVersion) -> dict:
     }
 
 
+def store_track_snapshot(db: Session, track_version: TrackVersion) -> str:
+    """Store the version's serialized snapshot once per content hash and return the hash."""
+    snapshot = _serialize_snapshot(track_version)
+    content_hash = sha256_json(snapshot)
+    db.execute(
+        pg_insert(TrackSnapshot)
+        .values(content_hash=content_hash, track_version_id=track_version.id, snapshot=snapshot)
+        .on_conflict_do_nothing()
+    )
+    return content_hash
+
+
 def extract_task_resources(snapshot_json: dict | None) -> dict[str, list[dict]]:
     if not isinstance(snapshot_json, dict):
         return {}
@@ -104,7 +146,7 @@ def create_assignment_from_track(
     start_date: date,
     target_date: date,
 ) -> tuple[OnboardingAssignment, list[AssessmentDelivery]]:
-    snapshot = _serialize_snapshot(track_version)
+    snapshot_hash = store_track_snapshot(db, track_version)
 
     assignment = OnboardingAssignment(
         employee_id=employee_id,
@@ -116,7 +158,7 @@ def create_assignment_from_track(
         target_date=target_date,
         status='not_started',
         progress_percent=0.0,
-        snapshot_json=snapshot,
+        snapshot_hash=snapshot_hash,
         created_by=actor_user_id,
         updated_by=actor_user_id,
     )
@@ -380,143 +422,376 @@ def mask_quiz_answers_for_employee(db: Session, assignment_out: AssignmentOut) -
     return assignment_out
 
 
-def apply_track_version_to_assignments(
+@dataclass(frozen=True)
+class TrackVersionPlan:
+    """Everything set-based propagation needs from a track version, built once per republish."""
+
+    version_id: UUID
+    title: str
+    snapshot_hash: str
+    phase_rows: tuple[tuple, ...]
+    task_rows: tuple[tuple, ...]
+
+    @property
+    def task_ids(self) -> list[UUID]:
+        return [row[1] for row in self.task_rows]
+
+    def phase_values(self) -> Values:
+        return _typed_values(
+            'new_phases',
+            self.phase_rows,
+            column('old_id', PG_UUID(as_uuid=True)),
+            column('new_id', PG_UUID(as_uuid=True)),
+            column('title', String),
+            column('description', Text),
+            column('order_index', Integer),
+        )
+
+    def task_values(self) -> Values:
+        return _typed_values(
+            'new_tasks',
+            self.task_rows,
+            column('old_id', PG_UUID(as_uuid=True)),
+            column('new_id', PG_UUID(as_uuid=True)),
+            column('phase_id', PG_UUID(as_uuid=True)),
+            column('title', String),
+            column('description', Text),
+            column('instructions', Text),
+            column('task_type', String),
+            column('required', Boolean),
+            column('order_index', Integer),
+            column('estimated_minutes', Integer),
+            column('passing_score', Integer),
+            column('metadata', JSONB),
+            column('due_days_offset', Integer),
+        )
+
+
+def _typed_values(name: str, rows: tuple[tuple, ...], *columns: ColumnClause) -> Values:
+    # A bare NULL in VALUES is typed as text, which then fails to compare with uuid / integer columns.
+    return values(*columns, name=name).data(
+        [
+            tuple(cast(null(), col.type) if value is None else value for col, value in zip(columns, row, strict=True))
+            for row in rows
+        ]
+    )
+
+
+def plan_track_version(db: Session, new_version: TrackVersion) -> TrackVersionPlan:
+    phases = sorted(new_version.phases, key=lambda row: row.order_index)
+    return TrackVersionPlan(
+        version_id=new_version.id,
+        title=new_version.title,
+        snapshot_hash=store_track_snapshot(db, new_version),
+        phase_rows=tuple(
+            (phase.source_phase_id, phase.id, phase.title, phase.description, phase.order_index) for phase in phases
+        ),
+        task_rows=tuple(
+            (
+                task.source_task_id,
+                task.id,
+                phase.id,
+                task.title,
+                task.description,
+                task.instructions,
+                task.task_type,
+                task.required,
+                task.order_index,
+                task.estimated_minutes,
+                task.passing_score,
+                task.metadata_json or {},
+                task.due_days_offset,
+            )
+            for phase in phases
+            for task in sorted(phase.tasks, key=lambda row: row.order_index)
+        ),
+    )
+
+
+def apply_track_version_chunk(
     db: Session,
     *,
-    template_id: UUID,
-    new_version: TrackVersion,
+    plan: TrackVersionPlan,
+    assignment_ids: list[UUID],
     actor_user_id: UUID,
 ) -> None:
-    assignments = db.scalars(
-        select(OnboardingAssignment)
-        .where(OnboardingAssignment.template_id == template_id)
-        .options(
-            joinedload(OnboardingAssignment.phases).joinedload(AssignmentPhase.tasks),
-            joinedload(OnboardingAssignment.tasks),
-        )
-    ).unique().all()
+    """Move one chunk of assignments onto the planned version with a fixed number of statements.
 
-    new_phases = sorted(new_version.phases, key=lambda row: row.order_index)
-    new_phase_by_source = {phase.source_phase_id: phase for phase in new_phases if phase.source_phase_id}
+    Phases and tasks are matched on the previous version's ids (``source_*_id``) or on the new
+    ones, so re-applying a version to an already migrated assignment changes nothing.
+    """
+    if not assignment_ids:
+        return
+    OA, AP, AT = OnboardingAssignment, AssignmentPhase, AssignmentTask
+    actor = literal(actor_user_id, PG_UUID(as_uuid=True))
+    sync = {'synchronize_session': False}
+
+    db.execute(
+        update(OA)
+        .where(OA.id.in_(assignment_ids))
+        .values(
+            track_version_id=plan.version_id,
+            snapshot_hash=plan.snapshot_hash,
+            title=plan.title,
+            updated_by=actor_user_id,
+        ),
+        execution_options=sync,
+    )
 
-    new_task_by_source: dict[UUID, TrackTask] = {}
-    for phase in new_phases:
-        for task in sorted(phase.tasks, key=lambda row: row.order_index):
-            if task.source_task_id:
-                new_task_by_source[task.source_task_id] = task
-
-    for assignment in assignments:
-        assignment.track_version_id = new_version.id
-        assignment.snapshot_json = _serialize_snapshot(new_version)
-        assignment.title = new_version.title
-        assignment.updated_by = actor_user_id
-
-        assignment_phase_by_source = {
-            phase.source_phase_id: phase for phase in assignment.phases if phase.source_phase_id
-        }
-        phase_map: dict[UUID, AssignmentPhase] = {}
-
-        for phase in new_phases:
-            if phase.source_phase_id and phase.source_phase_id in assignment_phase_by_source:
-                assignment_phase = assignment_phase_by_source[phase.source_phase_id]
-                assignment_phase.title = phase.title
-                assignment_phase.description = phase.description
-                assignment_phase.order_index = phase.order_index
-                assignment_phase.source_phase_id = phase.id
-                assignment_phase.updated_by = actor_user_id
-                phase_map[phase.id] = assignment_phase
-            else:
-                new_assignment_phase = AssignmentPhase(
-                    assignment_id=assignment.id,
-                    source_phase_id=phase.id,
-                    title=phase.title,
-                    description=phase.description,
-                    order_index=phase.order_index,
-                    status='not_started',
-                    progress_percent=0.0,
-                    created_by=actor_user_id,
-                    updated_by=actor_user_id,
+    if plan.phase_rows:
+        v = plan.phase_values()
+        db.execute(
+            update(AP)
+            .where(
+                AP.assignment_id.in_(assignment_ids),
+                or_(AP.source_phase_id == v.c.old_id, AP.source_phase_id == v.c.new_id),
+            )
+            .values(
+                title=v.c.title,
+                description=v.c.description,
+                order_index=v.c.order_index,
+                source_phase_id=v.c.new_id,
+                updated_by=actor_user_id,
+            ),
+            execution_options=sync,
+        )
+        db.execute(
+            insert(AP).from_select(
+                [
+                    'id', 'tenant_id', 'assignment_id', 'source_phase_id', 'title', 'description',
+                    'order_index', 'status', 'progress_percent', 'created_by', 'updated_by',
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    OA.tenant_id,
+                    OA.id,
+                    v.c.new_id,
+                    v.c.title,
+                    v.c.description,
+                    v.c.order_index,
+                    literal('not_started'),
+                    literal(0.0),
+                    actor,
+                    actor,
                 )
-                db.add(new_assignment_phase)
-                db.flush()
-                phase_map[phase.id] = new_assignment_phase
+                .select_from(OA)
+                .join(v, true())
+                .where(
+                    OA.id.in_(assignment_ids),
+                    ~exists().where(AP.assignment_id == OA.id, AP.source_phase_id == v.c.new_id),
+                ),
+            )
+        )
 
-        matched_assignment_task_ids: set[UUID] = set()
+    if plan.task_rows:
+        v = plan.task_values()
+        preserved = AT.status.in_(PRESERVE_TASK_STATUSES)
+        checklist = AT.metadata_json['checklist_state']
+        kept_checklist = case(
+            (func.jsonb_typeof(checklist) == 'object', func.jsonb_build_object('checklist_state', checklist)),
+            else_=literal({}, JSONB),
+        )
 
-        for phase in new_phases:
-            assignment_phase = phase_map.get(phase.id)
-            if not assignment_phase:
-                continue
+        def refreshed(current, incoming):
+            return case((preserved, current), else_=incoming)
 
-            for task in sorted(phase.tasks, key=lambda row: row.order_index):
-                if task.source_task_id and task.source_task_id in new_task_by_source:
-                    assignment_task = next(
-                        (item for item in assignment.tasks if item.source_task_id == task.source_task_id), None
-                    )
-                    if assignment_task:
-                        matched_assignment_task_ids.add(assignment_task.id)
-                        assignment_task.assignment_phase_id = assignment_phase.id
-                        assignment_task.order_index = task.order_index
-                        assignment_task.source_task_id = task.id
-                        assignment_task.updated_by = actor_user_id
-
-                        if assignment_task.status not in PRESERVE_TASK_STATUSES:
-                            assignment_task.title = task.title
-                            assignment_task.description = task.description
-                            assignment_task.instructions = task.instructions
-                            assignment_task.task_type = task.task_type
-                            assignment_task.required = task.required
-                            assignment_task.estimated_minutes = task.estimated_minutes
-                            assignment_task.passing_score = task.passing_score
-                            existing_metadata = dict(assignment_task.metadata_json or {})
-                            existing_checklist_state = existing_metadata.get('checklist_state')
-                            next_metadata = dict(task.metadata_json or {})
-                            if isinstance(existing_checklist_state, dict):
-                                next_metadata['checklist_state'] = existing_checklist_state
-                            assignment_task.metadata_json = next_metadata
-                            if task.due_days_offset is not None:
-                                assignment_task.due_date = assignment.start_date + timedelta(days=task.due_days_offset)
-                        continue
-
-                new_assignment_task = AssignmentTask(
-                    assignment_id=assignment.id,
-                    assignment_phase_id=assignment_phase.id,
-                    source_task_id=task.id,
-                    title=task.title,
-                    description=task.description,
-                    instructions=task.instructions,
-                    task_type=task.task_type,
-                    required=task.required,
-                    order_index=task.order_index,
-                    estimated_minutes=task.estimated_minutes,
-                    passing_score=task.passing_score,
-                    metadata_json=task.metadata_json,
-                    due_date=assignment.start_date + timedelta(days=task.due_days_offset)
-                    if task.due_days_offset is not None
-                    else None,
-                    status='not_started',
-                    progress_percent=0.0,
-                    is_next_recommended=False,
-                    created_by=actor_user_id,
-                    updated_by=actor_user_id,
+        db.execute(
+            update(AT)
+            .where(
+                AT.assignment_id.in_(assignment_ids),
+                or_(AT.source_task_id == v.c.old_id, AT.source_task_id == v.c.new_id),
+                AP.assignment_id == AT.assignment_id,
+                AP.source_phase_id == v.c.phase_id,
+                OA.id == AT.assignment_id,
+            )
+            .values(
+                assignment_phase_id=AP.id,
+                order_index=v.c.order_index,
+                source_task_id=v.c.new_id,
+                updated_by=actor_user_id,
+                title=refreshed(AT.title, v.c.title),
+                description=refreshed(AT.description, v.c.description),
+                instructions=refreshed(AT.instructions, v.c.instructions),
+                task_type=refreshed(AT.task_type, v.c.task_type),
+                required=refreshed(AT.required, v.c.required),
+                estimated_minutes=refreshed(AT.estimated_minutes, v.c.estimated_minutes),
+                passing_score=refreshed(AT.passing_score, v.c.passing_score),
+                metadata_json=refreshed(AT.metadata_json, v.c.metadata.op('||', return_type=JSONB)(kept_checklist)),
+                due_date=case(
+                    (and_(~preserved, v.c.due_days_offset.is_not(None)), OA.start_date + v.c.due_days_offset),
+                    else_=AT.due_date,
+                ),
+            ),
+            execution_options=sync,
+        )
+        db.execute(
+            insert(AT).from_select(
+                [
+                    'id', 'tenant_id', 'assignment_id', 'assignment_phase_id', 'source_task_id', 'title',
+                    'description', 'instructions', 'task_type', 'required', 'order_index', 'estimated_minutes',
+                    'passing_score', 'metadata', 'due_date', 'status', 'progress_percent',
+                    'is_next_recommended', 'created_by', 'updated_by',
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    OA.tenant_id,
+                    OA.id,
+                    AP.id,
+                    v.c.new_id,
+                    v.c.title,
+                    v.c.description,
+                    v.c.instructions,
+                    v.c.task_type,
+                    v.c.required,
+                    v.c.order_index,
+                    v.c.estimated_minutes,
+                    v.c.passing_score,
+                    v.c.metadata,
+                    case((v.c.due_days_offset.is_not(None), OA.start_date + v.c.due_days_offset)),
+                    literal('not_started'),
+                    literal(0.0),
+                    false(),
+                    actor,
+                    actor,
                 )
-                db.add(new_assignment_task)
-                db.flush()
-                matched_assignment_task_ids.add(new_assignment_task.id)
+                .select_from(OA)
+                .join(v, true())
+                .join(AP, and_(AP.assignment_id == OA.id, AP.source_phase_id == v.c.phase_id))
+                .where(
+                    OA.id.in_(assignment_ids),
+                    ~exists().where(AT.assignment_id == OA.id, AT.source_task_id == v.c.new_id),
+                ),
+            )
+        )
 
-        for task in assignment.tasks:
-            if task.id in matched_assignment_task_ids:
-                continue
-            if task.status in PRESERVE_TASK_STATUSES:
-                continue
-            task.metadata_json = {**task.metadata_json, ARCHIVE_METADATA_KEY: True}
-            task.updated_by = actor_user_id
+    db.execute(
+        update(AT)
+        .where(
+            AT.assignment_id.in_(assignment_ids),
+            AT.status.not_in(PRESERVE_TASK_STATUSES),
+            or_(AT.source_task_id.is_(None), AT.source_task_id.not_in(plan.task_ids)),
+            AT.metadata_json[ARCHIVE_METADATA_KEY].is_(None),
+        )
+        .values(
+            metadata_json=AT.metadata_json.op('||', return_type=JSONB)(
+                literal({ARCHIVE_METADATA_KEY: True}, JSONB)
+            ),
+            updated_by=actor_user_id,
+        ),
+        execution_options=sync,
+    )
 
-        refresh_overdue_and_status(db, assignment)
-        recompute_progress(db, assignment)
-        refresh_next_task(db, assignment)
+    refresh_assignment_states(db, assignment_ids)
 
-    db.flush()
+
+def refresh_assignment_states(db: Session, assignment_ids: list[UUID]) -> None:
+    """Set-based ``refresh_overdue_and_status`` + ``recompute_progress`` + ``refresh_next_task``."""
+    if not assignment_ids:
+        return
+    OA, AP, AT = OnboardingAssignment, AssignmentPhase, AssignmentTask
+    sync = {'synchronize_session': False}
+
+    db.execute(
+        update(AT)
+        .where(
+            AT.assignment_id.in_(assignment_ids),
+            AT.due_date < date.today(),
+            AT.status.not_in(COMPLETED_TASK_STATUSES | {'overdue'}),
+        )
+        .values(status='overdue'),
+        execution_options=sync,
+    )
+
+    required = AT.required.is_(True)
+    started = AT.status.in_(IN_PROGRESS_TASK_STATUSES | COMPLETED_TASK_STATUSES)
+    clamped = func.greatest(0.0, func.least(100.0, func.coalesce(AT.progress_percent, 0.0)))
+
+    def rounded(expr):
+        return cast(func.round(cast(expr, Numeric), 2), Float)
+
+    totals = (
+        select(
+            OA.id.label('assignment_id'),
+            func.count(AT.id).filter(required).label('required_count'),
+            func.count(AT.id).filter(and_(required, AT.status.in_(COMPLETED_TASK_STATUSES))).label('required_done'),
+            func.coalesce(func.bool_or(AT.status == 'overdue'), False).label('any_overdue'),
+            func.coalesce(func.bool_or(started), False).label('any_started'),
+            rounded(func.avg(clamped).filter(required)).label('required_avg'),
+        )
+        .select_from(OA)
+        .outerjoin(AT, AT.assignment_id == OA.id)
+        .where(OA.id.in_(assignment_ids))
+        .group_by(OA.id)
+        .subquery()
+    )
+    db.execute(
+        update(OA)
+        .where(OA.id == totals.c.assignment_id)
+        .values(
+            status=case(
+                (
+                    and_(totals.c.required_count > 0, totals.c.required_done == totals.c.required_count),
+                    'completed',
+                ),
+                (totals.c.any_overdue, 'overdue'),
+                (totals.c.any_started, 'in_progress'),
+                else_='not_started',
+            ),
+            progress_percent=case((totals.c.required_count == 0, 100.0), else_=totals.c.required_avg),
+        ),
+        execution_options=sync,
+    )
+
+    phase_totals = (
+        select(
+            AP.id.label('phase_id'),
+            func.count(AT.id).label('task_count'),
+            func.count(AT.id).filter(required).label('required_count'),
+            func.coalesce(func.bool_or(started), False).label('any_started'),
+            rounded(func.avg(clamped).filter(required)).label('required_avg'),
+        )
+        .select_from(AP)
+        .outerjoin(AT, AT.assignment_phase_id == AP.id)
+        .where(AP.assignment_id.in_(assignment_ids))
+        .group_by(AP.id)
+        .subquery()
+    )
+    phase_progress = case(
+        (phase_totals.c.task_count == 0, 0.0),
+        (phase_totals.c.required_count == 0, 100.0),
+        else_=phase_totals.c.required_avg,
+    )
+    db.execute(
+        update(AP)
+        .where(AP.id == phase_totals.c.phase_id)
+        .values(
+            progress_percent=phase_progress,
+            status=case(
+                (phase_totals.c.task_count == 0, 'not_started'),
+                (phase_progress >= 100, 'completed'),
+                (phase_totals.c.any_started, 'in_progress'),
+                else_='not_started',
+            ),
+        ),
+        execution_options=sync,
+    )
+
+    # Same order as ``refresh_next_task``: its stable sort keeps the ``tasks`` relationship
+    # order (order_index, id) between tasks with equal sort keys.
+    next_task_ids = (
+        select(AT.id)
+        .outerjoin(AP, AP.id == AT.assignment_phase_id)
+        .where(AT.assignment_id.in_(assignment_ids), AT.status.in_(NEXT_TASK_STATUSES))
+        .distinct(AT.assignment_id)
+        .order_by(AT.assignment_id, func.coalesce(AP.order_index, 0), AT.order_index, AT.id)
+    )
+    is_next = AT.id.in_(next_task_ids)
+    db.execute(
+        update(AT)
+        .where(AT.assignment_id.in_(assignment_ids), AT.is_next_recommended != is_next)
+        .values(is_next_recommended=is_next),
+        execution_options=sync,
+    )
 
 
 def refresh_overdue_and_status(db: Session, assignment: OnboardingAssignment) -> None:
@@ -588,7 +863,7 @@ def refresh_next_task(db: Session, assignment: OnboardingAssignment) -> Assignme
         (
             task
             for task in ordered
-            if task.status in {'not_started', 'in_progress', 'revision_requested', 'overdue'}
+            if task.status in NEXT_TASK_STATUSES
         ),
         None,
     )
@@ -13,10 +13,12 @@ from app.core.security import (
     decode_refresh_token,
     hash_password,
     hash_token,
+    verify_and_update_password,
     verify_password,
 )
 from app.models.rbac import User, UserRole
 from app.models.token import PasswordSetToken, RefreshToken
+from app.services import principal_service
 
 
 class AuthError(Exception):
@@ -43,8 +45,13 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
         return None
     if not user.hashed_password:
         return None
-    if not verify_password(password, user.hashed_password):
+    ok, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not ok:
         return None
+    if new_hash:
+        # Stored hash predates the current scheme or cost; upgrade it while we have the password.
+        user.hashed_password = new_hash
+        db.flush()
     return user
 
 
@@ -125,6 +132,7 @@ def revoke_refresh_token(db: Session, *, refresh_token: str) -> bool:
     if token_entity.revoked_at is None:
         token_entity.revoked_at = datetime.now(UTC)
         db.flush()
+        principal_service.mark_principal_stale(db, token_entity.user_id)
     return True
 
 
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import heapq
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, event, select
 from sqlalchemy.orm import Session
 
 from app.models.compliance import (
@@ -18,6 +23,22 @@ from app.models.compliance import (
 from app.services.compliance_summary_service import STATUS_SCORES
 
 
+CRITICALITY_WEIGHTS: dict[str, float] = {"High": 3.0, "Medium": 2.0, "Low": 1.0}
+PRIORITY_RANK: dict[str, int] = {"high": 0, "medium": 1, "low": 2}
+CRITICALITY_RANK: dict[str, int] = {"High": 0, "Medium": 1, "Low": 2}
+
+# Framework maps change only on library/profile edits; other workers pick them up within the TTL.
+FRAMEWORK_MAP_TTL_SECONDS = 60.0
+
+FrameworkMap = Mapping[str, tuple[str, ...]]
+
+_STALE_FRAMEWORK_MAPS_KEY = "stale_framework_maps"
+_framework_map_lock = threading.Lock()
+_framework_map_cache: dict[tuple[UUID, str], tuple[float, FrameworkMap]] = {}
+# Bumped on invalidation so a load that started before it does not re-cache its result.
+_framework_map_generation: dict[UUID, int] = {}
+
+
 @dataclass
 class GapItem:
     control_key: str
@@ -34,19 +55,70 @@ class GapItem:
     remediation_notes: str | None
     remediation_owner_user_id: UUID | None
     framework_keys: list[str]
+    priority_score: float = 0.0
 
 
-def list_gaps(
+@dataclass
+class GapColumns:
+    """The active profile's controls, loaded once and scored while loading.
+
+    The dashboard and the plan share one load for severity counts and ranking.
+    """
+
+    rows: list[Any] = field(default_factory=list)
+    statuses: list[str] = field(default_factory=list)
+    scores: list[float] = field(default_factory=list)
+    weights: list[float] = field(default_factory=list)
+    priority_scores: list[float] = field(default_factory=list)
+    framework_keys: list[tuple[str, ...]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def gap_indices(self, threshold: float) -> list[int]:
+        scores = self.scores
+        statuses = self.statuses
+        return [idx for idx in range(len(scores)) if statuses[idx] != "na" and scores[idx] < threshold]
+
+    def severity_counts(self, threshold: float) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for idx in self.gap_indices(threshold):
+            key = self.rows[idx].criticality or "Unknown"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def item(self, idx: int) -> GapItem:
+        row = self.rows[idx]
+        score = self.scores[idx]
+        return GapItem(
+            control_key=row.control_key,
+            code=row.code,
+            title=row.title,
+            domain_code=row.domain_code,
+            criticality=row.criticality,
+            weight=int(row.weight or 0),
+            status_enum=self.statuses[idx],
+            score=score,
+            gap_score=max(0.0, 1.0 - score),
+            priority=row.priority,
+            due_date=row.due_date,
+            remediation_notes=row.remediation_notes,
+            remediation_owner_user_id=row.remediation_owner_user_id,
+            framework_keys=list(self.framework_keys[idx]),
+            priority_score=self.priority_scores[idx],
+        )
+
+
+def load_gap_columns(
     db: Session,
     *,
     tenant_id: UUID,
-    threshold: float,
     framework_key: str | None = None,
     domain_code: str | None = None,
-) -> list[GapItem]:
+) -> GapColumns:
     profile_key = _active_profile_key(db, tenant_id)
     if not profile_key:
-        return []
+        return GapColumns()
 
     framework_map = _framework_map(db, tenant_id=tenant_id, profile_key=profile_key)
 
@@ -112,64 +184,100 @@ def list_gaps(
             .where(ComplianceTenantFramework.framework_key == framework_key)
         )
 
-    rows = db.execute(query).all()
-    gaps: list[GapItem] = []
-    for row in rows:
-        (
-            control_key,
-            code,
-            title,
-            domain,
-            criticality,
-            weight,
-            default_status,
-            default_score,
-            status_enum,
-            score,
-            priority,
-            due_date,
-            remediation_notes,
-            remediation_owner_user_id,
-        ) = row
-        resolved_status = status_enum or default_status or "not_started"
-        resolved_score = float(score if status_enum else default_score or STATUS_SCORES.get(resolved_status, 0.0))
-        if resolved_status == "na":
-            continue
-        if resolved_score >= threshold:
-            continue
-        gaps.append(
-            GapItem(
-                control_key=control_key,
-                code=code,
-                title=title,
-                domain_code=domain,
-                criticality=criticality,
-                weight=int(weight or 0),
-                status_enum=resolved_status,
-                score=resolved_score,
-                gap_score=max(0.0, 1.0 - resolved_score),
-                priority=priority,
-                due_date=due_date,
-                remediation_notes=remediation_notes,
-                remediation_owner_user_id=remediation_owner_user_id,
-                framework_keys=framework_map.get(control_key, []),
-            )
+    columns = GapColumns()
+    for row in db.execute(query).all():
+        resolved_status = row.status_enum or row.default_status or "not_started"
+        if row.status_enum:
+            resolved_score = float(row.score)
+        else:
+            resolved_score = float(row.default_score or STATUS_SCORES.get(resolved_status, 0.0))
+        keys = framework_map.get(row.control_key, ())
+        weight = float(row.weight or 0)
+        columns.rows.append(row)
+        columns.statuses.append(resolved_status)
+        columns.scores.append(resolved_score)
+        columns.weights.append(weight)
+        # weight x criticality x gap x number of frameworks referencing the control
+        columns.priority_scores.append(
+            weight
+            * CRITICALITY_WEIGHTS.get(row.criticality, 1.0)
+            * max(0.0, 1.0 - resolved_score)
+            * max(1, len(keys))
         )
-    return gaps
+        columns.framework_keys.append(keys)
+    return columns
 
 
-def order_gaps(gaps: list[GapItem]) -> list[GapItem]:
-    priority_rank = {"high": 0, "medium": 1, "low": 2}
-    criticality_rank = {"High": 0, "Medium": 1, "Low": 2}
+def list_gaps(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    threshold: float,
+    framework_key: str | None = None,
+    domain_code: str | None = None,
+) -> list[GapItem]:
+    columns = load_gap_columns(db, tenant_id=tenant_id, framework_key=framework_key, domain_code=domain_code)
+    return [columns.item(idx) for idx in columns.gap_indices(threshold)]
+
+
+def rank_gaps(columns: GapColumns, *, threshold: float, limit: int | None = None) -> list[GapItem]:
+    """Gaps by descending ``priority_score``, ties in ``order_gaps`` order.
+
+    With ``limit`` (the dashboard top-5 and ``/gaps/plan?limit=``) only the top-N are
+    heap-selected and materialized.
+    """
+    indices = columns.gap_indices(threshold)
+
+    def _key(idx: int) -> tuple:
+        row = columns.rows[idx]
+        return (
+            -columns.priority_scores[idx],
+            PRIORITY_RANK.get((row.priority or "").lower(), 9),
+            CRITICALITY_RANK.get(row.criticality, 9),
+            -columns.weights[idx],
+            columns.scores[idx],
+        )
+
+    if limit is not None and limit < len(indices):
+        selected = heapq.nsmallest(limit, indices, key=_key)
+    else:
+        selected = sorted(indices, key=_key)
+    return [columns.item(idx) for idx in selected]
 
+
+def order_gaps(gaps: list[GapItem]) -> list[GapItem]:
     def _key(item: GapItem) -> tuple:
-        priority_score = priority_rank.get((item.priority or "").lower(), 9)
-        crit_score = criticality_rank.get(item.criticality, 9)
-        return (priority_score, crit_score, -item.weight, item.score)
+        priority_score = PRIORITY_RANK.get((item.priority or "").lower(), 9)
+        crit_score = CRITICALITY_RANK.get(item.criticality, 9)
+        return (-item.priority_score, priority_score, crit_score, -item.weight, item.score)
 
     return sorted(gaps, key=_key)
 
 
+def invalidate_framework_map(db: Session, tenant_id: UUID) -> None:
+    """Drop the tenant's cached framework maps once the current transaction commits."""
+    # Dropping earlier would let a concurrent read re-cache pre-commit data.
+    db.info.setdefault(_STALE_FRAMEWORK_MAPS_KEY, set()).add(tenant_id)
+
+
+def _drop_framework_maps(tenant_id: UUID) -> None:
+    with _framework_map_lock:
+        _framework_map_generation[tenant_id] = _framework_map_generation.get(tenant_id, 0) + 1
+        for key in [key for key in _framework_map_cache if key[0] == tenant_id]:
+            _framework_map_cache.pop(key, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_framework_maps(session: Session) -> None:
+    for tenant_id in session.info.pop(_STALE_FRAMEWORK_MAPS_KEY, ()):
+        _drop_framework_maps(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_framework_maps(session: Session) -> None:
+    session.info.pop(_STALE_FRAMEWORK_MAPS_KEY, None)
+
+
 def _active_profile_key(db: Session, tenant_id: UUID) -> str | None:
     return db.scalar(
         select(ComplianceTenantProfile.profile_key).where(
@@ -179,7 +287,16 @@ def _active_profile_key(db: Session, tenant_id: UUID) -> str | None:
     )
 
 
-def _framework_map(db: Session, *, tenant_id: UUID, profile_key: str) -> dict[str, list[str]]:
+def _framework_map(db: Session, *, tenant_id: UUID, profile_key: str) -> FrameworkMap:
+    """control_key -> framework keys; cached read-only, so callers cannot mutate the shared copy."""
+    cache_key = (tenant_id, profile_key)
+    now = time.monotonic()
+    with _framework_map_lock:
+        cached = _framework_map_cache.get(cache_key)
+        generation = _framework_map_generation.get(tenant_id, 0)
+    if cached and now - cached[0] < FRAMEWORK_MAP_TTL_SECONDS:
+        return cached[1]
+
     rows = db.execute(
         select(
             ComplianceTenantLibraryProfileControl.control_key,
@@ -207,7 +324,11 @@ def _framework_map(db: Session, *, tenant_id: UUID, profile_key: str) -> dict[st
         )
     ).all()
 
-    mapping: dict[str, list[str]] = {}
+    grouped: dict[str, list[str]] = {}
     for control_key, framework_key in rows:
-        mapping.setdefault(control_key, []).append(framework_key)
+        grouped.setdefault(control_key, []).append(framework_key)
+    mapping = MappingProxyType({key: tuple(keys) for key, keys in grouped.items()})
+    with _framework_map_lock:
+        if _framework_map_generation.get(tenant_id, 0) == generation:
+            _framework_map_cache[cache_key] = (now, mapping)
     return mapping
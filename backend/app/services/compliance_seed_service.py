@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import hashlib
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -20,6 +18,7 @@ from app.models.compliance import (
     ComplianceProfileControl,
     ComplianceSeedImportBatch,
 )
+from app.utils.json_stream import batched, read_json_file_hashed, sha256_json
 
 
 ALLOWED_SERVER_FILES = {
@@ -41,11 +40,7 @@ def _parse_exported_at(value: str) -> datetime:
         raise SeedImportError(f"meta.exported_at must be ISO 8601, got: {value}") from exc
 
 
-def _payload_sha256(raw_text: str) -> str:
-    return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
-
-
-def _load_server_file(server_file: str) -> str:
+def _resolve_server_file(server_file: str) -> Path:
     if server_file not in ALLOWED_SERVER_FILES:
         raise SeedImportError("server_file is not allowed.")
     repo_root = None
@@ -58,7 +53,7 @@ def _load_server_file(server_file: str) -> str:
     path = (repo_root / server_file).resolve()
     if not path.exists():
         raise SeedImportError(f"server_file not found: {server_file}")
-    return path.read_text(encoding="utf-8")
+    return path
 
 
 def _validate_seed_payload(payload: dict[str, Any]) -> None:
@@ -172,8 +167,8 @@ def import_seed_payload(
         for item in frameworks
         if isinstance(item, dict) and item.get("id")
     ]
-    if framework_rows:
-        stmt = insert(ComplianceFramework).values(framework_rows)
+    for chunk in batched(framework_rows):
+        stmt = insert(ComplianceFramework).values(chunk)
         stmt = stmt.on_conflict_do_update(
             index_elements=["framework_key"],
             set_={
@@ -193,8 +188,8 @@ def import_seed_payload(
         for item in domains
         if isinstance(item, dict) and item.get("code")
     ]
-    if domain_rows:
-        stmt = insert(ComplianceDomain).values(domain_rows)
+    for chunk in batched(domain_rows):
+        stmt = insert(ComplianceDomain).values(chunk)
         stmt = stmt.on_conflict_do_update(
             index_elements=["code"],
             set_={"label": stmt.excluded.label},
@@ -217,8 +212,8 @@ def import_seed_payload(
         for item in controls
         if isinstance(item, dict) and item.get("id")
     ]
-    if control_rows:
-        stmt = insert(ComplianceControl).values(control_rows)
+    for chunk in batched(control_rows):
+        stmt = insert(ComplianceControl).values(chunk)
         stmt = stmt.on_conflict_do_update(
             index_elements=["control_key"],
             set_={
@@ -274,8 +269,8 @@ def import_seed_payload(
                     "note": ref.get("note"),
                 }
             )
-    if ref_rows:
-        stmt = insert(ComplianceControlFrameworkRef).values(ref_rows)
+    for chunk in batched(ref_rows):
+        stmt = insert(ComplianceControlFrameworkRef).values(chunk)
         stmt = stmt.on_conflict_do_update(
             index_elements=["control_id", "framework_id", "ref"],
             set_={"note": stmt.excluded.note},
@@ -291,8 +286,8 @@ def import_seed_payload(
         for item in profiles
         if isinstance(item, dict) and item.get("id")
     ]
-    if profile_rows:
-        stmt = insert(ComplianceProfile).values(profile_rows)
+    for chunk in batched(profile_rows):
+        stmt = insert(ComplianceProfile).values(chunk)
         stmt = stmt.on_conflict_do_update(
             index_elements=["profile_key"],
             set_={"name": stmt.excluded.name, "description": stmt.excluded.description},
@@ -328,8 +323,8 @@ def import_seed_payload(
                     "sort_order": idx,
                 }
             )
-    if profile_control_rows:
-        stmt = insert(ComplianceProfileControl).values(profile_control_rows)
+    for chunk in batched(profile_control_rows):
+        stmt = insert(ComplianceProfileControl).values(chunk)
         stmt = stmt.on_conflict_do_nothing(index_elements=["profile_id", "control_id"])
         db.execute(stmt)
 
@@ -371,17 +366,14 @@ def load_seed_payload_from_request(payload: dict[str, Any] | None, server_file:
         raise SeedImportError("Provide either payload or server_file.")
 
     if server_file:
-        raw_text = _load_server_file(server_file)
+        path = _resolve_server_file(server_file)
         try:
-            data = json.loads(raw_text)
-        except json.JSONDecodeError as exc:
+            data, sha = read_json_file_hashed(path)
+        except ValueError as exc:
             raise SeedImportError("server_file contains invalid JSON.") from exc
-        sha = _payload_sha256(raw_text)
         return data, sha, "server_file"
 
     if payload is not None and not isinstance(payload, dict):
         raise SeedImportError("payload must be a JSON object.")
 
-    raw_text = json.dumps(payload, separators=(",", ":"), sort_keys=True)
-    sha = _payload_sha256(raw_text)
-    return payload or {}, sha, "payload"
+    return payload or {}, sha256_json(payload), "payload"
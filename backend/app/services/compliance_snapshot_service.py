@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import hashlib
 import json
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
+from app.db.session import SessionLocal, set_tenant_id
 from app.models.compliance import (
     ComplianceClientMatchResult,
+    ComplianceClientRequirement,
+    ComplianceClientSetVersion,
     ComplianceControlStatus,
+    ComplianceEvidence,
     CompliancePracticeMatchResult,
     ComplianceSnapshot,
     ComplianceTenantControl,
@@ -22,8 +28,15 @@ from app.models.compliance import (
     ComplianceTenantLibraryProfileControl,
     ComplianceTenantProfile,
 )
-from app.services.compliance_summary_service import compute_framework_summary, compute_summary
+from app.models.tenant import Tenant
 from app.services.compliance_client_coverage_service import compute_client_coverage
+from app.services.compliance_summary_service import compute_framework_summary, compute_summary
+
+logger = logging.getLogger(__name__)
+
+# Trend windows longer than these are served one point per day / per week.
+TREND_RAW_WINDOW_DAYS = 31
+TREND_DAILY_WINDOW_DAYS = 180
 
 
 @dataclass
@@ -33,6 +46,26 @@ class SnapshotMetrics:
     metrics_json: dict[str, Any]
 
 
+@dataclass
+class SnapshotInputs:
+    """Per-tenant inputs shared by every scope of one snapshot pass."""
+
+    profile_key: str
+    library_batch_id: UUID | None
+    status_state: list[dict[str, Any]]
+    coverage_scores: dict[str, float]
+    framework_controls: dict[str, list[str]] = field(default_factory=dict)
+
+    @cached_property
+    def _status_by_key(self) -> dict[str, dict[str, Any]]:
+        return {row["control_key"]: row for row in self.status_state}
+
+    def framework_state(self, framework_key: str) -> list[dict[str, Any]]:
+        by_key = self._status_by_key
+        rows = [by_key[key] for key in self.framework_controls.get(framework_key, []) if key in by_key]
+        return sorted(rows, key=lambda item: item["control_key"])
+
+
 def create_snapshot(
     db: Session,
     *,
@@ -41,47 +74,58 @@ def create_snapshot(
     computed_by_user_id: UUID | None,
     framework_key: str | None = None,
     client_set_version_id: UUID | None = None,
+    inputs: SnapshotInputs | None = None,
+    skip_unchanged: bool = False,
 ) -> ComplianceSnapshot | None:
-    profile_key = _active_profile_key(db, tenant_id)
-    if not profile_key:
-        return None
+    """Persist a snapshot for one scope.
+
+    With ``skip_unchanged`` the latest snapshot of the same scope is returned as-is when its
+    input hash matches, so periodic runs only write rows when something actually changed.
+    """
     if scope == "framework" and not framework_key:
         raise ValueError("framework_key is required for framework snapshots.")
     if scope == "client_set" and not client_set_version_id:
         raise ValueError("client_set_version_id is required for client_set snapshots.")
+    if inputs is None:
+        inputs = load_snapshot_inputs(db, tenant_id=tenant_id)
+    if inputs is None:
+        return None
 
-    metrics = _compute_metrics(
+    input_hash = _compute_input_hash(
         db,
         tenant_id=tenant_id,
-        profile_key=profile_key,
+        inputs=inputs,
         scope=scope,
         framework_key=framework_key,
         client_set_version_id=client_set_version_id,
     )
+    if skip_unchanged:
+        previous = _latest_scope_snapshot(
+            db,
+            tenant_id=tenant_id,
+            scope=scope,
+            framework_key=framework_key,
+            client_set_version_id=client_set_version_id,
+        )
+        if previous and previous.input_hash == input_hash:
+            return previous
 
-    input_hash = _compute_input_hash(
+    metrics = _compute_metrics(
         db,
         tenant_id=tenant_id,
-        profile_key=profile_key,
+        inputs=inputs,
         scope=scope,
         framework_key=framework_key,
         client_set_version_id=client_set_version_id,
     )
 
-    batch_id = db.scalar(
-        select(ComplianceTenantLibraryImportBatch.id)
-        .where(ComplianceTenantLibraryImportBatch.tenant_id == tenant_id)
-        .order_by(ComplianceTenantLibraryImportBatch.imported_at.desc())
-        .limit(1)
-    )
-
     snapshot = ComplianceSnapshot(
         tenant_id=tenant_id,
         scope=scope,
-        profile_key=profile_key,
+        profile_key=inputs.profile_key,
         framework_key=framework_key,
         client_set_version_id=client_set_version_id,
-        library_batch_id=batch_id,
+        library_batch_id=inputs.library_batch_id,
         implementation_percent=metrics.implementation_percent,
         coverage_percent=metrics.coverage_percent,
         metrics_json=metrics.metrics_json,
@@ -93,6 +137,104 @@ def create_snapshot(
     return snapshot
 
 
+def load_snapshot_inputs(db: Session, *, tenant_id: UUID) -> SnapshotInputs | None:
+    profile_key = _active_profile_key(db, tenant_id)
+    if not profile_key:
+        return None
+
+    batch_id = db.scalar(
+        select(ComplianceTenantLibraryImportBatch.id)
+        .where(ComplianceTenantLibraryImportBatch.tenant_id == tenant_id)
+        .order_by(ComplianceTenantLibraryImportBatch.imported_at.desc())
+        .limit(1)
+    )
+
+    framework_controls: dict[str, list[str]] = {}
+    ref_rows = db.execute(
+        select(ComplianceTenantControlFrameworkRef.framework_key, ComplianceTenantControlFrameworkRef.control_key)
+        .join(
+            ComplianceTenantFramework,
+            and_(
+                ComplianceTenantFramework.tenant_id == tenant_id,
+                ComplianceTenantFramework.framework_key == ComplianceTenantControlFrameworkRef.framework_key,
+                ComplianceTenantFramework.is_active.is_(True),
+            ),
+        )
+        .where(
+            ComplianceTenantControlFrameworkRef.tenant_id == tenant_id,
+            ComplianceTenantControlFrameworkRef.is_active.is_(True),
+        )
+    ).all()
+    for framework_key, control_key in ref_rows:
+        framework_controls.setdefault(framework_key, []).append(control_key)
+
+    return SnapshotInputs(
+        profile_key=profile_key,
+        library_batch_id=batch_id,
+        status_state=_status_state(db, tenant_id=tenant_id, profile_key=profile_key),
+        coverage_scores=_coverage_scores(db, tenant_id=tenant_id),
+        framework_controls=framework_controls,
+    )
+
+
+def snapshot_tenant(db: Session, *, tenant_id: UUID) -> int:
+    """Snapshot overall, every active framework and every matched client set; returns rows written."""
+    inputs = load_snapshot_inputs(db, tenant_id=tenant_id)
+    if inputs is None:
+        return 0
+
+    scopes: list[tuple[str, str | None, UUID | None]] = [("overall", None, None)]
+    scopes.extend(("framework", key, None) for key in sorted(inputs.framework_controls))
+    version_ids = db.scalars(
+        select(ComplianceClientSetVersion.id).where(
+            ComplianceClientSetVersion.tenant_id == tenant_id,
+            ComplianceClientSetVersion.is_active_version.is_(True),
+            ComplianceClientSetVersion.last_matched_at.is_not(None),
+        )
+    ).all()
+    scopes.extend(("client_set", None, version_id) for version_id in version_ids)
+
+    created = 0
+    for scope, framework_key, version_id in scopes:
+        previous_id = _latest_scope_snapshot_id(
+            db, tenant_id=tenant_id, scope=scope, framework_key=framework_key, client_set_version_id=version_id
+        )
+        snapshot = create_snapshot(
+            db,
+            tenant_id=tenant_id,
+            scope=scope,
+            computed_by_user_id=None,
+            framework_key=framework_key,
+            client_set_version_id=version_id,
+            inputs=inputs,
+            skip_unchanged=True,
+        )
+        if snapshot is not None and snapshot.id != previous_id:
+            created += 1
+    return created
+
+
+def run_scheduled_snapshots() -> int:
+    """Periodic pass over all tenants (Celery beat). Each tenant commits independently."""
+    db = SessionLocal()
+    created = 0
+    try:
+        tenant_ids = db.scalars(
+            select(Tenant.id).where(Tenant.is_active.is_(True)).order_by(Tenant.created_at.asc())
+        ).all()
+        for tenant_id in tenant_ids:
+            try:
+                set_tenant_id(db, str(tenant_id))
+                created += snapshot_tenant(db, tenant_id=tenant_id)
+                db.commit()
+            except Exception:  # noqa: BLE001
+                db.rollback()
+                logger.exception("Scheduled compliance snapshot failed for tenant %s", tenant_id)
+        return created
+    finally:
+        db.close()
+
+
 def get_trends(
     db: Session,
     *,
@@ -101,22 +243,40 @@ def get_trends(
     window_days: int,
     framework_key: str | None = None,
     client_set_version_id: UUID | None = None,
-) -> list[ComplianceSnapshot]:
+) -> list[Any]:
+    """Trend points (computed_at, implementation_percent, coverage_percent), oldest first.
+
+    Windows over ``TREND_RAW_WINDOW_DAYS`` keep only the last snapshot per day, and over
+    ``TREND_DAILY_WINDOW_DAYS`` the last per week, so long histories stay a bounded series.
+    """
     since = datetime.utcnow() - timedelta(days=window_days)
-    query = (
-        select(ComplianceSnapshot)
-        .where(
-            ComplianceSnapshot.tenant_id == tenant_id,
-            ComplianceSnapshot.scope == scope,
-            ComplianceSnapshot.computed_at >= since,
-        )
-        .order_by(ComplianceSnapshot.computed_at.asc())
+    columns = (
+        ComplianceSnapshot.computed_at,
+        ComplianceSnapshot.implementation_percent,
+        ComplianceSnapshot.coverage_percent,
     )
+    filters = [
+        ComplianceSnapshot.tenant_id == tenant_id,
+        ComplianceSnapshot.scope == scope,
+        ComplianceSnapshot.computed_at >= since,
+    ]
     if framework_key:
-        query = query.where(ComplianceSnapshot.framework_key == framework_key)
+        filters.append(ComplianceSnapshot.framework_key == framework_key)
     if client_set_version_id:
-        query = query.where(ComplianceSnapshot.client_set_version_id == client_set_version_id)
-    return db.scalars(query).all()
+        filters.append(ComplianceSnapshot.client_set_version_id == client_set_version_id)
+
+    if window_days <= TREND_RAW_WINDOW_DAYS:
+        return db.execute(select(*columns).where(*filters).order_by(ComplianceSnapshot.computed_at.asc())).all()
+
+    unit = "day" if window_days <= TREND_DAILY_WINDOW_DAYS else "week"
+    bucket = func.date_trunc(unit, ComplianceSnapshot.computed_at)
+    rows = db.execute(
+        select(*columns)
+        .where(*filters)
+        .distinct(bucket)
+        .order_by(bucket, ComplianceSnapshot.computed_at.desc())
+    ).all()
+    return sorted(rows, key=lambda row: row.computed_at)
 
 
 def latest_snapshot(db: Session, *, tenant_id: UUID) -> ComplianceSnapshot | None:
@@ -128,6 +288,68 @@ def latest_snapshot(db: Session, *, tenant_id: UUID) -> ComplianceSnapshot | Non
     )
 
 
+def _latest_scope_snapshot(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    scope: str,
+    framework_key: str | None,
+    client_set_version_id: UUID | None,
+) -> ComplianceSnapshot | None:
+    return db.scalar(
+        _scope_filter(
+            select(ComplianceSnapshot),
+            tenant_id=tenant_id,
+            scope=scope,
+            framework_key=framework_key,
+            client_set_version_id=client_set_version_id,
+        )
+        .order_by(ComplianceSnapshot.computed_at.desc())
+        .limit(1)
+    )
+
+
+def _latest_scope_snapshot_id(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    scope: str,
+    framework_key: str | None,
+    client_set_version_id: UUID | None,
+) -> UUID | None:
+    return db.scalar(
+        _scope_filter(
+            select(ComplianceSnapshot.id),
+            tenant_id=tenant_id,
+            scope=scope,
+            framework_key=framework_key,
+            client_set_version_id=client_set_version_id,
+        )
+        .order_by(ComplianceSnapshot.computed_at.desc())
+        .limit(1)
+    )
+
+
+def _scope_filter(
+    query: Any,
+    *,
+    tenant_id: UUID,
+    scope: str,
+    framework_key: str | None,
+    client_set_version_id: UUID | None,
+) -> Any:
+    query = query.where(ComplianceSnapshot.tenant_id == tenant_id, ComplianceSnapshot.scope == scope)
+    if framework_key:
+        query = query.where(ComplianceSnapshot.framework_key == framework_key)
+    else:
+        query = query.where(ComplianceSnapshot.framework_key.is_(None))
+    if client_set_version_id:
+        query = query.where(ComplianceSnapshot.client_set_version_id == client_set_version_id)
+    else:
+        query = query.where(ComplianceSnapshot.client_set_version_id.is_(None))
+    return query
+
+
 def _active_profile_key(db: Session, tenant_id: UUID) -> str | None:
     return db.scalar(
         select(ComplianceTenantProfile.profile_key).where(
@@ -141,7 +363,7 @@ def _compute_metrics(
     db: Session,
     *,
     tenant_id: UUID,
-    profile_key: str,
+    inputs: SnapshotInputs,
     scope: str,
     framework_key: str | None,
     client_set_version_id: UUID | None,
@@ -166,6 +388,7 @@ def _compute_metrics(
             "implementation": summary["framework"] if summary else {},
             "by_domain": summary.get("by_domain", []) if summary else [],
         }
+        state = inputs.framework_state(framework_key)
     else:
         summary = compute_summary(db, tenant_id=tenant_id)
         implementation = summary["overall"]["compliance"]
@@ -174,22 +397,16 @@ def _compute_metrics(
             "by_framework": summary.get("by_framework", []),
             "by_domain": summary.get("by_domain", []),
         }
+        state = inputs.status_state
 
     coverage = _compute_coverage_percent(
         db,
         tenant_id=tenant_id,
-        profile_key=profile_key,
+        inputs=inputs,
         framework_key=framework_key if scope == "framework" else None,
     )
     metrics_json["coverage_percent"] = coverage
-
-    status_counts = _status_distribution(
-        db,
-        tenant_id=tenant_id,
-        profile_key=profile_key,
-        framework_key=framework_key if scope == "framework" else None,
-    )
-    metrics_json["status_counts"] = status_counts
+    metrics_json["status_counts"] = _status_distribution(state)
 
     return SnapshotMetrics(implementation_percent=implementation, coverage_percent=coverage, metrics_json=metrics_json)
 
@@ -198,34 +415,80 @@ def _compute_input_hash(
     db: Session,
     *,
     tenant_id: UUID,
-    profile_key: str,
+    inputs: SnapshotInputs,
     scope: str,
     framework_key: str | None,
     client_set_version_id: UUID | None,
 ) -> str:
-    status_rows = _status_state(
-        db,
-        tenant_id=tenant_id,
-        profile_key=profile_key,
-        framework_key=framework_key if scope == "framework" else None,
-    )
-    data = {
+    if scope == "framework" and framework_key:
+        status_rows = inputs.framework_state(framework_key)
+    else:
+        status_rows = inputs.status_state
+    data: dict[str, Any] = {
         "scope": scope,
-        "profile_key": profile_key,
+        "profile_key": inputs.profile_key,
+        "library_batch_id": str(inputs.library_batch_id) if inputs.library_batch_id else None,
         "framework_key": framework_key,
         "client_set_version_id": str(client_set_version_id) if client_set_version_id else None,
         "statuses": status_rows,
     }
+    if scope == "client_set" and client_set_version_id:
+        data["client_set"] = _client_set_state(db, tenant_id=tenant_id, version_id=client_set_version_id)
+    else:
+        data["coverage"] = {
+            row["control_key"]: inputs.coverage_scores[row["control_key"]]
+            for row in status_rows
+            if row["control_key"] in inputs.coverage_scores
+        }
     payload = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
     return hashlib.sha256(payload).hexdigest()
 
 
+def _client_set_state(db: Session, *, tenant_id: UUID, version_id: UUID) -> dict[str, Any]:
+    requirement_ids = db.scalars(
+        select(ComplianceClientRequirement.id).where(
+            ComplianceClientRequirement.tenant_id == tenant_id,
+            ComplianceClientRequirement.client_set_version_id == version_id,
+        )
+    ).all()
+    results = db.execute(
+        select(
+            ComplianceClientMatchResult.client_requirement_id,
+            ComplianceClientMatchResult.control_key,
+            ComplianceClientMatchResult.coverage_score,
+            ComplianceClientMatchResult.confidence,
+        ).where(
+            ComplianceClientMatchResult.tenant_id == tenant_id,
+            ComplianceClientMatchResult.client_requirement_id.in_(requirement_ids),
+            ComplianceClientMatchResult.accepted.is_(True),
+        )
+    ).all() if requirement_ids else []
+    control_keys = sorted({row.control_key for row in results if row.control_key})
+    evidence_counts = dict(
+        db.execute(
+            select(ComplianceEvidence.control_key, func.count(ComplianceEvidence.id))
+            .where(
+                ComplianceEvidence.tenant_id == tenant_id,
+                ComplianceEvidence.control_key.in_(control_keys),
+            )
+            .group_by(ComplianceEvidence.control_key)
+        ).all()
+    ) if control_keys else {}
+    return {
+        "requirements": sorted(str(item) for item in requirement_ids),
+        "results": sorted(
+            [str(row.client_requirement_id), row.control_key, float(row.coverage_score or 0.0), float(row.confidence or 0.0)]
+            for row in results
+        ),
+        "evidence": evidence_counts,
+    }
+
+
 def _status_state(
     db: Session,
     *,
     tenant_id: UUID,
     profile_key: str,
-    framework_key: str | None,
 ) -> list[dict[str, Any]]:
     query = (
         select(
@@ -255,27 +518,6 @@ def _status_state(
             ComplianceTenantControl.is_active.is_(True),
         )
     )
-    if framework_key:
-        query = (
-            query.join(
-                ComplianceTenantControlFrameworkRef,
-                and_(
-                    ComplianceTenantControlFrameworkRef.tenant_id == tenant_id,
-                    ComplianceTenantControlFrameworkRef.control_key == ComplianceTenantControl.control_key,
-                    ComplianceTenantControlFrameworkRef.is_active.is_(True),
-                ),
-            )
-            .join(
-                ComplianceTenantFramework,
-                and_(
-                    ComplianceTenantFramework.tenant_id == tenant_id,
-                    ComplianceTenantFramework.framework_key == ComplianceTenantControlFrameworkRef.framework_key,
-                    ComplianceTenantFramework.is_active.is_(True),
-                ),
-            )
-            .where(ComplianceTenantFramework.framework_key == framework_key)
-        )
-
     rows = db.execute(query).all()
     state: list[dict[str, Any]] = []
     for control_key, default_status, default_score, status_enum, score in rows:
@@ -287,65 +529,16 @@ def _status_state(
     return sorted(state, key=lambda item: item["control_key"])
 
 
-def _status_distribution(
-    db: Session,
-    *,
-    tenant_id: UUID,
-    profile_key: str,
-    framework_key: str | None,
-) -> dict[str, int]:
+def _status_distribution(state: list[dict[str, Any]]) -> dict[str, int]:
     counts: dict[str, int] = {}
-    for row in _status_state(
-        db,
-        tenant_id=tenant_id,
-        profile_key=profile_key,
-        framework_key=framework_key,
-    ):
+    for row in state:
         status = row["status"]
         counts[status] = counts.get(status, 0) + 1
     return counts
 
 
-def _compute_coverage_percent(
-    db: Session,
-    *,
-    tenant_id: UUID,
-    profile_key: str,
-    framework_key: str | None,
-) -> float | None:
-    control_query = (
-        select(ComplianceTenantLibraryProfileControl.control_key)
-        .where(
-            ComplianceTenantLibraryProfileControl.tenant_id == tenant_id,
-            ComplianceTenantLibraryProfileControl.profile_key == profile_key,
-        )
-        .distinct()
-    )
-    if framework_key:
-        control_query = (
-            control_query.join(
-                ComplianceTenantControlFrameworkRef,
-                and_(
-                    ComplianceTenantControlFrameworkRef.tenant_id == tenant_id,
-                    ComplianceTenantControlFrameworkRef.control_key == ComplianceTenantLibraryProfileControl.control_key,
-                    ComplianceTenantControlFrameworkRef.is_active.is_(True),
-                ),
-            )
-            .join(
-                ComplianceTenantFramework,
-                and_(
-                    ComplianceTenantFramework.tenant_id == tenant_id,
-                    ComplianceTenantFramework.framework_key == ComplianceTenantControlFrameworkRef.framework_key,
-                    ComplianceTenantFramework.is_active.is_(True),
-                ),
-            )
-            .where(ComplianceTenantFramework.framework_key == framework_key)
-        )
-
-    profile_controls = [row[0] for row in db.execute(control_query).all()]
-    if not profile_controls:
-        return None
-
+def _coverage_scores(db: Session, *, tenant_id: UUID) -> dict[str, float]:
+    """Best accepted practice/client coverage per control, clamped to [0, 1]."""
     practice_rows = db.execute(
         select(
             CompliancePracticeMatchResult.control_key,
@@ -367,16 +560,34 @@ def _compute_coverage_percent(
         )
     ).all()
 
-    practice_scores: dict[str, float] = {}
-    for control_key, score, confidence in practice_rows:
-        value = float(score or 0.0) or float(confidence or 0.0)
-        practice_scores[control_key] = max(practice_scores.get(control_key, 0.0), min(value, 1.0))
-    client_scores: dict[str, float] = {}
-    for control_key, score, confidence in client_rows:
+    scores: dict[str, float] = {}
+    for control_key, score, confidence in [*practice_rows, *client_rows]:
         value = float(score or 0.0) or float(confidence or 0.0)
-        client_scores[control_key] = max(client_scores.get(control_key, 0.0), min(value, 1.0))
+        scores[control_key] = max(scores.get(control_key, 0.0), min(value, 1.0))
+    return scores
+
+
+def _compute_coverage_percent(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    inputs: SnapshotInputs,
+    framework_key: str | None,
+) -> float | None:
+    control_query = (
+        select(ComplianceTenantLibraryProfileControl.control_key)
+        .where(
+            ComplianceTenantLibraryProfileControl.tenant_id == tenant_id,
+            ComplianceTenantLibraryProfileControl.profile_key == inputs.profile_key,
+        )
+        .distinct()
+    )
+    profile_controls = list(db.scalars(control_query).all())
+    if framework_key:
+        framework_controls = set(inputs.framework_controls.get(framework_key, []))
+        profile_controls = [key for key in profile_controls if key in framework_controls]
+    if not profile_controls:
+        return None
 
-    covered = 0.0
-    for control_key in profile_controls:
-        covered += max(practice_scores.get(control_key, 0.0), client_scores.get(control_key, 0.0))
+    covered = sum(inputs.coverage_scores.get(control_key, 0.0) for control_key in profile_controls)
     return covered / len(profile_controls)
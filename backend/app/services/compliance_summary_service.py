@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.db.session import SessionLocal, set_tenant_id
 from app.models.compliance import (
     ComplianceControlStatus,
+    ComplianceSummaryRollup,
     ComplianceTenantControl,
     ComplianceTenantControlFrameworkRef,
     ComplianceTenantDomain,
@@ -17,6 +22,7 @@ from app.models.compliance import (
     ComplianceTenantProfile,
 )
 
+logger = logging.getLogger(__name__)
 
 STATUS_SCORES: dict[str, float] = {
     "not_started": 0.0,
@@ -27,6 +33,11 @@ STATUS_SCORES: dict[str, float] = {
     "na": 0.0,
 }
 
+# Reads serve live numbers and queue a background rebuild when rollups are older
+# than this, bounding drift from writers that bypass ``refresh_rollups``.
+ROLLUP_MAX_AGE = timedelta(minutes=15)
+ROLLUP_REFRESH_DEBOUNCE_SECONDS = 60
+
 
 @dataclass
 class SummaryBucket:
@@ -292,3 +303,381 @@ def _bucket_dict(bucket: SummaryBucket) -> dict[str, float | None]:
         "denominator": bucket.denominator,
         "compliance": bucket.compliance(),
     }
+
+
+def load_summary(db: Session, *, tenant_id: UUID) -> dict[str, Any]:
+    """Same payload as ``compute_summary`` served from the rollup table.
+
+    Read-only: when the rollups are cold or stale the summary is computed live and a
+    background rebuild is queued.
+    """
+    rows = _load_rollups(db, tenant_id=tenant_id)
+    overall = rows.get(("overall", "", ""))
+    if overall is None:
+        schedule_rollup_refresh(tenant_id)
+        return compute_summary(db, tenant_id=tenant_id)
+
+    by_framework = []
+    by_domain = []
+    for (bucket_type, framework_key, domain_code), row in rows.items():
+        if bucket_type == "framework":
+            by_framework.append({"key": framework_key, "label": row.label, **_rollup_dict(row)})
+        elif bucket_type == "domain":
+            by_domain.append({"key": domain_code, "label": row.label, **_rollup_dict(row)})
+
+    return {
+        "overall": {"key": "overall", "label": "Overall", **_rollup_dict(overall)},
+        "by_framework": by_framework,
+        "by_domain": by_domain,
+    }
+
+
+def load_framework_summary(db: Session, *, tenant_id: UUID, framework_key: str) -> dict[str, Any] | None:
+    """Same payload as ``compute_framework_summary`` served from the rollup table."""
+    framework = db.scalar(
+        select(ComplianceTenantFramework).where(
+            ComplianceTenantFramework.tenant_id == tenant_id,
+            ComplianceTenantFramework.framework_key == framework_key,
+            ComplianceTenantFramework.is_active.is_(True),
+        )
+    )
+    if not framework:
+        return None
+
+    rows = _load_rollups(db, tenant_id=tenant_id, framework_key=framework.framework_key)
+    if ("overall", "", "") not in rows:
+        schedule_rollup_refresh(tenant_id)
+        return compute_framework_summary(db, tenant_id=tenant_id, framework_key=framework_key)
+
+    framework_bucket = SummaryBucket()
+    by_domain = []
+    for (bucket_type, _, domain_code), row in rows.items():
+        if bucket_type != "framework_domain":
+            continue
+        framework_bucket.numerator += row.numerator
+        framework_bucket.denominator += row.denominator
+        by_domain.append({"key": domain_code, "label": row.label, **_rollup_dict(row)})
+
+    return {
+        "framework": {"key": framework.framework_key, "label": framework.name, **_bucket_dict(framework_bucket)},
+        "by_domain": by_domain,
+    }
+
+
+def refresh_rollups(db: Session, *, tenant_id: UUID) -> dict[str, Any]:
+    """Rebuild the tenant's rollups inside the caller's transaction, so they commit with its writes.
+
+    Use after library, profile or bulk status changes. Rebuilds and status deltas for a
+    tenant are serialized on an advisory lock, so a rebuild always sees the committed
+    work of the writer before it.
+    """
+    db.flush()
+    _lock_rollups(db, tenant_id=tenant_id)
+    return _rebuild_rollups(db, tenant_id=tenant_id)
+
+
+def run_rollup_refresh(*, tenant_id: UUID) -> None:
+    """Background rebuild queued by stale reads (Celery)."""
+    db = SessionLocal()
+    try:
+        set_tenant_id(db, str(tenant_id))
+        refresh_rollups(db, tenant_id=tenant_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def schedule_rollup_refresh(tenant_id: UUID) -> None:
+    """Queue ``run_rollup_refresh`` at most once per debounce window; a no-op without Redis."""
+    from app.core.redis_client import redis_client
+
+    if redis_client is None:
+        return
+    try:
+        key = f"compliance:rollup-refresh:{tenant_id}"
+        if not redis_client.set(key, "1", nx=True, ex=ROLLUP_REFRESH_DEBOUNCE_SECONDS):
+            return
+        from app.tasks.compliance import refresh_compliance_rollups
+
+        refresh_compliance_rollups.delay(tenant_id=str(tenant_id))
+    except Exception:
+        logger.warning("Could not queue rollup refresh for tenant %s", tenant_id, exc_info=True)
+
+
+def apply_status_change(
+    db: Session,
+    *,
+    tenant_id: UUID,
+    control_key: str,
+    previous: tuple[str | None, Any],
+    current: tuple[str | None, Any],
+) -> None:
+    """Apply the delta of a single control status change to the cached rollups."""
+    _lock_rollups(db, tenant_id=tenant_id)
+    overall = db.get(
+        ComplianceSummaryRollup,
+        {"tenant_id": tenant_id, "bucket_type": "overall", "framework_key": "", "domain_code": ""},
+    )
+    if overall is None or not overall.profile_key:
+        return
+
+    _, old_score, old_include = _normalize_status(*previous)
+    _, new_score, new_include = _normalize_status(*current)
+    old_num, old_den = (old_score, 1.0) if old_include else (0.0, 0.0)
+    new_num, new_den = (new_score, 1.0) if new_include else (0.0, 0.0)
+    if old_num == new_num and old_den == new_den:
+        return
+
+    control = db.execute(
+        select(
+            ComplianceTenantControl.weight,
+            ComplianceTenantControl.domain_code,
+            ComplianceTenantDomain.domain_code.label("active_domain"),
+        )
+        .join(
+            ComplianceTenantLibraryProfileControl,
+            and_(
+                ComplianceTenantLibraryProfileControl.tenant_id == tenant_id,
+                ComplianceTenantLibraryProfileControl.control_key == ComplianceTenantControl.control_key,
+                ComplianceTenantLibraryProfileControl.profile_key == overall.profile_key,
+            ),
+        )
+        .outerjoin(
+            ComplianceTenantDomain,
+            and_(
+                ComplianceTenantDomain.tenant_id == tenant_id,
+                ComplianceTenantDomain.domain_code == ComplianceTenantControl.domain_code,
+                ComplianceTenantDomain.is_active.is_(True),
+            ),
+        )
+        .where(
+            ComplianceTenantControl.tenant_id == tenant_id,
+            ComplianceTenantControl.control_key == control_key,
+            ComplianceTenantControl.is_active.is_(True),
+        )
+    ).first()
+    if control is None:
+        return
+
+    weight = float(control.weight)
+    d_num = (new_num - old_num) * weight
+    d_den = (new_den - old_den) * weight
+
+    targets: list[tuple[str, str, str, int]] = []
+    if control.active_domain:
+        targets.append(("overall", "", "", 1))
+        targets.append(("domain", "", control.domain_code, 1))
+
+    framework_refs = db.execute(
+        select(ComplianceTenantControlFrameworkRef.framework_key, func.count())
+        .join(
+            ComplianceTenantFramework,
+            and_(
+                ComplianceTenantFramework.tenant_id == tenant_id,
+                ComplianceTenantFramework.framework_key == ComplianceTenantControlFrameworkRef.framework_key,
+                ComplianceTenantFramework.is_active.is_(True),
+            ),
+        )
+        .where(
+            ComplianceTenantControlFrameworkRef.tenant_id == tenant_id,
+            ComplianceTenantControlFrameworkRef.control_key == control_key,
+            ComplianceTenantControlFrameworkRef.is_active.is_(True),
+        )
+        .group_by(ComplianceTenantControlFrameworkRef.framework_key)
+    ).all()
+    for framework_key, ref_count in framework_refs:
+        targets.append(("framework", framework_key, "", int(ref_count)))
+        if control.active_domain:
+            targets.append(("framework_domain", framework_key, control.domain_code, int(ref_count)))
+
+    now = datetime.now(timezone.utc)
+    for bucket_type, framework_key, domain_code, multiplier in targets:
+        result = db.execute(
+            update(ComplianceSummaryRollup)
+            .where(
+                ComplianceSummaryRollup.tenant_id == tenant_id,
+                ComplianceSummaryRollup.bucket_type == bucket_type,
+                ComplianceSummaryRollup.framework_key == framework_key,
+                ComplianceSummaryRollup.domain_code == domain_code,
+            )
+            .values(
+                numerator=ComplianceSummaryRollup.numerator + d_num * multiplier,
+                denominator=ComplianceSummaryRollup.denominator + d_den * multiplier,
+                refreshed_at=now,
+            )
+        )
+        if result.rowcount == 0:
+            # Bucket missing means the cache no longer matches the library.
+            _rebuild_rollups(db, tenant_id=tenant_id)
+            return
+
+
+def _lock_rollups(db: Session, *, tenant_id: UUID) -> None:
+    key = f"compliance_rollups:{tenant_id}"
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0))))
+
+
+def _load_rollups(
+    db: Session, *, tenant_id: UUID, framework_key: str | None = None
+) -> dict[tuple[str, str, str], ComplianceSummaryRollup]:
+    query = select(ComplianceSummaryRollup).where(ComplianceSummaryRollup.tenant_id == tenant_id)
+    if framework_key is not None:
+        query = query.where(
+            (ComplianceSummaryRollup.bucket_type == "overall")
+            | (ComplianceSummaryRollup.framework_key == framework_key)
+        )
+    rows = {
+        (row.bucket_type, row.framework_key, row.domain_code): row
+        for row in db.scalars(query.order_by(ComplianceSummaryRollup.position)).all()
+    }
+    overall = rows.get(("overall", "", ""))
+    if overall is not None and _is_stale(overall):
+        return {}
+    return rows
+
+
+def _is_stale(row: ComplianceSummaryRollup) -> bool:
+    refreshed_at = row.refreshed_at
+    if refreshed_at is None:
+        return True
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - refreshed_at > ROLLUP_MAX_AGE
+
+
+def _rebuild_rollups(db: Session, *, tenant_id: UUID) -> dict[str, Any]:
+    profile_key = _active_profile_key(db, tenant_id)
+    summary = compute_summary(db, tenant_id=tenant_id)
+    now = datetime.now(timezone.utc)
+
+    def _row(
+        bucket_type: str,
+        item: dict[str, Any],
+        position: int,
+        *,
+        framework_key: str = "",
+        domain_code: str = "",
+    ) -> dict[str, Any]:
+        return {
+            "tenant_id": tenant_id,
+            "bucket_type": bucket_type,
+            "framework_key": framework_key,
+            "domain_code": domain_code,
+            "label": item.get("label") or "",
+            "profile_key": profile_key,
+            "numerator": float(item.get("numerator") or 0.0),
+            "denominator": float(item.get("denominator") or 0.0),
+            "position": position,
+            "refreshed_at": now,
+        }
+
+    # Positions keep the ``compute_summary`` order of each list when served from the table.
+    rows = [_row("overall", summary["overall"], 0)]
+    for i, item in enumerate(summary["by_domain"]):
+        rows.append(_row("domain", item, i, domain_code=item["key"]))
+    for i, item in enumerate(summary["by_framework"]):
+        rows.append(_row("framework", item, i, framework_key=item["key"]))
+    if profile_key:
+        for i, (framework_key, domain_code, label, bucket) in enumerate(
+            _framework_domain_buckets(db, tenant_id=tenant_id, profile_key=profile_key)
+        ):
+            rows.append(
+                _row(
+                    "framework_domain",
+                    {"label": label, "numerator": bucket.numerator, "denominator": bucket.denominator},
+                    i,
+                    framework_key=framework_key,
+                    domain_code=domain_code,
+                )
+            )
+
+    db.execute(delete(ComplianceSummaryRollup).where(ComplianceSummaryRollup.tenant_id == tenant_id))
+    stmt = insert(ComplianceSummaryRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "bucket_type", "framework_key", "domain_code"],
+        set_={
+            "label": stmt.excluded.label,
+            "profile_key": stmt.excluded.profile_key,
+            "numerator": stmt.excluded.numerator,
+            "denominator": stmt.excluded.denominator,
+            "position": stmt.excluded.position,
+            "refreshed_at": stmt.excluded.refreshed_at,
+        },
+    )
+    db.execute(stmt)
+    return summary
+
+
+def _framework_domain_buckets(
+    db: Session, *, tenant_id: UUID, profile_key: str
+) -> list[tuple[str, str, str, SummaryBucket]]:
+    """Per (framework, domain) buckets with the same joins as ``compute_framework_summary``."""
+    rows = db.execute(
+        select(
+            ComplianceTenantControlFrameworkRef.framework_key,
+            ComplianceTenantControl.weight,
+            ComplianceTenantControl.domain_code,
+            ComplianceTenantDomain.label,
+            ComplianceControlStatus.status_enum,
+            ComplianceControlStatus.score,
+        )
+        .join(
+            ComplianceTenantControlFrameworkRef,
+            and_(
+                ComplianceTenantControlFrameworkRef.tenant_id == tenant_id,
+                ComplianceTenantControlFrameworkRef.control_key == ComplianceTenantControl.control_key,
+                ComplianceTenantControlFrameworkRef.is_active.is_(True),
+            ),
+        )
+        .join(
+            ComplianceTenantFramework,
+            and_(
+                ComplianceTenantFramework.tenant_id == tenant_id,
+                ComplianceTenantFramework.framework_key == ComplianceTenantControlFrameworkRef.framework_key,
+                ComplianceTenantFramework.is_active.is_(True),
+            ),
+        )
+        .join(
+            ComplianceTenantDomain,
+            and_(
+                ComplianceTenantDomain.tenant_id == tenant_id,
+                ComplianceTenantDomain.domain_code == ComplianceTenantControl.domain_code,
+                ComplianceTenantDomain.is_active.is_(True),
+            ),
+        )
+        .join(
+            ComplianceTenantLibraryProfileControl,
+            and_(
+                ComplianceTenantLibraryProfileControl.tenant_id == tenant_id,
+                ComplianceTenantLibraryProfileControl.control_key == ComplianceTenantControl.control_key,
+                ComplianceTenantLibraryProfileControl.profile_key == profile_key,
+            ),
+        )
+        .outerjoin(
+            ComplianceControlStatus,
+            and_(
+                ComplianceControlStatus.control_key == ComplianceTenantControl.control_key,
+                ComplianceControlStatus.tenant_id == tenant_id,
+            ),
+        )
+        .where(
+            ComplianceTenantControl.tenant_id == tenant_id,
+            ComplianceTenantControl.is_active.is_(True),
+        )
+    ).all()
+
+    buckets: dict[tuple[str, str], SummaryBucket] = {}
+    labels: dict[tuple[str, str], str] = {}
+    for framework_key, weight, domain_code, domain_label, status_enum, score in rows:
+        _, score_value, include = _normalize_status(status_enum, score)
+        key = (framework_key, domain_code)
+        buckets.setdefault(key, SummaryBucket()).add(score=score_value, weight=float(weight), include=include)
+        labels[key] = domain_label
+    return [(fw, dc, labels[(fw, dc)], bucket) for (fw, dc), bucket in buckets.items()]
+
+
+def _rollup_dict(row: ComplianceSummaryRollup) -> dict[str, float | None]:
+    return _bucket_dict(SummaryBucket(numerator=float(row.numerator), denominator=float(row.denominator)))
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import hashlib
 import json
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +20,7 @@ from app.models.compliance import (
     ComplianceTenantLibraryProfile,
     ComplianceTenantLibraryProfileControl,
 )
+from app.utils.json_stream import batched, read_json_file_hashed, sha256_json
 
 
 CANONICAL_TENANT_LIBRARY_FILES = {
@@ -46,12 +46,18 @@ def load_tenant_library_payload_from_request(
         raw = _resolve_library_path(server_file)
         if not raw:
             raise TenantLibraryError("server_file not found.")
-        data = json.loads(raw.read_text(encoding="utf-8"))
-        return data, _sha256_json(data), f"server_file:{server_file}"
+        try:
+            # One streaming pass parses the file and hashes its bytes.
+            data, sha = read_json_file_hashed(raw)
+        except ValueError as exc:
+            raise TenantLibraryError("server_file contains invalid JSON.") from exc
+        if not isinstance(data, dict):
+            raise TenantLibraryError("server_file must contain a JSON object.")
+        return data, sha, f"server_file:{server_file}"
 
     if not isinstance(payload, dict):
         raise TenantLibraryError("payload must be a JSON object.")
-    return payload, _sha256_json(payload), "payload"
+    return payload, sha256_json(payload), "payload"
 
 
 def validate_tenant_library_payload(payload: dict[str, Any]) -> tuple[list[str], list[str]]:
@@ -84,11 +90,11 @@ def validate_tenant_library_payload(payload: dict[str, Any]) -> tuple[list[str],
     _require_list(controls, "library.controls", errors)
     _require_list(profiles, "library.profiles", errors)
 
-    framework_ids = _unique_ids(frameworks, "frameworks", errors)
-    domain_codes = _unique_codes(domains, "domains", errors, field="code")
-    control_ids = _unique_ids(controls, "controls", errors)
-    _unique_codes(controls, "controls", errors, field="code")
-    profile_ids = _unique_ids(profiles, "profiles", errors)
+    (framework_ids,) = _unique_fields(frameworks, "frameworks", errors, fields=("id",))
+    (domain_codes,) = _unique_fields(domains, "domains", errors, fields=("code",))
+    # Codes are only checked for uniqueness; ids are what profiles reference.
+    control_ids, _ = _unique_fields(controls, "controls", errors, fields=("id", "code"))
+    _unique_fields(profiles, "profiles", errors, fields=("id",))
 
     for item in domains:
         if not _has_keys(item, {"code", "label"}):
@@ -229,8 +235,8 @@ def apply_tenant_library_payload(
 
     # Replace profile controls (library-only)
     db.execute(delete(ComplianceTenantLibraryProfileControl).where(ComplianceTenantLibraryProfileControl.tenant_id == tenant_id))
-    if profile_controls:
-        db.execute(insert(ComplianceTenantLibraryProfileControl).values(profile_controls))
+    for chunk in batched(profile_controls):
+        db.execute(insert(ComplianceTenantLibraryProfileControl).values(chunk))
 
     _deactivate_missing(db, tenant_id, ComplianceTenantFramework, "framework_key", {f["framework_key"] for f in frameworks})
     _deactivate_missing(db, tenant_id, ComplianceTenantDomain, "domain_code", {d["domain_code"] for d in domains})
@@ -280,11 +286,6 @@ def list_tenant_library_versions(db: Session, tenant_id: UUID) -> list[Complianc
     ).all()
 
 
-def _sha256_json(payload: dict[str, Any]) -> str:
-    data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    return hashlib.sha256(data).hexdigest()
-
-
 def _resolve_library_path(server_file: str) -> Path | None:
     candidates = [Path.cwd(), Path(__file__).resolve().parents[3]]
     for base in candidates:
@@ -308,22 +309,32 @@ def _require_list(value: Any, label: str, errors: list[str]) -> None:
         errors.append(f"{label} must be an array.")
 
 
-def _unique_ids(items: list[dict[str, Any]], label: str, errors: list[str]) -> set[str]:
-    ids = [item.get("id") for item in items if isinstance(item, dict)]
-    if any(not item for item in ids):
-        errors.append(f"{label} items must include id.")
-    if len(set(ids)) != len(ids):
-        errors.append(f"{label} ids must be unique.")
-    return set([str(item) for item in ids if item])
-
-
-def _unique_codes(items: list[dict[str, Any]], label: str, errors: list[str], *, field: str) -> set[str]:
-    codes = [item.get(field) for item in items if isinstance(item, dict)]
-    if any(not item for item in codes):
-        errors.append(f"{label} items must include {field}.")
-    if len(set(codes)) != len(codes):
-        errors.append(f"{label} {field} values must be unique.")
-    return set([str(item) for item in codes if item])
+def _unique_fields(
+    items: list[dict[str, Any]], label: str, errors: list[str], *, fields: tuple[str, ...]
+) -> tuple[set[str], ...]:
+    """Collect unique values for several fields in a single pass over ``items``."""
+    seen: tuple[set[Any], ...] = tuple(set() for _ in fields)
+    missing = [False] * len(fields)
+    duplicate = [False] * len(fields)
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        for idx, field in enumerate(fields):
+            value = item.get(field)
+            if not value:
+                missing[idx] = True
+            if value in seen[idx]:
+                duplicate[idx] = True
+            seen[idx].add(value)
+    for idx, field in enumerate(fields):
+        if missing[idx]:
+            errors.append(f"{label} items must include {field}.")
+        if duplicate[idx]:
+            if field == "id":
+                errors.append(f"{label} ids must be unique.")
+            else:
+                errors.append(f"{label} {field} values must be unique.")
+    return tuple({str(value) for value in values if value} for values in seen)
 
 
 def _has_keys(item: Any, keys: set[str]) -> bool:
@@ -446,88 +457,83 @@ def _profile_control_rows(tenant_id: UUID, items: list[dict[str, Any]]) -> list[
 
 
 def _upsert_frameworks(db: Session, rows: list[dict[str, Any]]) -> None:
-    if not rows:
-        return
-    stmt = insert(ComplianceTenantFramework).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["tenant_id", "framework_key"],
-        set_={
-            "name": stmt.excluded.name,
-            "full_name": stmt.excluded.full_name,
-            "version": stmt.excluded.version,
-            "type": stmt.excluded.type,
-            "region": stmt.excluded.region,
-            "tags": stmt.excluded.tags,
-            "references": stmt.excluded.references,
-            "is_active": True,
-        },
-    )
-    db.execute(stmt)
+    for chunk in batched(rows):
+        stmt = insert(ComplianceTenantFramework).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "framework_key"],
+            set_={
+                "name": stmt.excluded.name,
+                "full_name": stmt.excluded.full_name,
+                "version": stmt.excluded.version,
+                "type": stmt.excluded.type,
+                "region": stmt.excluded.region,
+                "tags": stmt.excluded.tags,
+                "references": stmt.excluded.references,
+                "is_active": True,
+            },
+        )
+        db.execute(stmt)
 
 
 def _upsert_domains(db: Session, rows: list[dict[str, Any]]) -> None:
-    if not rows:
-        return
-    stmt = insert(ComplianceTenantDomain).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["tenant_id", "domain_code"],
-        set_={
-            "label": stmt.excluded.label,
-            "is_active": True,
-        },
-    )
-    db.execute(stmt)
+    for chunk in batched(rows):
+        stmt = insert(ComplianceTenantDomain).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "domain_code"],
+            set_={
+                "label": stmt.excluded.label,
+                "is_active": True,
+            },
+        )
+        db.execute(stmt)
 
 
 def _upsert_controls(db: Session, rows: list[dict[str, Any]]) -> None:
-    if not rows:
-        return
-    stmt = insert(ComplianceTenantControl).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["tenant_id", "control_key"],
-        set_={
-            "code": stmt.excluded.code,
-            "title": stmt.excluded.title,
-            "description": stmt.excluded.description,
-            "domain_code": stmt.excluded.domain_code,
-            "criticality": stmt.excluded.criticality,
-            "weight": stmt.excluded.weight,
-            "evidence_expected": stmt.excluded.evidence_expected,
-            "default_status": stmt.excluded.default_status,
-            "default_score": stmt.excluded.default_score,
-            "is_active": True,
-        },
-    )
-    db.execute(stmt)
+    for chunk in batched(rows):
+        stmt = insert(ComplianceTenantControl).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "control_key"],
+            set_={
+                "code": stmt.excluded.code,
+                "title": stmt.excluded.title,
+                "description": stmt.excluded.description,
+                "domain_code": stmt.excluded.domain_code,
+                "criticality": stmt.excluded.criticality,
+                "weight": stmt.excluded.weight,
+                "evidence_expected": stmt.excluded.evidence_expected,
+                "default_status": stmt.excluded.default_status,
+                "default_score": stmt.excluded.default_score,
+                "is_active": True,
+            },
+        )
+        db.execute(stmt)
 
 
 def _upsert_control_refs(db: Session, rows: list[dict[str, Any]]) -> None:
-    if not rows:
-        return
-    stmt = insert(ComplianceTenantControlFrameworkRef).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["tenant_id", "control_key", "framework_key", "ref"],
-        set_={
-            "note": stmt.excluded.note,
-            "is_active": True,
-        },
-    )
-    db.execute(stmt)
+    for chunk in batched(rows):
+        stmt = insert(ComplianceTenantControlFrameworkRef).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "control_key", "framework_key", "ref"],
+            set_={
+                "note": stmt.excluded.note,
+                "is_active": True,
+            },
+        )
+        db.execute(stmt)
 
 
 def _upsert_profiles(db: Session, rows: list[dict[str, Any]]) -> None:
-    if not rows:
-        return
-    stmt = insert(ComplianceTenantLibraryProfile).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["tenant_id", "profile_key"],
-        set_={
-            "name": stmt.excluded.name,
-            "description": stmt.excluded.description,
-            "is_active": True,
-        },
-    )
-    db.execute(stmt)
+    for chunk in batched(rows):
+        stmt = insert(ComplianceTenantLibraryProfile).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "profile_key"],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "is_active": True,
+            },
+        )
+        db.execute(stmt)
 
 
 def _deactivate_missing(
@@ -0,0 +1,144 @@
+"""Progress store for question-import jobs.
+
+Jobs live in Redis as a hash (``import_job:<id>``) plus two list keys for
+warnings and created question ids, so progress updates touch single fields
+(``HSET``/``HINCRBY``/``RPUSH``) instead of rewriting a JSON blob. Scalar hash
+values are JSON-encoded to keep ``None``/bool/int round-trips lossless.
+
+When Redis is unavailable the same API is served from an in-process dict
+protected by a lock (single-worker deployments only).
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any
+
+JOB_TTL = 600  # seconds; refreshed on every write
+JOB_KEY_PREFIX = 'import_job:'
+
+_LIST_FIELDS = ('warnings', 'question_ids')
+
+_mem_jobs: dict[str, dict] = {}
+_mem_jobs_lock = threading.Lock()
+
+
+def _redis():
+    from app.core.redis_client import redis_client
+
+    return redis_client
+
+
+def job_key(job_id: str) -> str:
+    return f'{JOB_KEY_PREFIX}{job_id}'
+
+
+def _list_key(job_id: str, field: str) -> str:
+    return f'{job_key(job_id)}:{field}'
+
+
+def create_job(job_id: str, data: dict[str, Any]) -> None:
+    scalars = {k: v for k, v in data.items() if k not in _LIST_FIELDS}
+    client = _redis()
+    if client is not None:
+        pipe = client.pipeline()
+        pipe.delete(job_key(job_id), *(_list_key(job_id, f) for f in _LIST_FIELDS))
+        pipe.hset(job_key(job_id), mapping={k: json.dumps(v) for k, v in scalars.items()})
+        for field in _LIST_FIELDS:
+            values = data.get(field) or []
+            if values:
+                pipe.rpush(_list_key(job_id, field), *values)
+        _expire(pipe, job_id)
+        pipe.execute()
+        return
+    with _mem_jobs_lock:
+        _mem_jobs[job_id] = {
+            **scalars,
+            **{f: list(data.get(f) or []) for f in _LIST_FIELDS},
+            '_ts': time.monotonic(),
+        }
+    _prune_mem_jobs()
+
+
+def read_job(job_id: str) -> dict[str, Any] | None:
+    client = _redis()
+    if client is not None:
+        pipe = client.pipeline()
+        pipe.hgetall(job_key(job_id))
+        for field in _LIST_FIELDS:
+            pipe.lrange(_list_key(job_id, field), 0, -1)
+        raw, *lists = pipe.execute()
+        if not raw:
+            return None
+        job = {k: json.loads(v) for k, v in raw.items()}
+        job.update(zip(_LIST_FIELDS, lists, strict=True))
+        return job
+    with _mem_jobs_lock:
+        job = _mem_jobs.get(job_id)
+        return {**job, **{f: list(job[f]) for f in _LIST_FIELDS}} if job else None
+
+
+def read_job_field(job_id: str, field: str) -> Any:
+    client = _redis()
+    if client is not None:
+        raw = client.hget(job_key(job_id), field)
+        return json.loads(raw) if raw is not None else None
+    with _mem_jobs_lock:
+        job = _mem_jobs.get(job_id)
+        return job.get(field) if job else None
+
+
+def update_job(
+    job_id: str,
+    *,
+    incr: dict[str, int] | None = None,
+    append: dict[str, list[str]] | None = None,
+    **fields: Any,
+) -> None:
+    """Set scalar fields, increment counters and append to list fields in one round-trip."""
+    client = _redis()
+    if client is not None:
+        if not client.exists(job_key(job_id)):
+            return
+        pipe = client.pipeline()
+        if fields:
+            pipe.hset(job_key(job_id), mapping={k: json.dumps(v) for k, v in fields.items()})
+        for field, amount in (incr or {}).items():
+            pipe.hincrby(job_key(job_id), field, amount)
+        for field, values in (append or {}).items():
+            if values:
+                pipe.rpush(_list_key(job_id, field), *values)
+        _expire(pipe, job_id)
+        pipe.execute()
+        return
+    with _mem_jobs_lock:
+        job = _mem_jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        for field, amount in (incr or {}).items():
+            job[field] = int(job.get(field) or 0) + amount
+        for field, values in (append or {}).items():
+            job[field].extend(values)
+        job['_ts'] = time.monotonic()
+
+
+def is_cancel_requested(job_id: str) -> bool:
+    return bool(read_job_field(job_id, 'cancel_requested'))
+
+
+def _expire(pipe, job_id: str) -> None:
+    pipe.expire(job_key(job_id), JOB_TTL)
+    for field in _LIST_FIELDS:
+        pipe.expire(_list_key(job_id, field), JOB_TTL)
+
+
+def _prune_mem_jobs() -> None:
+    now = time.monotonic()
+    with _mem_jobs_lock:
+        stale = [
+            jid for jid, j in _mem_jobs.items() if j.get('status') != 'running' and now - j.get('_ts', now) > JOB_TTL
+        ]
+        for jid in stale:
+            del _mem_jobs[jid]
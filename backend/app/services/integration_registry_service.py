@@ -9,16 +9,24 @@ Every write operation:
 
 from __future__ import annotations
 
+import json
+import logging
+import threading
+import time
 import uuid
+from collections.abc import Sequence
 from datetime import datetime, timezone
 from typing import Any
 
 import os
 
-from sqlalchemy import func, or_, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Integer, String, column as sql_column, event, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.integration_registry import (
+    IrAuditHead,
     IrAuditLog,
     IrDictionary,
     IrDictionaryItem,
@@ -44,26 +52,57 @@ from app.schemas.integration_registry import (
     IrServiceCreate,
     IrServiceUpdate,
 )
-from app.utils.crypto_at_rest import KdfParams, decrypt_str, derive_key, encrypt_str, fingerprint_key, is_encrypted_value
+from app.utils.blind_index import derive_index_key, query_tokens, value_tokens
+from app.utils.crypto_at_rest import (
+    ColumnCipher,
+    KdfParams,
+    decrypt_str,
+    derive_key_pooled,
+    encrypt_str,
+    fingerprint_key,
+    is_encrypted_value,
+)
+from app.utils.json_patch import apply_patch, make_patch
 from app.utils.tenant_keyring import get_key, is_unlocked, lock_tenant, store_key
 
+logger = logging.getLogger(__name__)
+
 
 # ---------------------------------------------------------------------------
 # Internal audit helper
 # ---------------------------------------------------------------------------
 
+# Every AUDIT_KEYFRAME_INTERVAL-th version of an entity stores a full snapshot; the
+# versions in between store a JSON Patch against their predecessor.
+AUDIT_KEYFRAME_INTERVAL = 10
+
+
 def _write_audit(
     db: Session,
     *,
     tenant_id: uuid.UUID,
     entity_type: str,
     entity_id: uuid.UUID,
-    version: int,
     action: str,
     changed_by: uuid.UUID | None,
     change_reason: str,
     snapshot: dict[str, Any],
 ) -> None:
+    head = db.get(IrAuditHead, (tenant_id, entity_type, entity_id), with_for_update=True)
+    if head is None:
+        head = IrAuditHead(
+            tenant_id=tenant_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            version=0,
+            keyframe_version=0,
+            snapshot_json={},
+        )
+        db.add(head)
+    version = head.version + 1
+    keyframe = head.version == 0 or version - head.keyframe_version >= AUDIT_KEYFRAME_INTERVAL
+    # Round-trip through JSON so the stored base matches what JSONB hands back later.
+    snapshot = json.loads(json.dumps(snapshot, default=str))
     log = IrAuditLog(
         id=uuid.uuid4(),
         tenant_id=tenant_id,
@@ -74,29 +113,90 @@ def _write_audit(
         changed_by=changed_by,
         changed_at=datetime.now(timezone.utc),
         change_reason=change_reason,
-        snapshot_json=snapshot,
+        snapshot_json=snapshot if keyframe else {},
+        is_keyframe=keyframe,
+        patch_json=None if keyframe else make_patch(head.snapshot_json, snapshot),
     )
     db.add(log)
-
-
-def _next_audit_version(
-    db: Session,
-    *,
-    tenant_id: uuid.UUID,
-    entity_type: str,
-    entity_id: uuid.UUID,
-) -> int:
-    current = (
-        db.scalar(
-            select(func.max(IrAuditLog.version)).where(
-                IrAuditLog.tenant_id == tenant_id,
-                IrAuditLog.entity_type == entity_type,
-                IrAuditLog.entity_id == entity_id,
-            )
+    head.version = version
+    head.snapshot_json = snapshot
+    if keyframe:
+        head.keyframe_version = version
+    if entity_type in ("ir_service", "ir_connection"):
+        _mark_overview_stale(db, tenant_id)
+
+
+def _materialize_snapshots(db: Session, logs: list[IrAuditLog]) -> list[IrAuditLog]:
+    """Fill ``snapshot_json`` of delta rows by replaying patches from their nearest keyframe.
+
+    The reconstructed snapshots are set as committed state, so the session never writes them back.
+    """
+    deltas = [log for log in logs if not log.is_keyframe]
+    if not deltas:
+        return logs
+    ranges: dict[tuple[uuid.UUID, str, uuid.UUID], tuple[int, int]] = {}
+    for log in deltas:
+        entity = (log.tenant_id, log.entity_type, log.entity_id)
+        low, high = ranges.get(entity, (log.version, log.version))
+        ranges[entity] = (min(low, log.version), max(high, log.version))
+
+    # One round trip for the whole page: every entity's rows from its nearest keyframe
+    # at or below the lowest requested version up to the highest one.
+    wanted = values(
+        sql_column("tenant_id", PG_UUID(as_uuid=True)),
+        sql_column("entity_type", String()),
+        sql_column("entity_id", PG_UUID(as_uuid=True)),
+        sql_column("low", Integer()),
+        sql_column("high", Integer()),
+        name="wanted",
+    ).data([(*entity, low, high) for entity, (low, high) in ranges.items()])
+    keyframe = aliased(IrAuditLog)
+    start = (
+        select(func.max(keyframe.version))
+        .where(
+            keyframe.tenant_id == wanted.c.tenant_id,
+            keyframe.entity_type == wanted.c.entity_type,
+            keyframe.entity_id == wanted.c.entity_id,
+            keyframe.is_keyframe.is_(True),
+            keyframe.version <= wanted.c.low,
         )
-        or 0
+        .scalar_subquery()
     )
-    return int(current) + 1
+    rows = db.execute(
+        select(
+            IrAuditLog.tenant_id,
+            IrAuditLog.entity_type,
+            IrAuditLog.entity_id,
+            IrAuditLog.version,
+            IrAuditLog.is_keyframe,
+            IrAuditLog.snapshot_json,
+            IrAuditLog.patch_json,
+        )
+        .join(
+            wanted,
+            (IrAuditLog.tenant_id == wanted.c.tenant_id)
+            & (IrAuditLog.entity_type == wanted.c.entity_type)
+            & (IrAuditLog.entity_id == wanted.c.entity_id),
+        )
+        .where(IrAuditLog.version >= start, IrAuditLog.version <= wanted.c.high)
+        .order_by(
+            IrAuditLog.tenant_id, IrAuditLog.entity_type, IrAuditLog.entity_id, IrAuditLog.version
+        )
+    ).all()
+
+    states: dict[tuple[tuple[uuid.UUID, str, uuid.UUID], int], dict[str, Any]] = {}
+    state: dict[str, Any] = {}
+    for row in rows:
+        entity = (row.tenant_id, row.entity_type, row.entity_id)
+        # Rows arrive grouped by entity and each group starts at a keyframe, so the replay
+        # state resets on its own.
+        state = row.snapshot_json if row.is_keyframe else apply_patch(state, row.patch_json or [])
+        states[(entity, row.version)] = state
+
+    for log in deltas:
+        snapshot = states.get(((log.tenant_id, log.entity_type, log.entity_id), log.version), {})
+        set_committed_value(log, "snapshot_json", snapshot)
+    return logs
 
 
 KEY_ID = "integration_registry"
@@ -160,27 +260,164 @@ def get_tenant_key(tenant_id: uuid.UUID) -> bytes | None:
     return get_key(tenant_id, KEY_ID)
 
 
-def build_instance_read_data(instance: IrInstance, key: bytes | None) -> dict[str, Any]:
-    locked = key is None
-    tenant_id = instance.tenant_id
+def decrypt_column(
+    values: Sequence[str | None],
+    *,
+    tenant_id: uuid.UUID,
+    table: str,
+    column: str,
+    key: bytes,
+) -> list[str | None]:
+    """Batched ``_decrypt_value`` over one column: one cipher context and AAD for all values."""
+    out = list(values)
+    positions = [i for i, value in enumerate(values) if is_encrypted_value(value)]
+    if not positions:
+        return out
+    cipher = ColumnCipher(key, _aad(tenant_id, table, column))
+    plain = cipher.decrypt_many([values[i] for i in positions])
+    for i, value in zip(positions, plain):
+        out[i] = value
+    return out
+
+
+def _decrypt_rows(
+    rows: Sequence[Any],
+    columns: Sequence[str],
+    *,
+    table: str,
+    key: bytes | None,
+) -> dict[str, list[str | None]]:
+    """Column-wise decryption of ``rows``; returns ``column → values`` aligned with ``rows``."""
+    if key is None:
+        return {column: [None] * len(rows) for column in columns}
+    by_tenant: dict[uuid.UUID, list[int]] = {}
+    for i, row in enumerate(rows):
+        by_tenant.setdefault(row.tenant_id, []).append(i)
+    result: dict[str, list[str | None]] = {}
+    for column in columns:
+        out: list[str | None] = [None] * len(rows)
+        for tenant_id, indexes in by_tenant.items():
+            plain = decrypt_column(
+                [getattr(rows[i], column) for i in indexes],
+                tenant_id=tenant_id,
+                table=table,
+                column=column,
+                key=key,
+            )
+            for i, value in zip(indexes, plain):
+                out[i] = value
+        result[column] = out
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Blind-index search tokens
+# ---------------------------------------------------------------------------
+
+SEARCH_INDEXED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "ir_endpoint": ("fqdn", "ip", "base_path"),
+    "ir_route_hop": ("label", "proxy_chain"),
+}
+SEARCH_REBUILD_BATCH_SIZE = 500
+
+
+def _search_tokens_many(rows: Sequence[IrEndpoint | IrRouteHop], *, key: bytes) -> list[list[str]]:
+    """Tokens for each row's encrypted columns; values that do not decrypt under ``key`` add none."""
+    if not rows:
+        return []
+    table = rows[0].__tablename__
+    columns = SEARCH_INDEXED_COLUMNS[table]
+    index_key = derive_index_key(key)
+    plain = _decrypt_rows(rows, columns, table=table, key=key)
+    result: list[list[str]] = []
+    for i in range(len(rows)):
+        tokens: set[str] = set()
+        for column in columns:
+            tokens |= value_tokens(index_key, f"{table}.{column}", plain[column][i])
+        result.append(sorted(tokens))
+    return result
+
+
+def _search_tokens(row: IrEndpoint | IrRouteHop, *, key: bytes) -> list[str]:
+    return _search_tokens_many([row], key=key)[0]
+
+
+def _search_token_match(model: type[IrEndpoint] | type[IrRouteHop], search: str, *, key: bytes):
+    table = model.__tablename__
+    index_key = derive_index_key(key)
+    exact: list[str] = []
+    clauses = []
+    for column in SEARCH_INDEXED_COLUMNS[table]:
+        tokens = query_tokens(index_key, f"{table}.{column}", search)
+        if tokens is None:
+            continue
+        exact.append(tokens.exact)
+        clauses.append(model.search_tokens.contains(list(tokens.required)))
+    if not exact:
+        return None
+    return or_(model.search_tokens.overlap(exact), *clauses)
 
-    def dec(value: str | None, table: str, column: str) -> str | None:
-        if locked:
-            return None
-        return _decrypt_value(value, tenant_id=tenant_id, table=table, column=column, key=key)
 
-    endpoints: list[dict[str, Any]] = []
-    for ep in instance.endpoints or []:
-        endpoints.append(
+def rebuild_search_tokens(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    key: bytes,
+    only_missing: bool = False,
+) -> int:
+    """Recompute blind-index tokens for the tenant's endpoints and route hops under ``key``.
+
+    ``only_missing`` limits the pass to rows never indexed (e.g. created before the index existed).
+    """
+    rebuilt = 0
+    for model in (IrEndpoint, IrRouteHop):
+        last_id: uuid.UUID | None = None
+        while True:
+            q = select(model).where(model.tenant_id == tenant_id)
+            if only_missing:
+                q = q.where(model.search_tokens.is_(None))
+            if last_id is not None:
+                q = q.where(model.id > last_id)
+            rows = list(db.scalars(q.order_by(model.id).limit(SEARCH_REBUILD_BATCH_SIZE)))
+            if not rows:
+                break
+            tokens = _search_tokens_many(rows, key=key)
+            db.execute(
+                update(model),
+                [{"id": row.id, "search_tokens": row_tokens} for row, row_tokens in zip(rows, tokens)],
+            )
+            rebuilt += len(rows)
+            last_id = rows[-1].id
+    db.expire_all()
+    return rebuilt
+
+
+def build_instances_read_data(
+    instances: Sequence[IrInstance], key: bytes | None
+) -> list[dict[str, Any]]:
+    locked = key is None
+    endpoints = [ep for inst in instances for ep in inst.endpoints or []]
+    route_hops = [rh for inst in instances for rh in inst.route_hops or []]
+    inst_plain = _decrypt_rows(
+        instances, ("contact", "vault_ref", "notes"), table="ir_instance", key=key
+    )
+    ep_plain = _decrypt_rows(endpoints, ("fqdn", "ip", "base_path"), table="ir_endpoint", key=key)
+    rh_plain = _decrypt_rows(
+        route_hops, ("label", "proxy_chain", "notes"), table="ir_route_hop", key=key
+    )
+
+    endpoint_data: dict[uuid.UUID, list[dict[str, Any]]] = {}
+    for i, ep in enumerate(endpoints):
+        endpoint_data.setdefault(ep.instance_id, []).append(
             {
                 "id": ep.id,
                 "instance_id": ep.instance_id,
                 "tenant_id": ep.tenant_id,
-                "fqdn": dec(ep.fqdn, "ir_endpoint", "fqdn"),
-                "ip": dec(ep.ip, "ir_endpoint", "ip"),
+                "fqdn": ep_plain["fqdn"][i],
+                "ip": ep_plain["ip"][i],
                 "port": ep.port,
                 "protocol": ep.protocol,
-                "base_path": dec(ep.base_path, "ir_endpoint", "base_path"),
+                "base_path": ep_plain["base_path"][i],
                 "is_public": ep.is_public,
                 "is_primary": ep.is_primary,
                 "sort_order": ep.sort_order,
@@ -189,79 +426,99 @@ def build_instance_read_data(instance: IrInstance, key: bytes | None) -> dict[st
             }
         )
 
-    route_hops: list[dict[str, Any]] = []
-    for rh in instance.route_hops or []:
-        route_hops.append(
+    route_hop_data: dict[uuid.UUID, list[dict[str, Any]]] = {}
+    for i, rh in enumerate(route_hops):
+        route_hop_data.setdefault(rh.instance_id, []).append(
             {
                 "id": rh.id,
                 "instance_id": rh.instance_id,
                 "tenant_id": rh.tenant_id,
                 "direction": rh.direction,
                 "hop_order": rh.hop_order,
-                "label": dec(rh.label, "ir_route_hop", "label"),
-                "proxy_chain": dec(rh.proxy_chain, "ir_route_hop", "proxy_chain"),
-                "notes": dec(rh.notes, "ir_route_hop", "notes"),
+                "label": rh_plain["label"][i],
+                "proxy_chain": rh_plain["proxy_chain"][i],
+                "notes": rh_plain["notes"][i],
                 "created_at": rh.created_at,
             }
         )
 
-    return {
-        "id": instance.id,
-        "tenant_id": instance.tenant_id,
-        "service_id": instance.service_id,
-        "service_name": instance.service.name if instance.service else None,
-        "env": instance.env,
-        "datacenter": instance.datacenter,
-        "network_zone": instance.network_zone,
-        "status": instance.status,
-        "contact": dec(instance.contact, "ir_instance", "contact"),
-        "vault_ref": dec(instance.vault_ref, "ir_instance", "vault_ref"),
-        "type_settings_json": instance.type_settings_json,
-        "tags": instance.tags,
-        "notes": dec(instance.notes, "ir_instance", "notes"),
-        "version": instance.version,
-        "created_at": instance.created_at,
-        "updated_at": instance.updated_at,
-        "created_by": instance.created_by,
-        "updated_by": instance.updated_by,
-        "endpoints": endpoints,
-        "route_hops": route_hops,
-        "encryption_locked": locked,
-    }
+    return [
+        {
+            "id": instance.id,
+            "tenant_id": instance.tenant_id,
+            "service_id": instance.service_id,
+            "service_name": instance.service.name if instance.service else None,
+            "env": instance.env,
+            "datacenter": instance.datacenter,
+            "network_zone": instance.network_zone,
+            "status": instance.status,
+            "contact": inst_plain["contact"][i],
+            "vault_ref": inst_plain["vault_ref"][i],
+            "type_settings_json": instance.type_settings_json,
+            "tags": instance.tags,
+            "notes": inst_plain["notes"][i],
+            "version": instance.version,
+            "created_at": instance.created_at,
+            "updated_at": instance.updated_at,
+            "created_by": instance.created_by,
+            "updated_by": instance.updated_by,
+            "endpoints": endpoint_data.get(instance.id, []),
+            "route_hops": route_hop_data.get(instance.id, []),
+            "encryption_locked": locked,
+        }
+        for i, instance in enumerate(instances)
+    ]
 
 
-def build_instance_list_item_data(instance: IrInstance, key: bytes | None) -> dict[str, Any]:
-    locked = key is None
-    tenant_id = instance.tenant_id
+def build_instance_read_data(instance: IrInstance, key: bytes | None) -> dict[str, Any]:
+    return build_instances_read_data([instance], key)[0]
 
-    def dec(value: str | None, table: str, column: str) -> str | None:
-        if locked:
-            return None
-        return _decrypt_value(value, tenant_id=tenant_id, table=table, column=column, key=key)
 
-    primary_endpoint = None
-    if not locked:
+def build_instance_list_items_data(
+    instances: Sequence[IrInstance], key: bytes | None
+) -> list[dict[str, Any]]:
+    locked = key is None
+    primaries: list[IrEndpoint | None] = []
+    for instance in instances:
         eps = instance.endpoints or []
-        primary = next((e for e in eps if e.is_primary), None) or (eps[0] if eps else None)
-        if primary:
-            host = dec(primary.fqdn, "ir_endpoint", "fqdn") or dec(primary.ip, "ir_endpoint", "ip") or ""
-            primary_endpoint = f"{host}:{primary.port}" if primary.port else host
+        primaries.append(next((e for e in eps if e.is_primary), None) or (eps[0] if eps else None))
+
+    primary_endpoints: list[str | None] = [None] * len(instances)
+    if not locked:
+        with_primary = [(i, ep) for i, ep in enumerate(primaries) if ep is not None]
+        rows = [ep for _, ep in with_primary]
+        fqdns = _decrypt_rows(rows, ("fqdn",), table="ir_endpoint", key=key)["fqdn"]
+        # The IP is only shown when there is no FQDN, so only those rows decrypt it.
+        ip_rows = [n for n, fqdn in enumerate(fqdns) if not fqdn]
+        ips = _decrypt_rows([rows[n] for n in ip_rows], ("ip",), table="ir_endpoint", key=key)["ip"]
+        ip_by_row = dict(zip(ip_rows, ips))
+        for n, (i, primary) in enumerate(with_primary):
+            host = fqdns[n] or ip_by_row.get(n) or ""
+            primary_endpoints[i] = f"{host}:{primary.port}" if primary.port else host
+
+    return [
+        {
+            "id": instance.id,
+            "tenant_id": instance.tenant_id,
+            "service_id": instance.service_id,
+            "service_name": instance.service.name if instance.service else None,
+            "env": instance.env,
+            "datacenter": instance.datacenter,
+            "network_zone": instance.network_zone,
+            "status": instance.status,
+            "primary_endpoint": primary_endpoints[i],
+            "version": instance.version,
+            "updated_at": instance.updated_at,
+            "updated_by": instance.updated_by,
+            "encryption_locked": locked,
+        }
+        for i, instance in enumerate(instances)
+    ]
+
+
+def build_instance_list_item_data(instance: IrInstance, key: bytes | None) -> dict[str, Any]:
+    return build_instance_list_items_data([instance], key)[0]
 
-    return {
-        "id": instance.id,
-        "tenant_id": instance.tenant_id,
-        "service_id": instance.service_id,
-        "service_name": instance.service.name if instance.service else None,
-        "env": instance.env,
-        "datacenter": instance.datacenter,
-        "network_zone": instance.network_zone,
-        "status": instance.status,
-        "primary_endpoint": primary_endpoint,
-        "version": instance.version,
-        "updated_at": instance.updated_at,
-        "updated_by": instance.updated_by,
-        "encryption_locked": locked,
-    }
 
 def get_crypto_record(db: Session, *, tenant_id: uuid.UUID) -> IrTenantCrypto | None:
     return db.scalar(
@@ -286,7 +543,7 @@ def unlock_tenant_key(
     record = get_crypto_record(db, tenant_id=tenant_id)
     if record is None or reinitialize:
         salt = os.urandom(16)
-        key = derive_key(passphrase, salt, KDF_DEFAULTS)
+        key = derive_key_pooled(passphrase, salt, KDF_DEFAULTS)
         fingerprint = fingerprint_key(key)
         if record is None:
             record = IrTenantCrypto(
@@ -303,6 +560,9 @@ def unlock_tenant_key(
             record.key_fingerprint = fingerprint
             record.kdf_params_json = KDF_DEFAULTS.as_json()
             record.updated_by = user_id
+            db.flush()
+            # Tokens derive from the key, so a new key invalidates every existing one.
+            rebuild_search_tokens(db, tenant_id=tenant_id, key=key)
         db.flush()
         store_key(tenant_id, KEY_ID, key)
         return record
@@ -312,9 +572,10 @@ def unlock_tenant_key(
         kdf_params = KdfParams(**params)
     except Exception:
         kdf_params = KDF_DEFAULTS
-    key = derive_key(passphrase, record.kdf_salt, kdf_params)
+    key = derive_key_pooled(passphrase, record.kdf_salt, kdf_params)
     if fingerprint_key(key) != record.key_fingerprint:
         raise InvalidEncryptionKeyError("Invalid encryption key")
+    rebuild_search_tokens(db, tenant_id=tenant_id, key=key, only_missing=True)
     store_key(tenant_id, KEY_ID, key)
     return record
 
@@ -460,7 +721,6 @@ def create_service(
         tenant_id=tenant_id,
         entity_type="ir_service",
         entity_id=svc.id,
-        version=1,
         action="create",
         changed_by=user_id,
         change_reason=payload.change_reason,
@@ -491,18 +751,11 @@ def update_service(
         service.tags = payload.tags
     service.updated_by = user_id
     db.flush()
-    version = _next_audit_version(
-        db,
-        tenant_id=service.tenant_id,
-        entity_type="ir_service",
-        entity_id=service.id,
-    )
     _write_audit(
         db,
         tenant_id=service.tenant_id,
         entity_type="ir_service",
         entity_id=service.id,
-        version=version,
         action="update",
         changed_by=user_id,
         change_reason=payload.change_reason,
@@ -549,13 +802,24 @@ def list_instances(
         )
     if search:
         pattern = f"%{search.lower()}%"
-        q = q.where(
-            or_(
-                func.lower(IrService.name).like(pattern),
-                func.lower(IrInstance.datacenter).like(pattern),
-                func.lower(IrInstance.network_zone).like(pattern),
-            )
-        )
+        matches = [
+            func.lower(IrService.name).like(pattern),
+            func.lower(IrInstance.datacenter).like(pattern),
+            func.lower(IrInstance.network_zone).like(pattern),
+        ]
+        # Encrypted endpoint/route-hop fields are searchable through their blind indexes
+        # while the tenant key is unlocked.
+        key = get_tenant_key(tenant_id)
+        if key is not None:
+            for model in (IrEndpoint, IrRouteHop):
+                token_match = _search_token_match(model, search, key=key)
+                if token_match is not None:
+                    matches.append(
+                        IrInstance.id.in_(
+                            select(model.instance_id).where(model.tenant_id == tenant_id, token_match)
+                        )
+                    )
+        q = q.where(or_(*matches))
 
     count_q = select(func.count()).select_from(q.subquery())
     total = db.scalar(count_q) or 0
@@ -626,7 +890,6 @@ def create_instance(
         tenant_id=tenant_id,
         entity_type="ir_connection",
         entity_id=inst.id,
-        version=1,
         action="create",
         changed_by=user_id,
         change_reason=payload.change_reason,
@@ -706,7 +969,6 @@ def update_instance(
         tenant_id=instance.tenant_id,
         entity_type="ir_connection",
         entity_id=instance.id,
-        version=instance.version,
         action="update",
         changed_by=user_id,
         change_reason=payload.change_reason,
@@ -792,7 +1054,6 @@ def clone_instance_to_prod(
         tenant_id=new_inst.tenant_id,
         entity_type="ir_connection",
         entity_id=new_inst.id,
-        version=1,
         action="create",
         changed_by=user_id,
         change_reason=change_reason,
@@ -833,6 +1094,7 @@ def _add_endpoint(
         is_primary=payload.is_primary,
         sort_order=sort_order,
     )
+    ep.search_tokens = _search_tokens(ep, key=key)
     db.add(ep)
     return ep
 
@@ -867,6 +1129,7 @@ def update_endpoint(
             )
         else:
             setattr(endpoint, field, value)
+    endpoint.search_tokens = _search_tokens(endpoint, key=key)
     db.flush()
     return endpoint
 
@@ -919,6 +1182,7 @@ def _add_route_hop(
             payload.notes, tenant_id=instance.tenant_id, table="ir_route_hop", column="notes", key=key
         ),
     )
+    rh.search_tokens = _search_tokens(rh, key=key)
     db.add(rh)
     return rh
 
@@ -959,6 +1223,7 @@ def update_route_hop(
             )
         else:
             setattr(route_hop, field, value)
+    route_hop.search_tokens = _search_tokens(route_hop, key=key)
     db.flush()
     return route_hop
 
@@ -1003,7 +1268,7 @@ def list_audit_log(
 
     total = db.scalar(select(func.count()).select_from(q.subquery())) or 0
     q = q.order_by(IrAuditLog.changed_at.desc()).offset((page - 1) * page_size).limit(page_size)
-    return list(db.scalars(q).all()), total
+    return _materialize_snapshots(db, list(db.scalars(q).all())), total
 
 
 def get_instance_history(
@@ -1012,7 +1277,7 @@ def get_instance_history(
     instance_id: uuid.UUID,
     tenant_id: uuid.UUID,
 ) -> list[IrAuditLog]:
-    return list(
+    logs = list(
         db.scalars(
             select(IrAuditLog)
             .where(
@@ -1023,6 +1288,31 @@ def get_instance_history(
             .order_by(IrAuditLog.version.desc())
         ).all()
     )
+    return _materialize_snapshots(db, logs)
+
+
+def get_instance_version(
+    db: Session,
+    *,
+    instance_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    version: int,
+) -> IrAuditLog | None:
+    """One point-in-time audit record; replays at most AUDIT_KEYFRAME_INTERVAL patches."""
+    log = db.scalar(
+        select(IrAuditLog)
+        .where(
+            IrAuditLog.tenant_id == tenant_id,
+            IrAuditLog.entity_type.in_(["ir_connection", "ir_instance"]),
+            IrAuditLog.entity_id == instance_id,
+            IrAuditLog.version == version,
+        )
+        .order_by(IrAuditLog.changed_at.desc())
+        .limit(1)
+    )
+    if log is None:
+        return None
+    return _materialize_snapshots(db, [log])[0]
 
 
 # ---------------------------------------------------------------------------
@@ -1153,51 +1443,132 @@ def save_grid_prefs(
 # Overview / dashboard
 # ---------------------------------------------------------------------------
 
-def get_overview(db: Session, *, tenant_id: uuid.UUID) -> IrOverview:
-    instances = list(
-        db.scalars(
-            select(IrInstance)
-            .options(selectinload(IrInstance.service))
-            .where(IrInstance.tenant_id == tenant_id)
-        ).all()
-    )
-    total = len(instances)
-    uat_count = sum(1 for i in instances if i.env == "UAT")
-    prod_count = sum(1 for i in instances if i.env == "PROD")
-    draft_count = sum(1 for i in instances if i.status == "draft")
-    active_count = sum(1 for i in instances if i.status == "active")
+OVERVIEW_CACHE_TTL_SECONDS = 30
+_OVERVIEW_KEY_PREFIX = "ir_overview:"
+_OVERVIEW_STALE_KEY = "ir_overview_stale"
+_overview_cache_lock = threading.Lock()
+_overview_cache: dict[uuid.UUID, tuple[float, IrOverview]] = {}
 
-    service_count = db.scalar(
-        select(func.count(IrService.id)).where(IrService.tenant_id == tenant_id)
-    ) or 0
 
-    recent_instances = list(
-        db.scalars(
-            select(IrInstance)
-            .options(selectinload(IrInstance.service))
-            .where(IrInstance.tenant_id == tenant_id)
-            .order_by(IrInstance.updated_at.desc())
-            .limit(5)
-        ).all()
+def _redis():
+    from app.core.redis_client import redis_client
+
+    return redis_client
+
+
+def _cached_overview(tenant_id: uuid.UUID) -> IrOverview | None:
+    client = _redis()
+    if client is not None:
+        try:
+            raw = client.get(f"{_OVERVIEW_KEY_PREFIX}{tenant_id}")
+            return IrOverview.model_validate_json(raw) if raw else None
+        except Exception as exc:  # noqa: BLE001 - fall back to the database
+            logger.warning("Could not read cached IR overview: %s", exc)
+            return None
+    with _overview_cache_lock:
+        entry = _overview_cache.get(tenant_id)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _store_overview(tenant_id: uuid.UUID, overview: IrOverview) -> None:
+    client = _redis()
+    if client is not None:
+        try:
+            client.set(
+                f"{_OVERVIEW_KEY_PREFIX}{tenant_id}",
+                overview.model_dump_json(),
+                ex=OVERVIEW_CACHE_TTL_SECONDS,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not cache IR overview: %s", exc)
+        return
+    with _overview_cache_lock:
+        _overview_cache[tenant_id] = (time.monotonic() + OVERVIEW_CACHE_TTL_SECONDS, overview)
+
+
+def invalidate_overview(tenant_id: uuid.UUID) -> None:
+    with _overview_cache_lock:
+        _overview_cache.pop(tenant_id, None)
+    client = _redis()
+    if client is not None:
+        try:
+            client.delete(f"{_OVERVIEW_KEY_PREFIX}{tenant_id}")
+        except Exception as exc:  # noqa: BLE001 - the TTL bounds staleness
+            logger.warning("Could not invalidate cached IR overview: %s", exc)
+
+
+def _mark_overview_stale(db: Session, tenant_id: uuid.UUID) -> None:
+    # Dropped after commit: dropping earlier would let a concurrent read re-cache pre-commit data.
+    db.info.setdefault(_OVERVIEW_STALE_KEY, set()).add(tenant_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_overviews(session: Session) -> None:
+    for tenant_id in session.info.pop(_OVERVIEW_STALE_KEY, ()):
+        invalidate_overview(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_overviews(session: Session) -> None:
+    session.info.pop(_OVERVIEW_STALE_KEY, None)
+
+
+def get_overview(db: Session, *, tenant_id: uuid.UUID) -> IrOverview:
+    cached = _cached_overview(tenant_id)
+    if cached is not None:
+        return cached
+
+    service_count = (
+        select(func.count(IrService.id)).where(IrService.tenant_id == tenant_id).scalar_subquery()
     )
+    counts = db.execute(
+        select(
+            func.count(IrInstance.id).label("total"),
+            func.count(IrInstance.id).filter(IrInstance.env == "UAT").label("uat_count"),
+            func.count(IrInstance.id).filter(IrInstance.env == "PROD").label("prod_count"),
+            func.count(IrInstance.id).filter(IrInstance.status == "draft").label("draft_count"),
+            func.count(IrInstance.id).filter(IrInstance.status == "active").label("active_count"),
+            service_count.label("service_count"),
+        ).where(IrInstance.tenant_id == tenant_id)
+    ).one()
+
+    # Served by ix_ir_instance_tenant_updated (tenant_id, updated_at DESC).
+    recent_rows = db.execute(
+        select(
+            IrInstance.id,
+            IrInstance.env,
+            IrInstance.status,
+            IrInstance.updated_at,
+            IrInstance.updated_by,
+            IrService.name.label("service_name"),
+        )
+        .join(IrService, IrService.id == IrInstance.service_id)
+        .where(IrInstance.tenant_id == tenant_id)
+        .order_by(IrInstance.updated_at.desc())
+        .limit(5)
+    ).all()
     recently_changed: list[IrOverviewRecentItem] = [
         IrOverviewRecentItem(
-            instance_id=i.id,
-            service_name=i.service.name if i.service else "",
-            env=i.env,
-            status=i.status,
-            changed_at=i.updated_at,
-            changed_by=i.updated_by,
+            instance_id=row.id,
+            service_name=row.service_name or "",
+            env=row.env,
+            status=row.status,
+            changed_at=row.updated_at,
+            changed_by=row.updated_by,
         )
-        for i in recent_instances
+        for row in recent_rows
     ]
 
-    return IrOverview(
-        total=total,
-        uat_count=uat_count,
-        prod_count=prod_count,
-        draft_count=draft_count,
-        active_count=active_count,
-        service_count=service_count,
+    overview = IrOverview(
+        total=counts.total,
+        uat_count=counts.uat_count,
+        prod_count=counts.prod_count,
+        draft_count=counts.draft_count,
+        active_count=counts.active_count,
+        service_count=counts.service_count or 0,
         recently_changed=recently_changed,
     )
+    _store_overview(tenant_id, overview)
+    return overview
@@ -0,0 +1,455 @@
+"""Classical item analysis for assessment test versions.
+
+Every scored attempt adds to running sufficient statistics instead of being
+re-read on each request:
+
+* per version (``assessment_version_stats``): N, sum(X), sum(X^2) where X is the
+  attempt's number-correct score;
+* per question (``assessment_item_stats``): correct count c, sum(X) over the
+  attempts that got it right (S), omissions and per-option selection counts.
+
+From these, p-values, item-rest point-biserial correlations, distractor
+selection rates and KR-20 are closed-form, O(items) per version:
+
+    p     = c / N
+    r_ir  = cov(x, X - x) / sqrt(var(x) * var(X - x)),
+            with  sum(X - x) = sum(X) - c,  sum((X - x)^2) = sum(X^2) - 2S + c,
+                  sum(x * (X - x)) = S - c
+    KR-20 = k / (k - 1) * (1 - sum(p * q) / var(X))
+
+``submit_attempt`` calls ``record_attempt`` (one UPDATE plus one multi-row
+upsert). Versions that predate the tables, or were never analysed, are rebuilt
+from their attempts once by a background task queued after commit. Results are
+cached per tenant/version (LRU-bounded) and revalidated against the version
+row's ``(attempt_count, updated_at)``.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, set_tenant_id
+from app.models.assessment import (
+    AssessmentAttempt,
+    AssessmentAttemptAnswer,
+    AssessmentDelivery,
+    AssessmentItemStats,
+    AssessmentTestVersionQuestion,
+    AssessmentVersionStats,
+)
+
+logger = logging.getLogger(__name__)
+
+# Review flags, applied once an item has at least MIN_FLAG_RESPONSES responses.
+MIN_FLAG_RESPONSES = 10
+TOO_EASY_P = 0.9
+TOO_HARD_P = 0.2
+LOW_DISCRIMINATION_R = 0.2
+
+ITEM_ANALYSIS_CACHE_MAX_ENTRIES = 512
+REBUILD_DEBOUNCE_SECONDS = 300
+
+_PENDING_REBUILDS_KEY = 'item_analysis_pending_rebuilds'
+
+_cache_lock = threading.Lock()
+_CacheEntry = tuple[tuple[int, datetime | None], dict[str, Any]]
+_cache: OrderedDict[tuple[str, uuid.UUID], _CacheEntry] = OrderedDict()
+
+
+@dataclass
+class ItemResponse:
+    item_id: uuid.UUID  # AssessmentTestVersionQuestion.id
+    is_correct: bool
+    selected_keys: Sequence[str] = ()
+
+
+@dataclass
+class _ItemAccumulator:
+    response_count: int = 0
+    correct_count: int = 0
+    omitted_count: int = 0
+    correct_score_sum: float = 0.0
+    option_counts: dict[str, int] = field(default_factory=dict)
+
+    def add(self, response: ItemResponse, score: int) -> None:
+        self.response_count += 1
+        if response.is_correct:
+            self.correct_count += 1
+            self.correct_score_sum += score
+        if not response.selected_keys:
+            self.omitted_count += 1
+        for key in set(response.selected_keys):
+            self.option_counts[key] = self.option_counts.get(key, 0) + 1
+
+
+def _version_lock(db: Session, test_version_id: uuid.UUID) -> None:
+    """Serialise (re)builds of one version's statistics for the rest of the transaction."""
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(str(test_version_id), 0))))
+
+
+def _increment_version(db: Session, test_version_id: uuid.UUID, score: int) -> bool:
+    result = db.execute(
+        update(AssessmentVersionStats)
+        .where(AssessmentVersionStats.test_version_id == test_version_id)
+        .values(
+            attempt_count=AssessmentVersionStats.attempt_count + 1,
+            score_sum=AssessmentVersionStats.score_sum + score,
+            score_sq_sum=AssessmentVersionStats.score_sq_sum + score * score,
+            updated_at=func.now(),
+        )
+    )
+    return bool(result.rowcount)
+
+
+def _upsert_items(db: Session, test_version_id: uuid.UUID, items: dict[uuid.UUID, _ItemAccumulator]) -> None:
+    if not items:
+        return
+    stmt = insert(AssessmentItemStats).values(
+        [
+            {
+                'test_version_question_id': item_id,
+                'test_version_id': test_version_id,
+                'response_count': acc.response_count,
+                'correct_count': acc.correct_count,
+                'omitted_count': acc.omitted_count,
+                'correct_score_sum': acc.correct_score_sum,
+                'option_counts': acc.option_counts,
+            }
+            for item_id, acc in items.items()
+        ]
+    )
+    table = AssessmentItemStats
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.test_version_question_id],
+            set_={
+                'response_count': table.response_count + stmt.excluded.response_count,
+                'correct_count': table.correct_count + stmt.excluded.correct_count,
+                'omitted_count': table.omitted_count + stmt.excluded.omitted_count,
+                'correct_score_sum': table.correct_score_sum + stmt.excluded.correct_score_sum,
+                'option_counts': func.assessment_merge_counts(table.option_counts, stmt.excluded.option_counts),
+                'updated_at': func.now(),
+            },
+        )
+    )
+
+
+def record_attempt(db: Session, *, test_version_id: uuid.UUID, responses: Iterable[ItemResponse]) -> None:
+    """Fold one freshly scored attempt (already flushed as ``scored``) into the running statistics.
+
+    A version without statistics yet is left to ``run_rebuild``, queued once this
+    transaction commits; the rebuild counts this attempt along with the older ones.
+    The version lock makes this wait for an in-flight rebuild, whose snapshot cannot see
+    this uncommitted attempt, so the UPDATE then finds the rebuilt row and counts it.
+    """
+    responses = list(responses)
+    score = sum(1 for r in responses if r.is_correct)
+    _version_lock(db, test_version_id)
+    if not _increment_version(db, test_version_id, score):
+        tenant_key = db.scalar(select(func.current_setting('app.tenant_id')))
+        db.info.setdefault(_PENDING_REBUILDS_KEY, set()).add((tenant_key, test_version_id))
+        return
+    items: dict[uuid.UUID, _ItemAccumulator] = {}
+    for response in responses:
+        items.setdefault(response.item_id, _ItemAccumulator()).add(response, score)
+    _upsert_items(db, test_version_id, items)
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_pending_rebuilds(session: Session) -> None:
+    for tenant_key, test_version_id in session.info.pop(_PENDING_REBUILDS_KEY, ()):
+        schedule_rebuild(tenant_key, test_version_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_pending_rebuilds(session: Session) -> None:
+    session.info.pop(_PENDING_REBUILDS_KEY, None)
+
+
+def _rebuild_debounce_key(test_version_id: uuid.UUID) -> str:
+    return f'item-analysis:rebuild:{test_version_id}'
+
+
+def schedule_rebuild(tenant_id: str, test_version_id: uuid.UUID) -> None:
+    """Queue ``run_rebuild`` for a version, at most once per debounce window with Redis."""
+    from app.core.redis_client import redis_client
+
+    try:
+        if redis_client is not None:
+            key = _rebuild_debounce_key(test_version_id)
+            if not redis_client.set(key, '1', nx=True, ex=REBUILD_DEBOUNCE_SECONDS):
+                return
+        from app.tasks.assessments import rebuild_item_statistics
+
+        rebuild_item_statistics.delay(
+            tenant_id=str(tenant_id), test_version_id=str(test_version_id)
+        )
+    except Exception:
+        logger.warning(
+            'Could not queue item statistics rebuild for version %s', test_version_id, exc_info=True
+        )
+
+
+def run_rebuild(*, tenant_id: uuid.UUID, test_version_id: uuid.UUID) -> None:
+    """Background backfill of a version's statistics (Celery)."""
+    db = SessionLocal()
+    try:
+        set_tenant_id(db, str(tenant_id))
+        rebuild_statistics(db, test_version_id=test_version_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        _clear_rebuild_debounce(test_version_id)
+
+
+def _clear_rebuild_debounce(test_version_id: uuid.UUID) -> None:
+    """Let the next version without statistics queue a rebuild without waiting out the window."""
+    from app.core.redis_client import redis_client
+
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(_rebuild_debounce_key(test_version_id))
+    except Exception:
+        logger.warning('Could not clear the rebuild debounce for version %s', test_version_id)
+
+
+def rebuild_statistics(db: Session, *, test_version_id: uuid.UUID) -> None:
+    """Recompute a version's statistics from all of its scored attempts in one streaming pass."""
+    _version_lock(db, test_version_id)
+    default_order = [
+        str(item_id)
+        for item_id in db.scalars(
+            select(AssessmentTestVersionQuestion.id)
+            .where(AssessmentTestVersionQuestion.test_version_id == test_version_id)
+            .order_by(AssessmentTestVersionQuestion.order_index)
+        )
+    ]
+    valid_ids = set(default_order)
+
+    rows = db.execute(
+        select(
+            AssessmentAttempt.id,
+            AssessmentAttempt.question_order,
+            AssessmentAttemptAnswer.question_index,
+            AssessmentAttemptAnswer.selected_option_keys,
+            AssessmentAttemptAnswer.is_correct,
+        )
+        .join(AssessmentDelivery, AssessmentDelivery.id == AssessmentAttempt.delivery_id)
+        .outerjoin(AssessmentAttemptAnswer, AssessmentAttemptAnswer.attempt_id == AssessmentAttempt.id)
+        .where(
+            AssessmentDelivery.test_version_id == test_version_id,
+            AssessmentAttempt.status == 'scored',
+        )
+        .order_by(AssessmentAttempt.id)
+        .execution_options(yield_per=2000)
+    )
+
+    attempt_count = 0
+    score_sum = 0.0
+    score_sq_sum = 0.0
+    items: dict[uuid.UUID, _ItemAccumulator] = {}
+
+    def flush_attempt(order: list[str], answers: dict[int, tuple[list[str], bool | None]]) -> None:
+        nonlocal attempt_count, score_sum, score_sq_sum
+        ordered = [qid for qid in (order or default_order) if qid in valid_ids]
+        responses = []
+        for idx, qid in enumerate(ordered):
+            selected, is_correct = answers.get(idx, ([], False))
+            responses.append(ItemResponse(uuid.UUID(qid), bool(is_correct), selected or []))
+        score = sum(1 for r in responses if r.is_correct)
+        attempt_count += 1
+        score_sum += score
+        score_sq_sum += score * score
+        for response in responses:
+            items.setdefault(response.item_id, _ItemAccumulator()).add(response, score)
+
+    current_id = None
+    current_order: list[str] = []
+    current_answers: dict[int, tuple[list[str], bool | None]] = {}
+    for attempt_id, order, question_index, selected, is_correct in rows:
+        if attempt_id != current_id:
+            if current_id is not None:
+                flush_attempt(current_order, current_answers)
+            current_id, current_order, current_answers = attempt_id, order, {}
+        if question_index is not None:
+            current_answers[question_index] = (selected, is_correct)
+    if current_id is not None:
+        flush_attempt(current_order, current_answers)
+
+    db.execute(delete(AssessmentItemStats).where(AssessmentItemStats.test_version_id == test_version_id))
+    db.execute(delete(AssessmentVersionStats).where(AssessmentVersionStats.test_version_id == test_version_id))
+    db.add(
+        AssessmentVersionStats(
+            test_version_id=test_version_id,
+            attempt_count=attempt_count,
+            score_sum=score_sum,
+            score_sq_sum=score_sq_sum,
+        )
+    )
+    db.flush()
+    _upsert_items(db, test_version_id, items)
+
+
+def _variance(total: float, sq_total: float, n: int) -> float:
+    mean = total / n
+    return max(sq_total / n - mean * mean, 0.0)
+
+
+def compute_item_analysis(
+    *,
+    attempt_count: int,
+    score_sum: float,
+    score_sq_sum: float,
+    items: Sequence[dict[str, Any]],
+) -> dict[str, Any]:
+    """Turn sufficient statistics into per-item indices and test reliability.
+
+    ``items`` carry the stored counters plus ``test_version_question_id``,
+    ``question_id``, ``order_index`` and the question snapshot's ``prompt`` and ``options``.
+    """
+    n = attempt_count
+    out_items = []
+    pq_sum = 0.0
+    for item in items:
+        c = int(item.get('correct_count') or 0)
+        p_value = point_biserial = None
+        omitted_rate = None
+        distractors = []
+        if n > 0:
+            p_value = c / n
+            pq_sum += p_value * (1 - p_value)
+            omitted_rate = int(item.get('omitted_count') or 0) / n
+            s = float(item.get('correct_score_sum') or 0.0)
+            rest_var = _variance(score_sum - c, score_sq_sum - 2 * s + c, n)
+            item_var = p_value * (1 - p_value)
+            if rest_var > 0 and item_var > 0:
+                cov = (s - c) / n - p_value * (score_sum - c) / n
+                point_biserial = cov / math.sqrt(item_var * rest_var)
+            counts = item.get('option_counts') or {}
+            distractors = [
+                {
+                    'key': opt.get('key'),
+                    'text': opt.get('text'),
+                    'is_correct': bool(opt.get('is_correct')),
+                    'selection_rate': int(counts.get(opt.get('key'), 0)) / n,
+                }
+                for opt in item.get('options') or []
+            ]
+
+        flags: list[str] = []
+        if n >= MIN_FLAG_RESPONSES and p_value is not None:
+            if p_value >= TOO_EASY_P:
+                flags.append('too_easy')
+            elif p_value <= TOO_HARD_P:
+                flags.append('too_hard')
+            if point_biserial is None or point_biserial < LOW_DISCRIMINATION_R:
+                flags.append('low_discrimination')
+            if any(not d['is_correct'] and d['selection_rate'] == 0 for d in distractors):
+                flags.append('unused_distractor')
+
+        out_items.append(
+            {
+                'test_version_question_id': item['test_version_question_id'],
+                'question_id': item.get('question_id'),
+                'order_index': item.get('order_index', 0),
+                'prompt': item.get('prompt', ''),
+                'response_count': int(item.get('response_count') or 0),
+                'p_value': p_value,
+                'point_biserial': point_biserial,
+                'omitted_rate': omitted_rate,
+                'distractors': distractors,
+                'flags': flags,
+            }
+        )
+
+    k = len(items)
+    score_var = _variance(score_sum, score_sq_sum, n) if n > 0 else 0.0
+    kr20 = k / (k - 1) * (1 - pq_sum / score_var) if k > 1 and score_var > 0 else None
+    return {
+        'attempt_count': n,
+        'question_count': k,
+        'mean_score': score_sum / n if n > 0 else None,
+        'score_std': math.sqrt(score_var) if n > 0 else None,
+        'kr20': kr20,
+        'items': out_items,
+    }
+
+
+def get_item_analysis(db: Session, *, test_version_id: uuid.UUID) -> dict[str, Any]:
+    """Item analysis for one version, cached per tenant while the stats are unchanged.
+
+    Read-only: a version whose statistics were never built reports no attempts,
+    with ``statistics_pending`` set, and queues the background rebuild.
+    """
+    tenant_key = db.scalar(select(func.current_setting('app.tenant_id')))
+    version_stats = db.scalar(
+        select(AssessmentVersionStats).where(AssessmentVersionStats.test_version_id == test_version_id)
+    )
+    if version_stats is None:
+        schedule_rebuild(tenant_key, test_version_id)
+        stamp = None
+    else:
+        stamp = (int(version_stats.attempt_count), version_stats.updated_at)
+        cache_key = (tenant_key, test_version_id)
+        with _cache_lock:
+            cached = _cache.get(cache_key)
+            if cached and cached[0] == stamp:
+                _cache.move_to_end(cache_key)
+                return cached[1]
+
+    item_rows = db.execute(
+        select(AssessmentTestVersionQuestion, AssessmentItemStats)
+        .outerjoin(
+            AssessmentItemStats,
+            AssessmentItemStats.test_version_question_id == AssessmentTestVersionQuestion.id,
+        )
+        .where(AssessmentTestVersionQuestion.test_version_id == test_version_id)
+        .order_by(AssessmentTestVersionQuestion.order_index)
+    ).all()
+    items = []
+    for question, item_stats in item_rows:
+        snapshot = question.question_snapshot or {}
+        items.append(
+            {
+                'test_version_question_id': question.id,
+                'question_id': question.question_id,
+                'order_index': question.order_index,
+                'prompt': snapshot.get('prompt', ''),
+                'options': snapshot.get('options', []),
+                'response_count': item_stats.response_count if item_stats else 0,
+                'correct_count': item_stats.correct_count if item_stats else 0,
+                'omitted_count': item_stats.omitted_count if item_stats else 0,
+                'correct_score_sum': item_stats.correct_score_sum if item_stats else 0.0,
+                'option_counts': item_stats.option_counts if item_stats else {},
+            }
+        )
+    result = compute_item_analysis(
+        attempt_count=version_stats.attempt_count if version_stats else 0,
+        score_sum=version_stats.score_sum if version_stats else 0.0,
+        score_sq_sum=version_stats.score_sq_sum if version_stats else 0.0,
+        items=items,
+    )
+    result['test_version_id'] = test_version_id
+    result['statistics_pending'] = version_stats is None
+    if stamp is not None:
+        with _cache_lock:
+            _cache[cache_key] = (stamp, result)
+            _cache.move_to_end(cache_key)
+            while len(_cache) > ITEM_ANALYSIS_CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return result
@@ -0,0 +1,82 @@
+"""Cancel/pause/resume signals for long-running background jobs via Redis pub/sub.
+
+Endpoints still persist the request on the job row (the source of truth for
+stale-worker handling); ``publish`` additionally pushes it to the worker so it
+reacts without polling the database. Without Redis, ``JobSignalListener``
+reports ``available = False`` and callers fall back to reading the job row.
+"""
+from __future__ import annotations
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'job_signal:'
+
+CANCEL = 'cancel'
+PAUSE = 'pause'
+RESUME = 'resume'
+
+
+def _redis():
+    from app.core.redis_client import redis_client
+
+    return redis_client
+
+
+def channel(job_id: object) -> str:
+    return f'{CHANNEL_PREFIX}{job_id}'
+
+
+def publish(job_id: object, signal: str) -> None:
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.publish(channel(job_id), signal)
+    except Exception as exc:  # noqa: BLE001 - the DB flag still carries the request
+        logger.warning('Could not publish %s signal for job %s: %s', signal, job_id, exc)
+
+
+class JobSignalListener:
+    def __init__(self, job_id: object) -> None:
+        client = _redis()
+        self._pubsub = None
+        if client is not None:
+            self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(channel(job_id))
+
+    @property
+    def available(self) -> bool:
+        return self._pubsub is not None
+
+    def poll(self) -> str | None:
+        """Drain pending signals without blocking: cancel wins, otherwise the latest one."""
+        latest = None
+        while (signal := self.wait(0)) is not None:
+            if signal == CANCEL:
+                return CANCEL
+            latest = signal
+        return latest
+
+    def wait(self, timeout: float) -> str | None:
+        if self._pubsub is None:
+            return None
+        message = self._pubsub.get_message(timeout=timeout)
+        if not message or message.get('type') != 'message':
+            return None
+        return str(message.get('data'))
+
+    def close(self) -> None:
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:  # noqa: BLE001
+                pass
+            self._pubsub = None
+
+    def __enter__(self) -> JobSignalListener:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
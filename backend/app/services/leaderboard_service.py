@@ -0,0 +1,364 @@
+"""Leaderboard read model: stars per member per week / month / quarter / all-time.
+
+``award_stars`` feeds ``record_stars``, which bumps one row per period type in
+``assessment_leaderboard_entries`` (an upsert on the period's primary key), so
+leaderboards never aggregate attempts at read time.
+
+When Redis is available each (tenant, period) board is mirrored into a sorted
+set, which answers top-N and rank-of-user in O(log n). Boards are built lazily
+from the table on first read; a build first adds a ``-inf`` marker member, so
+the key exists before the table is read. After the writing transaction commits,
+a Lua script applies ``ZADD GT`` (and refreshes the TTL) only to boards that
+exist. Boards that were never built stay missing until a read builds them, and
+``ZADD GT`` keeps a lagging build from lowering a newer score. Without Redis the
+same queries are served from the ``(tenant, period, stars DESC)`` index.
+
+Only members with an active tenant membership are ranked. A commit that adds,
+removes or changes a membership drops the tenant's boards, so they are rebuilt
+from the table on the next read.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import and_, event, func, inspect, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.assessment import AssessmentLeaderboardEntry
+from app.models.rbac import User
+from app.models.tenant import TenantMembership
+
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
+
+PERIOD_TYPES = ("week", "month", "quarter", "all")
+
+BOARD_KEY_PREFIX = "leaderboard:"
+# Boards outlive their period so the current one never expires mid-period.
+BOARD_TTL_SECONDS = {"week": 14 * 86400, "month": 62 * 86400, "quarter": 183 * 86400, "all": None}
+
+_BUILT_MEMBER = "built"
+
+_PENDING_KEY = "leaderboard_pending"
+_STALE_TENANTS_KEY = "leaderboard_stale_tenants"
+
+# KEYS: boards; ARGV: member, score, ttl (0 = none) per board.
+_UPDATE_BUILT_BOARDS = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        local base = (i - 1) * 3
+        redis.call('ZADD', key, 'GT', ARGV[base + 2], ARGV[base + 1])
+        local ttl = tonumber(ARGV[base + 3])
+        if ttl > 0 then
+            redis.call('EXPIRE', key, ttl)
+        end
+    end
+end
+return 0
+"""
+
+
+def _redis():
+    from app.core.redis_client import redis_client
+
+    return redis_client
+
+
+def period_key(period_type: str, at: datetime | None = None) -> str:
+    """Bucket key of ``at`` (default: now, UTC); matches the backfill in migration 0060."""
+    at = (at or datetime.now(UTC)).astimezone(UTC)
+    if period_type == "week":
+        iso = at.isocalendar()
+        return f"{iso.year}-W{iso.week:02d}"
+    if period_type == "month":
+        return f"{at.year}-{at.month:02d}"
+    if period_type == "quarter":
+        return f"{at.year}-Q{(at.month - 1) // 3 + 1}"
+    if period_type == "all":
+        return "all"
+    raise ValueError(f"Unknown leaderboard period: {period_type}")
+
+
+def _board_key(tenant_id: object, period_type: str, key: str) -> str:
+    return f"{BOARD_KEY_PREFIX}{tenant_id}:{period_type}:{key}"
+
+
+def _active_member():
+    """Join condition limiting leaderboard entries to active members of their tenant."""
+    return and_(
+        TenantMembership.tenant_id == AssessmentLeaderboardEntry.tenant_id,
+        TenantMembership.user_id == AssessmentLeaderboardEntry.user_id,
+        TenantMembership.status == "active",
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Writes
+# ─────────────────────────────────────────────────────────────────────────────
+
+def record_stars(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    user_id: uuid.UUID,
+    stars: int,
+    at: datetime | None = None,
+) -> None:
+    """Add one completed test worth ``stars`` to every period board of the member.
+
+    ``at`` is when the attempt was submitted; it picks the period buckets.
+    """
+    stmt = insert(AssessmentLeaderboardEntry).values(
+        [
+            {
+                "tenant_id": tenant_id,
+                "period_type": period_type,
+                "period_key": period_key(period_type, at),
+                "user_id": user_id,
+                "stars": stars,
+                "tests": 1,
+            }
+            for period_type in PERIOD_TYPES
+        ]
+    )
+    entry = AssessmentLeaderboardEntry
+    rows = db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[entry.tenant_id, entry.period_type, entry.period_key, entry.user_id],
+            set_={
+                "stars": entry.stars + stmt.excluded.stars,
+                "tests": entry.tests + stmt.excluded.tests,
+                "updated_at": func.now(),
+            },
+        ).returning(entry.period_type, entry.period_key, entry.stars)
+    ).all()
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    pending.extend(
+        (
+            _board_key(tenant_id, row.period_type, row.period_key),
+            str(user_id),
+            row.stars,
+            row.period_type,
+        )
+        for row in rows
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    client = _redis()
+    if not pending or client is None:
+        return
+    keys: list[str] = []
+    args: list[object] = []
+    for board_key, member, score, period_type in pending:
+        keys.append(board_key)
+        args.extend((member, score, BOARD_TTL_SECONDS.get(period_type) or 0))
+    try:
+        client.eval(_UPDATE_BUILT_BOARDS, len(keys), *keys, *args)
+    except Exception as exc:  # noqa: BLE001 - the table stays authoritative
+        logger.warning("Could not update leaderboard sorted sets: %s", exc)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_STALE_TENANTS_KEY, None)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_membership_changes(session: Session, _flush_context, _instances) -> None:
+    changed = [obj for obj in session.new if isinstance(obj, TenantMembership)]
+    changed += [obj for obj in session.deleted if isinstance(obj, TenantMembership)]
+    changed += [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, TenantMembership) and inspect(obj).attrs.status.history.has_changes()
+    ]
+    if changed:
+        session.info.setdefault(_STALE_TENANTS_KEY, set()).update(obj.tenant_id for obj in changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale_boards(session: Session) -> None:
+    tenant_ids = session.info.pop(_STALE_TENANTS_KEY, None)
+    client = _redis()
+    if not tenant_ids or client is None:
+        return
+    try:
+        for tenant_id in tenant_ids:
+            names = list(client.scan_iter(match=f"{BOARD_KEY_PREFIX}{tenant_id}:*"))
+            if names:
+                client.delete(*names)
+    except Exception as exc:  # noqa: BLE001 - boards expire on their own
+        logger.warning("Could not drop leaderboard sorted sets: %s", exc)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Reads
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _ensure_board(db: Session, client, *, tenant_id: uuid.UUID, period_type: str, key: str) -> str:
+    board_key = _board_key(tenant_id, period_type, key)
+    ttl = BOARD_TTL_SECONDS.get(period_type)
+    # Mark the board built before reading the table: writers committing from here on
+    # update it themselves, earlier ones are in the rows read below.
+    if not client.zadd(board_key, {_BUILT_MEMBER: float("-inf")}, nx=True):
+        return board_key
+    if ttl:
+        client.expire(board_key, ttl)
+    rows = db.execute(
+        select(AssessmentLeaderboardEntry.user_id, AssessmentLeaderboardEntry.stars)
+        .join(TenantMembership, _active_member())
+        .where(
+            AssessmentLeaderboardEntry.tenant_id == tenant_id,
+            AssessmentLeaderboardEntry.period_type == period_type,
+            AssessmentLeaderboardEntry.period_key == key,
+        )
+    ).all()
+    if rows:
+        pipe = client.pipeline(transaction=False)
+        for offset in range(0, len(rows), 1000):
+            pipe.zadd(board_key, {str(r.user_id): r.stars for r in rows[offset : offset + 1000]}, gt=True)
+        pipe.execute()
+    return board_key
+
+
+def _entries(
+    db: Session, *, tenant_id: uuid.UUID, period_type: str, key: str, user_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, Any]:
+    if not user_ids:
+        return {}
+    rows = db.execute(
+        select(
+            AssessmentLeaderboardEntry.user_id,
+            AssessmentLeaderboardEntry.stars,
+            AssessmentLeaderboardEntry.tests,
+            User.full_name,
+        )
+        .join(User, User.id == AssessmentLeaderboardEntry.user_id)
+        .join(TenantMembership, _active_member())
+        .where(
+            AssessmentLeaderboardEntry.tenant_id == tenant_id,
+            AssessmentLeaderboardEntry.period_type == period_type,
+            AssessmentLeaderboardEntry.period_key == key,
+            AssessmentLeaderboardEntry.user_id.in_(user_ids),
+        )
+    ).all()
+    return {row.user_id: row for row in rows}
+
+
+def _item(row: Any, rank: int) -> dict[str, Any]:
+    return {
+        "rank": rank,
+        "user_id": str(row.user_id),
+        "full_name": row.full_name,
+        "stars": row.stars,
+        "tests": row.tests,
+        "star_rate": round(row.stars / row.tests, 2) if row.tests > 0 else 0.0,
+    }
+
+
+def top(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    period_type: str,
+    key: str | None = None,
+    limit: int = 10,
+) -> list[dict[str, Any]]:
+    """Top ``limit`` members by stars (ties broken by user id, as in Redis)."""
+    key = key or period_key(period_type)
+    client = _redis()
+    if client is not None:
+        try:
+            board_key = _ensure_board(db, client, tenant_id=tenant_id, period_type=period_type, key=key)
+            members = client.zrevrange(board_key, 0, limit - 1)
+            user_ids = [uuid.UUID(m) for m in members if m != _BUILT_MEMBER]
+            rows = _entries(db, tenant_id=tenant_id, period_type=period_type, key=key, user_ids=user_ids)
+            # A membership change racing a build can leave a member behind until the next drop.
+            active = [uid for uid in user_ids if uid in rows]
+            return [_item(rows[uid], rank) for rank, uid in enumerate(active, start=1)]
+        except Exception as exc:  # noqa: BLE001 - fall through to the index
+            logger.warning("Leaderboard sorted set unavailable, using SQL: %s", exc)
+
+    entry = AssessmentLeaderboardEntry
+    rows = db.execute(
+        select(entry.user_id, entry.stars, entry.tests, User.full_name)
+        .join(User, User.id == entry.user_id)
+        .join(TenantMembership, _active_member())
+        .where(entry.tenant_id == tenant_id, entry.period_type == period_type, entry.period_key == key)
+        .order_by(entry.stars.desc(), entry.user_id.desc())
+        .limit(limit)
+    ).all()
+    return [_item(row, rank) for rank, row in enumerate(rows, start=1)]
+
+
+def rank_of(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    user_id: uuid.UUID,
+    period_type: str,
+    key: str | None = None,
+) -> dict[str, Any] | None:
+    """The member's rank and totals on one board, or None if they have no entry there."""
+    key = key or period_key(period_type)
+    rows = _entries(db, tenant_id=tenant_id, period_type=period_type, key=key, user_ids=[user_id])
+    row = rows.get(user_id)
+    if row is None:
+        return None
+
+    client = _redis()
+    if client is not None:
+        try:
+            board_key = _ensure_board(db, client, tenant_id=tenant_id, period_type=period_type, key=key)
+            position = client.zrevrank(board_key, str(user_id))
+            if position is not None:
+                return _item(row, position + 1)
+        except Exception as exc:  # noqa: BLE001 - fall through to the index
+            logger.warning("Leaderboard sorted set unavailable, using SQL: %s", exc)
+
+    entry = AssessmentLeaderboardEntry
+    ahead = db.scalar(
+        select(func.count())
+        .select_from(entry)
+        .join(TenantMembership, _active_member())
+        .where(
+            entry.tenant_id == tenant_id,
+            entry.period_type == period_type,
+            entry.period_key == key,
+            or_(entry.stars > row.stars, and_(entry.stars == row.stars, entry.user_id > user_id)),
+        )
+    )
+    return _item(row, int(ahead or 0) + 1)
+
+
+def period_totals(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    period_type: str,
+    key: str | None = None,
+) -> dict[uuid.UUID, tuple[int, int]]:
+    """``user_id → (stars, tests)`` for every member on one board."""
+    key = key or period_key(period_type)
+    rows = db.execute(
+        select(
+            AssessmentLeaderboardEntry.user_id,
+            AssessmentLeaderboardEntry.stars,
+            AssessmentLeaderboardEntry.tests,
+        ).where(
+            AssessmentLeaderboardEntry.tenant_id == tenant_id,
+            AssessmentLeaderboardEntry.period_type == period_type,
+            AssessmentLeaderboardEntry.period_key == key,
+        )
+    ).all()
+    return {row.user_id: (row.stars, row.tests) for row in rows}
@@ -0,0 +1,186 @@
+"""Verified-principal cache for authenticated requests.
+
+A ``Principal`` (active flag, global role names, password-change flag) is cached
+per worker under ``(user_id, token iat)`` for ``PRINCIPAL_TTL_SECONDS``, together
+with the user's revocation epoch at load time. A request reuses the entry only
+while the epoch is unchanged, so identity costs no DB query in the common case.
+
+The epoch is bumped after any commit that changes a user's active flag, password
+or password-change flag, or global roles, or deletes the user (detected at flush,
+including orphaned role rows, and before bulk UPDATE/DELETE statements), and by
+``mark_principal_stale`` for things like refresh-token revocation. Epochs live in
+Redis so a bump reaches every worker; without Redis they are process-local and
+other workers see changes once their entry expires.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import ORMExecuteState, Session, object_session
+
+from app.models.rbac import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_TTL_SECONDS = 300
+PRINCIPAL_CACHE_MAX_ENTRIES = 10_000
+
+_EPOCH_KEY_PREFIX = "principal_epoch:"
+# Outlives every cached entry, so an expired epoch key can never revive a stale principal.
+_EPOCH_TTL_SECONDS = 24 * 60 * 60
+_STALE_KEY = "principal_stale"
+_WATCHED_USER_FIELDS = ("is_active", "password_change_required", "hashed_password")
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: UUID
+    is_active: bool
+    role_names: frozenset[str]
+    password_change_required: bool
+
+
+@dataclass(frozen=True)
+class _Entry:
+    principal: Principal
+    epoch: int
+    expires_at: float
+
+
+_lock = threading.Lock()
+_entries: OrderedDict[tuple[UUID, int], _Entry] = OrderedDict()
+_local_epochs: dict[UUID, int] = {}
+
+
+def _redis():
+    from app.core.redis_client import redis_client
+
+    return redis_client
+
+
+def current_epoch(user_id: UUID) -> int:
+    client = _redis()
+    if client is not None:
+        try:
+            return int(client.get(f"{_EPOCH_KEY_PREFIX}{user_id}") or 0)
+        except Exception as exc:  # noqa: BLE001 - fall back to the local epoch
+            logger.warning("Principal epoch unavailable in Redis: %s", exc)
+    with _lock:
+        return _local_epochs.get(user_id, 0)
+
+
+def bump_epoch(user_id: UUID) -> None:
+    with _lock:
+        _local_epochs[user_id] = _local_epochs.get(user_id, 0) + 1
+        for key in [k for k in _entries if k[0] == user_id]:
+            _entries.pop(key, None)
+    client = _redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.incr(f"{_EPOCH_KEY_PREFIX}{user_id}")
+        pipe.expire(f"{_EPOCH_KEY_PREFIX}{user_id}", _EPOCH_TTL_SECONDS)
+        pipe.execute()
+    except Exception as exc:  # noqa: BLE001 - other workers fall back to the entry TTL
+        logger.warning("Could not bump principal epoch for %s: %s", user_id, exc)
+
+
+def get_principal(user_id: UUID, issued_at: int) -> tuple[Principal | None, int]:
+    """The cached principal if still valid, plus the current epoch (to pass to ``remember``)."""
+    epoch = current_epoch(user_id)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get((user_id, issued_at))
+        if entry is None:
+            return None, epoch
+        if entry.epoch != epoch or now >= entry.expires_at:
+            _entries.pop((user_id, issued_at), None)
+            return None, epoch
+        _entries.move_to_end((user_id, issued_at))
+        return entry.principal, epoch
+
+
+def remember(user: User, issued_at: int, epoch: int) -> Principal:
+    principal = Principal(
+        user_id=user.id,
+        is_active=bool(user.is_active),
+        role_names=frozenset(user_role.role.name for user_role in user.user_roles),
+        password_change_required=bool(user.password_change_required),
+    )
+    with _lock:
+        expires_at = time.monotonic() + PRINCIPAL_TTL_SECONDS
+        _entries[(user.id, issued_at)] = _Entry(principal, epoch, expires_at)
+        _entries.move_to_end((user.id, issued_at))
+        while len(_entries) > PRINCIPAL_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return principal
+
+
+def mark_principal_stale(db: Session, user_id: UUID) -> None:
+    """Invalidate the user's cached principals once the current transaction commits."""
+    db.info.setdefault(_STALE_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_principals(session: Session, _flush_context, _instances) -> None:
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _WATCHED_USER_FIELDS):
+                mark_principal_stale(session, obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            mark_principal_stale(session, obj.id)
+
+
+# Mapper events see every role row the flush writes, including orphans removed from
+# ``User.user_roles`` that never show up in ``session.deleted`` before the flush.
+@event.listens_for(UserRole, "after_insert")
+@event.listens_for(UserRole, "after_update")
+@event.listens_for(UserRole, "after_delete")
+def _collect_changed_roles(_mapper, _connection, target: UserRole) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    for user_id in {target.user_id, *inspect(target).attrs.user_id.history.deleted}:
+        if user_id is not None:
+            mark_principal_stale(session, user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changed_principals(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    entity = mapper.class_ if mapper is not None else None
+    if entity not in (User, UserRole):
+        return
+    affected = select(User.id if entity is User else UserRole.user_id)
+    if isinstance(orm_execute_state.parameters, list):
+        # Bulk UPDATE by primary key: the rows are named by the parameter sets.
+        ids = [row["id"] for row in orm_execute_state.parameters]
+        affected = affected.where(entity.id.in_(ids))
+    elif orm_execute_state.statement.whereclause is not None:
+        affected = affected.where(orm_execute_state.statement.whereclause)
+    session = orm_execute_state.session
+    for user_id in session.scalars(affected).all():
+        mark_principal_stale(session, user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_stale_principals(session: Session) -> None:
+    for user_id in session.info.pop(_STALE_KEY, ()):
+        bump_epoch(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_principals(session: Session) -> None:
+    session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,284 @@
+"""Near-duplicate detection for assessment questions with MinHash + LSH.
+
+Each question prompt is reduced to a set of character shingles and summarised
+by a fixed-length MinHash signature; the fraction of equal signature slots
+estimates the Jaccard similarity of two prompts. The signature is cut into
+``BANDS`` bands of ``ROWS`` slots and every band is hashed into a bucket, so
+two questions only become candidates when they share a bucket. Signatures and
+buckets are stored per question (``assessment_question_signatures`` /
+``assessment_question_lsh_bands``), written on create/update and backfilled
+lazily, so a dedup run joins on the bucket index instead of comparing every
+pair of prompts.
+
+With 32 bands of 3 rows, pairs at Jaccard 0.5 are found with ~99% probability
+and pairs at 0.8 practically always; candidates are then verified against the
+estimated similarity before being grouped.
+
+The backfill only scans questions updated since the last committed pass in this
+process (minus a skew for writers still in flight); the first pass per process
+and tenant scans them all.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, delete, event, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+
+from app.models.assessment import AssessmentQuestion, AssessmentQuestionLshBand, AssessmentQuestionSignature
+
+SHINGLE_SIZE = 5
+BANDS = 32
+ROWS = 3
+NUM_PERM = BANDS * ROWS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # fixed seed: stored signatures must stay comparable across processes
+_PERMUTATIONS = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)
+)
+
+_BACKFILL_BATCH = 500
+# Writers stamp updated_at at transaction start, so a pass can miss rows committed just after
+# it; the next pass re-checks this much history.
+_BACKFILL_SKEW = timedelta(minutes=10)
+_PENDING_WATERMARK_KEY = 'dedup_signed_through'
+_watermark_lock = threading.Lock()
+_signed_through: dict[str, datetime] = {}
+_NON_WORD_RE = re.compile(r'[^\w\s]+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+@dataclass
+class DuplicateGroup:
+    keep_id: uuid.UUID
+    duplicate_ids: list[uuid.UUID]
+
+
+def normalize_prompt(text: str | None) -> str:
+    text = _NON_WORD_RE.sub(' ', (text or '').lower())
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def shingles(text: str | None) -> set[str]:
+    norm = normalize_prompt(text)
+    if len(norm) <= SHINGLE_SIZE:
+        return {norm} if norm else set()
+    return {norm[i : i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(text: str | None) -> list[int]:
+    """MinHash signature of ``text``; empty for prompts without any shingles."""
+    hashes = [_hash64(s) for s in shingles(text)]
+    if not hashes:
+        return []
+    p = _MERSENNE_PRIME
+    return [min((a * h + b) % p for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_buckets(signature: Sequence[int]) -> list[int]:
+    """One signed 64-bit bucket per band (fits a BIGINT column)."""
+    if len(signature) != NUM_PERM:
+        return []
+    buckets = []
+    for band in range(BANDS):
+        chunk = ','.join(str(v) for v in signature[band * ROWS : (band + 1) * ROWS])
+        digest = hashlib.blake2b(chunk.encode('ascii'), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def estimate_jaccard(left: Sequence[int], right: Sequence[int]) -> float:
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right, strict=True) if a == b) / len(left)
+
+
+def index_questions(db: Session, items: Iterable[tuple[uuid.UUID, str | None]]) -> int:
+    """(Re)compute and store signatures and band buckets for ``(question_id, prompt)`` pairs."""
+    signatures = {question_id: minhash(prompt) for question_id, prompt in items}
+    if not signatures:
+        return 0
+    ids = list(signatures)
+    db.execute(delete(AssessmentQuestionLshBand).where(AssessmentQuestionLshBand.question_id.in_(ids)))
+    stmt = insert(AssessmentQuestionSignature).values(
+        [{'question_id': qid, 'minhash': sig} for qid, sig in signatures.items()]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AssessmentQuestionSignature.question_id],
+            set_={'minhash': stmt.excluded.minhash, 'updated_at': func.now()},
+        )
+    )
+    bands = [
+        {'question_id': qid, 'band': band, 'bucket': bucket}
+        for qid, sig in signatures.items()
+        for band, bucket in enumerate(band_buckets(sig))
+    ]
+    if bands:
+        db.execute(insert(AssessmentQuestionLshBand).values(bands))
+    return len(signatures)
+
+
+def ensure_signatures(db: Session) -> int:
+    """Backfill signatures for questions that have none or were edited after signing."""
+    from app.services.assessment_service import _tenant_id_expr  # local import to avoid circular refs
+
+    AQ = AssessmentQuestion
+    Sig = AssessmentQuestionSignature
+    tenant_key, started_at = db.execute(
+        select(func.current_setting('app.tenant_id'), func.now())
+    ).one()
+    with _watermark_lock:
+        since = _signed_through.get(tenant_key)
+    conditions = [
+        AQ.tenant_id == _tenant_id_expr(),
+        AQ.status != 'archived',
+        or_(Sig.question_id.is_(None), Sig.updated_at < AQ.updated_at),
+    ]
+    if since is not None:
+        conditions.append(AQ.updated_at >= since)
+    indexed = 0
+    while True:
+        rows = db.execute(
+            select(AQ.id, AQ.prompt)
+            .outerjoin(Sig, Sig.question_id == AQ.id)
+            .where(*conditions)
+            .limit(_BACKFILL_BATCH)
+        ).all()
+        if rows:
+            indexed += index_questions(db, ((row.id, row.prompt) for row in rows))
+        if len(rows) < _BACKFILL_BATCH:
+            break
+    # Advanced only once the signatures written above are committed.
+    db.info.setdefault(_PENDING_WATERMARK_KEY, {})[tenant_key] = started_at - _BACKFILL_SKEW
+    return indexed
+
+
+@event.listens_for(Session, 'after_commit')
+def _advance_watermarks(session: Session) -> None:
+    pending = session.info.pop(_PENDING_WATERMARK_KEY, None)
+    if not pending:
+        return
+    with _watermark_lock:
+        for tenant_key, watermark in pending.items():
+            current = _signed_through.get(tenant_key)
+            if current is None or watermark > current:
+                _signed_through[tenant_key] = watermark
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_watermarks(session: Session) -> None:
+    session.info.pop(_PENDING_WATERMARK_KEY, None)
+
+
+def _candidate_pairs(db: Session) -> set[tuple[uuid.UUID, uuid.UUID]]:
+    from app.services.assessment_service import _tenant_id_expr  # local import to avoid circular refs
+
+    left = aliased(AssessmentQuestionLshBand)
+    right = aliased(AssessmentQuestionLshBand)
+    left_q = aliased(AssessmentQuestion)
+    right_q = aliased(AssessmentQuestion)
+    rows = db.execute(
+        select(left.question_id, right.question_id)
+        .join(
+            right,
+            and_(
+                right.tenant_id == left.tenant_id,
+                right.band == left.band,
+                right.bucket == left.bucket,
+                right.question_id > left.question_id,
+            ),
+        )
+        .join(left_q, left_q.id == left.question_id)
+        .join(right_q, right_q.id == right.question_id)
+        .where(
+            left.tenant_id == _tenant_id_expr(),
+            left_q.status != 'archived',
+            right_q.status != 'archived',
+        )
+        .distinct()
+    ).all()
+    return {(a, b) for a, b in rows}
+
+
+def find_duplicate_groups(db: Session, *, threshold: float) -> list[DuplicateGroup]:
+    """Group non-archived questions whose estimated prompt similarity reaches ``threshold``.
+
+    Keeps the 'best' copy per group: prefers questions with both category and difficulty
+    set; among equals keeps the oldest. Every duplicate is similar to the copy it is
+    grouped with (no transitive chaining), so a chain A~B~C with A and C far apart
+    does not archive C in favour of A.
+    """
+    ensure_signatures(db)
+    pairs = _candidate_pairs(db)
+    if not pairs:
+        return []
+
+    ids = {qid for pair in pairs for qid in pair}
+    signatures = dict(
+        db.execute(
+            select(AssessmentQuestionSignature.question_id, AssessmentQuestionSignature.minhash).where(
+                AssessmentQuestionSignature.question_id.in_(ids)
+            )
+        ).all()
+    )
+    similar: dict[uuid.UUID, set[uuid.UUID]] = {}
+    for a, b in pairs:
+        if estimate_jaccard(signatures.get(a) or [], signatures.get(b) or []) >= threshold:
+            similar.setdefault(a, set()).add(b)
+            similar.setdefault(b, set()).add(a)
+    if not similar:
+        return []
+
+    meta = {
+        row.id: row
+        for row in db.execute(
+            select(
+                AssessmentQuestion.id,
+                AssessmentQuestion.category_id,
+                AssessmentQuestion.difficulty,
+                AssessmentQuestion.created_at,
+            ).where(AssessmentQuestion.id.in_(list(similar)))
+        )
+    }
+    return group_around_representatives(similar, key=lambda qid: _keep_score(meta[qid]))
+
+
+def group_around_representatives(
+    similar: dict[uuid.UUID, set[uuid.UUID]], *, key: Callable[[uuid.UUID], Any]
+) -> list[DuplicateGroup]:
+    """Greedy grouping over verified similar pairs.
+
+    Questions are visited best-first (``key`` ascending); an unassigned question becomes
+    its group's kept copy and takes every still-unassigned question similar to it.
+    """
+    assigned: set[uuid.UUID] = set()
+    groups = []
+    for qid in sorted(similar, key=key):
+        if qid in assigned:
+            continue
+        assigned.add(qid)
+        duplicates = sorted((other for other in similar[qid] if other not in assigned), key=key)
+        if duplicates:
+            assigned.update(duplicates)
+            groups.append(DuplicateGroup(keep_id=qid, duplicate_ids=duplicates))
+    return groups
+
+
+def _keep_score(row: Any) -> tuple[int, datetime, str]:
+    classified = (row.category_id is not None) + (row.difficulty is not None)
+    return (2 - classified, row.created_at, str(row.id))
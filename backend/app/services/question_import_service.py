@@ -0,0 +1,423 @@
+"""AI question-import pipeline shared by the PDF and text import endpoints.
+
+Source chunks are consumed lazily and sent to the model with bounded
+concurrency (a sliding window of in-flight requests). Results are yielded in
+chunk order so callers can validate, de-duplicate and persist questions
+incrementally instead of after the whole document has been processed.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from uuid import UUID
+
+from app.core.config import settings
+from app.services import assessment_service, audit_service, import_job_store, usage_service
+from app.services.openai_responses_service import call_openai_responses_json
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SYSTEM_PROMPT = """You extract high-quality multiple-choice assessment questions from technical text.
+Return compact JSON only (no prose).
+
+Constraints:
+- question_type must be "mcq_single" or "mcq_multi"
+- Provide 4 options for each question when possible (min 2).
+- For mcq_single: exactly 1 correct option.
+- For mcq_multi: 2-3 correct options.
+- Keep prompts unambiguous and answerable from the provided text.
+- Avoid trick questions; focus on key concepts, definitions, procedures, and requirements.
+"""
+
+IMPORT_JSON_SCHEMA: dict = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["questions"],
+    "properties": {
+        "questions": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": 50,
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["prompt", "question_type", "difficulty", "tags", "status", "explanation", "options"],
+                "properties": {
+                    "prompt": {"type": "string", "minLength": 8},
+                    "question_type": {"type": "string", "enum": ["mcq_single", "mcq_multi"]},
+                    "difficulty": {"type": ["string", "null"]},
+                    "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 20},
+                    "status": {"type": "string", "enum": ["draft"]},
+                    "explanation": {"type": ["string", "null"]},
+                    "options": {
+                        "type": "array",
+                        "minItems": 2,
+                        "maxItems": 6,
+                        "items": {
+                            "type": "object",
+                            "additionalProperties": False,
+                            "required": ["option_text", "is_correct", "order_index"],
+                            "properties": {
+                                "option_text": {"type": "string", "minLength": 1},
+                                "is_correct": {"type": "boolean"},
+                                "order_index": {"type": "integer", "minimum": 0, "maximum": 10},
+                            },
+                        },
+                    },
+                },
+            },
+        }
+    },
+}
+
+
+@dataclass
+class ImportSpec:
+    question_count: int
+    merged_tags: list[str]
+    difficulty: str | None = None
+    extra_instructions: str | None = None
+    material_context: str | None = None
+    auto_question_count: bool = False
+    per_chunk_max: int = 25
+    timeout_ms: int = 120_000
+
+    def system_prompt(self) -> str:
+        prompt = IMPORT_SYSTEM_PROMPT
+        if self.material_context:
+            prompt += f"\n\nMaterial context: {self.material_context}"
+        if self.extra_instructions:
+            prompt += f"\n\nAdditional instructions:\n{self.extra_instructions}"
+        return prompt
+
+    def chunk_prompt(self, chunk: str, quota: int) -> str:
+        if self.auto_question_count:
+            count_instruction = f"Generate the most appropriate number of questions (max {quota})"
+        else:
+            count_instruction = f"Generate exactly {quota} questions"
+        return (
+            f"{count_instruction} as JSON.\n"
+            f"Difficulty: {self.difficulty or 'mixed'}\n"
+            f"Tags to include on every question: {self.merged_tags}\n\n"
+            f"Content:\n{chunk}"
+        )
+
+
+@dataclass
+class ChunkResult:
+    index: int
+    questions: list[dict] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    error: Exception | None = None
+
+
+class QuestionCollector:
+    """De-duplicates generated questions by normalized prompt and enforces the requested count."""
+
+    def __init__(self, spec: ImportSpec) -> None:
+        self.limit = math.inf if spec.auto_question_count else spec.question_count
+        self.accepted = 0
+        self._seen: set[str] = set()
+
+    @property
+    def remaining(self) -> float:
+        return self.limit - self.accepted
+
+    def accept(self, questions: Iterable[dict]) -> list[dict]:
+        out: list[dict] = []
+        for q in questions:
+            if self.accepted >= self.limit:
+                break
+            key = re.sub(r"\s+", " ", str(q.get("prompt") or "").strip()).lower()
+            if not key or key in self._seen:
+                continue
+            self._seen.add(key)
+            out.append(q)
+            self.accepted += 1
+        return out
+
+
+def validate_mcq(question: dict) -> tuple[dict | None, str | None]:
+    qtype = question.get("question_type")
+    options = question.get("options") or []
+    if qtype not in ("mcq_single", "mcq_multi"):
+        return None, "invalid question_type"
+    if not isinstance(options, list) or len(options) < 2:
+        return None, "not enough options"
+
+    # Ensure order_index contiguous
+    normalized_opts = []
+    for idx, opt in enumerate(options):
+        if not isinstance(opt, dict):
+            continue
+        text = str(opt.get("option_text") or "").strip()
+        if not text:
+            continue
+        normalized_opts.append(
+            {
+                "option_text": text,
+                "is_correct": bool(opt.get("is_correct", False)),
+                "order_index": idx,
+            }
+        )
+    if len(normalized_opts) < 2:
+        return None, "not enough valid option_text"
+
+    correct_count = sum(1 for o in normalized_opts if o["is_correct"])
+    if qtype == "mcq_single" and correct_count != 1:
+        # try to coerce: keep the first correct, else mark first as correct
+        if correct_count > 1:
+            first = True
+            for o in normalized_opts:
+                if o["is_correct"] and first:
+                    first = False
+                elif o["is_correct"]:
+                    o["is_correct"] = False
+        else:  # 0
+            normalized_opts[0]["is_correct"] = True
+    if qtype == "mcq_multi" and correct_count < 2:
+        # coerce by adding the second option as correct
+        if len(normalized_opts) >= 2:
+            normalized_opts[0]["is_correct"] = True
+            normalized_opts[1]["is_correct"] = True
+
+    question["options"] = normalized_opts
+    question["status"] = "draft"
+    return question, None
+
+
+def split_text_chunks(text: str, chunk_size: int = 8_000) -> list[str]:
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    chunks: list[str] = []
+    buf: list[str] = []
+    buf_size = 0
+    for para in paragraphs:
+        if buf_size + len(para) > chunk_size and buf:
+            chunks.append("\n\n".join(buf))
+            buf = []
+            buf_size = 0
+        buf.append(para)
+        buf_size += len(para) + 2
+    if buf:
+        chunks.append("\n\n".join(buf))
+    return chunks
+
+
+def iter_chunk_results(
+    spec: ImportSpec,
+    chunks: Iterable[str],
+    collector: QuestionCollector,
+    *,
+    concurrency: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> Iterator[ChunkResult]:
+    """Generate questions for ``chunks`` with at most ``concurrency`` model calls in flight.
+
+    Chunks are pulled lazily. With a fixed question count, new chunks are only
+    submitted while the questions already accepted plus those requested from
+    in-flight chunks fall short of the target, so no more calls are made than
+    the sequential loop would have made. Results are yielded in chunk order;
+    callers must feed them through ``collector`` before resuming the iterator.
+    """
+    workers = max(1, concurrency or settings.ASSESSMENT_IMPORT_CONCURRENCY)
+    system_prompt = spec.system_prompt()
+    source = iter(enumerate(chunks))
+    pending: deque[tuple[int, Future, int]] = deque()
+    exhausted = False
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="question-import")
+    try:
+        while True:
+            stopping = should_stop() if should_stop else False
+            while not exhausted and not stopping and len(pending) < workers:
+                in_flight = sum(quota for _, _, quota in pending)
+                quota = int(min(spec.per_chunk_max, collector.remaining - in_flight))
+                if quota <= 0:
+                    break
+                nxt = next(source, None)
+                if nxt is None:
+                    exhausted = True
+                    break
+                idx, chunk = nxt
+                pending.append((idx, pool.submit(_generate_chunk, spec, system_prompt, chunk, quota), quota))
+            if not pending:
+                return
+            idx, future, _ = pending.popleft()
+            try:
+                questions, warnings = future.result()
+                yield ChunkResult(index=idx, questions=questions, warnings=warnings)
+            except Exception as exc:  # noqa: BLE001
+                yield ChunkResult(index=idx, error=exc)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _generate_chunk(spec: ImportSpec, system_prompt: str, chunk: str, quota: int) -> tuple[list[dict], list[str]]:
+    payload = call_openai_responses_json(
+        instructions=system_prompt,
+        input_text=spec.chunk_prompt(chunk, quota),
+        schema_name="assessment_questions_import",
+        schema=IMPORT_JSON_SCHEMA,
+        temperature=0.3,
+        timeout_ms=spec.timeout_ms,
+    )
+    items = payload.get("questions")
+    if not isinstance(items, list):
+        return [], ["OpenAI returned unexpected payload shape."]
+
+    questions: list[dict] = []
+    warnings: list[str] = []
+    for q in items:
+        if not isinstance(q, dict):
+            continue
+        q["tags"] = spec.merged_tags
+        if spec.difficulty and not q.get("difficulty"):
+            q["difficulty"] = spec.difficulty
+        q, err = validate_mcq(q)
+        if err:
+            warnings.append(f"Skipped invalid question: {err}")
+            continue
+        questions.append(q)
+    return questions, warnings
+
+
+def dispatch_text_import(
+    job_id: str,
+    *,
+    text_chunks: list[str],
+    spec: ImportSpec,
+    tenant_id: UUID,
+    user_id: UUID,
+    category_id: UUID | None = None,
+) -> None:
+    """Queue the job on the Celery worker; without Redis fall back to an in-process thread."""
+    from app.core.redis_client import redis_client
+
+    kwargs = {
+        "text_chunks": text_chunks,
+        "spec": asdict(spec),
+        "tenant_id": str(tenant_id),
+        "user_id": str(user_id),
+        "category_id": str(category_id) if category_id else None,
+    }
+    if redis_client is None:
+        threading.Thread(target=run_text_import_job, args=(job_id,), kwargs=kwargs, daemon=True).start()
+        return
+
+    from app.tasks.assessments import run_text_import
+
+    run_text_import.delay(job_id, **kwargs)
+
+
+def run_text_import_job(
+    job_id: str,
+    *,
+    text_chunks: list[str],
+    spec: dict,
+    tenant_id: str,
+    user_id: str,
+    category_id: str | None = None,
+) -> None:
+    """Generate questions chunk by chunk and persist each chunk's questions as soon as it completes."""
+    from app.db.session import SessionLocal, set_tenant_id  # local import to avoid circular refs
+
+    import_spec = ImportSpec(**spec)
+    actor_user_id = UUID(user_id)
+    resolved_category_id = UUID(category_id) if category_id else None
+    collector = QuestionCollector(import_spec)
+    created_ids: list[str] = []
+    total = len(text_chunks)
+    cancelled = False
+
+    import_job_store.update_job(job_id, phase=f"Generating questions… (0 of {total} chunks)")
+    db = SessionLocal()
+    try:
+        results = iter_chunk_results(
+            import_spec,
+            text_chunks,
+            collector,
+            should_stop=lambda: import_job_store.is_cancel_requested(job_id),
+        )
+        for done, result in enumerate(results, start=1):
+            label = f"Chunk {result.index + 1}"
+            if result.error is not None:
+                warnings = [f"{label} skipped (AI timeout or error): {result.error}"]
+                chunk_ids: list[str] = []
+            else:
+                warnings = [f"{label}: {w}" for w in result.warnings]
+                chunk_ids = []
+                accepted = collector.accept(result.questions)
+                if accepted:
+                    set_tenant_id(db, tenant_id)
+                    for q in accepted:
+                        if resolved_category_id is not None:
+                            q["category_id"] = resolved_category_id
+                        created = assessment_service.create_question(db, payload=q, actor_user_id=actor_user_id)
+                        chunk_ids.append(str(created.id))
+                    db.commit()
+            created_ids.extend(chunk_ids)
+            import_job_store.update_job(
+                job_id,
+                phase=f"Generating questions… ({done} of {total} chunks)",
+                done_chunks=done,
+                questions_created=len(created_ids),
+                append={"warnings": warnings, "question_ids": chunk_ids},
+            )
+            if import_job_store.is_cancel_requested(job_id):
+                cancelled = True
+                results.close()
+                break
+
+        if created_ids:
+            set_tenant_id(db, tenant_id)
+            audit_service.log_action(
+                db,
+                actor_user_id=actor_user_id,
+                action="assessment_questions_import_text",
+                entity_type="assessment_question",
+                details={
+                    "imported_count": len(created_ids),
+                    "question_count_requested": import_spec.question_count,
+                    "tags": import_spec.merged_tags,
+                    "difficulty": import_spec.difficulty,
+                    "cancelled": cancelled,
+                },
+            )
+            usage_service.record_event(
+                db,
+                tenant_id=UUID(tenant_id),
+                event_key="ai.text_import",
+                quantity=float(len(created_ids)),
+                actor_user_id=actor_user_id,
+                meta={"question_count_requested": import_spec.question_count},
+            )
+            db.commit()
+
+        if cancelled:
+            import_job_store.update_job(
+                job_id, status="cancelled", phase="Cancelled by user.", imported_count=len(created_ids)
+            )
+        elif not created_ids:
+            import_job_store.update_job(
+                job_id, status="error", error="No valid questions were generated from the provided text."
+            )
+        else:
+            import_job_store.update_job(
+                job_id,
+                status="done",
+                phase="Done",
+                done_chunks=total,
+                imported_count=len(created_ids),
+            )
+    except Exception as exc:  # noqa: BLE001
+        db.rollback()
+        logger.exception("Question import job %s failed", job_id)
+        import_job_store.update_job(job_id, status="error", error=str(exc))
+    finally:
+        db.close()
@@ -5,22 +5,36 @@ Responsibilities:
   into score_percent by the submission logic, so stars map directly to it).
 - After an attempt is scored, award stars to the user's membership counter
   and evaluate which achievements were just unlocked.
-- Return newly unlocked AchievementCatalog rows so the API can include them
+- Return newly unlocked catalog entries so the API can include them
   in the submit response (for frontend toast notifications).
+- Keep per-membership streak/run/per-test state (UserAchievementProgress)
+  up to date so unlock checks never rescan attempt history.
 """
 
 from __future__ import annotations
 
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from typing import TYPE_CHECKING
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.models.assessment import AchievementCatalog, AssessmentAttempt, UserAchievement
+from app.models.assessment import (
+    AchievementCatalog,
+    AssessmentAttempt,
+    AssessmentDelivery,
+    AssessmentTestVersion,
+    UserAchievement,
+    UserAchievementProgress,
+)
 from app.models.rbac import User
 from app.models.tenant import TenantMembership
+from app.services import leaderboard_service
 
 if TYPE_CHECKING:
     pass
@@ -115,8 +129,12 @@ def award_stars(
     user_id: uuid.UUID,
     tenant_id: uuid.UUID,
     stars: int,
+    at: datetime | None = None,
 ) -> TenantMembership:
-    """Atomically increment total_stars and tests_completed on the membership row."""
+    """Atomically increment total_stars and tests_completed on the membership row.
+
+    ``at`` is when the attempt was submitted; it picks the leaderboard periods.
+    """
     membership = db.scalar(
         select(TenantMembership).where(
             TenantMembership.user_id == user_id,
@@ -126,242 +144,283 @@ def award_stars(
     if membership:
         membership.total_stars += stars
         membership.tests_completed += 1
+        leaderboard_service.record_stars(
+            db, tenant_id=tenant_id, user_id=user_id, stars=stars, at=at
+        )
     return membership
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Achievement checks
+# Achievement catalog (process-wide cache)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def check_and_unlock_achievements(
-    db: Session,
-    *,
-    user_id: uuid.UUID,
-    tenant_id: uuid.UUID,
-    attempt: AssessmentAttempt,
-    total_stars: int,
-    tests_completed: int,
-) -> list[AchievementCatalog]:
-    """Evaluate all achievement conditions for this user and unlock new ones.
+# The catalog is seeded by migrations and effectively static; a short TTL still
+# picks up edits without a restart.
+CATALOG_TTL_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Detached snapshot of an AchievementCatalog row, safe to share across sessions."""
+
+    id: uuid.UUID
+    code: str
+    name: str
+    description: str
+    icon: str
+    category: str
+    sort_order: int
+
+
+_catalog_lock = threading.Lock()
+_catalog_cache: tuple[float, dict[str, CatalogEntry]] | None = None
+
+
+def get_achievement_catalog(db: Session) -> dict[str, CatalogEntry]:
+    """Catalog keyed by code, in sort order."""
+    global _catalog_cache
+    with _catalog_lock:
+        cached = _catalog_cache
+    if cached and time.monotonic() - cached[0] < CATALOG_TTL_SECONDS:
+        return cached[1]
+    rows = db.execute(
+        select(
+            AchievementCatalog.id,
+            AchievementCatalog.code,
+            AchievementCatalog.name,
+            AchievementCatalog.description,
+            AchievementCatalog.icon,
+            AchievementCatalog.category,
+            AchievementCatalog.sort_order,
+        ).order_by(AchievementCatalog.sort_order)
+    ).all()
+    catalog = {row.code: CatalogEntry(*row) for row in rows}
+    with _catalog_lock:
+        _catalog_cache = (time.monotonic(), catalog)
+    return catalog
 
-    Returns the list of AchievementCatalog rows that were *just* unlocked by
-    this attempt (so the frontend can display toast notifications).
-    """
-    stars = attempt.stars_earned or 0
 
-    # ── Already-unlocked codes (fast set lookup) ──────────────────────────────
-    already_unlocked: set[str] = set(
-        db.scalars(
-            select(AchievementCatalog.code)
-            .join(UserAchievement, UserAchievement.achievement_id == AchievementCatalog.id)
-            .where(
-                UserAchievement.user_id == user_id,
-                UserAchievement.tenant_id == tenant_id,
-            )
-        ).all()
-    )
+def invalidate_achievement_catalog() -> None:
+    global _catalog_cache
+    with _catalog_lock:
+        _catalog_cache = None
 
-    # ── Full catalog (keyed by code) ──────────────────────────────────────────
-    catalog: dict[str, AchievementCatalog] = {
-        a.code: a
-        for a in db.scalars(select(AchievementCatalog)).all()
-    }
 
-    to_unlock: list[str] = []
+# ─────────────────────────────────────────────────────────────────────────────
+# Incremental achievement progress
+# ─────────────────────────────────────────────────────────────────────────────
 
-    def _maybe(code: str) -> None:
-        if code in catalog and code not in already_unlocked:
-            to_unlock.append(code)
+def _iso_week(dt: datetime | date) -> str:
+    iso = dt.isocalendar()
+    return f"{iso.year}-{iso.week:02d}"
 
-    # ── Star milestones ───────────────────────────────────────────────────────
-    if total_stars >= 1:
-        _maybe("first_star")
-    for threshold, code in [(10, "stars_10"), (50, "stars_50"), (100, "stars_100"),
-                             (250, "stars_250"), (500, "stars_500"), (1000, "stars_1000")]:
-        if total_stars >= threshold:
-            _maybe(code)
 
-    # ── Test completion milestones ────────────────────────────────────────────
-    for threshold, code in [(1, "tests_1"), (10, "tests_10"), (25, "tests_25"),
-                             (50, "tests_50"), (100, "tests_100")]:
-        if tests_completed >= threshold:
-            _maybe(code)
+def _previous_week(week: str) -> str:
+    year, number = (int(part) for part in week.split("-"))
+    return _iso_week(date.fromisocalendar(year, number, 1) - timedelta(weeks=1))
 
-    # ── Performance achievements ──────────────────────────────────────────────
-    if stars == 5:
-        _maybe("perfect_score")
 
-    # Perfect 3 in a row — check last 3 scored attempts
-    if stars == 5 and "perfect_3" not in already_unlocked and "perfect_3" in catalog:
-        last3 = db.scalars(
-            select(AssessmentAttempt.stars_earned)
-            .where(
-                AssessmentAttempt.user_id == user_id,
-                AssessmentAttempt.status == "scored",
-                AssessmentAttempt.stars_earned.isnot(None),
-            )
-            .order_by(AssessmentAttempt.submitted_at.desc())
-            .limit(3)
-        ).all()
-        if len(last3) == 3 and all(s == 5 for s in last3):
-            _maybe("perfect_3")
+def _advance_progress(
+    progress: UserAchievementProgress,
+    *,
+    stars: int,
+    week: str,
+    test_key: str | None,
+) -> int | None:
+    """Fold one scored attempt into ``progress``; returns the previous stars on the same test."""
+    if progress.last_active_week != week:
+        if progress.last_active_week and progress.last_active_week == _previous_week(week):
+            progress.current_week_streak += 1
+        else:
+            progress.current_week_streak = 1
+        progress.last_active_week = week
+    progress.perfect_run = progress.perfect_run + 1 if stars == 5 else 0
+    if stars == 5:
+        progress.five_star_count += 1
+    if stars < 3:
+        progress.low_star_count += 1
 
-    # Five-star on 10 different attempts
-    if stars == 5 and "five_star_10" not in already_unlocked and "five_star_10" in catalog:
-        five_star_count = db.scalar(
-            select(func.count())
-            .where(
-                AssessmentAttempt.user_id == user_id,
-                AssessmentAttempt.stars_earned == 5,
-                AssessmentAttempt.status == "scored",
-            )
-        ) or 0
-        if five_star_count >= 10:
-            _maybe("five_star_10")
+    previous = None
+    if test_key:
+        test_stars = dict(progress.test_stars or {})
+        entry = test_stars.get(test_key) or {}
+        previous = entry.get("last")
+        test_stars[test_key] = {"last": stars, "best": max(stars, entry.get("best") or 0)}
+        progress.test_stars = test_stars  # reassign so the JSONB change is detected
+    return previous
 
-    # High Star Rate over 10+ tests
-    if tests_completed >= 10:
-        star_rate = total_stars / tests_completed
-        if star_rate >= 4.0:
-            _maybe("rate_4")
-        if star_rate >= 4.5:
-            _maybe("rate_45")
 
-    # Consistent — never below 3 stars across 10+ tests
-    if tests_completed >= 10 and "consistent" not in already_unlocked and "consistent" in catalog:
-        low_count = db.scalar(
-            select(func.count())
+def _load_progress(
+    db: Session,
+    *,
+    user_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    exclude_attempt_id: uuid.UUID,
+) -> UserAchievementProgress:
+    """Lock the member's progress row, seeding it once from attempt history if missing."""
+    def _locked() -> UserAchievementProgress | None:
+        return db.scalar(
+            select(UserAchievementProgress)
             .where(
-                AssessmentAttempt.user_id == user_id,
-                AssessmentAttempt.stars_earned < 3,
-                AssessmentAttempt.status == "scored",
+                UserAchievementProgress.tenant_id == tenant_id,
+                UserAchievementProgress.user_id == user_id,
             )
-        ) or 0
-        if low_count == 0:
-            _maybe("consistent")
-
-    # ── Streak achievements ───────────────────────────────────────────────────
-    _check_streaks(db, user_id=user_id, already_unlocked=already_unlocked, catalog=catalog,
-                   to_unlock=to_unlock)
+            .with_for_update()
+        )
 
-    # ── Improvement achievements ──────────────────────────────────────────────
-    _check_improvement(db, user_id=user_id, attempt=attempt,
-                       already_unlocked=already_unlocked, catalog=catalog, to_unlock=to_unlock)
+    progress = _locked()
+    if progress is not None:
+        return progress
+
+    seed = UserAchievementProgress(
+        tenant_id=tenant_id,
+        user_id=user_id,
+        current_week_streak=0,
+        perfect_run=0,
+        five_star_count=0,
+        low_star_count=0,
+        test_stars={},
+    )
+    history = db.execute(
+        select(AssessmentAttempt.submitted_at, AssessmentAttempt.stars_earned, AssessmentTestVersion.test_id)
+        .join(AssessmentDelivery, AssessmentDelivery.id == AssessmentAttempt.delivery_id)
+        .join(AssessmentTestVersion, AssessmentTestVersion.id == AssessmentDelivery.test_version_id)
+        .where(
+            AssessmentAttempt.user_id == user_id,
+            AssessmentAttempt.tenant_id == tenant_id,
+            AssessmentAttempt.id != exclude_attempt_id,
+            AssessmentAttempt.status == "scored",
+            AssessmentAttempt.stars_earned.isnot(None),
+            AssessmentAttempt.submitted_at.isnot(None),
+        )
+        .order_by(AssessmentAttempt.submitted_at)
+    )
+    for submitted_at, stars, test_id in history:
+        _advance_progress(seed, stars=stars, week=_iso_week(submitted_at), test_key=str(test_id))
 
-    # ── Unlock new achievements ───────────────────────────────────────────────
-    newly_unlocked: list[AchievementCatalog] = []
-    now = datetime.now(UTC)
-    for code in to_unlock:
-        achievement = catalog[code]
-        ua = UserAchievement(
+    # A concurrent first submission may have seeded the row already; theirs wins.
+    db.execute(
+        insert(UserAchievementProgress)
+        .values(
             tenant_id=tenant_id,
             user_id=user_id,
-            achievement_id=achievement.id,
-            unlocked_at=now,
+            current_week_streak=seed.current_week_streak,
+            last_active_week=seed.last_active_week,
+            perfect_run=seed.perfect_run,
+            five_star_count=seed.five_star_count,
+            low_star_count=seed.low_star_count,
+            test_stars=seed.test_stars,
         )
-        db.add(ua)
-        newly_unlocked.append(achievement)
+        .on_conflict_do_nothing()
+    )
+    return _locked()
 
-    return newly_unlocked
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Achievement checks
+# ─────────────────────────────────────────────────────────────────────────────
 
-def _check_streaks(
-    db: Session,
-    user_id: uuid.UUID,
-    already_unlocked: set[str],
-    catalog: dict[str, AchievementCatalog],
-    to_unlock: list[str],
-) -> None:
-    """Check consecutive week streaks — needs at most one query."""
-    needed_weeks = 0
-    if "week_streak_8" not in already_unlocked and "week_streak_8" in catalog:
-        needed_weeks = 8
-    elif "week_streak_4" not in already_unlocked and "week_streak_4" in catalog:
-        needed_weeks = 4
-    elif "week_streak_2" not in already_unlocked and "week_streak_2" in catalog:
-        needed_weeks = 2
-
-    if needed_weeks == 0:
-        return
-
-    # Fetch submitted_at for last needed_weeks+1 weeks of scored attempts
-    since = datetime.now(UTC) - timedelta(weeks=needed_weeks + 1)
-    dates = db.scalars(
-        select(AssessmentAttempt.submitted_at)
-        .where(
-            AssessmentAttempt.user_id == user_id,
-            AssessmentAttempt.status == "scored",
-            AssessmentAttempt.submitted_at >= since,
-        )
-        .order_by(AssessmentAttempt.submitted_at.desc())
-    ).all()
+STAR_MILESTONES = [(1, "first_star"), (10, "stars_10"), (50, "stars_50"), (100, "stars_100"),
+                   (250, "stars_250"), (500, "stars_500"), (1000, "stars_1000")]
+TEST_MILESTONES = [(1, "tests_1"), (10, "tests_10"), (25, "tests_25"),
+                   (50, "tests_50"), (100, "tests_100")]
+STREAK_MILESTONES = [(2, "week_streak_2"), (4, "week_streak_4"), (8, "week_streak_8")]
 
-    if not dates:
-        return
 
-    # Build set of ISO year-week strings that have at least one attempt
-    weeks_with_attempt: set[str] = set()
-    for dt in dates:
-        if dt:
-            iso = dt.isocalendar()
-            weeks_with_attempt.add(f"{iso.year}-{iso.week:02d}")
+def achievement_candidates(
+    *,
+    stars: int,
+    total_stars: int,
+    tests_completed: int,
+    progress: UserAchievementProgress,
+    previous_test_stars: int | None,
+) -> list[str]:
+    """Codes whose conditions hold after this attempt (whether or not already unlocked)."""
+    codes = [code for threshold, code in STAR_MILESTONES if total_stars >= threshold]
+    codes += [code for threshold, code in TEST_MILESTONES if tests_completed >= threshold]
 
-    # Check if there are N consecutive weeks ending at the current week
-    now = datetime.now(UTC)
-    consecutive = 0
-    check_date = now
-    for _ in range(needed_weeks):
-        iso = check_date.isocalendar()
-        key = f"{iso.year}-{iso.week:02d}"
-        if key in weeks_with_attempt:
-            consecutive += 1
-            check_date -= timedelta(weeks=1)
-        else:
-            break
+    if stars == 5:
+        codes.append("perfect_score")
+    if progress.perfect_run >= 3:
+        codes.append("perfect_3")
+    if progress.five_star_count >= 10:
+        codes.append("five_star_10")
+
+    if tests_completed >= 10:
+        star_rate = total_stars / tests_completed
+        if star_rate >= 4.0:
+            codes.append("rate_4")
+        if star_rate >= 4.5:
+            codes.append("rate_45")
+        if progress.low_star_count == 0:
+            codes.append("consistent")
 
-    if consecutive >= 2 and "week_streak_2" not in already_unlocked:
-        to_unlock.append("week_streak_2") if "week_streak_2" in catalog else None
-    if consecutive >= 4 and "week_streak_4" not in already_unlocked:
-        to_unlock.append("week_streak_4") if "week_streak_4" in catalog else None
-    if consecutive >= 8 and "week_streak_8" not in already_unlocked:
-        to_unlock.append("week_streak_8") if "week_streak_8" in catalog else None
+    codes += [code for weeks, code in STREAK_MILESTONES if progress.current_week_streak >= weeks]
 
+    if previous_test_stars is not None:
+        if stars - previous_test_stars >= 2:
+            codes.append("improver")
+        if previous_test_stars == 1 and stars == 5:
+            codes.append("comeback")
+    return codes
 
-def _check_improvement(
+
+def check_and_unlock_achievements(
     db: Session,
+    *,
     user_id: uuid.UUID,
+    tenant_id: uuid.UUID,
     attempt: AssessmentAttempt,
-    already_unlocked: set[str],
-    catalog: dict[str, AchievementCatalog],
-    to_unlock: list[str],
-) -> None:
-    """Check improver + comeback achievements against previous attempt on same delivery."""
-    if attempt.stars_earned is None:
-        return
-
-    # Get previous scored attempt on the same delivery by the same user
-    previous = db.scalar(
-        select(AssessmentAttempt)
-        .where(
-            AssessmentAttempt.delivery_id == attempt.delivery_id,
-            AssessmentAttempt.user_id == user_id,
-            AssessmentAttempt.id != attempt.id,
-            AssessmentAttempt.status == "scored",
-            AssessmentAttempt.stars_earned.isnot(None),
-        )
-        .order_by(AssessmentAttempt.submitted_at.desc())
-        .limit(1)
+    total_stars: int,
+    tests_completed: int,
+    test_id: uuid.UUID | None = None,
+) -> list[CatalogEntry]:
+    """Update the member's achievement progress with this attempt and unlock new achievements.
+
+    Constant DB work per call: lock the progress row, then one INSERT … ON CONFLICT DO
+    NOTHING RETURNING for every satisfied condition, so only rows that were *just*
+    unlocked come back (for the frontend's toast notifications).
+    """
+    stars = attempt.stars_earned or 0
+    catalog = get_achievement_catalog(db)
+    progress = _load_progress(db, user_id=user_id, tenant_id=tenant_id, exclude_attempt_id=attempt.id)
+    previous_test_stars = _advance_progress(
+        progress,
+        stars=stars,
+        week=_iso_week(attempt.submitted_at or datetime.now(UTC)),
+        test_key=str(test_id or attempt.delivery_id),
     )
-    if not previous or previous.stars_earned is None:
-        return
 
-    if "improver" not in already_unlocked and "improver" in catalog:
-        if attempt.stars_earned - previous.stars_earned >= 2:
-            to_unlock.append("improver")
+    codes = achievement_candidates(
+        stars=stars,
+        total_stars=total_stars,
+        tests_completed=tests_completed,
+        progress=progress,
+        previous_test_stars=previous_test_stars,
+    )
+    by_id = {catalog[code].id: catalog[code] for code in codes if code in catalog}
+    if not by_id:
+        return []
 
-    if "comeback" not in already_unlocked and "comeback" in catalog:
-        if previous.stars_earned == 1 and attempt.stars_earned == 5:
-            to_unlock.append("comeback")
+    now = datetime.now(UTC)
+    unlocked_ids = db.scalars(
+        insert(UserAchievement)
+        .values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "user_id": user_id,
+                    "achievement_id": achievement_id,
+                    "unlocked_at": now,
+                }
+                for achievement_id in by_id
+            ]
+        )
+        .on_conflict_do_nothing(constraint="uq_user_achievement")
+        .returning(UserAchievement.achievement_id)
+    ).all()
+    return sorted((by_id[a_id] for a_id in unlocked_ids), key=lambda a: a.sort_order)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -395,9 +454,7 @@ def get_user_star_profile(
     ).all():
         unlocked_map[ua.achievement_id] = ua.unlocked_at
 
-    all_achievements = db.scalars(
-        select(AchievementCatalog).order_by(AchievementCatalog.sort_order)
-    ).all()
+    all_achievements = list(get_achievement_catalog(db).values())
 
     achievements_out = []
     for a in all_achievements:
@@ -452,25 +509,36 @@ def get_team_performance(
     tenant_id: uuid.UUID,
     period_start: datetime | None = None,
     period_end: datetime | None = None,
+    period_type: str | None = None,
 ) -> list[dict]:
-    """Return per-member star performance stats for the tenant (manager view)."""
-    memberships = db.scalars(
-        select(TenantMembership).where(
+    """Return per-member star performance stats for the tenant (manager view).
+
+    ``period_type`` (week/month/quarter) reads the current period from the leaderboard
+    rollups; an explicit ``period_start``/``period_end`` window aggregates attempts.
+    """
+    members = db.execute(
+        select(
+            TenantMembership.user_id,
+            TenantMembership.total_stars,
+            TenantMembership.tests_completed,
+            TenantMembership.created_at,
+            User.full_name,
+            User.email,
+        )
+        .join(User, User.id == TenantMembership.user_id)
+        .where(
             TenantMembership.tenant_id == tenant_id,
             TenantMembership.status == "active",
         )
     ).all()
 
-    user_ids = [m.user_id for m in memberships]
-    membership_map = {m.user_id: m for m in memberships}
-
-    users = db.scalars(select(User).where(User.id.in_(user_ids))).all()
-    user_map = {u.id: u for u in users}
-
-    # Period-specific attempt counts if filters are provided
-    if period_start or period_end:
+    has_period = bool(period_type or period_start or period_end)
+    period_map: dict[uuid.UUID, tuple[int, int]] = {}
+    if period_type:
+        period_map = leaderboard_service.period_totals(db, tenant_id=tenant_id, period_type=period_type)
+    elif period_start or period_end:
         attempt_filter = [
-            AssessmentAttempt.user_id.in_(user_ids),
+            AssessmentAttempt.tenant_id == tenant_id,
             AssessmentAttempt.status == "scored",
             AssessmentAttempt.stars_earned.isnot(None),
         ]
@@ -479,46 +547,38 @@ def get_team_performance(
         if period_end:
             attempt_filter.append(AssessmentAttempt.submitted_at <= period_end)
 
-        from sqlalchemy import and_
-        from app.models.assessment import AssessmentDelivery
-
         rows = db.execute(
             select(
                 AssessmentAttempt.user_id,
-                func.count().label("period_tests"),
                 func.sum(AssessmentAttempt.stars_earned).label("period_stars"),
+                func.count().label("period_tests"),
             )
             .where(*attempt_filter)
             .group_by(AssessmentAttempt.user_id)
         ).all()
-        period_map = {r.user_id: {"period_tests": r.period_tests, "period_stars": r.period_stars} for r in rows}
-    else:
-        period_map = {}
+        period_map = {r.user_id: (int(r.period_stars or 0), int(r.period_tests)) for r in rows}
 
+    now = datetime.now(UTC)
     result = []
-    for m in memberships:
-        u = user_map.get(m.user_id)
-        if not u:
-            continue
-        period_data = period_map.get(m.user_id, {"period_tests": 0, "period_stars": 0})
-        tests = period_data["period_tests"] if period_start or period_end else m.tests_completed
-        stars = period_data["period_stars"] if period_start or period_end else m.total_stars
+    for m in members:
+        period_stars, period_tests = period_map.get(m.user_id, (0, 0))
+        tests = period_tests if has_period else m.tests_completed
+        stars = period_stars if has_period else m.total_stars
         rate = round(stars / tests, 2) if tests > 0 else 0.0
 
         # Tenure in months
-        now = datetime.now(UTC)
         joined = m.created_at.replace(tzinfo=UTC) if m.created_at and m.created_at.tzinfo is None else (m.created_at or now)
         tenure_months = max(0, int((now - joined).days / 30.44))
 
         result.append({
             "user_id": str(m.user_id),
-            "full_name": u.full_name or u.email,
-            "email": u.email,
+            "full_name": m.full_name or m.email,
+            "email": m.email,
             "total_stars": m.total_stars,
             "tests_completed": m.tests_completed,
             "star_rate": round(m.total_stars / m.tests_completed, 2) if m.tests_completed > 0 else 0.0,
-            "period_stars": period_data["period_stars"] or 0,
-            "period_tests": period_data["period_tests"] or 0,
+            "period_stars": period_stars,
+            "period_tests": period_tests,
             "period_star_rate": rate,
             "tenure_months": tenure_months,
         })
@@ -0,0 +1,245 @@
+"""Background propagation of a published track version to the template's assignments.
+
+Publishing with ``apply_to_assignments`` records a ``TrackPropagationJob`` and hands
+it to a worker, which walks the template's assignments in id order and moves one
+chunk per transaction with ``assignment_service.apply_track_version_chunk``. The
+job row keeps the keyset cursor, so a re-delivered or restarted job continues
+after the last committed chunk. Workers claim a job with a conditional UPDATE
+(queued, or running with a stale heartbeat), so a duplicate delivery of a job
+that is already running does nothing. Before each chunk the worker re-checks
+that its version is still the template's current one and stops if a newer
+publish superseded it; assignments already on the target version are skipped,
+so re-running a chunk is a no-op.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.session import SessionLocal, set_tenant_id
+from app.models.assignment import OnboardingAssignment
+from app.models.track import TrackPhase, TrackPropagationJob, TrackTask, TrackVersion
+from app.services import assignment_service
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+# A running job whose worker has not reported for this long is resumed by the next publish
+# (or a re-delivered task). Queued jobs are never stale: they have no worker yet.
+STALE_AFTER = timedelta(minutes=2)
+
+
+def _pending_assignments(template_id: UUID, version_id: UUID):
+    return select(OnboardingAssignment.id).where(
+        OnboardingAssignment.template_id == template_id,
+        OnboardingAssignment.track_version_id != version_id,
+    )
+
+
+def _stale_worker(cutoff: datetime):
+    return and_(
+        TrackPropagationJob.status == 'running',
+        TrackPropagationJob.last_heartbeat_at < cutoff,
+    )
+
+
+def cancel_job(db: Session, *, job: TrackPropagationJob, actor_user_id: UUID) -> None:
+    """Cancel an active job: a queued or abandoned one at once, a live one at its next chunk."""
+    now = datetime.now(UTC)
+    finish = or_(TrackPropagationJob.status == 'queued', _stale_worker(now - STALE_AFTER))
+    db.execute(
+        update(TrackPropagationJob)
+        .where(TrackPropagationJob.id == job.id, TrackPropagationJob.status.in_(ACTIVE_STATUSES))
+        .values(
+            cancel_requested=True,
+            status=case((finish, 'canceled'), else_=TrackPropagationJob.status),
+            completed_at=case((finish, now), else_=TrackPropagationJob.completed_at),
+            updated_by=actor_user_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(job)
+
+
+def start_propagation_job(
+    db: Session,
+    *,
+    template_id: UUID,
+    version_id: UUID,
+    actor_user_id: UUID,
+) -> tuple[TrackPropagationJob, bool]:
+    """Create (or pick up) the propagation job for ``version_id``.
+
+    Returns ``(job, needs_dispatch)``: a live job for the same version is returned as is,
+    one whose worker went stale is requeued and resumed from its cursor. Active jobs for
+    older versions are canceled.
+    """
+    active = db.scalars(
+        select(TrackPropagationJob).where(
+            TrackPropagationJob.template_id == template_id,
+            TrackPropagationJob.status.in_(ACTIVE_STATUSES),
+        )
+    ).all()
+    cutoff = datetime.now(UTC) - STALE_AFTER
+    for job in active:
+        if job.track_version_id != version_id:
+            cancel_job(db, job=job, actor_user_id=actor_user_id)
+            continue
+        if job.status == 'queued':
+            # Re-sending a long-queued job covers a lost message; only one worker can claim it.
+            return job, job.updated_at < cutoff
+        requeued = db.execute(
+            update(TrackPropagationJob)
+            .where(TrackPropagationJob.id == job.id, _stale_worker(cutoff))
+            .values(status='queued', error_summary=None, updated_by=actor_user_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.refresh(job)
+        return job, bool(requeued)
+
+    total = db.scalar(
+        select(func.count()).select_from(_pending_assignments(template_id, version_id).subquery())
+    )
+    job = TrackPropagationJob(
+        template_id=template_id,
+        track_version_id=version_id,
+        status='queued',
+        total=int(total or 0),
+        processed=0,
+        created_by=actor_user_id,
+        updated_by=actor_user_id,
+    )
+    db.add(job)
+    db.flush()
+    return job, True
+
+
+def dispatch_propagation_job(*, job_id: UUID, tenant_id: UUID) -> None:
+    """Queue the job on the Celery worker; without Redis fall back to an in-process thread."""
+    from app.core.redis_client import redis_client
+
+    if redis_client is None:
+        threading.Thread(
+            target=run_propagation_job,
+            kwargs={'job_id': job_id, 'tenant_id': tenant_id},
+            daemon=True,
+        ).start()
+        return
+
+    from app.tasks.tracks import run_track_propagation
+
+    run_track_propagation.delay(job_id=str(job_id), tenant_id=str(tenant_id))
+
+
+def run_propagation_job(
+    *,
+    job_id: UUID,
+    tenant_id: UUID,
+    chunk_size: int = assignment_service.PROPAGATION_CHUNK_SIZE,
+) -> None:
+    db = SessionLocal()
+    try:
+        def _update_job(**fields: Any) -> None:
+            # Only while this worker's claim stands; a canceled job stays canceled.
+            set_tenant_id(db, str(tenant_id))
+            db.execute(
+                update(TrackPropagationJob)
+                .where(TrackPropagationJob.id == job_id, TrackPropagationJob.status == 'running')
+                .values(last_heartbeat_at=datetime.now(UTC), **fields)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+        set_tenant_id(db, str(tenant_id))
+        now = datetime.now(UTC)
+        job = db.execute(
+            update(TrackPropagationJob)
+            .where(
+                TrackPropagationJob.id == job_id,
+                or_(TrackPropagationJob.status == 'queued', _stale_worker(now - STALE_AFTER)),
+            )
+            .values(
+                status='running',
+                started_at=func.coalesce(TrackPropagationJob.started_at, now),
+                last_heartbeat_at=now,
+            )
+            .returning(
+                TrackPropagationJob.template_id,
+                TrackPropagationJob.track_version_id,
+                TrackPropagationJob.created_by,
+                TrackPropagationJob.last_assignment_id,
+                TrackPropagationJob.processed,
+            )
+        ).one_or_none()
+        db.commit()
+        if job is None:
+            # Finished, canceled, or claimed by a live worker.
+            return
+        template_id, version_id, actor_user_id = job.template_id, job.track_version_id, job.created_by
+        last_id = job.last_assignment_id
+        processed = job.processed
+
+        version = db.scalar(
+            select(TrackVersion)
+            .where(TrackVersion.id == version_id)
+            .options(
+                selectinload(TrackVersion.phases)
+                .selectinload(TrackPhase.tasks)
+                .selectinload(TrackTask.resources)
+            )
+        )
+        if version is None:
+            _update_job(status='failed', error_summary='Track version no longer exists')
+            return
+        plan = assignment_service.plan_track_version(db, version)
+        _update_job()
+
+        while True:
+            set_tenant_id(db, str(tenant_id))
+            state = db.execute(
+                select(TrackPropagationJob.cancel_requested, TrackVersion.is_current)
+                .join(TrackVersion, TrackVersion.id == TrackPropagationJob.track_version_id)
+                .where(TrackPropagationJob.id == job_id)
+            ).one_or_none()
+            if state is None or state.cancel_requested:
+                _update_job(status='canceled', completed_at=datetime.now(UTC))
+                return
+            if not state.is_current:
+                _update_job(
+                    status='canceled',
+                    error_summary='Superseded by a newer published version',
+                    completed_at=datetime.now(UTC),
+                )
+                return
+
+            query = _pending_assignments(template_id, version_id)
+            if last_id is not None:
+                query = query.where(OnboardingAssignment.id > last_id)
+            ids = list(db.scalars(query.order_by(OnboardingAssignment.id).limit(chunk_size)))
+            if not ids:
+                break
+            assignment_service.apply_track_version_chunk(
+                db, plan=plan, assignment_ids=ids, actor_user_id=actor_user_id
+            )
+            processed += len(ids)
+            last_id = ids[-1]
+            # The chunk and the cursor commit together, so a restart never skips or repeats work.
+            _update_job(processed=processed, last_assignment_id=last_id)
+
+        _update_job(status='completed', completed_at=datetime.now(UTC))
+    except Exception as exc:
+        logger.exception('Track propagation job %s failed', job_id)
+        try:
+            db.rollback()
+            _update_job(status='failed', error_summary=str(exc)[:500])
+        except Exception:  # noqa: BLE001
+            pass  # best-effort — don't mask the original exception
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.core.celery_app import celery_app
+from app.services.assessment_classification_service import run_classification_job
+from app.services.item_analysis_service import run_rebuild
+from app.services.question_import_service import run_text_import_job
+
+
+@celery_app.task(name='app.tasks.assessments.run_text_import', acks_late=False)
+def run_text_import(
+    job_id: str,
+    *,
+    text_chunks: list[str],
+    spec: dict,
+    tenant_id: str,
+    user_id: str,
+    category_id: str | None = None,
+) -> None:
+    # Not re-delivered on worker loss: questions are persisted per chunk, so a replay would duplicate them.
+    run_text_import_job(
+        job_id,
+        text_chunks=text_chunks,
+        spec=spec,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        category_id=category_id,
+    )
+
+
+@celery_app.task(name='app.tasks.assessments.run_classification')
+def run_classification(
+    *,
+    job_id: str,
+    tenant_id: str,
+    actor_user_id: str,
+    mode: str,
+    dry_run: bool,
+    batch_size: int,
+) -> None:
+    run_classification_job(
+        job_id=UUID(job_id),
+        tenant_id=UUID(tenant_id),
+        actor_user_id=UUID(actor_user_id),
+        mode=mode,
+        dry_run=dry_run,
+        batch_size=batch_size,
+    )
+
+
+@celery_app.task(name='app.tasks.assessments.rebuild_item_statistics')
+def rebuild_item_statistics(*, tenant_id: str, test_version_id: str) -> None:
+    run_rebuild(tenant_id=UUID(tenant_id), test_version_id=UUID(test_version_id))
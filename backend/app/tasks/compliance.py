@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.core.celery_app import celery_app
+from app.services.compliance_snapshot_service import run_scheduled_snapshots
+from app.services.compliance_summary_service import run_rollup_refresh
+
+
+@celery_app.task(name='app.tasks.compliance.run_compliance_snapshots')
+def run_compliance_snapshots() -> int:
+    return run_scheduled_snapshots()
+
+
+@celery_app.task(name='app.tasks.compliance.refresh_compliance_rollups')
+def refresh_compliance_rollups(tenant_id: str) -> None:
+    run_rollup_refresh(tenant_id=UUID(tenant_id))
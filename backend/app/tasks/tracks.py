@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.core.celery_app import celery_app
+from app.services.track_propagation_service import run_propagation_job
+
+
+@celery_app.task(name='app.tasks.tracks.run_track_propagation')
+def run_track_propagation(*, job_id: str, tenant_id: str) -> None:
+    # Safe to re-deliver after a worker loss: the job resumes from its last committed chunk.
+    run_propagation_job(job_id=UUID(job_id), tenant_id=UUID(tenant_id))
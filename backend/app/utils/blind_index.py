@@ -0,0 +1,74 @@
+"""Keyed blind-index tokens for searching encrypted-at-rest values.
+
+A token is a truncated HMAC-SHA256, under a subkey derived from the tenant data
+key, of ``<kind>:<scope>:<term>`` where scope names the table and column the
+value came from. For every value we index:
+  exact   the whole normalized value
+  prefix  its first one and two characters
+  gram    each distinct character trigram
+
+Searching a term matches a row when its exact token is present, or when every
+trigram of the term is (terms shorter than a trigram use the prefix token).
+Trigram containment is a superset check: no false negatives, rare false positives.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import unicodedata
+from dataclasses import dataclass
+
+
+TOKEN_HEX_LEN = 16
+GRAM_LEN = 3
+_SUBKEY_LABEL = b"blind-index:v1"
+
+
+@dataclass(frozen=True)
+class QueryTokens:
+    exact: str
+    required: tuple[str, ...]
+
+
+def derive_index_key(key: bytes) -> bytes:
+    """Subkey for blind indexes, so tokens never reuse the encryption key directly."""
+    return hmac.new(key, _SUBKEY_LABEL, hashlib.sha256).digest()
+
+
+def normalize(value: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", value).casefold().split())
+
+
+def _token(index_key: bytes, kind: str, scope: str, term: str) -> str:
+    msg = f"{kind}:{scope}:{term}".encode("utf-8")
+    return hmac.new(index_key, msg, hashlib.sha256).hexdigest()[:TOKEN_HEX_LEN]
+
+
+def _grams(term: str) -> set[str]:
+    return {term[i : i + GRAM_LEN] for i in range(len(term) - GRAM_LEN + 1)}
+
+
+def value_tokens(index_key: bytes, scope: str, value: str | None) -> set[str]:
+    if not value:
+        return set()
+    term = normalize(value)
+    if not term:
+        return set()
+    tokens = {_token(index_key, "exact", scope, term)}
+    tokens.update(_token(index_key, "prefix", scope, term[:n]) for n in range(1, GRAM_LEN) if len(term) >= n)
+    tokens.update(_token(index_key, "gram", scope, gram) for gram in _grams(term))
+    return tokens
+
+
+def query_tokens(index_key: bytes, scope: str, search: str) -> QueryTokens | None:
+    term = normalize(search)
+    if not term:
+        return None
+    exact = _token(index_key, "exact", scope, term)
+    if len(term) < GRAM_LEN:
+        return QueryTokens(exact=exact, required=(_token(index_key, "prefix", scope, term),))
+    return QueryTokens(
+        exact=exact,
+        required=tuple(sorted(_token(index_key, "gram", scope, gram) for gram in _grams(term))),
+    )
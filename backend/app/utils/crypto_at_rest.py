@@ -7,14 +7,21 @@ AES-256-GCM with scrypt-derived keys. Ciphertext format:
 from __future__ import annotations
 
 import base64
+import binascii
 import hashlib
+import multiprocessing
 import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
-
 PREFIX = "enc:v1:"
+_PREFIX_LEN = len(PREFIX)
 NONCE_LEN = 12
 
 
@@ -44,6 +51,39 @@ def derive_key(passphrase: str, salt: bytes, params: KdfParams | None = None) ->
     )
 
 
+_kdf_pool: ProcessPoolExecutor | None = None
+_kdf_pool_lock = threading.Lock()
+
+
+def _get_kdf_pool() -> ProcessPoolExecutor:
+    global _kdf_pool
+    with _kdf_pool_lock:
+        if _kdf_pool is None:
+            from app.core.config import settings
+
+            _kdf_pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.IR_KDF_POOL_SIZE),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _kdf_pool
+
+
+def derive_key_pooled(passphrase: str, salt: bytes, params: KdfParams | None = None) -> bytes:
+    """``derive_key`` in a bounded process pool, capping concurrent scrypt CPU and memory.
+
+    Falls back to deriving in-process if the pool cannot be used.
+    """
+    global _kdf_pool
+    if not passphrase:
+        raise ValueError("Passphrase is required")
+    try:
+        return _get_kdf_pool().submit(derive_key, passphrase, salt, params).result()
+    except (BrokenProcessPool, OSError):
+        with _kdf_pool_lock:
+            _kdf_pool = None
+        return derive_key(passphrase, salt, params)
+
+
 def fingerprint_key(key: bytes) -> str:
     return hashlib.sha256(key).hexdigest()
 
@@ -73,3 +113,36 @@ def decrypt_str(ciphertext: str, key: bytes, aad: bytes) -> str:
     aes = AESGCM(key)
     plaintext = aes.decrypt(nonce, data, aad)
     return plaintext.decode("utf-8")
+
+
+class ColumnCipher:
+    """Decrypts many values sharing one key and AAD (one table column of one tenant).
+
+    The AES-GCM context and the AAD are built once, instead of per value as in
+    ``decrypt_str``. Safe to share between threads.
+    """
+
+    __slots__ = ("_aad", "_aes")
+
+    def __init__(self, key: bytes, aad: bytes) -> None:
+        self._aes = AESGCM(key)
+        self._aad = aad
+
+    def decrypt(self, ciphertext: str) -> str:
+        if not ciphertext.startswith(PREFIX):
+            raise ValueError("ciphertext does not have encryption prefix")
+        raw = memoryview(binascii.a2b_base64(ciphertext[_PREFIX_LEN:]))
+        return self._aes.decrypt(raw[:NONCE_LEN], raw[NONCE_LEN:], self._aad).decode("utf-8")
+
+    def decrypt_many(self, ciphertexts: Sequence[str]) -> list[str | None]:
+        """Decrypt prefixed values in order; malformed or unauthenticated ones become None."""
+        aes, aad = self._aes, self._aad
+        out: list[str | None] = []
+        append = out.append
+        for ciphertext in ciphertexts:
+            try:
+                raw = memoryview(binascii.a2b_base64(ciphertext[_PREFIX_LEN:]))
+                append(aes.decrypt(raw[:NONCE_LEN], raw[NONCE_LEN:], aad).decode("utf-8"))
+            except (InvalidTag, ValueError):
+                append(None)
+        return out
@@ -0,0 +1,88 @@
+"""Minimal JSON Patch (RFC 6902) diff and apply for JSON-compatible dicts/lists.
+
+``make_patch`` emits only ``add`` / ``remove`` / ``replace``: objects are diffed
+key by key, lists element by element over their common length, with trailing
+elements appended or removed from the end. ``apply_patch`` never mutates its input.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(old: Any, new: Any, path: str, ops: list[dict[str, Any]]) -> None:
+    if type(old) is not type(new):
+        ops.append({"op": "replace", "path": path, "value": new})
+        return
+    if isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(old[key], value, child, ops)
+        return
+    if isinstance(old, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff(old[i], new[i], f"{path}/{i}", ops)
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for value in new[common:]:
+            ops.append({"op": "add", "path": f"{path}/-", "value": value})
+        return
+    if old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def make_patch(old: Any, new: Any) -> list[dict[str, Any]]:
+    ops: list[dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def apply_patch(doc: Any, patch: list[dict[str, Any]]) -> Any:
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            doc = copy.deepcopy(op["value"])
+            continue
+        *parents, last = [_unescape(t) for t in path.split("/")[1:]]
+        target = doc
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        kind = op["op"]
+        if isinstance(target, list):
+            if kind == "add":
+                value = copy.deepcopy(op["value"])
+                if last == "-":
+                    target.append(value)
+                else:
+                    target.insert(int(last), value)
+            elif kind == "remove":
+                del target[int(last)]
+            elif kind == "replace":
+                target[int(last)] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported JSON patch op: {kind}")
+        else:
+            if kind in ("add", "replace"):
+                target[last] = copy.deepcopy(op["value"])
+            elif kind == "remove":
+                del target[last]
+            else:
+                raise ValueError(f"Unsupported JSON patch op: {kind}")
+    return doc
@@ -0,0 +1,148 @@
+"""Incremental JSON helpers for large import payloads.
+
+Hashing goes through ``JSONEncoder.iterencode`` / chunked file reads so the
+digest is computed as bytes are produced instead of materializing a second
+serialized copy of the payload. Files are parsed from a sliding text window:
+values that fit in the window are decoded by the C scanner, larger arrays and
+objects are walked element by element, so the raw file is never held in full.
+Upserts are fed in fixed-size row batches to stay well below PostgreSQL's
+bind-parameter limit (65535 per statement).
+"""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import json
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, TypeVar
+
+T = TypeVar("T")
+
+READ_CHUNK_SIZE = 1024 * 1024
+UPSERT_BATCH_SIZE = 500
+
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def sha256_json(payload: Any) -> str:
+    """Digest of the canonical ``json.dumps(payload, sort_keys=True, separators=(",", ":"))``."""
+    digest = hashlib.sha256()
+    for chunk in _CANONICAL_ENCODER.iterencode(payload):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _ChunkedJSONReader:
+    """Parses one JSON document from a binary stream, hashing the bytes as they are read."""
+
+    def __init__(self, handle: BinaryIO, chunk_size: int) -> None:
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self.digest = hashlib.sha256()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self._handle.read(self._chunk_size)
+        self.digest.update(chunk)
+        self.eof = not chunk
+        text = self._text.decode(chunk, final=self.eof)
+        if self.pos >= self._chunk_size:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += text
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buf, self.pos)
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or ``""`` at end of input."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def value(self) -> Any:
+        char = self.peek()
+        if not char:
+            raise self._error("Expecting value")
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Larger than the window: walk containers, keep reading for long scalars.
+                if char in "[{" and len(self.buf) - self.pos >= self._chunk_size:
+                    return self._container(char)
+                self._fill()
+                continue
+            if not self.eof and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS):
+                # A number cut at the window edge (e.g. "1e" + "-07") continues in the next chunk.
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def _container(self, opening: str) -> Any:
+        closing = "]" if opening == "[" else "}"
+        result: Any = [] if opening == "[" else {}
+        self.pos += 1
+        if self.peek() == closing:
+            self.pos += 1
+            return result
+        while True:
+            if opening == "[":
+                result.append(self.value())
+            else:
+                if self.peek() != '"':
+                    raise self._error("Expecting property name enclosed in double quotes")
+                key = self.value()
+                if self.peek() != ":":
+                    raise self._error("Expecting ':' delimiter")
+                self.pos += 1
+                result[key] = self.value()
+            separator = self.peek()
+            if separator == closing:
+                self.pos += 1
+                return result
+            if separator != ",":
+                raise self._error("Expecting ',' delimiter")
+            self.pos += 1
+
+
+def read_json_file_hashed(path: Path, *, chunk_size: int = READ_CHUNK_SIZE) -> tuple[Any, str]:
+    """Parse a JSON file incrementally, hashing its raw bytes as they are read.
+
+    Raises ``ValueError`` (``json.JSONDecodeError`` / ``UnicodeDecodeError``) on invalid content.
+    """
+    with path.open("rb") as handle:
+        reader = _ChunkedJSONReader(handle, chunk_size)
+        data = reader.value()
+        if reader.peek():
+            raise reader._error("Extra data")
+    return data, reader.digest.hexdigest()
+
+
+def batched(rows: Iterable[T], size: int = UPSERT_BATCH_SIZE) -> Iterator[list[T]]:
+    batch: list[T] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,26 +1,125 @@
-"""In-memory per-tenant key cache.
+"""Per-tenant unlocked key cache shared by all workers.
 
-This cache is process-local and is cleared on restart.
+Keys are kept in a process-local dict and, when Redis and CREDENTIALS_ENCRYPTION_KEY
+are configured, also in Redis, wrapped (AES-GCM) under a subkey of the server
+master key. One unlock then serves every worker and survives restarts. Entries
+expire after ``settings.IR_KEY_TTL_SECONDS`` (auto-lock); the local copy is
+re-checked against Redis every ``LOCAL_RECHECK_SECONDS`` so a lock on one worker
+reaches the others. Without Redis the cache is process-local, as before.
 """
 
 from __future__ import annotations
 
+import logging
 import threading
+import time
 import uuid
+from dataclasses import dataclass
+
+from app.utils.crypto_at_rest import decrypt_str, encrypt_str
+
+logger = logging.getLogger(__name__)
+
+LOCAL_RECHECK_SECONDS = 15
+_REDIS_PREFIX = "keyring:"
+_WRAP_LABEL = b"tenant-keyring:v1"
+
+
+@dataclass(frozen=True)
+class _Entry:
+    key: bytes
+    expires_at: float
+    recheck_at: float
 
 
 _lock = threading.RLock()
-_keys: dict[tuple[uuid.UUID, str], bytes] = {}
+_keys: dict[tuple[uuid.UUID, str], _Entry] = {}
 
 
-def store_key(tenant_id: uuid.UUID, key_id: str, key: bytes) -> None:
+def _ttl_seconds() -> int:
+    from app.core.config import settings
+
+    return settings.IR_KEY_TTL_SECONDS
+
+
+def _shared_store():
+    """(redis client, wrapping key), or None when keys cannot be shared."""
+    from app.core.redis_client import redis_client
+
+    if redis_client is None:
+        return None
+    from app.core.crypto import derive_subkey
+
+    try:
+        return redis_client, derive_subkey(_WRAP_LABEL)
+    except RuntimeError:
+        return None
+
+
+def _redis_key(tenant_id: uuid.UUID, key_id: str) -> str:
+    return f"{_REDIS_PREFIX}{tenant_id}:{key_id}"
+
+
+def _aad(tenant_id: uuid.UUID, key_id: str) -> bytes:
+    return f"keyring:{tenant_id}:{key_id}".encode("utf-8")
+
+
+def _remember(tenant_id: uuid.UUID, key_id: str, key: bytes, ttl: float) -> None:
+    now = time.monotonic()
     with _lock:
-        _keys[(tenant_id, key_id)] = key
+        _keys[(tenant_id, key_id)] = _Entry(key, now + ttl, now + min(ttl, LOCAL_RECHECK_SECONDS))
+
+
+def store_key(tenant_id: uuid.UUID, key_id: str, key: bytes) -> None:
+    ttl = _ttl_seconds()
+    _remember(tenant_id, key_id, key, ttl)
+    shared = _shared_store()
+    if shared is None:
+        return
+    client, wrap = shared
+    try:
+        client.set(_redis_key(tenant_id, key_id), encrypt_str(key.hex(), wrap, _aad(tenant_id, key_id)), ex=ttl)
+    except Exception as exc:  # noqa: BLE001 - the local copy still serves this worker
+        logger.warning("Could not share unlocked key for tenant %s: %s", tenant_id, exc)
 
 
 def get_key(tenant_id: uuid.UUID, key_id: str) -> bytes | None:
+    now = time.monotonic()
     with _lock:
-        return _keys.get((tenant_id, key_id))
+        entry = _keys.get((tenant_id, key_id))
+    if entry is not None and now >= entry.expires_at:
+        with _lock:
+            _keys.pop((tenant_id, key_id), None)
+        entry = None
+
+    shared = _shared_store()
+    if shared is None:
+        return entry.key if entry else None
+    if entry is not None and now < entry.recheck_at:
+        return entry.key
+
+    client, wrap = shared
+    name = _redis_key(tenant_id, key_id)
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.get(name)
+        pipe.pttl(name)
+        wrapped, pttl = pipe.execute()
+    except Exception as exc:  # noqa: BLE001 - keep serving the local copy until it expires
+        logger.warning("Shared keyring unavailable, using local copy: %s", exc)
+        return entry.key if entry else None
+
+    if not wrapped:
+        # Locked (or expired) elsewhere.
+        with _lock:
+            _keys.pop((tenant_id, key_id), None)
+        return None
+    try:
+        key = bytes.fromhex(decrypt_str(wrapped, wrap, _aad(tenant_id, key_id)))
+    except Exception:  # noqa: BLE001 - wrapped under another master key
+        return None
+    _remember(tenant_id, key_id, key, pttl / 1000 if pttl and pttl > 0 else _ttl_seconds())
+    return key
 
 
 def is_unlocked(tenant_id: uuid.UUID, key_id: str) -> bool:
@@ -33,5 +132,19 @@ def lock_tenant(tenant_id: uuid.UUID, key_id: str | None = None) -> None:
             for k in list(_keys.keys()):
                 if k[0] == tenant_id:
                     _keys.pop(k, None)
-            return
-        _keys.pop((tenant_id, key_id), None)
+        else:
+            _keys.pop((tenant_id, key_id), None)
+
+    shared = _shared_store()
+    if shared is None:
+        return
+    client, _ = shared
+    try:
+        if key_id is None:
+            names = list(client.scan_iter(match=f"{_REDIS_PREFIX}{tenant_id}:*"))
+            if names:
+                client.delete(*names)
+        else:
+            client.delete(_redis_key(tenant_id, key_id))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not remove shared key for tenant %s: %s", tenant_id, exc)
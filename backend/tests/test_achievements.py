@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.assessment import UserAchievementProgress
+from app.services.star_service import _advance_progress, _iso_week, achievement_candidates
+
+
+def _progress(**values) -> UserAchievementProgress:
+    defaults = {
+        'current_week_streak': 0,
+        'last_active_week': None,
+        'perfect_run': 0,
+        'five_star_count': 0,
+        'low_star_count': 0,
+        'test_stars': {},
+    }
+    return UserAchievementProgress(**{**defaults, **values})
+
+
+def _candidates(progress=None, *, stars=3, total_stars=3, tests_completed=1, previous=None):
+    return achievement_candidates(
+        stars=stars,
+        total_stars=total_stars,
+        tests_completed=tests_completed,
+        progress=progress or _progress(),
+        previous_test_stars=previous,
+    )
+
+
+def test_first_attempt_unlocks_first_milestones_only():
+    assert _candidates() == ['first_star', 'tests_1']
+    assert _candidates(stars=0, total_stars=0) == ['tests_1']
+
+
+@pytest.mark.parametrize(
+    ('total_stars', 'tests_completed', 'expected'),
+    [
+        (9, 9, ['first_star', 'tests_1']),
+        (10, 10, ['first_star', 'stars_10', 'tests_1', 'tests_10']),
+        (1000, 100, ['stars_1000', 'tests_100']),
+    ],
+)
+def test_milestones_are_inclusive_thresholds(total_stars, tests_completed, expected):
+    progress = _progress(low_star_count=1)
+    codes = _candidates(total_stars=total_stars, tests_completed=tests_completed, progress=progress)
+    assert set(expected) <= set(codes)
+    assert ('stars_50' in codes) is (total_stars >= 50)
+
+
+def test_perfect_runs_and_five_star_counts():
+    codes = _candidates(stars=5, progress=_progress(perfect_run=3, five_star_count=10))
+    assert {'perfect_score', 'perfect_3', 'five_star_10'} <= set(codes)
+
+    codes = _candidates(stars=4, progress=_progress(perfect_run=2, five_star_count=9))
+    assert not {'perfect_score', 'perfect_3', 'five_star_10'} & set(codes)
+
+
+def test_rates_need_ten_tests():
+    codes = _candidates(total_stars=45, tests_completed=9)
+    assert not {'rate_4', 'rate_45', 'consistent'} & set(codes)
+
+    codes = _candidates(total_stars=40, tests_completed=10)
+    assert 'rate_4' in codes and 'rate_45' not in codes and 'consistent' in codes
+
+    codes = _candidates(total_stars=45, tests_completed=10, progress=_progress(low_star_count=1))
+    assert 'rate_45' in codes and 'consistent' not in codes
+
+
+def test_streaks_and_per_test_improvements():
+    codes = _candidates(progress=_progress(current_week_streak=4))
+    assert 'week_streak_2' in codes and 'week_streak_4' in codes and 'week_streak_8' not in codes
+
+    assert 'improver' in _candidates(stars=4, previous=2)
+    assert 'improver' not in _candidates(stars=4, previous=3)
+    assert {'improver', 'comeback'} <= set(_candidates(stars=5, previous=1))
+    assert not {'improver', 'comeback'} & set(_candidates(stars=5, previous=None))
+
+
+def test_advance_progress_tracks_streaks_runs_and_per_test_stars():
+    progress = _progress()
+    weeks = [datetime(2026, 1, day) for day in (5, 7, 12, 26)]
+    streaks = []
+    for when, stars in zip(weeks, [5, 5, 1, 5], strict=True):
+        previous = _advance_progress(progress, stars=stars, week=_iso_week(when), test_key='t1')
+        streaks.append(progress.current_week_streak)
+
+    assert streaks == [1, 1, 2, 1]
+    assert previous == 1
+    assert progress.perfect_run == 1
+    assert progress.five_star_count == 3
+    assert progress.low_star_count == 1
+    assert progress.test_stars == {'t1': {'last': 5, 'best': 5}}
+
+
+def test_streak_continues_across_year_boundary():
+    progress = _progress()
+    _advance_progress(progress, stars=3, week=_iso_week(datetime(2026, 12, 28)), test_key=None)
+    _advance_progress(progress, stars=3, week=_iso_week(datetime(2027, 1, 4)), test_key=None)
+
+    assert progress.current_week_streak == 2
+    assert progress.test_stars == {}
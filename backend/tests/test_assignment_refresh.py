@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.assignment import AssignmentPhase, AssignmentTask, OnboardingAssignment
+from app.models.rbac import User
+from app.models.tenant import Tenant
+from app.models.track import TrackSnapshot, TrackTemplate, TrackVersion
+from app.services.assignment_service import (
+    recompute_progress,
+    refresh_assignment_states,
+    refresh_next_task,
+    refresh_overdue_and_status,
+)
+
+
+PAST = date.today() - timedelta(days=3)
+FUTURE = date.today() + timedelta(days=3)
+
+# phase order -> [(task order, status, required, progress, due date)], deliberately out of order.
+PLANS = {
+    'in_progress_with_overdue': {
+        2: [(0, 'not_started', True, 0.0, FUTURE), (1, 'in_progress', True, 40.0, None)],
+        0: [
+            (1, 'completed', True, 100.0, PAST),
+            (0, 'blocked', True, 0.0, None),
+            (2, 'not_started', False, 0.0, PAST),
+        ],
+        1: [(0, 'pending_review', True, 90.0, PAST), (1, 'revision_requested', True, 60.0, FUTURE)],
+        3: [],
+        4: [(0, 'not_started', False, 0.0, None)],
+    },
+    'ties_across_phases': {
+        1: [(0, 'not_started', True, 0.0, None), (1, 'in_progress', True, 25.0, None)],
+        0: [(1, 'not_started', True, 0.0, None), (0, 'completed', True, 100.0, None)],
+    },
+    'completed': {
+        0: [(0, 'completed', True, 100.0, PAST), (1, 'completed', True, 150.0, None)],
+        1: [(0, 'not_started', False, 0.0, PAST)],
+    },
+    'nothing_required': {
+        0: [(0, 'not_started', False, 0.0, None), (1, 'in_progress', False, 30.0, None)],
+    },
+}
+
+
+def _assignment(db, *, tenant_id, employee_id, version, plan) -> OnboardingAssignment:
+    assignment = OnboardingAssignment(
+        tenant_id=tenant_id,
+        employee_id=employee_id,
+        template_id=version.template_id,
+        track_version_id=version.id,
+        title='Refresh',
+        start_date=date.today() - timedelta(days=10),
+        target_date=date.today() + timedelta(days=30),
+        snapshot_hash='refresh',
+    )
+    db.add(assignment)
+    db.flush()
+    for phase_order, tasks in plan.items():
+        phase = AssignmentPhase(
+            tenant_id=tenant_id,
+            assignment_id=assignment.id,
+            title=f'P{phase_order}',
+            order_index=phase_order,
+        )
+        db.add(phase)
+        db.flush()
+        for task_order, status, required, progress, due_date in tasks:
+            db.add(
+                AssignmentTask(
+                    tenant_id=tenant_id,
+                    assignment_id=assignment.id,
+                    assignment_phase_id=phase.id,
+                    title=f'T{phase_order}.{task_order}',
+                    task_type='read_material',
+                    required=required,
+                    order_index=task_order,
+                    status=status,
+                    progress_percent=progress,
+                    due_date=due_date,
+                    is_next_recommended=True,
+                )
+            )
+    db.flush()
+    return assignment
+
+
+def _state(db, assignment_id):
+    assignment = db.get(OnboardingAssignment, assignment_id)
+    phases = {phase.id: phase.order_index for phase in assignment.phases}
+    return (
+        assignment.status,
+        assignment.progress_percent,
+        {phase.order_index: (phase.status, phase.progress_percent) for phase in assignment.phases},
+        {
+            (phases[task.assignment_phase_id], task.order_index): (
+                task.status,
+                task.is_next_recommended,
+            )
+            for task in assignment.tasks
+        },
+    )
+
+
+@pytest.mark.parametrize('plan', PLANS.values(), ids=PLANS.keys())
+def test_set_based_refresh_matches_orm_refresh(db_session, plan):
+    tenant_id = db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    employee_id = db_session.scalar(
+        select(User.id).where(User.email == 'seed-employee-1@example.com')
+    )
+    template = TrackTemplate(tenant_id=tenant_id, title='Refresh')
+    db_session.add(template)
+    db_session.flush()
+    version = TrackVersion(
+        tenant_id=tenant_id, template_id=template.id, version_number=1, title='Refresh'
+    )
+    db_session.add(version)
+    db_session.add(TrackSnapshot(tenant_id=tenant_id, content_hash='refresh', snapshot={}))
+    db_session.flush()
+
+    fixture = {'tenant_id': tenant_id, 'employee_id': employee_id, 'version': version, 'plan': plan}
+    orm_copy = _assignment(db_session, **fixture)
+    set_copy = _assignment(db_session, **fixture)
+    db_session.commit()
+
+    refresh_overdue_and_status(db_session, orm_copy)
+    recompute_progress(db_session, orm_copy)
+    refresh_next_task(db_session, orm_copy)
+    refresh_assignment_states(db_session, [set_copy.id])
+    db_session.commit()
+    db_session.expire_all()
+
+    assert _state(db_session, set_copy.id) == _state(db_session, orm_copy.id)
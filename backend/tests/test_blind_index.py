@@ -0,0 +1,64 @@
+import pytest
+
+from app.utils.blind_index import (
+    TOKEN_HEX_LEN,
+    derive_index_key,
+    normalize,
+    query_tokens,
+    value_tokens,
+)
+
+
+KEY = derive_index_key(b'k' * 32)
+SCOPE = 'ir_endpoints.fqdn'
+
+
+def _matches(search: str, value: str, *, scope: str = SCOPE, key: bytes = KEY) -> bool:
+    # Mirrors the SQL filter: the exact token, or every required token, is present.
+    query = query_tokens(key, scope, search)
+    tokens = value_tokens(KEY, SCOPE, value)
+    return query is not None and (query.exact in tokens or set(query.required) <= tokens)
+
+
+def test_normalize_folds_case_width_and_whitespace():
+    assert normalize('  API.Example.COM ') == 'api.example.com'
+    assert normalize('\uff30\uff41\uff59\tGateway\n  EU') == 'pay gateway eu'
+    assert normalize('STRASSE') == normalize('straße')
+
+
+@pytest.mark.parametrize(
+    ('search', 'value', 'expected'),
+    [
+        ('api.example.com', 'API.example.com', True),
+        ('example', 'api.example.com', True),
+        ('ap', 'api.example.com', True),
+        ('a', 'api.example.com', True),
+        ('pi', 'api.example.com', False),
+        ('example.org', 'api.example.com', False),
+        ('10.0.0', '10.0.0.12', True),
+        ('0.13', '10.0.0.12', False),
+    ],
+)
+def test_search_semantics(search, value, expected):
+    assert _matches(search, value) is expected
+
+
+def test_tokens_are_scoped_and_keyed():
+    assert not _matches('api.example.com', 'api.example.com', scope='ir_endpoints.base_path')
+    assert not _matches('api.example.com', 'api.example.com', key=derive_index_key(b'x' * 32))
+    assert derive_index_key(b'k' * 32) != b'k' * 32
+
+
+def test_value_tokens_shape():
+    tokens = value_tokens(KEY, SCOPE, 'abcd')
+    # exact + two prefixes + two trigrams
+    assert len(tokens) == 5
+    assert all(len(token) == TOKEN_HEX_LEN for token in tokens)
+    assert value_tokens(KEY, SCOPE, 'aaaa') == value_tokens(KEY, SCOPE, 'aaaa')
+    assert len(value_tokens(KEY, SCOPE, 'aaaaaa')) == 4
+
+
+@pytest.mark.parametrize('value', [None, '', '   '])
+def test_empty_values_have_no_tokens(value):
+    assert value_tokens(KEY, SCOPE, value) == set()
+    assert query_tokens(KEY, SCOPE, value or '') is None
@@ -0,0 +1,106 @@
+import uuid
+
+from sqlalchemy import select, text
+
+from app.db.session import set_tenant_id
+from app.models.assessment import AssessmentCategory
+from app.models.tenant import Tenant
+from app.services.assessment_category_trie import CategoryTrie, load_category_trie
+from app.services.assessment_service import find_or_create_category_path
+from tests.conftest import TestingSessionLocal
+
+
+SCHOOL = uuid.uuid4()
+HISTORY = uuid.uuid4()
+GRADE = uuid.uuid4()
+BIOLOGY = uuid.uuid4()
+BIOLOGY_GRADE = uuid.uuid4()
+
+
+def _trie() -> CategoryTrie:
+    return CategoryTrie(
+        [
+            (SCHOOL, 'School', 'school', None),
+            (HISTORY, 'History', 'history', SCHOOL),
+            (GRADE, '8th Grade', '8th-grade', HISTORY),
+            (BIOLOGY, 'Biology', 'biology', SCHOOL),
+            (BIOLOGY_GRADE, '8th Grade', '8th-grade', BIOLOGY),
+        ]
+    )
+
+
+def test_trie_resolves_paths_by_slug_per_parent():
+    trie = _trie()
+
+    assert trie.resolve('School/History/8th Grade') == GRADE
+    assert trie.resolve(' school / BIOLOGY / 8th grade ') == BIOLOGY_GRADE
+    assert trie.resolve('School/Chemistry') is None
+    assert trie.resolve('  /  ') is None
+    assert trie.paths() == [
+        'School',
+        'School/Biology',
+        'School/Biology/8th Grade',
+        'School/History',
+        'School/History/8th Grade',
+    ]
+
+
+def test_trie_attach_ignores_orphans_and_keeps_existing_nodes():
+    trie = _trie()
+
+    trie._attach(uuid.uuid4(), 'Orphan', 'orphan', uuid.uuid4())
+    trie._attach(uuid.uuid4(), 'History', 'history', SCHOOL)
+    trie._attach(uuid.uuid4(), 'Modern', 'modern', HISTORY)
+
+    assert trie.resolve('School/History') == HISTORY
+    assert trie.resolve('School/History/Modern') is not None
+    assert 'Orphan' not in trie.paths()
+
+
+def _category_indexes(db_session) -> None:
+    # Created by migration 0046 in real databases; create_all doesn't know about them.
+    db_session.execute(
+        text(
+            'CREATE UNIQUE INDEX uq_category_slug_root ON assessment_categories (tenant_id, slug) '
+            'WHERE parent_id IS NULL'
+        )
+    )
+    db_session.execute(
+        text(
+            'CREATE UNIQUE INDEX uq_category_slug_child '
+            'ON assessment_categories (tenant_id, slug, parent_id) WHERE parent_id IS NOT NULL'
+        )
+    )
+    db_session.commit()
+
+
+def test_ensure_paths_picks_up_rows_inserted_concurrently(db_session):
+    tenant = Tenant(id=uuid.uuid4(), name='Tenant A', slug='tenant-a', tenant_type='company')
+    db_session.add(tenant)
+    db_session.commit()
+    _category_indexes(db_session)
+
+    set_tenant_id(db_session, str(tenant.id))
+    trie = load_category_trie(db_session)
+
+    other = TestingSessionLocal()
+    try:
+        set_tenant_id(other, str(tenant.id))
+        winner = AssessmentCategory(
+            id=uuid.uuid4(), tenant_id=tenant.id, name='School', slug='school'
+        )
+        other.add(winner)
+        other.commit()
+    finally:
+        other.close()
+
+    resolved, created = trie.ensure_paths(db_session, ['School/History'])
+    db_session.commit()
+
+    history = db_session.scalar(
+        select(AssessmentCategory).where(AssessmentCategory.slug == 'history')
+    )
+    assert created == 1
+    assert history.parent_id == winner.id
+    assert resolved == {'School/History': history.id}
+    assert find_or_create_category_path(db_session, 'School') == winner.id
@@ -0,0 +1,18 @@
+import pytest
+
+from app.core.celery_app import celery_app
+
+
+@pytest.mark.parametrize(
+    ('task', 'queue'),
+    [
+        # Billing stays on the default queue so workers started without -Q still drain it.
+        ('app.modules.billing.tasks.process_billing_outbox', 'billing'),
+        ('app.tasks.compliance.run_compliance_snapshots', 'default'),
+        ('app.tasks.tracks.run_track_propagation', 'default'),
+        ('app.tasks.assessments.rebuild_item_statistics', 'imports'),
+    ],
+)
+def test_task_queues(task, queue):
+    assert celery_app.conf.task_default_queue == 'billing'
+    assert celery_app.amqp.router.route({}, task)['queue'].name == queue
@@ -0,0 +1,97 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.models.assessment import AssessmentClassificationJob
+from app.models.rbac import User
+from app.models.tenant import Tenant
+from app.services import assessment_classification_service
+from tests.conftest import login, tenant_headers
+
+
+def _run(job: AssessmentClassificationJob, tenant_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    assessment_classification_service.run_classification_job(
+        job_id=job.id,
+        tenant_id=tenant_id,
+        actor_user_id=user_id,
+        mode='unclassified_only',
+        dry_run=True,
+        batch_size=10,
+    )
+
+
+JOB_PAYLOAD = {
+    'mode': 'unclassified_only',
+    'scope': 'all_matching',
+    'dry_run': True,
+    'batch_size': 10,
+}
+
+
+def _start(
+    client: TestClient, db_session, monkeypatch
+) -> tuple[dict, AssessmentClassificationJob]:
+    # The worker is driven by the test, not by the endpoint.
+    monkeypatch.setattr(
+        assessment_classification_service, 'dispatch_classification_job', lambda **_: None
+    )
+    admin = login(client, 'seed-admin@example.com')
+    response = client.post(
+        '/api/v1/assessments/questions/classify',
+        json=JOB_PAYLOAD,
+        headers=tenant_headers(admin['access_token']),
+    )
+    assert response.status_code == 202, response.text
+    job = db_session.get(AssessmentClassificationJob, uuid.UUID(response.json()['id']))
+    return admin, job
+
+
+def test_job_canceled_before_start_is_never_claimed(
+    client: TestClient, db_session, monkeypatch
+) -> None:
+    admin, job = _start(client, db_session, monkeypatch)
+
+    response = client.post(
+        f'/api/v1/assessments/questions/classify/jobs/{job.id}/cancel',
+        headers=tenant_headers(admin['access_token']),
+    )
+    assert response.json() == {'status': 'ok'}
+
+    tenant_id = db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    user_id = db_session.scalar(select(User.id).where(User.email == 'seed-admin@example.com'))
+    _run(job, tenant_id, user_id)
+
+    db_session.refresh(job)
+    assert job.status == 'canceled'
+    assert job.started_at is None
+
+
+def test_job_is_claimed_once(client: TestClient, db_session, monkeypatch) -> None:
+    admin, job = _start(client, db_session, monkeypatch)
+    tenant_id = db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    user_id = db_session.scalar(select(User.id).where(User.email == 'seed-admin@example.com'))
+
+    _run(job, tenant_id, user_id)
+    db_session.refresh(job)
+    assert job.status == 'completed'
+    started_at = job.started_at
+
+    # A duplicate delivery finds nothing to claim and leaves the finished job alone.
+    _run(job, tenant_id, user_id)
+    db_session.refresh(job)
+    assert job.status == 'completed'
+    assert job.started_at == started_at
+
+    # A queued job that is still within its claim window is returned, not replaced.
+    response = client.post(
+        '/api/v1/assessments/questions/classify',
+        json=JOB_PAYLOAD,
+        headers=tenant_headers(admin['access_token']),
+    )
+    again = client.post(
+        '/api/v1/assessments/questions/classify',
+        json=JOB_PAYLOAD,
+        headers=tenant_headers(admin['access_token']),
+    )
+    assert again.json()['id'] == response.json()['id']
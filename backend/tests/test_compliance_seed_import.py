@@ -1,7 +1,15 @@
+import hashlib
+import json
+
 from sqlalchemy import func, select
 
 from app.models.compliance import ComplianceControl, ComplianceFramework, ComplianceProfile
 from app.services.compliance_seed_service import import_seed_payload, load_seed_payload_from_request
+from app.services.compliance_tenant_library_service import (
+    CANONICAL_TENANT_LIBRARY_FILES,
+    _resolve_library_path,
+    load_tenant_library_payload_from_request,
+)
 
 
 def test_compliance_seed_import_is_idempotent(db_session):
@@ -41,3 +49,27 @@ def test_compliance_seed_import_is_idempotent(db_session):
     assert framework_count_after == framework_count
     assert control_count_after == control_count
     assert profile_count_after == profile_count
+
+
+def test_compliance_seed_payload_sha_is_canonical():
+    payload = {"meta": {"schema_version": "1.0", "dataset": "x"}, "controls": [{"id": "c1", "code": "C-1"}]}
+    reordered = {"controls": [{"code": "C-1", "id": "c1"}], "meta": {"dataset": "x", "schema_version": "1.0"}}
+
+    _, sha, source = load_seed_payload_from_request(payload, None)
+    _, sha_reordered, _ = load_seed_payload_from_request(reordered, None)
+
+    expected = hashlib.sha256(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")).hexdigest()
+    assert source == "payload"
+    assert sha == expected
+    assert sha_reordered == expected
+
+
+def test_tenant_library_server_file_is_parsed_and_hashed_in_one_pass():
+    (server_file,) = CANONICAL_TENANT_LIBRARY_FILES
+    path = _resolve_library_path(server_file)
+
+    data, sha, source = load_tenant_library_payload_from_request(None, server_file)
+
+    assert data == json.loads(path.read_bytes())
+    assert sha == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert source == f"server_file:{server_file}"
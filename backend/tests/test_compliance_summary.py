@@ -1,7 +1,12 @@
 import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 
 from app.models.compliance import (
     ComplianceControlStatus,
+    ComplianceSummaryRollup,
     ComplianceTenantControl,
     ComplianceTenantControlFrameworkRef,
     ComplianceTenantDomain,
@@ -11,10 +16,27 @@ from app.models.compliance import (
     ComplianceTenantProfile,
 )
 from app.models.tenant import Tenant
-from app.services.compliance_summary_service import compute_framework_summary, compute_summary
+from app.services import compliance_gap_service
+from app.services.compliance_gap_service import (
+    GapColumns,
+    invalidate_framework_map,
+    list_gaps,
+    load_gap_columns,
+    order_gaps,
+    rank_gaps,
+)
+from app.services.compliance_snapshot_service import SnapshotInputs, snapshot_tenant
+from app.services.compliance_summary_service import (
+    apply_status_change,
+    compute_framework_summary,
+    compute_summary,
+    load_framework_summary,
+    load_summary,
+    refresh_rollups,
+)
 
 
-def test_compliance_summary_excludes_na(db_session):
+def _seed_profile_library(db_session) -> Tenant:
     tenant = Tenant(id=uuid.uuid4(), name='Tenant A', slug='tenant-a', tenant_type='company')
     db_session.add(tenant)
     db_session.commit()
@@ -127,6 +149,12 @@ def test_compliance_summary_excludes_na(db_session):
     )
     db_session.commit()
 
+    return tenant
+
+
+def test_compliance_summary_excludes_na(db_session):
+    tenant = _seed_profile_library(db_session)
+
     summary = compute_summary(db_session, tenant_id=tenant.id)
     assert summary['overall']['denominator'] == 2
     assert summary['overall']['numerator'] == 2
@@ -152,3 +180,184 @@ def test_compliance_summary_handles_no_active_profile(db_session):
     framework_summary = compute_framework_summary(db_session, tenant_id=tenant.id, framework_key='FW_TEST')
     assert framework_summary is not None
     assert framework_summary['framework']['denominator'] == 0
+
+
+def test_compliance_summary_reads_do_not_write_rollups(db_session):
+    tenant = _seed_profile_library(db_session)
+
+    fresh = compute_summary(db_session, tenant_id=tenant.id)
+    assert load_summary(db_session, tenant_id=tenant.id) == fresh
+    assert load_framework_summary(db_session, tenant_id=tenant.id, framework_key='FW_TEST') == (
+        compute_framework_summary(db_session, tenant_id=tenant.id, framework_key='FW_TEST')
+    )
+    assert db_session.scalar(select(func.count()).select_from(ComplianceSummaryRollup)) == 0
+
+
+def test_compliance_summary_rollups_keep_compute_order(db_session):
+    tenant = _seed_profile_library(db_session)
+    db_session.add(
+        ComplianceTenantDomain(
+            tenant_id=tenant.id, domain_code='access', label='Access', is_active=True
+        )
+    )
+    control_b = db_session.get(
+        ComplianceTenantControl, {'tenant_id': tenant.id, 'control_key': 'CTL_B'}
+    )
+    control_b.domain_code = 'access'
+    db_session.commit()
+
+    fresh = refresh_rollups(db_session, tenant_id=tenant.id)
+    db_session.commit()
+
+    cached = load_summary(db_session, tenant_id=tenant.id)
+    assert len(cached['by_domain']) == 2
+    assert cached == fresh
+
+
+def test_compliance_summary_rollups_follow_status_changes(db_session):
+    tenant = _seed_profile_library(db_session)
+
+    cached = refresh_rollups(db_session, tenant_id=tenant.id)
+    db_session.commit()
+    assert cached['overall']['numerator'] == 2
+    assert cached['overall']['denominator'] == 2
+
+    status_row = db_session.get(ComplianceControlStatus, {'tenant_id': tenant.id, 'control_key': 'CTL_B'})
+    status_row.status_enum = 'partial'
+    status_row.score = 0.5
+    status_row.na_reason = None
+    db_session.flush()
+    apply_status_change(
+        db_session,
+        tenant_id=tenant.id,
+        control_key='CTL_B',
+        previous=('na', 0),
+        current=('partial', 0.5),
+    )
+    db_session.commit()
+
+    overall = db_session.get(
+        ComplianceSummaryRollup,
+        {'tenant_id': tenant.id, 'bucket_type': 'overall', 'framework_key': '', 'domain_code': ''},
+    )
+    assert overall is not None and overall.numerator == 3.5
+    cached = load_summary(db_session, tenant_id=tenant.id)
+    fresh = compute_summary(db_session, tenant_id=tenant.id)
+    assert cached['overall']['numerator'] == fresh['overall']['numerator'] == 3.5
+    assert cached['overall']['denominator'] == fresh['overall']['denominator'] == 5
+
+    cached_fw = load_framework_summary(db_session, tenant_id=tenant.id, framework_key='FW_TEST')
+    fresh_fw = compute_framework_summary(db_session, tenant_id=tenant.id, framework_key='FW_TEST')
+    assert cached_fw['framework']['numerator'] == fresh_fw['framework']['numerator']
+    assert cached_fw['framework']['denominator'] == fresh_fw['framework']['denominator']
+
+
+def test_gap_ranking_scores_and_limits(db_session):
+    tenant = _seed_profile_library(db_session)
+    for control_key in ('CTL_A', 'CTL_B'):
+        status_row = db_session.get(ComplianceControlStatus, {'tenant_id': tenant.id, 'control_key': control_key})
+        status_row.status_enum = 'not_started'
+        status_row.score = 0
+        status_row.na_reason = None
+    db_session.commit()
+
+    columns = load_gap_columns(db_session, tenant_id=tenant.id)
+    ranked = rank_gaps(columns, threshold=0.75)
+    assert [item.control_key for item in ranked] == ['CTL_A', 'CTL_B']
+    assert [item.priority_score for item in ranked] == [6.0, 3.0]  # weight x criticality x gap x frameworks
+    assert columns.severity_counts(0.75) == {'High': 1, 'Low': 1}
+
+    top = rank_gaps(columns, threshold=0.75, limit=1)
+    assert [item.control_key for item in top] == ['CTL_A']
+    assert len(list_gaps(db_session, tenant_id=tenant.id, threshold=0.75)) == 2
+
+
+def test_scheduled_snapshots_skip_unchanged_scopes(db_session):
+    tenant = _seed_profile_library(db_session)
+
+    assert snapshot_tenant(db_session, tenant_id=tenant.id) == 2  # overall + FW_TEST
+    db_session.commit()
+    assert snapshot_tenant(db_session, tenant_id=tenant.id) == 0
+    db_session.commit()
+
+    status_row = db_session.get(ComplianceControlStatus, {'tenant_id': tenant.id, 'control_key': 'CTL_A'})
+    status_row.status_enum = 'partial'
+    status_row.score = 0.5
+    db_session.commit()
+
+    assert snapshot_tenant(db_session, tenant_id=tenant.id) == 2
+    db_session.commit()
+
+
+def test_snapshot_inputs_framework_state_is_sorted_subset():
+    inputs = SnapshotInputs(
+        profile_key='PROFILE_TEST',
+        library_batch_id=None,
+        status_state=[{'control_key': key, 'status': 'implemented'} for key in ('CTL_C', 'CTL_A', 'CTL_B')],
+        coverage_scores={},
+        framework_controls={'FW_TEST': ['CTL_B', 'CTL_A', 'CTL_MISSING']},
+    )
+
+    assert [row['control_key'] for row in inputs.framework_state('FW_TEST')] == ['CTL_A', 'CTL_B']
+    assert inputs.framework_state('FW_OTHER') == []
+
+
+def _gap_columns(*controls: tuple[str, str, str | None, float, float]) -> GapColumns:
+    columns = GapColumns()
+    for control_key, criticality, priority, weight, score in controls:
+        columns.rows.append(
+            SimpleNamespace(
+                control_key=control_key,
+                code=control_key,
+                title=control_key,
+                domain_code='d',
+                criticality=criticality,
+                weight=weight,
+                priority=priority,
+                due_date=None,
+                remediation_notes=None,
+                remediation_owner_user_id=None,
+            )
+        )
+        columns.statuses.append('partial')
+        columns.scores.append(score)
+        columns.weights.append(weight)
+        columns.priority_scores.append(weight * (1 - score))
+        columns.framework_keys.append(('FW',))
+    return columns
+
+
+def test_rank_gaps_orders_by_priority_score_with_and_without_limit():
+    columns = _gap_columns(
+        ('LOW_HEAVY', 'Low', None, 9, 0.0),
+        ('HIGH_LIGHT', 'High', None, 1, 0.5),
+        ('MEDIUM_URGENT', 'Medium', 'high', 2, 0.25),
+        ('HIGH_TIE_1', 'High', None, 1, 0.5),
+        ('LOW_TIE_URGENT', 'Low', 'high', 1, 0.5),
+        ('DONE', 'High', None, 5, 1.0),
+    )
+
+    expected = [item.control_key for item in order_gaps(list(map(columns.item, columns.gap_indices(0.75))))]
+    # Highest priority score first; equal scores fall back to priority, criticality, weight.
+    assert expected == ['LOW_HEAVY', 'MEDIUM_URGENT', 'LOW_TIE_URGENT', 'HIGH_LIGHT', 'HIGH_TIE_1']
+    assert [item.control_key for item in rank_gaps(columns, threshold=0.75)] == expected
+    top = rank_gaps(columns, threshold=0.75, limit=3)
+    assert [item.control_key for item in top] == expected[:3]
+
+    item = columns.item(0)
+    item.framework_keys.append('MUTATED')
+    assert columns.framework_keys[0] == ('FW',)
+
+
+def test_framework_map_is_dropped_only_after_commit():
+    tenant_id = uuid.uuid4()
+    compliance_gap_service._framework_map_cache[(tenant_id, 'PROFILE')] = (0.0, {})
+    db = Session()
+    try:
+        invalidate_framework_map(db, tenant_id)
+        assert (tenant_id, 'PROFILE') in compliance_gap_service._framework_map_cache
+        db.commit()
+        assert (tenant_id, 'PROFILE') not in compliance_gap_service._framework_map_cache
+    finally:
+        db.close()
+        compliance_gap_service._framework_map_cache.pop((tenant_id, 'PROFILE'), None)
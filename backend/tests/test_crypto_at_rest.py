@@ -0,0 +1,64 @@
+import base64
+import os
+import uuid
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from app.services.integration_registry_service import decrypt_column
+from app.utils.crypto_at_rest import PREFIX, ColumnCipher, decrypt_str, encrypt_str
+
+
+KEY = os.urandom(32)
+AAD = b'tenant:ir_endpoint:fqdn'
+
+
+def _flip_last_byte(ciphertext: str) -> str:
+    raw = bytearray(base64.b64decode(ciphertext[len(PREFIX) :]))
+    raw[-1] ^= 1
+    return PREFIX + base64.b64encode(bytes(raw)).decode('ascii')
+
+
+def test_column_cipher_round_trips_encrypt_str():
+    values = ['api.example.com', '', 'Überprüfung ✓', 'x' * 4096]
+    ciphertexts = [encrypt_str(value, KEY, AAD) for value in values]
+    cipher = ColumnCipher(KEY, AAD)
+
+    assert [cipher.decrypt(c) for c in ciphertexts] == values
+    assert cipher.decrypt_many(ciphertexts) == values
+    assert [decrypt_str(c, KEY, AAD) for c in ciphertexts] == values
+
+
+def test_column_cipher_rejects_tampering_and_foreign_context():
+    ciphertext = encrypt_str('api.example.com', KEY, AAD)
+    tampered = _flip_last_byte(ciphertext)
+
+    with pytest.raises(InvalidTag):
+        ColumnCipher(KEY, AAD).decrypt(tampered)
+    with pytest.raises(InvalidTag):
+        ColumnCipher(KEY, b'tenant:ir_endpoint:ip').decrypt(ciphertext)
+    with pytest.raises(InvalidTag):
+        ColumnCipher(os.urandom(32), AAD).decrypt(ciphertext)
+    with pytest.raises(ValueError):
+        ColumnCipher(KEY, AAD).decrypt('plain text')
+
+
+def test_decrypt_many_maps_bad_values_to_none_in_place():
+    good = encrypt_str('a', KEY, AAD)
+    other = encrypt_str('b', KEY, AAD)
+
+    batch = [good, _flip_last_byte(other), PREFIX + '!!', other]
+
+    result = ColumnCipher(KEY, AAD).decrypt_many(batch)
+
+    assert result == ['a', None, None, 'b']
+
+
+def test_decrypt_column_passes_plaintext_through():
+    tenant_id = uuid.uuid4()
+    aad = f'{tenant_id}:ir_endpoint:fqdn'.encode()
+    values = [None, 'legacy.example.com', encrypt_str('new.example.com', KEY, aad), '']
+
+    plain = decrypt_column(values, tenant_id=tenant_id, table='ir_endpoint', column='fqdn', key=KEY)
+
+    assert plain == [None, 'legacy.example.com', 'new.example.com', '']
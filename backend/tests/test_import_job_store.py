@@ -0,0 +1,95 @@
+import os
+import uuid
+
+import pytest
+import redis
+
+from app.services import import_job_store
+from app.services.import_job_store import (
+    create_job,
+    is_cancel_requested,
+    read_job,
+    read_job_field,
+    update_job,
+)
+
+
+TEST_REDIS_URL = os.getenv('TEST_REDIS_URL')
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request, monkeypatch):
+    client = None
+    if request.param == 'redis':
+        if not TEST_REDIS_URL:
+            pytest.skip('TEST_REDIS_URL is required for Redis-backed job store tests')
+        client = redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    monkeypatch.setattr(import_job_store, '_redis', lambda: client)
+    yield client
+    if client is not None:
+        client.close()
+
+
+def test_job_round_trips_scalars_and_lists(store):
+    job_id = str(uuid.uuid4())
+    create_job(
+        job_id,
+        {
+            'status': 'queued',
+            'total': 3,
+            'processed': 0,
+            'error': None,
+            'dry_run': True,
+            'warnings': ['w1'],
+        },
+    )
+
+    job = read_job(job_id)
+    assert job is not None
+    assert job['status'] == 'queued'
+    assert job['total'] == 3
+    assert job['error'] is None
+    assert job['dry_run'] is True
+    assert job['warnings'] == ['w1']
+    assert job['question_ids'] == []
+    assert read_job_field(job_id, 'total') == 3
+    assert read_job(str(uuid.uuid4())) is None
+
+
+def test_update_job_sets_increments_and_appends(store):
+    job_id = str(uuid.uuid4())
+    create_job(job_id, {'status': 'queued', 'processed': 0})
+
+    update_job(
+        job_id, status='running', incr={'processed': 2}, append={'question_ids': ['q1', 'q2']}
+    )
+    update_job(job_id, incr={'processed': 1}, append={'question_ids': ['q3'], 'warnings': []})
+
+    job = read_job(job_id)
+    assert job['status'] == 'running'
+    assert job['processed'] == 3
+    assert job['question_ids'] == ['q1', 'q2', 'q3']
+    assert job['warnings'] == []
+
+
+def test_update_job_ignores_unknown_jobs(store):
+    job_id = str(uuid.uuid4())
+    update_job(job_id, status='running', incr={'processed': 1})
+    assert read_job(job_id) is None
+
+
+def test_read_job_returns_copies(store):
+    job_id = str(uuid.uuid4())
+    create_job(job_id, {'status': 'queued', 'warnings': ['w1']})
+
+    read_job(job_id)['warnings'].append('mutated')
+    assert read_job(job_id)['warnings'] == ['w1']
+
+
+def test_cancel_flag(store):
+    job_id = str(uuid.uuid4())
+    create_job(job_id, {'status': 'running'})
+    assert is_cancel_requested(job_id) is False
+
+    update_job(job_id, cancel_requested=True)
+    assert is_cancel_requested(job_id) is True
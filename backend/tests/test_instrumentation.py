@@ -0,0 +1,94 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import instrumentation
+from app.core.config import settings
+from app.core.instrumentation import (
+    RequestStats,
+    _record_request,
+    _server_timing,
+    fingerprint,
+    render_metrics,
+)
+from app.main import app
+from tests.conftest import auth_header, login
+
+
+@pytest.fixture()
+def fresh_totals(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_route_totals', {})
+    monkeypatch.setattr(instrumentation, '_status_counts', {})
+
+
+def test_fingerprint_ignores_values_but_not_shape():
+    digest, normalized = fingerprint(
+        "SELECT *  FROM users\n WHERE email = 'a''b@x.io' AND id IN (%(id_1)s, %(id_2)s) LIMIT 10"
+    )
+
+    same, _ = fingerprint("select * from users where email = 'c' and id in ($1, $2, $3) limit 5")
+    other, _ = fingerprint('select * from users where email = %s limit 5')
+
+    assert normalized == 'select * from users where email = ? and id in (?+) limit ?'
+    assert same == digest
+    assert other != digest
+    assert fingerprint('select * from users2')[1] == 'select * from users2'
+
+
+def test_server_timing_format():
+    stats = RequestStats(started_at=0.0, query_count=3, db_seconds=0.012)
+    assert _server_timing(stats, 0.05) == (
+        'db;dur=12.0;desc="3 queries", app;dur=38.0, total;dur=50.0'
+    )
+
+    stats.slowest_seconds, stats.slowest_fingerprint = 0.0075, 'abc123'
+    assert _server_timing(stats, 0.005).endswith(
+        'app;dur=0.0, total;dur=5.0, db-slowest;dur=7.5;desc="abc123"'
+    )
+
+
+def test_histogram_buckets_are_cumulative(fresh_totals):
+    stats = RequestStats(started_at=0.0, query_count=2, db_seconds=0.004)
+    _record_request('GET', '/items/{id}', 200, 0.03, stats, False)
+    _record_request('GET', '/items/{id}', 404, 0.2, stats, True)
+    _record_request('GET', '/items/{id}', 200, 30.0, stats, False)
+
+    text = render_metrics()
+
+    labels = 'method="GET",route="/items/{id}"'
+    for bound, count in (('0.025', 0), ('0.05', 1), ('0.25', 2), ('10.0', 2), ('+Inf', 3)):
+        assert f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}\n' in text
+    assert f'http_request_duration_seconds_sum{{{labels}}} 30.230000\n' in text
+    assert f'http_request_duration_seconds_count{{{labels}}} 3\n' in text
+    assert f'http_requests_total{{{labels},status="200"}} 2\n' in text
+    assert f'db_queries_total{{{labels}}} 6\n' in text
+    assert f'db_n_plus_one_requests_total{{{labels}}} 1\n' in text
+    assert 'password_hash_pool_rejected_total ' in text
+
+
+def test_metrics_require_a_token_outside_development(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(settings, 'APP_ENV', 'production')
+    monkeypatch.setattr(settings, 'METRICS_TOKEN', None)
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setattr(settings, 'METRICS_TOKEN', 'scrape-token')
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200
+    assert '# TYPE http_requests_total counter' in response.text
+
+
+def test_requests_report_sql_timing_and_metrics(client: TestClient) -> None:
+    auth_payload = login(client, 'seed-admin@example.com')
+
+    response = client.get('/api/v1/auth/me', headers=auth_header(auth_payload['access_token']))
+    assert response.status_code == 200
+    timing = response.headers['server-timing']
+    assert timing.startswith('db;dur=')
+    assert 'app;dur=' in timing
+    assert 'total;dur=' in timing
+
+    metrics = client.get('/metrics')
+    assert metrics.status_code == 200
+    assert 'http_requests_total{method="GET",route="/api/v1/auth/me",status="200"}' in metrics.text
+    assert 'db_queries_total{method="POST",route="/api/v1/auth/login"}' in metrics.text
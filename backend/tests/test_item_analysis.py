@@ -0,0 +1,210 @@
+import math
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.db.session import set_tenant_id
+from app.models.assessment import (
+    AssessmentAttempt,
+    AssessmentDelivery,
+    AssessmentTest,
+    AssessmentTestVersion,
+    AssessmentVersionStats,
+)
+from app.models.rbac import User
+from app.models.tenant import Tenant
+from app.services.item_analysis_service import (
+    _PENDING_REBUILDS_KEY,
+    ItemResponse,
+    _ItemAccumulator,
+    compute_item_analysis,
+    rebuild_statistics,
+    record_attempt,
+)
+from tests.conftest import TestingSessionLocal
+
+
+OPTIONS = [
+    {'key': 'a', 'text': 'A', 'is_correct': True},
+    {'key': 'b', 'text': 'B', 'is_correct': False},
+    {'key': 'c', 'text': 'C', 'is_correct': False},
+]
+
+# Rows are attempts, columns items: 1 = correct.
+MATRIX = [
+    [1, 1, 1],
+    [1, 1, 0],
+    [1, 0, 0],
+    [1, 1, 1],
+    [0, 0, 0],
+    [1, 0, 1],
+]
+
+
+def _statistics(matrix: list[list[int]]) -> tuple[dict, list[dict]]:
+    items = [_ItemAccumulator() for _ in matrix[0]]
+    totals = {'attempt_count': 0, 'score_sum': 0.0, 'score_sq_sum': 0.0}
+    for row in matrix:
+        score = sum(row)
+        totals['attempt_count'] += 1
+        totals['score_sum'] += score
+        totals['score_sq_sum'] += score * score
+        for idx, correct in enumerate(row):
+            selected = ['a'] if correct else (['b'] if idx != 1 else [])
+            items[idx].add(ItemResponse(uuid.uuid4(), bool(correct), selected), score)
+    rows = [
+        {
+            'test_version_question_id': uuid.uuid4(),
+            'question_id': uuid.uuid4(),
+            'order_index': idx,
+            'prompt': f'Q{idx}',
+            'options': OPTIONS,
+            'response_count': acc.response_count,
+            'correct_count': acc.correct_count,
+            'omitted_count': acc.omitted_count,
+            'correct_score_sum': acc.correct_score_sum,
+            'option_counts': acc.option_counts,
+        }
+        for idx, acc in enumerate(items)
+    ]
+    return totals, rows
+
+
+def _pearson(xs: list[float], ys: list[float]) -> float:
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys, strict=True)) / n
+    vx = sum((x - mx) ** 2 for x in xs) / n
+    vy = sum((y - my) ** 2 for y in ys) / n
+    return cov / math.sqrt(vx * vy)
+
+
+def test_closed_form_matches_direct_computation():
+    totals, rows = _statistics(MATRIX)
+    result = compute_item_analysis(items=rows, **totals)
+
+    scores = [sum(row) for row in MATRIX]
+    n, k = len(MATRIX), len(MATRIX[0])
+    mean = sum(scores) / n
+    var = sum((s - mean) ** 2 for s in scores) / n
+    p = [sum(row[i] for row in MATRIX) / n for i in range(k)]
+    kr20 = k / (k - 1) * (1 - sum(pi * (1 - pi) for pi in p) / var)
+
+    assert result['attempt_count'] == n
+    assert result['question_count'] == k
+    assert result['mean_score'] == pytest.approx(mean)
+    assert result['score_std'] == pytest.approx(math.sqrt(var))
+    assert result['kr20'] == pytest.approx(kr20)
+    for idx, item in enumerate(result['items']):
+        column = [row[idx] for row in MATRIX]
+        rest = [s - x for s, x in zip(scores, column, strict=True)]
+        assert item['p_value'] == pytest.approx(p[idx])
+        assert item['point_biserial'] == pytest.approx(_pearson(column, rest))
+        assert item['response_count'] == n
+
+
+def test_distractor_rates_and_omissions():
+    totals, rows = _statistics(MATRIX)
+    result = compute_item_analysis(items=rows, **totals)
+
+    rates = {d['key']: d['selection_rate'] for d in result['items'][0]['distractors']}
+    assert rates == pytest.approx({'a': 5 / 6, 'b': 1 / 6, 'c': 0.0})
+    assert result['items'][0]['omitted_rate'] == 0.0
+    # Item 1 leaves wrong answers blank.
+    assert result['items'][1]['omitted_rate'] == pytest.approx(3 / 6)
+
+
+def test_constant_items_have_no_discrimination():
+    totals, rows = _statistics([[1, 0], [1, 1], [1, 0]])
+    result = compute_item_analysis(items=rows, **totals)
+
+    assert result['items'][0]['p_value'] == 1.0
+    assert result['items'][0]['point_biserial'] is None
+
+
+def test_flags_need_enough_responses():
+    totals, rows = _statistics(MATRIX)
+    assert all(item['flags'] == [] for item in compute_item_analysis(items=rows, **totals)['items'])
+
+    totals, rows = _statistics(MATRIX * 2)
+    flags = [item['flags'] for item in compute_item_analysis(items=rows, **totals)['items']]
+    assert 'unused_distractor' in flags[0]
+    assert 'too_easy' not in flags[0]
+    assert all('too_hard' not in f for f in flags)
+
+    totals, rows = _statistics([[1, 0, 1]] * 9 + [[1, 1, 0]])
+    flags = [item['flags'] for item in compute_item_analysis(items=rows, **totals)['items']]
+    assert flags[0][:2] == ['too_easy', 'low_discrimination']
+    assert 'too_hard' in flags[1]
+
+
+def test_no_attempts():
+    _, rows = _statistics(MATRIX)
+    result = compute_item_analysis(attempt_count=0, score_sum=0.0, score_sq_sum=0.0, items=rows)
+
+    assert result['mean_score'] is None
+    assert result['score_std'] is None
+    assert result['kr20'] is None
+    assert all(item['p_value'] is None and item['distractors'] == [] for item in result['items'])
+
+
+def _scored_attempt(db, *, delivery, user_id, attempt_number):
+    db.add(
+        AssessmentAttempt(
+            delivery_id=delivery.id,
+            user_id=user_id,
+            attempt_number=attempt_number,
+            status='scored',
+        )
+    )
+    db.flush()
+
+
+def test_attempt_submitted_during_the_first_rebuild_is_counted(db_session):
+    tenant_id = str(db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant')))
+    user_id = db_session.scalar(select(User.id).where(User.email == 'seed-employee-1@example.com'))
+    set_tenant_id(db_session, tenant_id)
+    test = AssessmentTest(title='Rebuild race')
+    db_session.add(test)
+    db_session.flush()
+    version = AssessmentTestVersion(test_id=test.id, version_number=1)
+    db_session.add(version)
+    db_session.flush()
+    delivery = AssessmentDelivery(
+        test_version_id=version.id, title='Rebuild race', attempts_allowed=5
+    )
+    db_session.add(delivery)
+    db_session.flush()
+    _scored_attempt(db_session, delivery=delivery, user_id=user_id, attempt_number=1)
+    db_session.commit()
+
+    rebuilder, submitter = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        set_tenant_id(rebuilder, tenant_id)
+        set_tenant_id(submitter, tenant_id)
+        # The rebuild has read the attempts and written the stats row, but not committed.
+        rebuild_statistics(rebuilder, test_version_id=version.id)
+        _scored_attempt(submitter, delivery=delivery, user_id=user_id, attempt_number=2)
+        worker = threading.Thread(
+            target=record_attempt,
+            args=(submitter,),
+            kwargs={'test_version_id': version.id, 'responses': []},
+        )
+        worker.start()
+        worker.join(timeout=0.5)
+        assert worker.is_alive()  # waits behind the rebuild instead of missing its row
+
+        rebuilder.commit()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+        assert _PENDING_REBUILDS_KEY not in submitter.info
+        submitter.commit()
+    finally:
+        rebuilder.close()
+        submitter.close()
+
+    db_session.expire_all()
+    stats = db_session.get(AssessmentVersionStats, version.id)
+    assert stats.attempt_count == 2
@@ -0,0 +1,67 @@
+from app.services import job_signals
+from app.services.job_signals import CANCEL, PAUSE, RESUME, JobSignalListener
+
+
+class _PubSub:
+    def __init__(self, messages: list[str]) -> None:
+        self.messages = [{'type': 'message', 'data': message} for message in messages]
+        self.channels: list[str] = []
+        self.closed = False
+
+    def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+
+    def get_message(self, timeout: float):
+        return self.messages.pop(0) if self.messages else None
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Client:
+    def __init__(self, messages: list[str]) -> None:
+        self.pubsub_instance = _PubSub(messages)
+        self.published: list[tuple[str, str]] = []
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> _PubSub:
+        return self.pubsub_instance
+
+    def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, message))
+
+
+def test_listener_without_redis_is_unavailable(monkeypatch):
+    monkeypatch.setattr(job_signals, '_redis', lambda: None)
+
+    job_signals.publish('job-1', CANCEL)
+    with JobSignalListener('job-1') as listener:
+        assert listener.available is False
+        assert listener.poll() is None
+        assert listener.wait(0) is None
+
+
+def test_poll_prefers_cancel_then_latest_signal(monkeypatch):
+    client = _Client([PAUSE, CANCEL, RESUME])
+    monkeypatch.setattr(job_signals, '_redis', lambda: client)
+
+    listener = JobSignalListener('job-1')
+    assert client.pubsub_instance.channels == ['job_signal:job-1']
+    assert listener.poll() == CANCEL
+    assert listener.poll() == RESUME
+    assert listener.poll() is None
+    listener.close()
+    assert client.pubsub_instance.closed is True
+    assert listener.available is False
+
+    client = _Client([PAUSE, RESUME, PAUSE])
+    monkeypatch.setattr(job_signals, '_redis', lambda: client)
+    with JobSignalListener('job-2') as listener:
+        assert listener.poll() == PAUSE
+
+
+def test_publish_sends_to_job_channel(monkeypatch):
+    client = _Client([])
+    monkeypatch.setattr(job_signals, '_redis', lambda: client)
+
+    job_signals.publish('job-1', PAUSE)
+    assert client.published == [('job_signal:job-1', PAUSE)]
@@ -0,0 +1,116 @@
+import copy
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.integration_registry import IrAuditLog
+from app.services.integration_registry_service import _materialize_snapshots
+from app.utils.json_patch import apply_patch, make_patch
+
+
+CASES = [
+    ({}, {}),
+    ({'a': 1}, {'a': 2}),
+    ({'a': 1, 'b': 2}, {'b': 2, 'c': 3}),
+    ({'a': {'b': [1, 2, 3]}}, {'a': {'b': [1, 5]}}),
+    ({'a': [1]}, {'a': [1, {'x': None}, [2]]}),
+    ({'a': [1, 2]}, {'a': {'0': 1}}),
+    ({'a/b': 1, 'c~d': 2}, {'a/b': 3, 'c~d': 4, '~1': 5}),
+    ([{'id': 1}, {'id': 2}], [{'id': 2}]),
+    ({'a': 1}, [1, 2]),
+    ({'a': 1.0}, {'a': 1}),
+]
+
+
+@pytest.mark.parametrize(('old', 'new'), CASES)
+def test_patch_round_trips(old, new):
+    before = copy.deepcopy(old)
+
+    patch = make_patch(old, new)
+
+    assert apply_patch(old, patch) == new
+    assert old == before
+
+
+def test_make_patch_emits_minimal_ops():
+    assert make_patch({'a': 1, 'b': [1, 2]}, {'a': 1, 'b': [1, 2]}) == []
+    assert make_patch({'a/b': 1}, {'a/b': 2}) == [{'op': 'replace', 'path': '/a~1b', 'value': 2}]
+    assert make_patch({'l': [1, 2, 3]}, {'l': [1]}) == [
+        {'op': 'remove', 'path': '/l/2'},
+        {'op': 'remove', 'path': '/l/1'},
+    ]
+    assert make_patch({'l': []}, {'l': [1]}) == [{'op': 'add', 'path': '/l/-', 'value': 1}]
+
+
+def test_apply_patch_does_not_share_values_with_the_patch():
+    patch = [{'op': 'add', 'path': '/a', 'value': {'b': []}}]
+
+    doc = apply_patch({}, patch)
+    doc['a']['b'].append(1)
+
+    assert patch[0]['value'] == {'b': []}
+
+
+def test_apply_patch_supports_list_insert_and_rejects_unknown_ops():
+    patch = [{'op': 'add', 'path': '/l/1', 'value': 2}]
+    assert apply_patch({'l': [1, 3]}, patch) == {'l': [1, 2, 3]}
+    with pytest.raises(ValueError):
+        apply_patch({'a': 1}, [{'op': 'move', 'from': '/a', 'path': '/b'}])
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = 0
+
+    def execute(self, _statement):
+        self.statements += 1
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def test_materialize_snapshots_replays_each_entity_in_one_query():
+    tenant_id = uuid.uuid4()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    history = {
+        first: [{'name': 'a'}, {'name': 'b'}, {'name': 'b', 'tags': ['x']}],
+        second: [{'name': 'z'}, {}],
+    }
+    rows, logs = [], []
+    for entity_id, snapshots in history.items():
+        previous = None
+        for version, snapshot in enumerate(snapshots, start=1):
+            keyframe = previous is None
+            rows.append(
+                SimpleNamespace(
+                    tenant_id=tenant_id,
+                    entity_type='ir_service',
+                    entity_id=entity_id,
+                    version=version,
+                    is_keyframe=keyframe,
+                    snapshot_json=snapshot if keyframe else {},
+                    patch_json=None if keyframe else make_patch(previous, snapshot),
+                )
+            )
+            if not keyframe:
+                logs.append(
+                    IrAuditLog(
+                        tenant_id=tenant_id,
+                        entity_type='ir_service',
+                        entity_id=entity_id,
+                        version=version,
+                        is_keyframe=False,
+                        snapshot_json={},
+                    )
+                )
+            previous = snapshot
+    db = _Rows(rows)
+
+    _materialize_snapshots(db, logs)
+
+    assert db.statements == 1
+    assert [log.snapshot_json for log in logs] == [
+        {'name': 'b'},
+        {'name': 'b', 'tags': ['x']},
+        {},
+    ]
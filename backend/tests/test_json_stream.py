@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+import pytest
+
+from app.utils.json_stream import batched, read_json_file_hashed, sha256_json
+
+
+DOCUMENT = {
+    'meta': {'schema_version': '1.0', 'exported_at': '2026-01-01T00:00:00Z'},
+    'controls': [
+        {'id': f'c{i}', 'code': f'C-{i}', 'title': 'Überprüfung ✓ ' * (i % 5), 'weight': i * 1.25, 'tags': []}
+        for i in range(200)
+    ],
+    'empty': {},
+    'flags': [True, False, None, -12345678901234567890, 1e-7],
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1024 * 1024])
+def test_read_json_file_hashed_matches_json_loads(tmp_path, chunk_size):
+    raw = json.dumps(DOCUMENT, indent=2, ensure_ascii=False).encode('utf-8')
+    path = tmp_path / 'seed.json'
+    path.write_bytes(raw)
+
+    data, sha = read_json_file_hashed(path, chunk_size=chunk_size)
+
+    assert data == json.loads(raw)
+    assert sha == hashlib.sha256(raw).hexdigest()
+
+
+@pytest.mark.parametrize('content', [b'{"a": 1,}', b'[1 2]', b'{"a" 1}', b'{"a": 1} x', b'', b'{"a": "\xff"}'])
+def test_read_json_file_hashed_rejects_invalid_content(tmp_path, content):
+    path = tmp_path / 'bad.json'
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        read_json_file_hashed(path, chunk_size=4)
+
+
+def test_sha256_json_is_canonical_dump_digest():
+    expected = hashlib.sha256(json.dumps(DOCUMENT, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    assert sha256_json(DOCUMENT) == expected.hexdigest()
+
+
+def test_batched_splits_into_fixed_size_batches():
+    assert list(batched(range(5), size=2)) == [[0, 1], [2, 3], [4]]
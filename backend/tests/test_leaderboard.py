@@ -0,0 +1,159 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.rbac import User
+from app.models.tenant import Tenant, TenantMembership
+from app.services import leaderboard_service
+from app.services.leaderboard_service import (
+    _UPDATE_BUILT_BOARDS,
+    period_key,
+    rank_of,
+    record_stars,
+    top,
+)
+
+
+TEST_REDIS_URL = os.getenv('TEST_REDIS_URL')
+
+
+class _RecordingRedis:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def eval(self, script, numkeys, *args):
+        self.calls.append((script, numkeys, args))
+
+    def scan_iter(self, match):
+        self.calls.append(('scan', match))
+        return [match.replace('*', 'week:2026-W42')]
+
+    def delete(self, *names):
+        self.calls.append(('delete', *names))
+
+
+@pytest.fixture()
+def redis_client():
+    if not TEST_REDIS_URL:
+        pytest.skip('TEST_REDIS_URL is required for Redis-backed leaderboard tests')
+    client = redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    yield client
+    client.close()
+
+
+@pytest.mark.parametrize(
+    ('period_type', 'at', 'expected'),
+    [
+        ('week', datetime(2027, 1, 1, tzinfo=timezone.utc), '2026-W53'),
+        ('month', datetime(2026, 10, 31, 23, 30, tzinfo=timezone.utc), '2026-10'),
+        ('quarter', datetime(2026, 10, 1, tzinfo=timezone.utc), '2026-Q4'),
+        ('quarter', datetime(2026, 3, 31, tzinfo=timezone.utc), '2026-Q1'),
+        ('all', datetime(2026, 1, 1, tzinfo=timezone.utc), 'all'),
+    ],
+)
+def test_period_key(period_type, at, expected):
+    assert period_key(period_type, at) == expected
+
+
+def test_period_key_rejects_unknown_periods():
+    with pytest.raises(ValueError):
+        period_key('decade')
+
+
+def test_publish_sends_pending_updates_with_board_ttls(monkeypatch):
+    client = _RecordingRedis()
+    monkeypatch.setattr(leaderboard_service, '_redis', lambda: client)
+    session = Session()
+    session.info[leaderboard_service._PENDING_KEY] = [
+        ('leaderboard:t:week:2026-W42', 'u1', 7, 'week'),
+        ('leaderboard:t:all:all', 'u1', 30, 'all'),
+    ]
+
+    leaderboard_service._publish_pending(session)
+
+    assert client.calls == [
+        (
+            _UPDATE_BUILT_BOARDS,
+            2,
+            ('leaderboard:t:week:2026-W42', 'leaderboard:t:all:all', 'u1', 7, 14 * 86400, 'u1', 30, 0),
+        )
+    ]
+    assert leaderboard_service._PENDING_KEY not in session.info
+
+
+def test_update_script_skips_boards_that_were_never_built(redis_client):
+    built = f'leaderboard:test:{uuid.uuid4()}:week:2026-W42'
+    missing = f'leaderboard:test:{uuid.uuid4()}:week:2026-W42'
+    redis_client.zadd(built, {'built': float('-inf'), 'u1': 5})
+    try:
+        redis_client.eval(_UPDATE_BUILT_BOARDS, 2, built, missing, 'u1', 3, 60, 'u2', 4, 60)
+        redis_client.eval(_UPDATE_BUILT_BOARDS, 1, built, 'u2', 9, 0)
+
+        assert redis_client.exists(missing) == 0
+        assert redis_client.zscore(built, 'u1') == 5
+        assert redis_client.zscore(built, 'u2') == 9
+        assert 0 < redis_client.ttl(built) <= 60
+    finally:
+        redis_client.delete(built, missing)
+
+
+def test_record_stars_buckets_by_submission_time(db_session, monkeypatch):
+    monkeypatch.setattr(leaderboard_service, '_redis', lambda: None)
+    tenant_id = db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    users = db_session.scalars(select(User).order_by(User.email)).all()
+    submitted_at = datetime(2025, 12, 31, 23, 0, tzinfo=timezone.utc)
+
+    record_stars(db_session, tenant_id=tenant_id, user_id=users[0].id, stars=3, at=submitted_at)
+    record_stars(db_session, tenant_id=tenant_id, user_id=users[0].id, stars=2, at=submitted_at)
+    record_stars(db_session, tenant_id=tenant_id, user_id=users[1].id, stars=4, at=submitted_at)
+    db_session.commit()
+
+    board = top(db_session, tenant_id=tenant_id, period_type='month', key='2025-12')
+    assert [(item['user_id'], item['stars'], item['tests']) for item in board] == [
+        (str(users[0].id), 5, 2),
+        (str(users[1].id), 4, 1),
+    ]
+    assert top(db_session, tenant_id=tenant_id, period_type='quarter', key='2025-Q4')[0]['stars'] == 5
+    assert top(db_session, tenant_id=tenant_id, period_type='week', key='2026-W01')[0]['stars'] == 5
+    me = rank_of(db_session, tenant_id=tenant_id, user_id=users[1].id, period_type='all')
+    assert me['rank'] == 2
+    assert rank_of(db_session, tenant_id=tenant_id, user_id=users[1].id, period_type='month') is None
+    assert set(board[0]) == {'rank', 'user_id', 'full_name', 'stars', 'tests', 'star_rate'}
+
+
+def test_inactive_members_are_left_off_the_board(db_session, monkeypatch):
+    client = _RecordingRedis()
+    monkeypatch.setattr(leaderboard_service, '_redis', lambda: None)
+    tenant_id = db_session.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    users = db_session.scalars(select(User).order_by(User.email)).all()
+    for user, stars in zip(users[:3], (9, 5, 3), strict=True):
+        record_stars(db_session, tenant_id=tenant_id, user_id=user.id, stars=stars)
+    db_session.commit()
+
+    membership = db_session.scalar(
+        select(TenantMembership).where(
+            TenantMembership.tenant_id == tenant_id, TenantMembership.user_id == users[0].id
+        )
+    )
+    membership.status = 'disabled'
+    monkeypatch.setattr(leaderboard_service, '_redis', lambda: client)
+    db_session.commit()
+    assert client.calls == [
+        ('scan', f'leaderboard:{tenant_id}:*'),
+        ('delete', f'leaderboard:{tenant_id}:week:2026-W42'),
+    ]
+
+    monkeypatch.setattr(leaderboard_service, '_redis', lambda: None)
+    board = top(db_session, tenant_id=tenant_id, period_type='all')
+    assert [(item['rank'], item['user_id']) for item in board] == [
+        (1, str(users[1].id)),
+        (2, str(users[2].id)),
+    ]
+    assert rank_of(db_session, tenant_id=tenant_id, user_id=users[0].id, period_type='all') is None
+    me = rank_of(db_session, tenant_id=tenant_id, user_id=users[2].id, period_type='all')
+    assert me['rank'] == 2
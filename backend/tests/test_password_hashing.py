@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from passlib.hash import bcrypt
+
+from app.core import security
+from app.core.security import (
+    PasswordHashBusyError,
+    hash_password,
+    password_pool_stats,
+    pwd_context,
+    verify_password,
+)
+from app.models.rbac import User
+from app.services.auth_service import authenticate_user
+
+
+@pytest.fixture(autouse=True)
+def in_process(monkeypatch):
+    monkeypatch.setattr(security.settings, 'PASSWORD_HASH_POOL_SIZE', 0)
+
+
+class _LoginSession:
+    def __init__(self, user: User) -> None:
+        self.user = user
+        self.flushes = 0
+
+    def scalar(self, _statement):
+        return self.user
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+def _user(hashed_password: str) -> User:
+    return User(email='rehash@example.com', is_active=True, hashed_password=hashed_password)
+
+
+def test_saturated_pool_rejects_without_waiting(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, '_slots', slots)
+    before = password_pool_stats()
+    slots.acquire()
+
+    with pytest.raises(PasswordHashBusyError):
+        hash_password('Secret123!')
+
+    after = password_pool_stats()
+    assert after['rejected_total'] == before['rejected_total'] + 1
+    assert after['completed_total'] == before['completed_total']
+    assert after['in_flight'] == 0
+
+    slots.release()
+    assert verify_password('Secret123!', hash_password('Secret123!')) is True
+    assert password_pool_stats()['completed_total'] == before['completed_total'] + 2
+
+
+def test_failed_hashes_release_the_slot_but_do_not_count_as_completed(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, '_slots', slots)
+    before = password_pool_stats()
+
+    with pytest.raises(ValueError):
+        verify_password('Secret123!', 'not-a-hash')
+
+    assert password_pool_stats()['completed_total'] == before['completed_total']
+    assert slots.acquire(blocking=False) is True
+
+
+def test_login_upgrades_outdated_hashes():
+    legacy = bcrypt.using(rounds=4).hash('Secret123!')
+    db = _LoginSession(_user(legacy))
+
+    assert authenticate_user(db, 'Rehash@example.com', 'Secret123!') is db.user
+    assert db.flushes == 1
+    assert pwd_context.identify(db.user.hashed_password) == 'bcrypt_sha256'
+    assert pwd_context.verify('Secret123!', db.user.hashed_password)
+
+
+def test_login_keeps_current_hashes_and_rejects_wrong_passwords():
+    current = hash_password('Secret123!')
+    db = _LoginSession(_user(current))
+
+    assert authenticate_user(db, 'rehash@example.com', 'Wrong123!') is None
+    assert authenticate_user(db, 'rehash@example.com', 'Secret123!') is db.user
+    assert db.user.hashed_password == current
+    assert db.flushes == 0
@@ -0,0 +1,141 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.rbac import Role, User, UserRole
+from app.services import principal_service
+from app.services.principal_service import (
+    PRINCIPAL_TTL_SECONDS,
+    bump_epoch,
+    get_principal,
+    mark_principal_stale,
+    remember,
+)
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    monkeypatch.setattr(principal_service, '_redis', lambda: None)
+    monkeypatch.setattr(principal_service, '_entries', type(principal_service._entries)())
+    monkeypatch.setattr(principal_service, '_local_epochs', {})
+
+
+@pytest.fixture()
+def bumped(monkeypatch):
+    calls: list[uuid.UUID] = []
+    monkeypatch.setattr(principal_service, 'bump_epoch', calls.append)
+    return calls
+
+
+def _user(*role_names: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        is_active=True,
+        password_change_required=False,
+        user_roles=[SimpleNamespace(role=SimpleNamespace(name=name)) for name in role_names],
+    )
+
+
+def _load(user) -> principal_service.Principal:
+    cached, epoch = get_principal(user.id, 1)
+    return cached or remember(user, 1, epoch)
+
+
+def test_cached_principal_is_reused_until_the_epoch_moves():
+    user = _user('admin', 'mentor')
+    principal = _load(user)
+
+    assert principal.role_names == frozenset({'admin', 'mentor'})
+    assert get_principal(user.id, 1) == (principal, 0)
+    assert get_principal(user.id, 2) == (None, 0)
+
+    bump_epoch(user.id)
+    assert get_principal(user.id, 1) == (None, 1)
+
+
+def test_stale_entries_from_an_older_epoch_are_dropped():
+    user = _user()
+    _, epoch = get_principal(user.id, 1)
+    bump_epoch(user.id)
+    # Loaded before the bump landed: must not be served afterwards.
+    remember(user, 1, epoch)
+
+    assert get_principal(user.id, 1) == (None, 1)
+    assert (user.id, 1) not in principal_service._entries
+
+
+def test_entries_expire_and_the_cache_is_bounded(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(principal_service, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(principal_service, 'PRINCIPAL_CACHE_MAX_ENTRIES', 2)
+    first, second, third = _user(), _user(), _user()
+    for user in (first, second):
+        _load(user)
+    assert get_principal(first.id, 1)[0] is not None
+    _load(third)
+
+    assert get_principal(second.id, 1)[0] is None
+    assert get_principal(first.id, 1)[0] is not None
+    clock.now += PRINCIPAL_TTL_SECONDS
+    assert get_principal(third.id, 1)[0] is None
+
+
+def test_stale_marks_are_applied_on_commit_and_dropped_on_rollback(bumped):
+    user_id = uuid.uuid4()
+    session = Session()
+
+    session.begin()
+    mark_principal_stale(session, user_id)
+    session.rollback()
+    assert bumped == []
+
+    session.begin()
+    mark_principal_stale(session, user_id)
+    mark_principal_stale(session, user_id)
+    session.commit()
+    assert bumped == [user_id]
+
+
+def _seeded(db, email: str) -> User:
+    return db.scalar(select(User).where(User.email == email))
+
+
+def test_orphaned_role_rows_bump_the_epoch(db_session, bumped):
+    user = _seeded(db_session, 'seed-mentor@example.com')
+
+    user.user_roles.clear()
+    db_session.commit()
+
+    assert bumped == [user.id]
+
+
+def test_added_roles_and_deleted_users_bump_the_epoch(db_session, bumped):
+    user = User(email='principal-cache@example.com', full_name='Principal Cache', is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    bumped.clear()
+    reviewer = db_session.scalar(select(Role).where(Role.name == 'reviewer'))
+
+    db_session.add(UserRole(user_id=user.id, role_id=reviewer.id))
+    db_session.commit()
+    assert bumped == [user.id]
+
+    db_session.delete(user)
+    db_session.commit()
+    assert bumped == [user.id, user.id]
+
+
+def test_bulk_statements_bump_the_affected_users(db_session, bumped):
+    mentor = _seeded(db_session, 'seed-mentor@example.com')
+    employee = _seeded(db_session, 'seed-employee-1@example.com')
+    admin = _seeded(db_session, 'seed-admin@example.com')
+
+    db_session.execute(delete(UserRole).where(UserRole.user_id == mentor.id))
+    db_session.execute(update(User).where(User.id == employee.id).values(is_active=False))
+    db_session.execute(update(User), [{'id': admin.id, 'password_change_required': True}])
+    db_session.commit()
+
+    assert sorted(bumped) == sorted([mentor.id, employee.id, admin.id])
@@ -0,0 +1,79 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.services import question_dedup_service
+from app.services.question_dedup_service import (
+    BANDS,
+    NUM_PERM,
+    band_buckets,
+    estimate_jaccard,
+    group_around_representatives,
+    minhash,
+    normalize_prompt,
+    shingles,
+)
+
+PROMPT = 'Which HTTP status code tells the client that the requested resource was not found?'
+NEAR_DUPLICATE = 'Which HTTP status code tells a client that the requested resource was not found?'
+UNRELATED = 'Name the Python keyword that defines an anonymous function inline.'
+
+
+def test_normalize_and_shingles():
+    assert normalize_prompt('  What is  2+2?\n') == 'what is 2 2'
+    assert shingles('') == set()
+    assert shingles('abc') == {'abc'}
+    assert shingles('abcdef') == {'abcde', 'bcdef'}
+
+
+def test_minhash_is_deterministic_and_sized():
+    signature = minhash(PROMPT)
+    assert len(signature) == NUM_PERM
+    assert signature == minhash(PROMPT.upper() + ' ')
+    assert minhash('?!') == []
+    assert band_buckets([]) == []
+    assert len(band_buckets(signature)) == BANDS
+
+
+def test_estimated_jaccard_tracks_similarity():
+    assert estimate_jaccard(minhash(PROMPT), minhash(PROMPT)) == 1.0
+    assert estimate_jaccard(minhash(PROMPT), minhash(NEAR_DUPLICATE)) >= 0.8
+    assert estimate_jaccard(minhash(PROMPT), minhash(UNRELATED)) < 0.2
+    assert estimate_jaccard([], []) == 0.0
+
+
+def test_lsh_buckets_collide_for_near_duplicates_only():
+    base = set(enumerate(band_buckets(minhash(PROMPT))))
+    assert base & set(enumerate(band_buckets(minhash(NEAR_DUPLICATE))))
+    assert not base & set(enumerate(band_buckets(minhash(UNRELATED))))
+
+
+def test_groups_do_not_chain_through_intermediate_questions():
+    a, b, c, d = (uuid.UUID(int=i) for i in range(1, 5))
+    # a~b and b~c, but a and c are not similar; d~c.
+    similar = {a: {b}, b: {a, c}, c: {b, d}, d: {c}}
+    order = {a: 0, b: 1, c: 2, d: 3}
+
+    groups = group_around_representatives(similar, key=order.__getitem__)
+
+    assert [(group.keep_id, group.duplicate_ids) for group in groups] == [(a, [b]), (c, [d])]
+
+
+def test_backfill_watermark_advances_only_on_commit():
+    tenant_key = str(uuid.uuid4())
+    later = datetime.now(UTC)
+    earlier = later - timedelta(minutes=5)
+    db = Session()
+    try:
+        db.info['dedup_signed_through'] = {tenant_key: later}
+        db.commit()
+        assert question_dedup_service._signed_through[tenant_key] == later
+
+        # An older pass committing late never moves the watermark back.
+        db.info['dedup_signed_through'] = {tenant_key: earlier}
+        db.commit()
+        assert question_dedup_service._signed_through[tenant_key] == later
+    finally:
+        db.close()
+        question_dedup_service._signed_through.pop(tenant_key, None)
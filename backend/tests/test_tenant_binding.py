@@ -0,0 +1,151 @@
+from sqlalchemy import text
+
+from app.db.session import (
+    _bind_tenant,
+    _forget_bound_tenant,
+    _keep_bound_tenant,
+    _reset_bound_tenant,
+    set_tenant_id,
+)
+from tests.conftest import TestingSessionLocal, engine
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.info: dict = {}
+        self.bound: list[str] = []
+
+    def execute(self, _statement, params):
+        self.bound.append(params['tenant_id'])
+
+
+class _DbapiConnection:
+    def __init__(self, fail: bool = False) -> None:
+        self.autocommit = False
+        self.fail = fail
+        self.statements: list[tuple[str, bool]] = []
+
+    def cursor(self):
+        connection = self
+
+        class _Cursor:
+            def execute(self, statement):
+                if connection.fail:
+                    raise OSError('connection lost')
+                connection.statements.append((statement, connection.autocommit))
+
+            def close(self):
+                pass
+
+        return _Cursor()
+
+
+class _Record:
+    def __init__(self, info: dict) -> None:
+        self.info = info
+        self.invalidated = None
+
+    def invalidate(self, exc):
+        self.invalidated = exc
+
+
+def test_bind_tenant_skips_connections_already_bound_to_the_tenant():
+    connection = _Connection()
+
+    _bind_tenant(connection, 'a')
+    _bind_tenant(connection, 'a')
+    _bind_tenant(connection, None)
+    _bind_tenant(connection, None)
+
+    assert connection.bound == ['a', '']
+
+
+def test_committed_binding_survives_later_rollbacks():
+    connection = _Connection()
+    _bind_tenant(connection, 'a')
+    _keep_bound_tenant(connection)
+
+    _forget_bound_tenant(connection)
+    _bind_tenant(connection, 'a')
+
+    assert connection.bound == ['a']
+
+
+def test_rolled_back_binding_is_forgotten():
+    connection = _Connection()
+    _bind_tenant(connection, 'a')
+
+    _forget_bound_tenant(connection)
+    _bind_tenant(connection, 'a')
+
+    assert connection.bound == ['a', 'a']
+
+
+def test_checkin_resets_a_connection_whose_unbinding_was_rolled_back():
+    connection = _Connection()
+    _bind_tenant(connection, 'a')
+    _keep_bound_tenant(connection)
+    # Clearing the tenant is undone by the rollback: Postgres still holds 'a'.
+    _bind_tenant(connection, None)
+    _forget_bound_tenant(connection)
+
+    dbapi_connection = _DbapiConnection()
+    _reset_bound_tenant(dbapi_connection, _Record(connection.info))
+
+    assert dbapi_connection.statements == [('RESET app.tenant_id', True)]
+
+
+def test_savepoint_rollback_forgets_a_binding_made_inside_it():
+    connection = _Connection()
+    _bind_tenant(connection, 'a')
+    _keep_bound_tenant(connection)
+
+    _bind_tenant(connection, 'b')
+    _forget_bound_tenant(connection, 'sa_savepoint_1', None)
+    _bind_tenant(connection, 'b')
+    _forget_bound_tenant(connection, 'sa_savepoint_2', None)
+
+    assert connection.bound == ['a', 'b', 'b']
+    dbapi_connection = _DbapiConnection()
+    _reset_bound_tenant(dbapi_connection, _Record(connection.info))
+    assert dbapi_connection.statements == [('RESET app.tenant_id', True)]
+
+
+def test_checkin_resets_the_tenant_in_autocommit():
+    dbapi_connection = _DbapiConnection()
+    record = _Record({'bound_tenant_id': 'a', 'bound_tenant_pending': True, 'other': 1})
+
+    _reset_bound_tenant(dbapi_connection, record)
+
+    assert dbapi_connection.statements == [('RESET app.tenant_id', True)]
+    assert dbapi_connection.autocommit is False
+    assert record.info == {'other': 1}
+    assert record.invalidated is None
+
+
+def test_checkin_skips_unbound_connections_and_invalidates_on_failure():
+    unbound = _DbapiConnection()
+    _reset_bound_tenant(unbound, _Record({'bound_tenant_id': None}))
+    _reset_bound_tenant(None, _Record({'bound_tenant_id': 'a'}))
+    assert unbound.statements == []
+
+    record = _Record({'bound_tenant_id': 'a'})
+    _reset_bound_tenant(_DbapiConnection(fail=True), record)
+    assert isinstance(record.invalidated, OSError)
+
+
+def test_direct_connections_do_not_inherit_a_session_tenant(db_session):
+    tenant_id = db_session.execute(text("select id::text from tenants limit 1")).scalar()
+    session = TestingSessionLocal()
+    try:
+        set_tenant_id(session, tenant_id)
+        bound = session.execute(text("select current_setting('app.tenant_id')")).scalar()
+        assert bound == tenant_id
+        session.commit()
+    finally:
+        session.close()
+
+    # The pool hands the tenant-bound connection back out here.
+    for _ in range(engine.pool.size() + 1):
+        with engine.connect() as conn:
+            assert not conn.execute(text("select current_setting('app.tenant_id', true)")).scalar()
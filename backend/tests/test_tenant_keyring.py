@@ -0,0 +1,163 @@
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import tenant_keyring
+from app.utils.tenant_keyring import get_key, is_unlocked, lock_tenant, store_key
+
+
+KEY_ID = 'integration_registry'
+TTL = 600
+
+
+class _FakeRedis:
+    def __init__(self, clock) -> None:
+        self.clock = clock
+        self.values: dict[str, tuple[str, float]] = {}
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError('redis is down')
+
+    def set(self, name, value, ex):
+        self._check()
+        self.values[name] = (value, self.clock.now + ex)
+
+    def _live(self, name):
+        value = self.values.get(name)
+        if value is None or value[1] <= self.clock.now:
+            self.values.pop(name, None)
+            return None
+        return value
+
+    def get(self, name):
+        value = self._live(name)
+        return value[0] if value else None
+
+    def pttl(self, name):
+        value = self._live(name)
+        return int((value[1] - self.clock.now) * 1000) if value else -2
+
+    def pipeline(self, transaction=False):
+        client = self
+        calls = []
+
+        class _Pipe:
+            def get(self, name):
+                calls.append(lambda: client.get(name))
+
+            def pttl(self, name):
+                calls.append(lambda: client.pttl(name))
+
+            def execute(self):
+                client._check()
+                return [call() for call in calls]
+
+        return _Pipe()
+
+    def delete(self, *names):
+        self._check()
+        for name in names:
+            self.values.pop(name, None)
+
+    def scan_iter(self, match):
+        self._check()
+        prefix = match.rstrip('*')
+        return [name for name in list(self.values) if name.startswith(prefix)]
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(tenant_keyring, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(tenant_keyring, '_ttl_seconds', lambda: TTL)
+    monkeypatch.setattr(tenant_keyring, '_keys', {})
+    return clock
+
+
+@pytest.fixture()
+def shared(monkeypatch, clock):
+    client = _FakeRedis(clock)
+    wrap = os.urandom(32)
+    monkeypatch.setattr(tenant_keyring, '_shared_store', lambda: (client, wrap))
+    return client
+
+
+@pytest.fixture()
+def local_only(monkeypatch, clock):
+    monkeypatch.setattr(tenant_keyring, '_shared_store', lambda: None)
+
+
+def _other_worker(monkeypatch):
+    # A fresh process: same Redis, empty local cache.
+    monkeypatch.setattr(tenant_keyring, '_keys', {})
+
+
+def test_local_keys_expire_after_the_ttl(local_only, clock):
+    tenant_id, key = uuid.uuid4(), os.urandom(32)
+    store_key(tenant_id, KEY_ID, key)
+
+    assert get_key(tenant_id, KEY_ID) == key
+    assert get_key(uuid.uuid4(), KEY_ID) is None
+    clock.now += TTL
+    assert is_unlocked(tenant_id, KEY_ID) is False
+
+
+def test_lock_tenant_drops_every_key_of_that_tenant_only(local_only):
+    tenant_id, other = uuid.uuid4(), uuid.uuid4()
+    for tid, key_id in ((tenant_id, 'a'), (tenant_id, 'b'), (other, 'a')):
+        store_key(tid, key_id, os.urandom(32))
+
+    lock_tenant(tenant_id, 'a')
+    assert [is_unlocked(tenant_id, k) for k in ('a', 'b')] == [False, True]
+    lock_tenant(tenant_id)
+    assert is_unlocked(tenant_id, 'b') is False
+    assert is_unlocked(other, 'a') is True
+
+
+def test_shared_keys_are_wrapped_and_reach_other_workers(shared, monkeypatch, clock):
+    tenant_id, key = uuid.uuid4(), os.urandom(32)
+    store_key(tenant_id, KEY_ID, key)
+    (wrapped, _), = shared.values.values()
+    assert key.hex() not in wrapped
+
+    _other_worker(monkeypatch)
+    clock.now += TTL - 60
+    assert get_key(tenant_id, KEY_ID) == key
+    # The local copy inherits the remaining Redis TTL rather than a fresh one.
+    clock.now += 60
+    assert get_key(tenant_id, KEY_ID) is None
+
+
+def test_lock_on_one_worker_reaches_others_after_the_recheck(shared, monkeypatch, clock):
+    tenant_id, key = uuid.uuid4(), os.urandom(32)
+    store_key(tenant_id, KEY_ID, key)
+    shared.delete(*list(shared.values))
+
+    assert get_key(tenant_id, KEY_ID) == key
+    clock.now += tenant_keyring.LOCAL_RECHECK_SECONDS
+    assert get_key(tenant_id, KEY_ID) is None
+    assert (tenant_id, KEY_ID) not in tenant_keyring._keys
+
+
+def test_redis_outage_serves_the_local_copy_until_it_expires(shared, clock):
+    tenant_id, key = uuid.uuid4(), os.urandom(32)
+    store_key(tenant_id, KEY_ID, key)
+    shared.down = True
+
+    clock.now += tenant_keyring.LOCAL_RECHECK_SECONDS
+    assert get_key(tenant_id, KEY_ID) == key
+    clock.now += TTL
+    assert get_key(tenant_id, KEY_ID) is None
+
+
+def test_keys_wrapped_under_another_master_key_are_ignored(shared, monkeypatch):
+    tenant_id = uuid.uuid4()
+    store_key(tenant_id, KEY_ID, os.urandom(32))
+
+    _other_worker(monkeypatch)
+    monkeypatch.setattr(tenant_keyring, '_shared_store', lambda: (shared, os.urandom(32)))
+    assert get_key(tenant_id, KEY_ID) is None
@@ -0,0 +1,157 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.db.session import set_tenant_id
+from app.models.rbac import User
+from app.models.tenant import Tenant
+from app.models.track import TrackPropagationJob, TrackTemplate, TrackVersion
+from app.services.track_propagation_service import (
+    cancel_job,
+    run_propagation_job,
+    start_propagation_job,
+)
+
+
+LONG_AGO = datetime.now(UTC) - timedelta(minutes=30)
+
+
+def _setup(db):
+    tenant_id = db.scalar(select(Tenant.id).where(Tenant.slug == 'test-tenant'))
+    actor_id = db.scalar(select(User.id).where(User.email == 'seed-admin@example.com'))
+    set_tenant_id(db, str(tenant_id))
+    template = TrackTemplate(tenant_id=tenant_id, title='Propagation')
+    db.add(template)
+    db.flush()
+    versions = [
+        TrackVersion(tenant_id=tenant_id, template_id=template.id, version_number=n, title=f'v{n}')
+        for n in (1, 2)
+    ]
+    db.add_all(versions)
+    db.flush()
+    return tenant_id, actor_id, template, versions
+
+
+def _job(db, *, tenant_id, template, version, status, heartbeat=None):
+    job = TrackPropagationJob(
+        tenant_id=tenant_id,
+        template_id=template.id,
+        track_version_id=version.id,
+        status=status,
+        last_heartbeat_at=heartbeat,
+    )
+    db.add(job)
+    db.flush()
+    # Queued long ago, so a created_at-based staleness check would fire.
+    db.execute(
+        update(TrackPropagationJob)
+        .where(TrackPropagationJob.id == job.id)
+        .values(created_at=LONG_AGO)
+    )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def test_long_queued_job_is_not_requeued_or_resumed(db_session):
+    tenant_id, actor_id, template, (version, _) = _setup(db_session)
+    job = _job(db_session, tenant_id=tenant_id, template=template, version=version, status='queued')
+
+    picked, needs_dispatch = start_propagation_job(
+        db_session, template_id=template.id, version_id=version.id, actor_user_id=actor_id
+    )
+
+    assert picked.id == job.id
+    assert needs_dispatch is False
+    assert picked.status == 'queued'
+
+
+def test_only_stale_running_jobs_are_requeued(db_session):
+    tenant_id, actor_id, template, (version, _) = _setup(db_session)
+    job = _job(
+        db_session,
+        tenant_id=tenant_id,
+        template=template,
+        version=version,
+        status='running',
+        heartbeat=datetime.now(UTC),
+    )
+
+    _, needs_dispatch = start_propagation_job(
+        db_session, template_id=template.id, version_id=version.id, actor_user_id=actor_id
+    )
+    assert needs_dispatch is False
+    assert job.status == 'running'
+
+    db_session.execute(
+        update(TrackPropagationJob)
+        .where(TrackPropagationJob.id == job.id)
+        .values(last_heartbeat_at=LONG_AGO)
+    )
+    _, needs_dispatch = start_propagation_job(
+        db_session, template_id=template.id, version_id=version.id, actor_user_id=actor_id
+    )
+    assert needs_dispatch is True
+    assert job.status == 'queued'
+
+
+def test_newer_publish_cancels_queued_jobs_and_flags_live_ones(db_session):
+    tenant_id, actor_id, template, (old, new) = _setup(db_session)
+    queued = _job(db_session, tenant_id=tenant_id, template=template, version=old, status='queued')
+    live = _job(
+        db_session,
+        tenant_id=tenant_id,
+        template=template,
+        version=old,
+        status='running',
+        heartbeat=datetime.now(UTC),
+    )
+
+    job, needs_dispatch = start_propagation_job(
+        db_session, template_id=template.id, version_id=new.id, actor_user_id=actor_id
+    )
+
+    assert needs_dispatch is True
+    assert job.track_version_id == new.id
+    assert (queued.status, queued.cancel_requested) == ('canceled', True)
+    assert (live.status, live.cancel_requested) == ('running', True)
+
+
+def test_worker_claims_a_job_once(db_session):
+    tenant_id, actor_id, template, (version, _) = _setup(db_session)
+    running = _job(
+        db_session,
+        tenant_id=tenant_id,
+        template=template,
+        version=version,
+        status='running',
+        heartbeat=datetime.now(UTC),
+    )
+    canceled = _job(
+        db_session, tenant_id=tenant_id, template=template, version=version, status='queued'
+    )
+    cancel_job(db_session, job=canceled, actor_user_id=actor_id)
+    db_session.commit()
+
+    run_propagation_job(job_id=running.id, tenant_id=tenant_id)
+    run_propagation_job(job_id=canceled.id, tenant_id=tenant_id)
+
+    db_session.expire_all()
+    assert (running.status, running.processed) == ('running', 0)
+    assert running.completed_at is None
+    assert canceled.status == 'canceled'
+    assert canceled.started_at is None
+
+
+def test_worker_runs_a_queued_job_to_completion(db_session):
+    tenant_id, _, template, (version, _) = _setup(db_session)
+    db_session.execute(
+        update(TrackVersion).where(TrackVersion.id == version.id).values(is_current=True)
+    )
+    job = _job(db_session, tenant_id=tenant_id, template=template, version=version, status='queued')
+
+    run_propagation_job(job_id=job.id, tenant_id=tenant_id)
+
+    db_session.expire_all()
+    assert job.status == 'completed'
+    assert job.started_at is not None
@@ -25,7 +25,11 @@ interface ResultsResponse {
     user_id?: string | null;
     attempt_count: number;
     average_score_percent?: number | null;
+    scored_count?: number;
+    pass_rate?: number | null;
+    score_percentiles?: Record<string, number | null>;
   };
+  next_cursor?: string | null;
 }
 
 function SectionScorePill({ percent }: { percent: number }) {
@@ -76,23 +80,39 @@ export default function AssessmentResultsPage() {
   const [results, setResults] = useState<ResultsResponse | null>(null);
   const [loading, setLoading] = useState(true);
   const [detail, setDetail] = useState<AssessmentAttempt | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const fetchPage = (token: string, cursor?: string | null) => {
+    const params = new URLSearchParams();
+    if (deliveryId) params.set('delivery_id', deliveryId);
+    if (testId) params.set('test_id', testId);
+    if (userId) params.set('user_id', userId);
+    if (cursor) params.set('cursor', cursor);
+    const qs = params.toString();
+    return api.get<ResultsResponse>(`/assessments/results${qs ? `?${qs}` : ''}`, token);
+  };
 
   const load = async () => {
     if (!accessToken) return;
     setLoading(true);
     try {
-      const params = new URLSearchParams();
-      if (deliveryId) params.set('delivery_id', deliveryId);
-      if (testId) params.set('test_id', testId);
-      if (userId) params.set('user_id', userId);
-      const qs = params.toString();
-      const response = await api.get<ResultsResponse>(`/assessments/results${qs ? `?${qs}` : ''}`, accessToken);
-      setResults(response);
+      setResults(await fetchPage(accessToken));
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    if (!accessToken || !results?.next_cursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(accessToken, results.next_cursor);
+      setResults({ ...page, items: [...results.items, ...page.items] });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     void load();
   }, [accessToken, deliveryId, testId, userId]);
@@ -300,6 +320,13 @@ export default function AssessmentResultsPage() {
               </tbody>
             </table>
           </div>
+          {results.next_cursor && (
+            <div className='flex justify-center border-t py-3'>
+              <Button variant='outline' size='sm' onClick={() => void loadMore()} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : `Load more (${items.length} of ${results.summary.attempt_count})`}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 